@@ -0,0 +1,130 @@
+"""
+TEGG Touch 蛋挞 辅助软件 - 按键绑定编译
+
+把按钮/扇区/语音指令上的按键字符串（如 "shift+w"、"macro:reload+mouse:left"）
+在方案加载或编辑保存时一次性编译成不可变的 BindingPlan:
+  - 普通键 → 已解析扫描码 + 扩展键标志的 InputEvent
+  - mouse:left/right/middle/x1/x2 → 鼠标按钮 InputEvent
+  - mouse:wheelup/wheeldown → 滚轮 InputEvent
+  - macro:name → 宏名引用（执行时在 core.macro_compiler 编译的宏索引中查找，宏可能在之后被编辑）
+
+运行时热路径只需按动作取出预构建的事件批次，不再做字符串拆分和扫描码查询。
+"""
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+
+from core import input_engine
+from core.input_backend import InputEvent, INPUT_MOUSE
+
+logger = logging.getLogger(__name__)
+
+# 可绑定按键的字段名（按钮 / 扇区 / 圆环共用）
+BINDING_FIELDS = (
+    'hover', 'lclick', 'rclick', 'mclick',
+    'wheelup', 'wheeldown', 'xbutton1', 'xbutton2',
+)
+
+
+@dataclass(frozen=True)
+class BindingPlan:
+    """编译后的按键绑定 — 不可变，可在线程间共享
+
+    press / release:        普通键 + 鼠标按钮，用于 'p' / 'r'
+    tap_press / tap_release: 仅普通键，用于 'c'（鼠标按钮不参与点击动作）
+    wheel:                   mouse:wheelup/wheeldown 滚轮事件
+    macros:                  macro:name 引用的宏名
+    unknown:                 无法解析扫描码的键名（编译时已告警）
+    """
+    source: str = ''
+    press: tuple = ()
+    release: tuple = ()
+    tap_press: tuple = ()
+    tap_release: tuple = ()
+    wheel: tuple = ()
+    macros: tuple = ()
+    unknown: tuple = ()
+
+    def __bool__(self):
+        # 与原先 "if key_str:" 的判断保持一致
+        return bool(self.source)
+
+
+EMPTY_PLAN = BindingPlan()
+
+# 编译缓存上限（同一键位在多个按钮/宏步骤中复用；编辑过的旧字符串按 LRU 淘汰）
+PLAN_CACHE_MAX = 512
+
+
+def clear_plan_cache():
+    """清空编译缓存（键盘布局变化或测试时调用）"""
+    _compile.cache_clear()
+
+
+def compile_binding(key_str: str) -> BindingPlan:
+    """将按键字符串编译为 BindingPlan（带缓存）。"""
+    if not key_str:
+        return EMPTY_PLAN
+    return _compile(key_str)
+
+
+@lru_cache(maxsize=PLAN_CACHE_MAX)
+def _compile(key_str: str) -> BindingPlan:
+    key_down, key_up = [], []
+    mouse_down, mouse_up = [], []
+    wheel, macros, unknown = [], [], []
+
+    for part in key_str.split('+'):
+        p = part.strip()
+        if not p:
+            continue
+        if p.startswith('macro:'):
+            macros.append(p[6:])
+        elif p.startswith('mouse:'):
+            mouse_val = p[6:]
+            if mouse_val in ('wheelup', 'wheeldown'):
+                delta = input_engine.WHEEL_DELTA if mouse_val == 'wheelup' else -input_engine.WHEEL_DELTA
+                wheel.append(InputEvent(INPUT_MOUSE, 0, input_engine.MOUSEEVENTF_WHEEL,
+                                        delta & 0xFFFFFFFF))
+            else:
+                ev_down = input_engine.mouse_button_event(mouse_val, up=False)
+                if ev_down is None:
+                    unknown.append(p)
+                    continue
+                mouse_down.append(ev_down)
+                mouse_up.append(input_engine.mouse_button_event(mouse_val, up=True))
+        else:
+            sc = input_engine.get_scan_code(p)
+            if sc == 0:
+                unknown.append(p)
+                continue
+            ext = p.lower() in input_engine._EXTENDED_KEY_NAMES
+            key_down.append(input_engine.key_event(sc, ext, up=False))
+            key_up.append(input_engine.key_event(sc, ext, up=True))
+
+    return BindingPlan(
+        source=key_str,
+        press=tuple(key_down + mouse_down),
+        release=tuple(key_up + mouse_up),
+        tap_press=tuple(key_down),
+        tap_release=tuple(key_up),
+        wheel=tuple(wheel),
+        macros=tuple(macros),
+        unknown=tuple(unknown),
+    )
+
+
+def compile_bindings(data) -> dict:
+    """编译一个按钮/扇区/圆环数据上的全部绑定字段，返回 {字段名: BindingPlan}。
+
+    含未知按键的绑定在此处告警，而不是等到运行时被静默跳过。
+    """
+    plans = {}
+    for field in BINDING_FIELDS:
+        plan = compile_binding(getattr(data, field, '') or '')
+        if plan.unknown:
+            logger.warning("'%s' 的 %s 绑定包含无法识别的按键: %s",
+                           getattr(data, 'name', '?'), field, ', '.join(plan.unknown))
+        plans[field] = plan
+    return plans
@@ -21,6 +21,7 @@ PROFILES_DIR = "profiles"
 PROFILES_INDEX = "_index.json"
 DEFAULT_PROFILE_NAME = "Default"  # 固定英文作为文件名 key，显示名用 t("profile.default_name")
 HOTKEYS_FILE = "settings/hotkeys.json"
+LATENCY_DUMP_FILE = "latency_stats.json"  # 运行模式延迟直方图导出
 
 def get_app_title():
     """返回本地化的应用标题。"""
@@ -36,9 +37,22 @@ DEFAULT_HOTKEYS = {
     "pt_off":         "f10",
     "pt_block":       "f11",
     "stop":           "f12",
+    "latency_hud":    "",   # 诊断: 延迟统计 HUD（不在设置面板中显示，见 DEBUG_HOTKEYS）
+    "latency_dump":   "",   # 诊断: 导出延迟统计
+    "repaint_debug":  "",   # 诊断: 重绘区域闪烁
     "auto_center_delay": 1500,
 }
 
+# 诊断快捷键: 默认不绑定，避免占用游戏常用的组合键；
+# 设置环境变量 TEGG_DEBUG_HOTKEYS=1 启动时启用以下组合（也可在 settings/hotkeys.json 中手动指定）
+DEBUG_HOTKEYS = {
+    "latency_hud":    "ctrl+shift+l",
+    "latency_dump":   "ctrl+shift+d",
+    "repaint_debug":  "ctrl+shift+r",
+}
+if os.environ.get("TEGG_DEBUG_HOTKEYS"):
+    DEFAULT_HOTKEYS.update(DEBUG_HOTKEYS)
+
 def get_hotkey_labels():
     """返回本地化的快捷键显示名称（运行时求值）。"""
     return {
@@ -216,9 +230,33 @@ BTN_RADIUS = 10               # 按钮圆角半径
 # 轮询间隔 (ms) — 约 120fps，兼顾流畅与 CPU 占用
 UPDATE_INTERVAL = 8
 
+# 事件驱动模式 (低级鼠标钩子可用) 下的定时间隔 (ms) — 只做快捷键 / 自动回中 / 兜底
+HOOK_IDLE_INTERVAL = 33
+
+# 自适应节拍: 光标 / 按键 / hover 状态机持续空闲 TICK_IDLE_AFTER_MS 后降频，首次活动恢复
+TICK_IDLE_AFTER_MS = 500
+POLL_IDLE_INTERVAL = 16       # 轮询模式空闲间隔 (无唤醒源，首次移动最多晚 8ms 被发现)
+HOOK_SLEEP_INTERVAL = 100     # 事件驱动模式空闲间隔 (移动 / 按键由钩子即时唤醒)
+TICK_BURST_WINDOW_MS = 250    # 空闲后首次活动的加速窗口
+TICK_BURST_INTERVAL = 8       # 加速窗口内的节拍间隔 (ms)，可小于 UPDATE_INTERVAL
+
+# 事件驱动模式下 hover / 点击 / 侧键 / 滚轮在独立输入线程处理（GUI 线程卡顿不推迟按键）
+INPUT_THREAD = True
+
+# 自动回中倒计时进度条尺寸 (px)
+AUTO_CENTER_BAR_W = 50
+AUTO_CENTER_BAR_H = 6
+
 # 快捷键防抖间隔 (秒)
 HOTKEY_DEBOUNCE_SEC = 0.3
 
+# 宏调度: 同时执行的宏上限；到期前最后 MACRO_SPIN_SEC 忙等（系统定时器粒度约 1~15ms）
+MACRO_MAX_CONCURRENT = 8
+MACRO_SPIN_SEC = 0.001
+
+# hover 充能 / 释放动画: 共享动画时钟的帧间隔 (ms)，到期时刻另按精确截止时间唤醒
+ANIM_FRAME_MS = 16
+
 
 
 # 按钮运行时字段 (保存时需要剔除)
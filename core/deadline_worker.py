@@ -0,0 +1,114 @@
+"""
+TEGG Touch 蛋挞 辅助软件 - 截止时间调度线程
+
+按截止时间排序的小根堆 + 单个守护线程，定时服务与宏调度器共用:
+  - 条目需带 cancelled 属性；取消只做标记，出堆时跳过
+  - 线程在最近截止时间前 spin_sec 醒来，剩余部分忙等（spin_sec=0 时不忙等）
+  - 到期条目交给子类的 _fire(entry, now)，在调度线程中顺序执行
+
+两种运行方式:
+  - threaded=True（默认）: 首次入堆时启动守护线程，到期自动执行
+  - threaded=False:        不启动线程，由调用方 run_due(now) 推进（测试 / 虚拟时钟）
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+
+class DeadlineWorker:
+    """小根堆 + 可选守护线程的公共部分（子类实现 _fire）"""
+
+    def __init__(self, clock=time.perf_counter, threaded: bool = True,
+                 name: str = 'tegg-worker', spin_sec: float = 0.0):
+        self._clock = clock
+        self._threaded = threaded
+        self._name = name
+        self._spin_sec = spin_sec
+        self._heap = []  # (deadline, seq, entry)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+    @property
+    def clock(self):
+        return self._clock
+
+    def next_deadline(self):
+        """最近一个有效条目的截止时间；没有时返回 None"""
+        with self._cond:
+            self._drop_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    def run_due(self, now: float = None) -> int:
+        """执行所有已到期的条目，返回执行数量（非线程模式下由调用方驱动）。"""
+        if now is None:
+            now = self._clock()
+        count = 0
+        while True:
+            with self._cond:
+                self._drop_cancelled()
+                if not self._heap or self._heap[0][0] > now:
+                    return count
+                _, _, entry = heapq.heappop(self._heap)
+            self._fire(entry, now)
+            count += 1
+
+    # ── 子类使用 ──
+
+    def _fire(self, entry, now: float):
+        raise NotImplementedError
+
+    def _push(self, deadline: float, entry):
+        """入堆并唤醒线程（需持有 _cond）"""
+        heapq.heappush(self._heap, (deadline, next(self._seq), entry))
+        if self._threaded:
+            self._ensure_thread()
+        self._cond.notify()
+
+    def _stop(self):
+        """丢弃所有条目并停止线程"""
+        with self._cond:
+            self._stopped = True
+            self._heap.clear()
+            self._cond.notify()
+        t = self._thread
+        if t is not None and t is not threading.current_thread():
+            t.join(timeout=1.0)
+        self._thread = None
+
+    # ── 内部 ──
+
+    def _drop_cancelled(self):
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._loop, name=self._name, daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        clock = self._clock
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    self._drop_cancelled()
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    deadline = self._heap[0][0]
+                    wait = deadline - clock()
+                    if wait <= self._spin_sec:
+                        break
+                    self._cond.wait(wait - self._spin_sec)
+            # 最后一段忙等（条件变量超时的精度受系统定时器粒度限制）
+            while clock() < deadline:
+                time.sleep(0)
+            self.run_due(clock())
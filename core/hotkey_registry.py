@@ -0,0 +1,125 @@
+"""
+TEGG Touch 蛋挞 辅助软件 - 全局快捷键注册表
+
+由键盘钩子的按下 / 抬起事件驱动，替代运行循环每帧对每个快捷键的 is_pressed 轮询:
+  - 快捷键字符串（如 "f12"、"ctrl+shift+l"）在加载 / 修改快捷键时一次性解析成扫描码
+  - 只在主键的按下沿触发，且要求所有修饰键此刻都按着；同一主键有多个组合时取修饰键最多的一个
+  - 按住不放的系统自动重复（连续的按下事件）不会重复触发；另有每个快捷键的最短间隔兜底
+  - 钩子可能漏掉抬起事件（安全桌面 / 按住时切换焦点 / LowLevelHooksTimeout），
+    所以距上一次按下超过 repeat_window_sec 的按下视为新的按下，而不是自动重复
+  - 没有按键事件时没有任何开销
+
+不依赖 Qt；on_key 在钩子线程调用，触发结果由调用方投递到主线程。
+"""
+
+import logging
+import threading
+import time
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class Hotkey(NamedTuple):
+    """解析后的快捷键"""
+    name: str          # 功能名（stop / voice / ...）
+    combo: str         # 原始字符串
+    trigger: tuple     # 主键的扫描码（可有多个，如左右同名键）
+    modifiers: tuple   # 每个修饰键一组扫描码，组内任意一个按下即满足
+
+
+class HotkeyRegistry:
+    """快捷键表 + 当前按下的扫描码集合"""
+
+    def __init__(self, resolve, repeat_sec: float = 0.3, clock=time.perf_counter,
+                 repeat_window_sec: float = 1.5):
+        """resolve: 键名 → 扫描码元组（解析失败返回空元组）
+
+        repeat_window_sec: 自动重复的最大间隔（系统重复延迟最长 1 秒），超过即视为漏掉了抬起
+        """
+        self._resolve = resolve
+        self._repeat_sec = repeat_sec
+        self._repeat_window = repeat_window_sec
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._index = {}     # 主键扫描码 → [Hotkey]（修饰键多的在前）
+        self._held = {}      # 当前按下的扫描码 → 上一次按下事件的时刻
+        self._last = {}      # 快捷键名 → 上次触发时刻
+        self._fired = 0
+        self._suppressed = 0
+
+    def rebuild(self, bindings: dict) -> list:
+        """按 {名字: 组合字符串} 重建，返回无法解析的名字列表"""
+        index, failed = {}, []
+        for name, combo in bindings.items():
+            hotkey = self._parse(name, combo)
+            if hotkey is None:
+                if combo:
+                    failed.append(name)
+                continue
+            for code in hotkey.trigger:
+                index.setdefault(code, []).append(hotkey)
+        for hotkeys in index.values():
+            hotkeys.sort(key=lambda h: len(h.modifiers), reverse=True)
+        with self._lock:
+            self._index = index
+            self._last.clear()
+        if failed:
+            logger.warning("无法解析的快捷键: %s", ', '.join(failed))
+        return failed
+
+    def _parse(self, name, combo):
+        if not isinstance(combo, str) or not combo.strip():
+            return None
+        parts = [p.strip().lower() for p in combo.split('+') if p.strip()]
+        codes = [tuple(self._resolve(p)) for p in parts]
+        if not codes or not all(codes):
+            return None
+        return Hotkey(name, combo, codes[-1], tuple(codes[:-1]))
+
+    @property
+    def hotkeys(self) -> list:
+        """当前注册的快捷键（去重，按名字排序）"""
+        with self._lock:
+            seen = {h.name: h for hs in self._index.values() for h in hs}
+        return [seen[n] for n in sorted(seen)]
+
+    def on_key(self, code: int, down: bool, now: float = None) -> list:
+        """一次按键事件 → 本次触发的快捷键名列表（通常为空）"""
+        with self._lock:
+            if not down:
+                self._held.pop(code, None)
+                return []
+            now = self._clock() if now is None else now
+            last_down = self._held.get(code)
+            self._held[code] = now
+            if last_down is not None and now - last_down < self._repeat_window:
+                return []  # 自动重复
+            candidates = self._index.get(code)
+            if not candidates:
+                return []
+            held = self._held
+            for hotkey in candidates:
+                if all(any(c in held for c in alts) for alts in hotkey.modifiers):
+                    last = self._last.get(hotkey.name)
+                    if last is not None and now - last < self._repeat_sec:
+                        self._suppressed += 1
+                        return []
+                    self._last[hotkey.name] = now
+                    self._fired += 1
+                    return [hotkey.name]
+            return []
+
+    def reset(self):
+        """清空按下状态（钩子重装 / 进出运行模式时，避免遗留的"按住"）"""
+        with self._lock:
+            self._held.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hotkeys': len({h.name for hs in self._index.values() for h in hs}),
+                'held': len(self._held),
+                'fired': self._fired,
+                'suppressed': self._suppressed,
+            }
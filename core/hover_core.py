@@ -0,0 +1,289 @@
+"""
+TEGG Touch 蛋挞 辅助软件 - hover 状态机核心 + 共享动画时钟
+
+状态机只记录进入充能 / 释放的时刻，进度 = (now - 起点) / 延迟，由单调时钟的时间戳计算:
+hover_delay=200ms 就在 200ms 时激活，与事件循环负载、定时器回调是否迟到无关。
+
+AnimationClock 只推进处于充能 / 释放中的状态机（其余状态机不占用任何定时器）:
+  - next_deadline(): 下一帧（ANIM_FRAME_MS，刷新进度条）与最近一次到期中较早的时刻
+  - step(now): 推进所有忙碌的状态机，回到稳定状态的自动移出
+  - on_wake: 有状态机登记时的回调（Qt 驱动据此重新安排唯一的定时器）
+
+HoverTracker 是光标下目标变化时的 leave / enter 与按键交接，主线程与输入线程共用。
+
+不依赖 Qt，时钟可注入（测试 / 回放按虚拟时间批量推进）。
+"""
+
+import time
+from collections import deque
+from enum import Enum
+
+from core.constants import ANIM_FRAME_MS
+
+# 到期延迟样本保留数量
+LATENESS_SAMPLES = 1024
+
+
+class HoverState(Enum):
+    IDLE = 'idle'
+    CHARGING = 'charging'      # hover_delay > 0 时的充能阶段
+    ACTIVE = 'active'          # hover 已激活，按键已按下
+    RELEASING = 'releasing'    # hover_release_delay > 0 时的释放倒计时
+
+
+_BUSY = (HoverState.CHARGING, HoverState.RELEASING)
+
+
+def _no_emit(name, *args):
+    pass
+
+
+class HoverCore:
+    """悬停状态机核心 — 管理 hover 充能/激活/释放的完整生命周期
+
+    状态转换:
+      IDLE → CHARGING → ACTIVE → RELEASING → IDLE
+      (hover_delay == 0 时跳过 CHARGING 直接到 ACTIVE)
+      (release_delay == 0 时跳过 RELEASING 直接到 IDLE)
+
+    emit(name, *args) 接收事件: 'activated' / 'deactivated' / 'charge_progress'(0~1) / 'release_progress'(1~0)
+    anim: 充能 / 释放期间登记到的 AnimationClock
+    """
+
+    __slots__ = ('_state', '_hover_delay', '_release_delay', '_emit', 'anim', '_on', '_start', 'deadline')
+
+    def __init__(self, hover_delay_ms: int = 200, release_delay_ms: int = 0, emit=None, anim=None):
+        self._state = HoverState.IDLE
+        self._hover_delay = hover_delay_ms
+        self._release_delay = release_delay_ms
+        self._emit = emit or _no_emit
+        self.anim = anim
+        self._on = None          # 当前登记的时钟
+        self._start = 0.0        # 充能 / 释放开始时刻 (秒)
+        self.deadline = None     # 充能 / 释放到期时刻 (秒)，稳定状态为 None
+
+    @property
+    def state(self) -> HoverState:
+        return self._state
+
+    @property
+    def is_active(self) -> bool:
+        return self._state == HoverState.ACTIVE
+
+    @property
+    def busy(self) -> bool:
+        return self._state in _BUSY
+
+    def enter(self, now: float = None):
+        """鼠标进入 hover 区域"""
+        if self._state == HoverState.RELEASING:
+            # 重入：取消释放倒计时，直接恢复 ACTIVE
+            self._settle(HoverState.ACTIVE)
+            self._emit('release_progress', 0.0)  # 清除进度条，避免与 hover 填充双层叠加
+            return
+
+        if self._state != HoverState.IDLE:
+            return
+
+        if self._hover_delay <= 0:
+            # 无充能延迟，直接激活
+            self._state = HoverState.ACTIVE
+            self._emit('activated')
+        else:
+            # 开始充能
+            self._begin(HoverState.CHARGING, self._hover_delay, now)
+
+    def leave(self, now: float = None):
+        """鼠标离开 hover 区域"""
+        if self._state == HoverState.CHARGING:
+            # 充能中离开 → 取消充能，回到 IDLE
+            self._settle(HoverState.IDLE)
+            self._emit('charge_progress', 0.0)
+            return
+
+        if self._state != HoverState.ACTIVE:
+            return
+
+        if self._release_delay <= 0:
+            # 无释放延迟，直接释放
+            self._state = HoverState.IDLE
+            self._emit('deactivated')
+        else:
+            # 开始释放倒计时
+            self._begin(HoverState.RELEASING, self._release_delay, now)
+
+    def reset(self):
+        """强制重置到 IDLE（切换模式/隐藏按键时调用）"""
+        was_active = self._state in (HoverState.ACTIVE, HoverState.RELEASING)
+        self._settle(HoverState.IDLE)
+        if was_active:
+            self._emit('deactivated')
+
+    def update_delays(self, hover_delay_ms: int, release_delay_ms: int):
+        """动态更新延迟配置（进行中的充能 / 释放按原延迟完成）"""
+        self._hover_delay = hover_delay_ms
+        self._release_delay = release_delay_ms
+
+    def advance(self, now: float) -> bool:
+        """按时间戳推进进度，返回本次是否到期（由 AnimationClock 调用）"""
+        if self._state == HoverState.CHARGING:
+            progress = min(1.0, (now - self._start) / max(1e-3, self.deadline - self._start))
+            self._emit('charge_progress', progress)
+            if progress >= 1.0:
+                self._settle(HoverState.ACTIVE)
+                self._emit('activated')
+                self._emit('charge_progress', 0.0)  # 清除充能条
+                return True
+        elif self._state == HoverState.RELEASING:
+            progress = max(0.0, 1.0 - (now - self._start) / max(1e-3, self.deadline - self._start))
+            self._emit('release_progress', progress)
+            if progress <= 0.0:
+                self._settle(HoverState.IDLE)
+                self._emit('deactivated')
+                return True
+        return False
+
+    # ── 内部 ──
+
+    def _begin(self, state: HoverState, delay_ms: int, now):
+        anim = self.anim
+        if now is None:
+            now = anim.now() if anim is not None else time.perf_counter()
+        self._state = state
+        self._start = now
+        self.deadline = now + delay_ms / 1000.0
+        if anim is not None:
+            self._on = anim
+            anim.add(self)
+
+    def _settle(self, state: HoverState):
+        self._state = state
+        self.deadline = None
+        if self._on is not None:
+            self._on.discard(self)
+            self._on = None
+
+
+class HoverTracker:
+    """hover 交接 — 光标下目标变化时旧目标 leave、新目标 enter
+
+    machine(target): 目标的状态机（enter / leave / is_active），没有时返回 None
+    visual(target, state): 设置 'hover' / 'normal' 外观
+    commit(presses, releases): 注入 [(source, plan)]；恰好一进一出时只注入键集合的对称差
+
+    状态机在 update() 内发出的激活 / 释放经 activated() / deactivated() 暂存，最后一次性提交；
+    充能 / 释放到期等其余时刻立即提交。
+    """
+
+    __slots__ = ('target', '_machine', '_visual', '_commit', '_pending')
+
+    def __init__(self, machine, visual, commit):
+        self.target = None
+        self._machine = machine
+        self._visual = visual
+        self._commit = commit
+        self._pending = None     # ([按下], [释放])；None 表示不在交接中
+
+    def activated(self, source, plan):
+        """状态机激活 → 按下 hover 键"""
+        if self._pending is not None:
+            self._pending[0].append((source, plan))
+        else:
+            self._commit([(source, plan)], [])
+
+    def deactivated(self, source, plan):
+        """状态机释放 → 释放 hover 键"""
+        if self._pending is not None:
+            self._pending[1].append((source, plan))
+        else:
+            self._commit([], [(source, plan)])
+
+    def update(self, target) -> bool:
+        """光标下目标 → 驱动 leave / enter，返回目标是否变化"""
+        prev = self.target
+        if target is prev:
+            return False
+        self._pending = ([], [])
+        try:
+            if prev is not None:
+                sm = self._machine(prev)
+                if sm is not None:
+                    sm.leave()
+                # RELEASING 时也设 normal — 充能条在深色背景上递减可见
+                self._visual(prev, 'normal')
+            if target is not None:
+                sm = self._machine(target)
+                if sm is not None:
+                    sm.enter()
+                # 充能期间保持 normal（充能条可见），直接激活 / 释放中重入时才设 hover
+                if sm is None or sm.is_active:
+                    self._visual(target, 'hover')
+            self.target = target
+        finally:
+            presses, releases = self._pending
+            self._pending = None
+            if presses or releases:
+                self._commit(presses, releases)
+        return True
+
+
+class AnimationClock:
+    """共享动画时钟 — 只推进正在充能 / 释放的状态机"""
+
+    def __init__(self, clock=time.perf_counter, frame_ms: float = ANIM_FRAME_MS):
+        self._clock = clock
+        self._frame = frame_ms / 1000.0
+        self._active = {}        # HoverCore → None（保持插入顺序，推进顺序确定）
+        self._next_frame = None
+        self.on_wake = None      # 登记新状态机时回调（Qt 驱动）
+        self._lateness = deque(maxlen=LATENESS_SAMPLES)
+        self._counts = {'steps': 0, 'advanced': 0, 'completed': 0}
+
+    def now(self) -> float:
+        return self._clock()
+
+    def add(self, core: HoverCore):
+        if not self._active:
+            self._next_frame = self._clock() + self._frame
+        self._active[core] = None
+        if self.on_wake is not None:
+            self.on_wake()
+
+    def discard(self, core: HoverCore):
+        self._active.pop(core, None)
+
+    def __len__(self):
+        return len(self._active)
+
+    def next_deadline(self):
+        """下一次需要 step 的时刻；没有忙碌的状态机时返回 None"""
+        if not self._active:
+            return None
+        return min(self._next_frame, min(c.deadline for c in self._active))
+
+    def step(self, now: float = None) -> int:
+        """推进所有忙碌的状态机，返回推进的数量"""
+        if now is None:
+            now = self._clock()
+        cores = list(self._active)
+        for core in cores:
+            deadline = core.deadline
+            if core.advance(now):
+                self._lateness.append(max(0.0, now - deadline))
+                self._counts['completed'] += 1
+        if self._active and now >= self._next_frame:
+            # 帧按计划时刻累加（到期唤醒不影响帧节奏）；落后超过一帧时从当前时刻重新开始
+            self._next_frame += self._frame
+            if self._next_frame <= now:
+                self._next_frame = now + self._frame
+        self._counts['steps'] += 1
+        self._counts['advanced'] += len(cores)
+        return len(cores)
+
+    def stats(self) -> dict:
+        """推进次数 + 到期时刻相对计划的延迟 (µs)"""
+        samples = sorted(self._lateness)
+        n = len(samples)
+        return dict(self._counts, active=len(self._active),
+                    lateness_mean_us=sum(samples) / n * 1e6 if n else 0.0,
+                    lateness_max_us=samples[-1] * 1e6 if n else 0.0)
@@ -0,0 +1,607 @@
+"""
+TEGG Touch 蛋挞 辅助软件 - 输入后端
+
+运行模式管线与操作系统之间的唯一接口，覆盖:
+  - 事件注入 (SendInput)
+  - 光标查询/设置 (GetCursorPos / SetCursorPos)
+  - 异步按键状态 (GetAsyncKeyState)
+  - 低级鼠标钩子 (WH_MOUSE_LL) 与钩子所在线程的消息循环
+  - 低级键盘钩子 (WH_KEYBOARD_LL，快捷键) — 运行在专用线程
+  - 窗口扩展样式与前台窗口 (GetWindowLongW / SetWindowLongW ...)
+
+两种实现:
+  - Win32Backend:     真实 Win32 调用；注入时预分配 INPUT 数组，一次 SendInput 提交整批事件
+  - RecordingBackend: 纯内存、确定性；记录所有输出（带时间戳），
+                      并允许测试直接设置光标/按键状态、驱动钩子回调
+
+除本模块外，其余模块不直接访问 ctypes.windll.user32，
+因此整个运行模式管线可以在非 Windows 平台（Qt offscreen）下导入、测试和基准。
+"""
+
+import ctypes
+import ctypes.wintypes as wintypes
+import logging
+import math
+import sys
+import threading
+import time
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+# ─── 事件定义 ────────────────────────────────────────────────
+
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+
+
+class InputEvent(NamedTuple):
+    """一条待注入的输入事件 — 字段与 Win32 INPUT 结构一一对应
+
+    kind:  INPUT_KEYBOARD | INPUT_MOUSE
+    code:  键盘扫描码（鼠标事件为 0）
+    flags: KEYEVENTF_* 或 MOUSEEVENTF_*
+    data:  鼠标 mouseData（X 键编号 / 滚轮 delta），键盘事件为 0
+    """
+    kind: int
+    code: int
+    flags: int
+    data: int = 0
+
+
+# ─── ctypes 结构体定义 ───────────────────────────────────────
+
+PUL = ctypes.POINTER(ctypes.c_ulong)
+
+
+class KeyBdInput(ctypes.Structure):
+    _fields_ = [
+        ("wVk", ctypes.c_ushort),
+        ("wScan", ctypes.c_ushort),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", PUL),
+    ]
+
+
+class HardwareInput(ctypes.Structure):
+    _fields_ = [
+        ("uMsg", ctypes.c_ulong),
+        ("wParamL", ctypes.c_short),
+        ("wParamH", ctypes.c_ushort),
+    ]
+
+
+class MouseInput(ctypes.Structure):
+    _fields_ = [
+        ("dx", ctypes.c_long),
+        ("dy", ctypes.c_long),
+        ("mouseData", ctypes.c_ulong),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", PUL),
+    ]
+
+
+class Input_I(ctypes.Union):
+    _fields_ = [
+        ("ki", KeyBdInput),
+        ("mi", MouseInput),
+        ("hi", HardwareInput),
+    ]
+
+
+class Input(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_ulong),
+        ("ii", Input_I),
+    ]
+
+
+class _MSLLHOOKSTRUCT(ctypes.Structure):
+    _fields_ = [
+        ('pt', wintypes.POINT),
+        ('mouseData', wintypes.DWORD),
+        ('flags', wintypes.DWORD),
+        ('time', wintypes.DWORD),
+        ('dwExtraInfo', ctypes.POINTER(ctypes.c_ulong)),
+    ]
+
+class _KBDLLHOOKSTRUCT(ctypes.Structure):
+    _fields_ = [
+        ('vkCode', wintypes.DWORD),
+        ('scanCode', wintypes.DWORD),
+        ('flags', wintypes.DWORD),
+        ('time', wintypes.DWORD),
+        ('dwExtraInfo', ctypes.POINTER(ctypes.c_ulong)),
+    ]
+
+_HOOKPROC = ctypes.CFUNCTYPE(ctypes.c_ssize_t, ctypes.c_int, ctypes.c_size_t, ctypes.POINTER(_MSLLHOOKSTRUCT))
+
+WH_MOUSE_LL = 14
+WH_KEYBOARD_LL = 13
+WM_KEYDOWN = 0x0100
+WM_SYSKEYDOWN = 0x0104
+GWL_EXSTYLE = -20
+WM_NULL = 0x0000
+PM_REMOVE = 0x0001
+QS_ALLINPUT = 0x04FF
+THREAD_PRIORITY_HIGHEST = 2
+
+
+# ─── 后端 ────────────────────────────────────────────────────
+
+class InputBackend:
+    """输入后端基类 — 所有方法都可能在非主线程调用（宏线程 / 语音回调）"""
+
+    name = 'base'
+
+    # ── 注入 ──
+
+    def send(self, events) -> int:
+        """提交一批事件，返回实际注入的条数。"""
+        raise NotImplementedError
+
+    # ── 光标 ──
+
+    def get_cursor_pos(self) -> tuple:
+        """返回光标屏幕坐标 (x, y)。"""
+        raise NotImplementedError
+
+    def set_cursor_pos(self, x: int, y: int):
+        """移动光标到屏幕坐标 (x, y)。"""
+        raise NotImplementedError
+
+    # ── 按键状态 ──
+
+    def is_key_down(self, vk: int) -> bool:
+        """虚拟键码 vk 当前是否按下（含鼠标键 VK_LBUTTON 等）。"""
+        raise NotImplementedError
+
+    # ── 低级鼠标钩子 ──
+
+    def install_mouse_hook(self, callback) -> bool:
+        """安装全局鼠标钩子。callback(msg, x, y, mouse_data, flags) 在钩子线程调用。"""
+        raise NotImplementedError
+
+    def uninstall_mouse_hook(self):
+        raise NotImplementedError
+
+    # ── 低级键盘钩子 ──
+
+    def install_keyboard_hook(self, callback) -> bool:
+        """安装全局键盘钩子。callback(scan_code, down, flags) 在钩子线程调用。"""
+        raise NotImplementedError
+
+    def uninstall_keyboard_hook(self):
+        raise NotImplementedError
+
+    # ── 线程消息循环（钩子回调在安装线程的消息循环中执行） ──
+
+    def pump_messages(self, timeout: float):
+        """在调用线程处理待处理的系统消息；没有消息时最多阻塞 timeout 秒。"""
+        raise NotImplementedError
+
+    def wake_thread(self, thread_id: int):
+        """唤醒阻塞在 pump_messages 中的线程 thread_id（threading.get_native_id()）。"""
+        raise NotImplementedError
+
+    def raise_thread_priority(self) -> bool:
+        """提升调用线程的调度优先级；不支持时返回 False。"""
+        return False
+
+    # ── 窗口样式 ──
+
+    def get_window_ex_style(self, hwnd) -> int:
+        raise NotImplementedError
+
+    def set_window_ex_style(self, hwnd, style: int):
+        raise NotImplementedError
+
+    def window_from_point(self, x: int, y: int):
+        raise NotImplementedError
+
+    def get_foreground_window(self):
+        raise NotImplementedError
+
+    def set_foreground_window(self, hwnd) -> bool:
+        raise NotImplementedError
+
+
+class Win32Backend(InputBackend):
+    """SendInput 后端 — 一批事件写入预分配的 INPUT 数组，单次系统调用提交
+
+    组合键 (shift+w+a) 与 mouse: 按钮同批提交，在游戏的输入队列中原子落地。
+    数组在首次超出容量时翻倍扩容，之后不再分配 ctypes 对象。
+    """
+
+    name = 'win32'
+
+    def __init__(self, capacity: int = 16):
+        user32 = ctypes.windll.user32
+        self._user32 = user32
+
+        # ── ctypes 类型声明 ──
+        user32.SendInput.argtypes = [ctypes.c_uint, ctypes.POINTER(Input), ctypes.c_int]
+        user32.SendInput.restype = ctypes.c_uint
+        self._SendInput = user32.SendInput
+
+        user32.GetCursorPos.argtypes = [ctypes.POINTER(wintypes.POINT)]
+        user32.GetCursorPos.restype = wintypes.BOOL
+        user32.SetCursorPos.argtypes = [ctypes.c_int, ctypes.c_int]
+        user32.SetCursorPos.restype = wintypes.BOOL
+        user32.GetAsyncKeyState.argtypes = [ctypes.c_int]
+        user32.GetAsyncKeyState.restype = ctypes.c_short
+
+        user32.CallNextHookEx.argtypes = [wintypes.HHOOK, ctypes.c_int, ctypes.c_size_t, ctypes.POINTER(_MSLLHOOKSTRUCT)]
+        user32.CallNextHookEx.restype = ctypes.c_ssize_t
+        user32.SetWindowsHookExW.argtypes = [ctypes.c_int, _HOOKPROC, wintypes.HINSTANCE, wintypes.DWORD]
+        user32.SetWindowsHookExW.restype = wintypes.HHOOK
+        user32.UnhookWindowsHookEx.argtypes = [wintypes.HHOOK]
+        user32.UnhookWindowsHookEx.restype = wintypes.BOOL
+
+        user32.MsgWaitForMultipleObjects.argtypes = [
+            wintypes.DWORD, ctypes.c_void_p, wintypes.BOOL, wintypes.DWORD, wintypes.DWORD]
+        user32.MsgWaitForMultipleObjects.restype = wintypes.DWORD
+        user32.PeekMessageW.argtypes = [
+            ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT, wintypes.UINT]
+        user32.PeekMessageW.restype = wintypes.BOOL
+        user32.TranslateMessage.argtypes = [ctypes.POINTER(wintypes.MSG)]
+        user32.TranslateMessage.restype = wintypes.BOOL
+        user32.DispatchMessageW.argtypes = [ctypes.POINTER(wintypes.MSG)]
+        user32.DispatchMessageW.restype = ctypes.c_ssize_t
+        user32.PostThreadMessageW.argtypes = [
+            wintypes.DWORD, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+        user32.PostThreadMessageW.restype = wintypes.BOOL
+
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentThread.argtypes = []
+        kernel32.GetCurrentThread.restype = wintypes.HANDLE
+        kernel32.SetThreadPriority.argtypes = [wintypes.HANDLE, ctypes.c_int]
+        kernel32.SetThreadPriority.restype = wintypes.BOOL
+        self._kernel32 = kernel32
+
+        user32.GetWindowLongW.argtypes = [wintypes.HWND, ctypes.c_int]
+        user32.GetWindowLongW.restype = ctypes.c_long
+        user32.SetWindowLongW.argtypes = [wintypes.HWND, ctypes.c_int, ctypes.c_long]
+        user32.SetWindowLongW.restype = ctypes.c_long
+        user32.WindowFromPoint.argtypes = [wintypes.POINT]
+        user32.WindowFromPoint.restype = wintypes.HWND
+        user32.GetForegroundWindow.argtypes = []
+        user32.GetForegroundWindow.restype = wintypes.HWND
+        user32.SetForegroundWindow.argtypes = [wintypes.HWND]
+        user32.SetForegroundWindow.restype = wintypes.BOOL
+
+        self._pt = wintypes.POINT()
+        self._hook_handle = None
+        self._hook_func_ref = None  # prevent GC
+        self._kb_thread = None      # 键盘钩子线程
+        self._kb_tid = None
+        self._kb_stop = False
+        self._extra = ctypes.c_ulong(0)
+        self._extra_ptr = ctypes.pointer(self._extra)
+        self._input_size = ctypes.sizeof(Input)
+        # 预分配数组被所有线程共享（主线程 / 宏线程 / 语音回调）
+        self._lock = threading.Lock()
+        self._alloc(capacity)
+
+    def _alloc(self, capacity: int):
+        self._capacity = capacity
+        self._buf = (Input * capacity)()
+
+    def send(self, events) -> int:
+        n = len(events)
+        if n == 0:
+            return 0
+        with self._lock:
+            if n > self._capacity:
+                self._alloc(max(n, self._capacity * 2))
+            buf = self._buf
+            for i, ev in enumerate(events):
+                slot = buf[i]
+                slot.type = ev.kind
+                if ev.kind == INPUT_KEYBOARD:
+                    ki = slot.ii.ki
+                    ki.wVk = 0
+                    ki.wScan = ev.code
+                    ki.dwFlags = ev.flags
+                    ki.time = 0
+                    ki.dwExtraInfo = self._extra_ptr
+                else:
+                    mi = slot.ii.mi
+                    mi.dx = 0
+                    mi.dy = 0
+                    mi.mouseData = ev.data
+                    mi.dwFlags = ev.flags
+                    mi.time = 0
+                    mi.dwExtraInfo = self._extra_ptr
+            return self._SendInput(n, buf, self._input_size)
+
+    def get_cursor_pos(self) -> tuple:
+        pt = self._pt
+        self._user32.GetCursorPos(ctypes.byref(pt))
+        return pt.x, pt.y
+
+    def set_cursor_pos(self, x: int, y: int):
+        self._user32.SetCursorPos(int(x), int(y))
+
+    def is_key_down(self, vk: int) -> bool:
+        return (self._user32.GetAsyncKeyState(vk) & 0x8000) != 0
+
+    def install_mouse_hook(self, callback) -> bool:
+        if self._hook_handle is not None:
+            return True  # 已安装
+        call_next = self._user32.CallNextHookEx
+
+        def _proc(nCode, wParam, lParam):
+            if nCode >= 0:
+                data = lParam.contents
+                try:
+                    callback(wParam, data.pt.x, data.pt.y, data.mouseData, data.flags)
+                except Exception as e:
+                    logger.error(f"鼠标钩子回调异常: {e}")
+            return call_next(None, nCode, wParam, lParam)
+
+        self._hook_func_ref = _HOOKPROC(_proc)
+        handle = self._user32.SetWindowsHookExW(WH_MOUSE_LL, self._hook_func_ref, None, 0)
+        if not handle:
+            logger.error("安装鼠标钩子失败")
+            self._hook_func_ref = None
+            return False
+        self._hook_handle = handle
+        return True
+
+    def uninstall_mouse_hook(self):
+        if self._hook_handle:
+            self._user32.UnhookWindowsHookEx(self._hook_handle)
+            self._hook_handle = None
+            self._hook_func_ref = None
+
+    def install_keyboard_hook(self, callback) -> bool:
+        """键盘钩子装在专用线程并由其消息循环驱动: GUI 线程卡顿不会拖慢全系统的键盘输入"""
+        if self._kb_thread is not None:
+            return True  # 已安装
+        ready = threading.Event()
+        installed = []
+        self._kb_stop = False
+
+        def _run():
+            user32 = self._user32
+            call_next = user32.CallNextHookEx
+            self.pump_messages(0)  # 创建本线程消息队列
+            self._kb_tid = threading.get_native_id()
+
+            def _proc(nCode, wParam, lParam):
+                if nCode >= 0:
+                    data = ctypes.cast(lParam, ctypes.POINTER(_KBDLLHOOKSTRUCT)).contents
+                    try:
+                        callback(data.scanCode, wParam in (WM_KEYDOWN, WM_SYSKEYDOWN), data.flags)
+                    except Exception as e:
+                        logger.error(f"键盘钩子回调异常: {e}")
+                return call_next(None, nCode, wParam, lParam)
+
+            func = _HOOKPROC(_proc)
+            handle = user32.SetWindowsHookExW(WH_KEYBOARD_LL, func, None, 0)
+            installed.append(bool(handle))
+            ready.set()
+            if not handle:
+                logger.error("安装键盘钩子失败")
+                return
+            try:
+                while not self._kb_stop:
+                    self.pump_messages(0.5)
+            finally:
+                user32.UnhookWindowsHookEx(handle)
+
+        t = threading.Thread(target=_run, name='tegg-key-hook', daemon=True)
+        t.start()
+        ready.wait(1.0)
+        if not (installed and installed[0]):
+            t.join(0.5)
+            return False
+        self._kb_thread = t
+        return True
+
+    def uninstall_keyboard_hook(self):
+        t = self._kb_thread
+        if t is None:
+            return
+        self._kb_stop = True
+        if self._kb_tid is not None:
+            self.wake_thread(self._kb_tid)
+        t.join(1.0)
+        self._kb_thread = None
+        self._kb_tid = None
+
+    def pump_messages(self, timeout: float):
+        user32 = self._user32
+        # 向上取整到毫秒: 按截止时间等待时不会提前醒来再空转一轮
+        user32.MsgWaitForMultipleObjects(0, None, False, max(0, math.ceil(timeout * 1000)), QS_ALLINPUT)
+        msg = wintypes.MSG()
+        # PeekMessage 同时派发发送给本线程的消息（低级钩子回调即在此执行）
+        while user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, PM_REMOVE):
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+
+    def wake_thread(self, thread_id: int):
+        self._user32.PostThreadMessageW(thread_id, WM_NULL, 0, 0)
+
+    def raise_thread_priority(self) -> bool:
+        k = self._kernel32
+        return bool(k.SetThreadPriority(k.GetCurrentThread(), THREAD_PRIORITY_HIGHEST))
+
+    def get_window_ex_style(self, hwnd) -> int:
+        return self._user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
+
+    def set_window_ex_style(self, hwnd, style: int):
+        self._user32.SetWindowLongW(hwnd, GWL_EXSTYLE, style)
+
+    def window_from_point(self, x: int, y: int):
+        return self._user32.WindowFromPoint(wintypes.POINT(int(x), int(y)))
+
+    def get_foreground_window(self):
+        return self._user32.GetForegroundWindow()
+
+    def set_foreground_window(self, hwnd) -> bool:
+        return bool(self._user32.SetForegroundWindow(hwnd))
+
+
+class RecordingBackend(InputBackend):
+    """内存记录后端 — 不接触操作系统，行为完全确定
+
+    输出侧（程序 → 系统）全部带时间戳记录:
+      records:      [(timestamp, batch_index, InputEvent)]，batches 即"系统调用次数"
+      cursor_moves: [(timestamp, x, y)]          — set_cursor_pos
+      style_writes: [(timestamp, hwnd, style)]   — set_window_ex_style
+    输入侧（系统 → 程序）由测试直接驱动:
+      move_cursor / set_key_state / feed_mouse_hook / feed_key_hook
+    """
+
+    name = 'recording'
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.records = []
+        self.batches = 0
+        self.cursor_moves = []
+        self.style_writes = []
+        # 模拟的系统状态
+        self.cursor = (0, 0)
+        self.keys_down = set()
+        self.window_styles = {}
+        self.foreground = None
+        self._hook = None
+        self._key_hook = None
+        self._pump = threading.Event()  # 模拟线程消息队列的唤醒
+
+    # ── 输出（记录） ──
+
+    def send(self, events) -> int:
+        n = len(events)
+        if n == 0:
+            return 0
+        ts = self._clock()
+        with self._lock:
+            batch = self.batches
+            self.batches += 1
+            for ev in events:
+                self.records.append((ts, batch, ev))
+        return n
+
+    def set_cursor_pos(self, x: int, y: int):
+        self.cursor = (int(x), int(y))
+        with self._lock:
+            self.cursor_moves.append((self._clock(), int(x), int(y)))
+
+    def set_window_ex_style(self, hwnd, style: int):
+        self.window_styles[hwnd] = style
+        with self._lock:
+            self.style_writes.append((self._clock(), hwnd, style))
+
+    def set_foreground_window(self, hwnd) -> bool:
+        self.foreground = hwnd
+        return True
+
+    # ── 查询（读取模拟状态） ──
+
+    def get_cursor_pos(self) -> tuple:
+        return self.cursor
+
+    def is_key_down(self, vk: int) -> bool:
+        return vk in self.keys_down
+
+    def get_window_ex_style(self, hwnd) -> int:
+        return self.window_styles.get(hwnd, 0)
+
+    def window_from_point(self, x: int, y: int):
+        return None
+
+    def get_foreground_window(self):
+        return self.foreground
+
+    def install_mouse_hook(self, callback) -> bool:
+        self._hook = callback
+        return True
+
+    def uninstall_mouse_hook(self):
+        self._hook = None
+
+    def install_keyboard_hook(self, callback) -> bool:
+        self._key_hook = callback
+        return True
+
+    def uninstall_keyboard_hook(self):
+        self._key_hook = None
+
+    def pump_messages(self, timeout: float):
+        self._pump.wait(timeout)
+        self._pump.clear()
+
+    def wake_thread(self, thread_id: int):
+        self._pump.set()
+
+    # ── 测试驱动 ──
+
+    def move_cursor(self, x: int, y: int):
+        """模拟用户移动鼠标（不计入 cursor_moves）"""
+        self.cursor = (int(x), int(y))
+
+    def set_key_state(self, vk: int, down: bool):
+        """模拟物理按键/鼠标键按下或抬起"""
+        if down:
+            self.keys_down.add(vk)
+        else:
+            self.keys_down.discard(vk)
+
+    def feed_mouse_hook(self, msg: int, x: int, y: int, mouse_data: int = 0, flags: int = 0):
+        """模拟一次低级鼠标钩子回调（未安装钩子时忽略）"""
+        if self._hook is not None:
+            self._hook(msg, x, y, mouse_data, flags)
+
+    def feed_key_hook(self, scan_code: int, down: bool, flags: int = 0):
+        """模拟一次低级键盘钩子回调（未安装钩子时忽略）"""
+        if self._key_hook is not None:
+            self._key_hook(scan_code, down, flags)
+
+    @property
+    def key_hook_installed(self) -> bool:
+        return self._key_hook is not None
+
+    @property
+    def hook_installed(self) -> bool:
+        return self._hook is not None
+
+    @property
+    def events(self) -> list:
+        """按提交顺序返回所有事件（不含时间戳）"""
+        with self._lock:
+            return [ev for _, _, ev in self.records]
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+            self.batches = 0
+            self.cursor_moves.clear()
+            self.style_writes.clear()
+
+
+# ─── 全局后端选择 ────────────────────────────────────────────
+
+_backend = None
+
+
+def get_backend() -> InputBackend:
+    """返回当前后端；首次调用时按平台创建默认后端。"""
+    global _backend
+    if _backend is None:
+        _backend = Win32Backend() if sys.platform == 'win32' else RecordingBackend()
+    return _backend
+
+
+def set_backend(backend: InputBackend) -> InputBackend:
+    """替换当前后端（测试/基准用），返回旧后端。"""
+    global _backend
+    old = _backend
+    _backend = backend
+    return old
@@ -0,0 +1,154 @@
+"""
+TEGG Touch 蛋挞 辅助软件 - 输入派发线程
+
+运行模式下所有按键/鼠标注入都经由这里:
+  主线程 (hover/click)、宏线程、语音回调、定时释放 → submit() 入队 → 单一输出线程 → 后端注入
+
+  - 生产者只做一次 O(1) 入队，不再等待 SendInput
+  - 单队列 FIFO，宏 / hover / 语音输出保持全局顺序
+  - 队列有界: 满时丢弃新的"按下"批次并计数；释放批次始终入队，避免卡键
+  - 指标: 当前/最大队列深度、丢弃数、入队 → 注入延迟分位数
+
+队列是 deque + Condition，不是无锁环: CPython 下生产者本就受 GIL 串行化，
+锁内只有一次 append，持锁时间远小于一次 SendInput；无锁环仍需要条件变量 / 事件
+来唤醒空闲的输出线程，省不掉这把锁。FIFO 语义与定时服务 / 宏调度器的截止时间堆
+（core.deadline_worker）不同，因此不共用它。
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from core.input_backend import get_backend
+from core.latency_stats import record_injected
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 256
+_LATENCY_SAMPLES = 2048
+
+
+class InputDispatcher:
+    """单一输出线程 + 有界事件队列"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, clock=time.perf_counter):
+        self._capacity = capacity
+        self._clock = clock
+        self._queue = deque()  # (enqueue_ts, events, trace)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+        # ── 指标 ──
+        self._submitted = 0
+        self._injected = 0
+        self._dropped = 0
+        self._max_depth = 0
+        self._latencies = deque(maxlen=_LATENCY_SAMPLES)  # 秒
+
+    # ── 生命周期 ──
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._loop, name='tegg-input', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """注入完队列中剩余事件后停止线程"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        t = self._thread
+        if t is not None and t is not threading.current_thread():
+            t.join(timeout)
+        self._thread = None
+
+    # ── 生产者 ──
+
+    def submit(self, events, droppable: bool = True, trace=None) -> bool:
+        """入队一批事件。队列已满且 droppable 时丢弃并返回 False。
+
+        trace: latency_stats.record_submitted 的返回值；注入完成后记录 inject / end_to_end。
+        """
+        ts = self._clock()
+        with self._cond:
+            depth = len(self._queue)
+            if droppable and depth >= self._capacity:
+                self._dropped += 1
+                return False
+            self._queue.append((ts, events, trace))
+            self._submitted += 1
+            if depth + 1 > self._max_depth:
+                self._max_depth = depth + 1
+            self._cond.notify()
+        return True
+
+    def flush(self, timeout: float = 0.5) -> bool:
+        """等待当前已入队的事件全部注入完成"""
+        if not self.running:
+            return not self._queue
+        with self._cond:
+            target = self._submitted
+            return self._cond.wait_for(lambda: self._injected >= target, timeout)
+
+    # ── 输出线程 ──
+
+    def _loop(self):
+        queue = self._queue
+        cond = self._cond
+        while True:
+            with cond:
+                while not queue and not self._stopping:
+                    cond.wait()
+                if not queue:
+                    return  # stopping 且已排空
+                ts, events, trace = queue.popleft()
+            try:
+                get_backend().send(events)
+            except Exception as e:
+                logger.error(f"输入注入失败: {e}")
+            latency = self._clock() - ts
+            if trace is not None:
+                record_injected(trace)
+            with cond:
+                self._injected += 1
+                self._latencies.append(latency)
+                cond.notify_all()
+
+    # ── 指标 ──
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def stats(self) -> dict:
+        """返回派发指标快照（延迟单位: 毫秒）"""
+        with self._cond:
+            samples = sorted(self._latencies)
+            result = {
+                'depth': len(self._queue),
+                'max_depth': self._max_depth,
+                'capacity': self._capacity,
+                'submitted': self._submitted,
+                'injected': self._injected,
+                'dropped': self._dropped,
+            }
+        for name, q in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99)):
+            result[f'latency_{name}_ms'] = (
+                samples[min(len(samples) - 1, int(q * len(samples)))] * 1000.0 if samples else 0.0
+            )
+        result['latency_max_ms'] = samples[-1] * 1000.0 if samples else 0.0
+        return result
+
+    def reset_stats(self):
+        with self._cond:
+            self._dropped = 0
+            self._max_depth = len(self._queue)
+            self._latencies.clear()
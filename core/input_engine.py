@@ -3,82 +3,70 @@ TEGG Touch 蛋挞 辅助软件 - 键盘输入模拟引擎
 
 使用 Windows SendInput API 发送硬件级扫描码按键事件。
 与 UI 完全解耦，可独立测试。
+
+一次动作（如 "shift+w+a" 按下）的所有按键与 mouse: 按钮被打包成
+一批 InputEvent，通过 core.input_backend 单次提交。
 """
 
 import ctypes
-import ctypes.wintypes as wintypes
-import time
+import itertools
 import random
 import logging
 import threading
+import time
 from collections import deque
+from typing import NamedTuple
+
+from core.input_backend import (
+    InputEvent, INPUT_KEYBOARD, INPUT_MOUSE, get_backend,
+)
+from core.timer_service import get_timer_service
+from core.input_dispatcher import InputDispatcher
+from core.latency_stats import current_trace, record_submitted, record_injected
 
 logger = logging.getLogger(__name__)
 
 # ─── 全局滚轮事件队列 ───────────────────────────────────────
 
-_wheel_queue: deque = deque(maxlen=64)
+# 队列满时不丢事件: 新 delta 并入队尾事件并计入 _wheel_overflow
+WHEEL_QUEUE_CAPACITY = 256
+_wheel_queue: deque = deque()
 _wheel_lock = threading.Lock()  # 保护 _wheel_queue 的跨线程访问（钩子线程 vs 主线程）
-_hook_handle = None
-_hook_func_ref = None  # prevent GC
+_wheel_overflow = 0
+_hook_installed = False
+
+# ─── 全局鼠标事件队列（移动 / 按键，事件驱动运行循环）────────
+
+# 连续移动在队尾合并为一条（只保留最新坐标），队列里几乎只剩按键事件
+MOUSE_QUEUE_CAPACITY = 1024
+_mouse_queue: deque = deque()
+_mouse_lock = threading.Lock()  # 保护 _mouse_queue / _wake_armed
+_mouse_overflow = 0
+_mouse_listener = None  # 队列由空变非空时在钩子线程调用（唤醒消费者）
+_wake_armed = True
 
 # 追踪当前已按下的键 — 用于退出时兜底释放，防止卡键
 # 元素: (scan_code, extended: bool)
 _pressed_keys: set = set()
 _pressed_keys_lock = threading.Lock()
 
-# ─── ctypes 结构体定义 ───────────────────────────────────────
-
-PUL = ctypes.POINTER(ctypes.c_ulong)
-
-
-class KeyBdInput(ctypes.Structure):
-    _fields_ = [
-        ("wVk", ctypes.c_ushort),
-        ("wScan", ctypes.c_ushort),
-        ("dwFlags", ctypes.c_ulong),
-        ("time", ctypes.c_ulong),
-        ("dwExtraInfo", PUL),
-    ]
-
-
-class HardwareInput(ctypes.Structure):
-    _fields_ = [
-        ("uMsg", ctypes.c_ulong),
-        ("wParamL", ctypes.c_short),
-        ("wParamH", ctypes.c_ushort),
-    ]
-
+# 点击 ('c') 的按住时长区间 — 释放由定时服务调度，调用线程不阻塞
+CLICK_HOLD_MIN_SEC = 0.03
+CLICK_HOLD_MAX_SEC = 0.06
 
-class MouseInput(ctypes.Structure):
-    _fields_ = [
-        ("dx", ctypes.c_long),
-        ("dy", ctypes.c_long),
-        ("mouseData", ctypes.c_ulong),
-        ("dwFlags", ctypes.c_ulong),
-        ("time", ctypes.c_ulong),
-        ("dwExtraInfo", PUL),
-    ]
+# 尚未释放的点击: click_id → (TimerHandle, 释放批次)（release_all_keys 时统一取消并释放）
+_pending_clicks: dict = {}
+_clicks_lock = threading.Lock()
+_click_seq = itertools.count()
 
+# 输入派发线程（运行模式期间存在；None 时同步注入）
+_dispatcher = None
 
-class Input_I(ctypes.Union):
-    _fields_ = [
-        ("ki", KeyBdInput),
-        ("mi", MouseInput),
-        ("hi", HardwareInput),
-    ]
-
-
-class Input(ctypes.Structure):
-    _fields_ = [
-        ("type", ctypes.c_ulong),
-        ("ii", Input_I),
-    ]
-
-
-_SendInput = ctypes.windll.user32.SendInput
-_SendInput.argtypes = [ctypes.c_uint, ctypes.POINTER(Input), ctypes.c_int]
-_SendInput.restype = ctypes.c_uint
+# 按键所有权: 按下事件 → {source, ...}
+# source 为任意可哈希标识，如 ('hover', id(data))、('macro', name)、('voice', phrase)
+# 仅第一个 owner 按下时注入按下，最后一个 owner 释放时注入释放
+_key_owners: dict = {}
+_owners_lock = threading.Lock()
 
 # ─── 扩展键扫描码集合 ────────────────────────────────────────
 # 这些按键与小键盘共享扫描码，必须加 KEYEVENTF_EXTENDEDKEY 标志才能正确识别
@@ -105,6 +93,142 @@ except ImportError:
     _keyboard_available = False
     logger.warning("keyboard 库未安装，按键模拟将不可用")
 
+# ─── 鼠标按钮模拟常量 ─────────────────────────────────────────
+MOUSEEVENTF_MOVE       = 0x0001
+MOUSEEVENTF_LEFTDOWN   = 0x0002
+MOUSEEVENTF_LEFTUP     = 0x0004
+MOUSEEVENTF_RIGHTDOWN  = 0x0008
+MOUSEEVENTF_RIGHTUP    = 0x0010
+MOUSEEVENTF_MIDDLEDOWN = 0x0020
+MOUSEEVENTF_MIDDLEUP   = 0x0040
+MOUSEEVENTF_XDOWN      = 0x0080
+MOUSEEVENTF_XUP        = 0x0100
+MOUSEEVENTF_WHEEL      = 0x0800
+
+_MOUSE_UP_FLAGS = MOUSEEVENTF_LEFTUP | MOUSEEVENTF_RIGHTUP | MOUSEEVENTF_MIDDLEUP | MOUSEEVENTF_XUP
+XBUTTON1               = 0x0001
+XBUTTON2               = 0x0002
+WHEEL_DELTA            = 120
+
+# 按钮名 → (down_flag, up_flag, mouseData)
+_MOUSE_BUTTON_MAP = {
+    'left':   (MOUSEEVENTF_LEFTDOWN,   MOUSEEVENTF_LEFTUP,   0),
+    'right':  (MOUSEEVENTF_RIGHTDOWN,  MOUSEEVENTF_RIGHTUP,  0),
+    'middle': (MOUSEEVENTF_MIDDLEDOWN, MOUSEEVENTF_MIDDLEUP, 0),
+    'x1':     (MOUSEEVENTF_XDOWN,      MOUSEEVENTF_XUP,      XBUTTON1),
+    'x2':     (MOUSEEVENTF_XDOWN,      MOUSEEVENTF_XUP,      XBUTTON2),
+}
+
+
+# ─── 事件构建 ────────────────────────────────────────────────
+
+def key_event(scan_code: int, extended: bool, up: bool) -> InputEvent:
+    """构建一条键盘扫描码事件。"""
+    flags = KEYEVENTF_SCANCODE
+    if extended:
+        flags |= KEYEVENTF_EXTENDEDKEY
+    if up:
+        flags |= KEYEVENTF_KEYUP
+    return InputEvent(INPUT_KEYBOARD, scan_code, flags, 0)
+
+
+def mouse_button_event(button: str, up: bool):
+    """构建一条鼠标按钮事件。未知按钮返回 None。"""
+    entry = _MOUSE_BUTTON_MAP.get(button.lower())
+    if not entry:
+        logger.debug(f"未知鼠标按钮: '{button}'")
+        return None
+    down_flag, up_flag, mouse_data = entry
+    return InputEvent(INPUT_MOUSE, 0, up_flag if up else down_flag, mouse_data)
+
+
+def _resolve_keys(keys: str) -> list:
+    """把 "w+a" 解析为 [(scan_code, extended), ...]，跳过无法识别的键。"""
+    resolved = []
+    for k in keys.split('+'):
+        k = k.strip()
+        if not k:
+            continue
+        sc = get_scan_code(k)
+        if sc == 0:
+            continue
+        resolved.append((sc, k.lower() in _EXTENDED_KEY_NAMES))
+    return resolved
+
+
+def send_events(events: list) -> int:
+    """提交一批事件，并同步按下键集合。
+
+    派发线程运行时只入队（不阻塞调用线程）；否则直接交给后端同步注入。
+    集合按"已提交"而非"已注入"更新，release_all_keys 的释放批次排在其后，顺序不变。
+    当前线程设置了延迟 trace 时，记录 submit / inject / end_to_end 阶段。
+    """
+    if not events:
+        return 0
+    trace = current_trace()
+    if trace is not None:
+        trace = record_submitted(trace)
+    dispatcher = _dispatcher
+    if dispatcher is not None:
+        if not dispatcher.submit(events, droppable=not _is_release_batch(events), trace=trace):
+            return 0  # 队列已满，丢弃按下批次（计入 dropped）
+        sent = len(events)
+    else:
+        sent = get_backend().send(events)
+        if trace is not None:
+            record_injected(trace)
+    with _pressed_keys_lock:
+        for ev in events:
+            if ev.kind != INPUT_KEYBOARD:
+                continue
+            key = (ev.code, bool(ev.flags & KEYEVENTF_EXTENDEDKEY))
+            if ev.flags & KEYEVENTF_KEYUP:
+                _pressed_keys.discard(key)
+            else:
+                _pressed_keys.add(key)
+    return sent
+
+
+def _is_release_batch(events) -> bool:
+    """批次是否全部为释放事件（键盘 KEYUP / 鼠标 *UP）— 释放批次不可丢弃"""
+    for ev in events:
+        if ev.kind == INPUT_KEYBOARD:
+            if not ev.flags & KEYEVENTF_KEYUP:
+                return False
+        elif not ev.flags & _MOUSE_UP_FLAGS:
+            return False
+    return True
+
+
+# ─── 输入派发线程 ────────────────────────────────────────────
+
+def start_dispatcher(capacity: int = None) -> InputDispatcher:
+    """启动输入派发线程（进入运行模式时调用）；已启动则直接返回"""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = InputDispatcher(capacity) if capacity else InputDispatcher()
+        _dispatcher.start()
+    return _dispatcher
+
+
+def stop_dispatcher():
+    """注入完剩余事件后停止派发线程，之后恢复同步注入。返回最终指标或 None。"""
+    global _dispatcher
+    dispatcher = _dispatcher
+    if dispatcher is None:
+        return None
+    _dispatcher = None
+    dispatcher.stop()
+    stats = dispatcher.stats()
+    logger.info("输入派发: submitted=%d dropped=%d max_depth=%d p95=%.2fms",
+                stats['submitted'], stats['dropped'], stats['max_depth'], stats['latency_p95_ms'])
+    return stats
+
+
+def get_dispatcher():
+    """当前派发线程（未启动时为 None）"""
+    return _dispatcher
+
 
 # ─── 公共 API ────────────────────────────────────────────────
 
@@ -120,88 +244,234 @@ def get_scan_code(key_name: str) -> int:
 
 
 def press_key(scan_code: int, extended: bool = False):
-    """按下按键（硬件扫描码）。extended=True 为方向键等扩展键。
+    """按下按键（硬件扫描码）。extended=True 为方向键等扩展键。"""
+    send_events([key_event(scan_code, extended, up=False)])
+
+
+def release_key(scan_code: int, extended: bool = False):
+    """释放按键（硬件扫描码）。extended=True 为方向键等扩展键。"""
+    send_events([key_event(scan_code, extended, up=True)])
+
+
+def release_all_keys():
+    """释放所有当前被按下的键 — 退出/停止时兜底调用，防止卡键。
 
-    先执行 SendInput（可能耗时），再在锁内更新集合，避免锁内阻塞。
+    同时取消所有尚未到期的点击释放: 键盘键在按下键集合中一并释放，
+    鼠标按钮不在该集合中，取消时把点击自己的鼠标释放事件并入同一批次；
+    按所有权持有的鼠标按钮（如 hover 绑定 mouse:left）同样在清空持有表前并入。
     """
-    flags = KEYEVENTF_SCANCODE
-    if extended:
-        flags |= KEYEVENTF_EXTENDEDKEY
-    extra = ctypes.c_ulong(0)
-    ii_ = Input_I()
-    ii_.ki = KeyBdInput(0, scan_code, flags, 0, ctypes.pointer(extra))
-    x = Input(ctypes.c_ulong(1), ii_)
-    _SendInput(1, ctypes.pointer(x), ctypes.sizeof(x))
+    with _clicks_lock:
+        pending = list(_pending_clicks.values())
+        _pending_clicks.clear()
+    mouse_up = []
+    for handle, up in pending:
+        handle.cancel()
+        mouse_up.extend(u for u in up if u.kind != INPUT_KEYBOARD)
+    with _owners_lock:
+        mouse_up.extend(_release_event(ev) for ev in _key_owners if ev.kind != INPUT_KEYBOARD)
+        _key_owners.clear()
     with _pressed_keys_lock:
-        _pressed_keys.add((scan_code, extended))
+        keys_copy = list(_pressed_keys)
+        _pressed_keys.clear()
+    batch = [key_event(sc, ext, up=True) for sc, ext in keys_copy]
+    batch.extend(dict.fromkeys(mouse_up))  # 去重，保持顺序
+    if not batch:
+        return
+    # 在锁外提交（派发线程运行时排在已入队事件之后），避免锁内阻塞
+    try:
+        send_events(batch)
+        if _dispatcher is not None:
+            _dispatcher.flush(0.2)  # 兜底路径: 确保退出前释放已真正注入
+    except Exception as e:
+        logger.error(f"释放按键失败: events={batch}, error={e}")
+    logger.info(f"兜底释放了 {len(batch)} 个按键")
 
 
-def release_key(scan_code: int, extended: bool = False):
-    """释放按键（硬件扫描码）。extended=True 为方向键等扩展键。
+def _schedule_click_release(down, up) -> int:
+    """在随机按住时长后由定时服务提交释放批次，返回点击编号。
 
-    先执行 SendInput（可能耗时），再在锁内更新集合，避免锁内阻塞。
+    到期时已被其他来源持有的键不释放（如点击期间 hover 按下了同一个键）。
     """
-    flags = KEYEVENTF_SCANCODE | KEYEVENTF_KEYUP
-    if extended:
-        flags |= KEYEVENTF_EXTENDEDKEY
-    extra = ctypes.c_ulong(0)
-    ii_ = Input_I()
-    ii_.ki = KeyBdInput(0, scan_code, flags, 0, ctypes.pointer(extra))
-    x = Input(ctypes.c_ulong(1), ii_)
-    _SendInput(1, ctypes.pointer(x), ctypes.sizeof(x))
-    with _pressed_keys_lock:
-        _pressed_keys.discard((scan_code, extended))
+    click_id = next(_click_seq)
 
+    def _fire():
+        with _clicks_lock:
+            if _pending_clicks.pop(click_id, None) is None:
+                return  # 已被 release_all_keys 取消
+        with _owners_lock:
+            send_events([u for d, u in zip(down, up) if d not in _key_owners])
 
-def release_all_keys():
-    """释放所有当前被按下的键 — 退出/停止时兜底调用，防止卡键。"""
-    with _pressed_keys_lock:
-        if not _pressed_keys:
+    # 在锁内调度: 即使定时器立即到期，_fire 也会等到句柄登记完成
+    with _clicks_lock:
+        hold = random.uniform(CLICK_HOLD_MIN_SEC, CLICK_HOLD_MAX_SEC)
+        _pending_clicks[click_id] = (get_timer_service().call_later(hold, _fire), up)
+    return click_id
+
+
+# ─── 按键所有权（引用计数） ──────────────────────────────────
+
+def _acquire(source, down, batch: list):
+    """登记 source 持有 down 中的键；首个持有者的按下事件追加到 batch（需持有 _owners_lock）"""
+    for ev in down:
+        owners = _key_owners.get(ev)
+        if owners is None:
+            _key_owners[ev] = {source}
+            batch.append(ev)
+        else:
+            owners.add(source)
+
+
+def _rollback(batch: list):
+    """撤销 _acquire 为 batch 中按下事件新建的持有登记（按下批次被丢弃时，需持有 _owners_lock）"""
+    for ev in batch:
+        _key_owners.pop(ev, None)
+
+
+def _release(source, down, up, batch: list):
+    """注销 source 的持有；最后一个持有者离开的键释放事件追加到 batch（需持有 _owners_lock）
+
+    从未登记过的键（例如宏里单独的 release 步骤）照常释放，保持旧行为。
+    """
+    for d, u in zip(down, up):
+        owners = _key_owners.get(d)
+        if owners is None:
+            batch.append(u)
+            continue
+        owners.discard(source)
+        if not owners:
+            del _key_owners[d]
+            batch.append(u)
+
+
+def press_owned(source, down, up=()) -> int:
+    """source 按下 down 中的键 — 只注入此前无人持有的键，返回注入条数。
+
+    注入在锁内提交，保证与其他来源的按下/释放顺序一致
+    （派发线程运行时只是入队，不会长时间占用锁）。
+    按下批次因队列已满被丢弃时撤销本次新建的登记，之后其他来源仍会真正按下这些键。
+    """
+    with _owners_lock:
+        batch = []
+        _acquire(source, down, batch)
+        sent = send_events(batch)
+        if batch and not sent:
+            _rollback(batch)
+        return sent
+
+
+def release_owned(source, down, up) -> int:
+    """source 释放 down/up 对应的键 — 只在最后一个 owner 离开时注入释放。"""
+    with _owners_lock:
+        batch = []
+        _release(source, down, up, batch)
+        return send_events(batch)
+
+
+def handoff_owned(old_source, old_down, old_up, new_source, new_down) -> int:
+    """持有权交接（相邻扇区滑动）: 新来源先登记、旧来源再注销。
+
+    两组键的交集保持按下，只注入对称差: 新增键的按下 + 旧独有键的释放。
+    例如 ↖(w+a) → ←(a) 只释放 w；a 不会被"松开再按下"。
+    按下与释放分两批提交: 按下批次可被丢弃（同 press_owned 撤销登记），
+    释放批次不可丢弃 — 旧来源已注销，丢掉释放会卡键。
+    """
+    with _owners_lock:
+        press, release = [], []
+        _acquire(new_source, new_down, press)
+        _release(old_source, old_down, old_up, release)
+        sent = send_events(press)
+        if press and not sent:
+            _rollback(press)
+        return sent + send_events(release)
+
+
+def release_source(source) -> int:
+    """注销 source 持有的全部键（宏被取消等），只注入已无其他持有者的键的释放。"""
+    with _owners_lock:
+        batch = []
+        for ev in [ev for ev, owners in _key_owners.items() if source in owners]:
+            owners = _key_owners[ev]
+            owners.discard(source)
+            if not owners:
+                del _key_owners[ev]
+                batch.append(_release_event(ev))
+        return send_events(batch)
+
+
+def _release_event(down: InputEvent) -> InputEvent:
+    """按下事件 → 对应的释放事件（鼠标 *DOWN 标志左移一位即为 *UP）"""
+    if down.kind == INPUT_KEYBOARD:
+        return down._replace(flags=down.flags | KEYEVENTF_KEYUP)
+    return down._replace(flags=down.flags << 1)
+
+
+def key_owners(event) -> frozenset:
+    """当前持有某个按下事件对应键的来源集合（诊断 / 测试）"""
+    with _owners_lock:
+        return frozenset(_key_owners.get(event, ()))
+
+
+def pending_click_count() -> int:
+    """尚未释放的点击数量"""
+    with _clicks_lock:
+        return len(_pending_clicks)
+
+
+def trigger_events(down, up, action: str, repeat: int = 1, source=None):
+    """按动作提交预构建的事件批次。
+
+    Args:
+        down:   按下批次（'p' 与 'c' 使用）
+        up:     释放批次（'r' 与 'c' 使用），与 down 按位置一一对应
+        action: 'p' = 按下, 'r' = 释放, 'c' = 点击(按下后立即返回，释放由定时服务调度)
+        repeat: 'c' 的连续点击次数 — 前 repeat-1 次按下/释放与最后一次按下同批提交
+        source: 持有者标识；给出时 'p'/'r' 按引用计数处理，共享键不会被提前释放
+    """
+    if action == 'p':
+        if source is not None:
+            press_owned(source, down, up)
+        else:
+            send_events(down)
+    elif action == 'r':
+        if source is not None:
+            release_owned(source, down, up)
+        else:
+            send_events(up)
+    elif action == 'c':
+        # 已被持有的键不参与点击（它本就处于按下状态，点击的释放会打断持有者）
+        with _owners_lock:
+            pairs = [(d, u) for d, u in zip(down, up) if d not in _key_owners]
+        if not pairs:
             return
-        keys_copy = list(_pressed_keys)
-        _pressed_keys.clear()
-    # 在锁外执行 Win32 API 调用，避免锁内阻塞
-    for sc, ext in keys_copy:
-        try:
-            flags = KEYEVENTF_SCANCODE | KEYEVENTF_KEYUP
-            if ext:
-                flags |= KEYEVENTF_EXTENDEDKEY
-            extra = ctypes.c_ulong(0)
-            ii_ = Input_I()
-            ii_.ki = KeyBdInput(0, sc, flags, 0, ctypes.pointer(extra))
-            x = Input(ctypes.c_ulong(1), ii_)
-            _SendInput(1, ctypes.pointer(x), ctypes.sizeof(x))
-        except Exception as e:
-            logger.error(f"释放按键失败: scan={sc}, ext={ext}, error={e}")
-    logger.info(f"兜底释放了 {len(keys_copy)} 个按键")
-
-
-def trigger(keys: str, action: str):
-    """触发按键操作。
+        down = [d for d, _ in pairs]
+        up = [u for _, u in pairs]
+        if repeat > 1:
+            send_events((down + up) * (repeat - 1) + down)
+        else:
+            send_events(down)
+        _schedule_click_release(down, up)
+
+
+def trigger(keys: str, action: str, mouse_buttons=()):
+    """触发按键操作 — 同一动作的所有键与鼠标按钮合并为一批提交。
 
     Args:
-        keys:   按键字符串，多键用 '+' 连接，如 "w+a"
-        action: 'p' = 按下, 'r' = 释放, 'c' = 点击(按下+短暂延迟+释放)
+        keys:          按键字符串，多键用 '+' 连接，如 "w+a"
+        action:        'p' = 按下, 'r' = 释放, 'c' = 点击(按下+定时释放)
+        mouse_buttons: 同批提交的鼠标按钮名，如 ('left',)（来自 mouse:left 标签）
     """
-    if not keys:
-        return
-    key_list = [k.strip() for k in keys.split('+') if k.strip()]
-    if not key_list:
+    if not keys and not mouse_buttons:
         return
     try:
-        for k in key_list:
-            sc = get_scan_code(k)
-            if sc == 0:
-                continue
-            ext = k.lower() in _EXTENDED_KEY_NAMES
-            if action == 'p':
-                press_key(sc, ext)
-            elif action == 'r':
-                release_key(sc, ext)
-            elif action == 'c':
-                press_key(sc, ext)
-                time.sleep(random.uniform(0.03, 0.06))
-                release_key(sc, ext)
+        resolved = _resolve_keys(keys) if keys else []
+        down = [key_event(sc, ext, up=False) for sc, ext in resolved]
+        up = [key_event(sc, ext, up=True) for sc, ext in resolved]
+        for mb in mouse_buttons:
+            ev_down = mouse_button_event(mb, up=False)
+            if ev_down is not None:
+                down.append(ev_down)
+                up.append(mouse_button_event(mb, up=True))
+        trigger_events(down, up, action)
     except Exception as e:
         logger.error(f"触发按键失败: keys={keys}, action={action}, error={e}")
 
@@ -216,137 +486,261 @@ def is_key_pressed(key_name: str) -> bool:
         return False
 
 
-# ─── 低级鼠标钩子：全局滚轮捕获 ─────────────────────────────
-
-WH_MOUSE_LL = 14
-WM_MOUSEWHEEL = 0x020A
+def mouse_press(button: str):
+    """按下鼠标按钮。button: 'left', 'right', 'middle', 'x1', 'x2'"""
+    ev = mouse_button_event(button, up=False)
+    if ev is not None:
+        send_events([ev])
 
-class _MSLLHOOKSTRUCT(ctypes.Structure):
-    _fields_ = [
-        ('pt', wintypes.POINT),
-        ('mouseData', wintypes.DWORD),
-        ('flags', wintypes.DWORD),
-        ('time', wintypes.DWORD),
-        ('dwExtraInfo', ctypes.POINTER(ctypes.c_ulong)),
-    ]
 
-_HOOKPROC = ctypes.CFUNCTYPE(ctypes.c_ssize_t, ctypes.c_int, ctypes.c_size_t, ctypes.POINTER(_MSLLHOOKSTRUCT))
+def mouse_release(button: str):
+    """释放鼠标按钮。button: 'left', 'right', 'middle', 'x1', 'x2'"""
+    ev = mouse_button_event(button, up=True)
+    if ev is not None:
+        send_events([ev])
 
 
-# mouse_event 比 SendInput 快得多（无需创建 ctypes 结构体）
-_mouse_event = ctypes.windll.user32.mouse_event
-_mouse_event.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD, ctypes.POINTER(ctypes.c_ulong)]
-_mouse_event.restype = None
+def mouse_wheel(direction: str):
+    """模拟鼠标滚轮。direction: 'up' 或 'down'"""
+    delta = WHEEL_DELTA if direction.lower() == 'up' else -WHEEL_DELTA
+    send_events([InputEvent(INPUT_MOUSE, 0, MOUSEEVENTF_WHEEL, delta & 0xFFFFFFFF)])
 
-_CallNextHookEx = ctypes.windll.user32.CallNextHookEx
-_CallNextHookEx.argtypes = [wintypes.HHOOK, ctypes.c_int, ctypes.c_size_t, ctypes.POINTER(_MSLLHOOKSTRUCT)]
-_CallNextHookEx.restype = ctypes.c_ssize_t
 
-_SetWindowsHookExW = ctypes.windll.user32.SetWindowsHookExW
-_SetWindowsHookExW.argtypes = [ctypes.c_int, _HOOKPROC, wintypes.HINSTANCE, wintypes.DWORD]
-_SetWindowsHookExW.restype = wintypes.HHOOK
+# ─── 低级鼠标钩子：滚轮 / 移动 / 按键捕获 ─────────────────────
 
-_UnhookWindowsHookEx = ctypes.windll.user32.UnhookWindowsHookEx
-_UnhookWindowsHookEx.argtypes = [wintypes.HHOOK]
-_UnhookWindowsHookEx.restype = wintypes.BOOL
-MOUSEEVENTF_MOVE = 0x0001
+WM_MOUSEMOVE = 0x0200
+WM_LBUTTONDOWN = 0x0201
+WM_LBUTTONUP = 0x0202
+WM_RBUTTONDOWN = 0x0204
+WM_RBUTTONUP = 0x0205
+WM_MBUTTONDOWN = 0x0207
+WM_MBUTTONUP = 0x0208
+WM_MOUSEWHEEL = 0x020A
+WM_XBUTTONDOWN = 0x020B
+WM_XBUTTONUP = 0x020C
 
-# ─── 鼠标按钮模拟常量 ─────────────────────────────────────────
-MOUSEEVENTF_LEFTDOWN   = 0x0002
-MOUSEEVENTF_LEFTUP     = 0x0004
-MOUSEEVENTF_RIGHTDOWN  = 0x0008
-MOUSEEVENTF_RIGHTUP    = 0x0010
-MOUSEEVENTF_MIDDLEDOWN = 0x0020
-MOUSEEVENTF_MIDDLEUP   = 0x0040
-MOUSEEVENTF_XDOWN      = 0x0080
-MOUSEEVENTF_XUP        = 0x0100
-MOUSEEVENTF_WHEEL      = 0x0800
-XBUTTON1               = 0x0001
-XBUTTON2               = 0x0002
-WHEEL_DELTA            = 120
+LLMHF_INJECTED = 0x01  # MSLLHOOKSTRUCT.flags: 由 SendInput 注入
 
-# 按钮名 → (down_flag, up_flag, mouseData)
-_MOUSE_BUTTON_MAP = {
-    'left':   (MOUSEEVENTF_LEFTDOWN,   MOUSEEVENTF_LEFTUP,   0),
-    'right':  (MOUSEEVENTF_RIGHTDOWN,  MOUSEEVENTF_RIGHTUP,  0),
-    'middle': (MOUSEEVENTF_MIDDLEDOWN, MOUSEEVENTF_MIDDLEUP, 0),
-    'x1':     (MOUSEEVENTF_XDOWN,      MOUSEEVENTF_XUP,      XBUTTON1),
-    'x2':     (MOUSEEVENTF_XDOWN,      MOUSEEVENTF_XUP,      XBUTTON2),
+# 钩子消息 → (VK, 是否按下)；X 键的 VK 由 mouseData 高 16 位 (1/2) 决定
+_BUTTON_MSGS = {
+    WM_LBUTTONDOWN: (0x01, True), WM_LBUTTONUP: (0x01, False),
+    WM_RBUTTONDOWN: (0x02, True), WM_RBUTTONUP: (0x02, False),
+    WM_MBUTTONDOWN: (0x04, True), WM_MBUTTONUP: (0x04, False),
 }
+_XBUTTON_VK = {1: 0x05, 2: 0x06}
 
 
-def mouse_press(button: str):
-    """按下鼠标按钮。button: 'left', 'right', 'middle', 'x1', 'x2'"""
-    entry = _MOUSE_BUTTON_MAP.get(button.lower())
-    if not entry:
-        logger.debug(f"未知鼠标按钮: '{button}'")
-        return
-    down_flag, _, mouse_data = entry
-    extra = ctypes.c_ulong(0)
-    _mouse_event(down_flag, 0, 0, mouse_data, ctypes.pointer(extra))
-
+class WheelEvent(NamedTuple):
+    """一次钩子捕获的滚轮事件
 
-def mouse_release(button: str):
-    """释放鼠标按钮。button: 'left', 'right', 'middle', 'x1', 'x2'"""
-    entry = _MOUSE_BUTTON_MAP.get(button.lower())
-    if not entry:
-        logger.debug(f"未知鼠标按钮: '{button}'")
-        return
-    _, up_flag, mouse_data = entry
-    extra = ctypes.c_ulong(0)
-    _mouse_event(up_flag, 0, 0, mouse_data, ctypes.pointer(extra))
+    ts:    钩子回调时刻 (time.perf_counter 秒)
+    delta: 有符号原始 delta — WHEEL_DELTA(120) 为一格，高精度触控板/无级滚轮可能更小
+    x, y:  屏幕坐标
+    """
+    ts: float
+    delta: int
+    x: int
+    y: int
 
 
-def mouse_wheel(direction: str):
-    """模拟鼠标滚轮。direction: 'up' 或 'down'"""
-    delta = WHEEL_DELTA if direction.lower() == 'up' else -WHEEL_DELTA
-    extra = ctypes.c_ulong(0)
-    _mouse_event(MOUSEEVENTF_WHEEL, 0, 0, ctypes.c_ulong(delta & 0xFFFFFFFF), ctypes.pointer(extra))
+class MouseEvent(NamedTuple):
+    """一次钩子捕获的移动 / 按键事件
 
+    ts:   钩子回调时刻 (time.perf_counter 秒)
+    x, y: 屏幕坐标
+    vk:   按键 VK (VK_LBUTTON / VK_RBUTTON / VK_MBUTTON / VK_XBUTTON1/2)；0 表示移动
+    down: 按下 (True) / 抬起 (False)；移动时无意义
+    """
+    ts: float
+    x: int
+    y: int
+    vk: int = 0
+    down: bool = False
 
-def _mouse_hook_proc(nCode, wParam, lParam):
-    """低级鼠标钩子回调。处理全局滚轮捕获。"""
-    if nCode >= 0:
-        data = lParam.contents
 
-        if wParam == WM_MOUSEWHEEL:
-            # mouseData 高16位是滚轮 delta (signed short)
-            delta = ctypes.c_short(data.mouseData >> 16).value
-            direction = 'up' if delta > 0 else 'down'
-            with _wheel_lock:
-                _wheel_queue.append((direction, data.pt.x, data.pt.y))
+def _on_mouse_hook(msg, x, y, mouse_data, flags=0):
+    """低级鼠标钩子回调（由后端在钩子线程调用）。
 
-    return _CallNextHookEx(None, nCode, wParam, lParam)
+    滚轮入 _wheel_queue；移动 / 按键入 _mouse_queue（自身注入的按键事件忽略，避免回环）。
+    """
+    global _wheel_overflow
+    if msg == WM_MOUSEMOVE:
+        _push_mouse_event(MouseEvent(time.perf_counter(), x, y))
+    elif msg in _BUTTON_MSGS:
+        if not flags & LLMHF_INJECTED:
+            vk, down = _BUTTON_MSGS[msg]
+            _push_mouse_event(MouseEvent(time.perf_counter(), x, y, vk, down))
+    elif msg in (WM_XBUTTONDOWN, WM_XBUTTONUP):
+        vk = _XBUTTON_VK.get((mouse_data >> 16) & 0xFFFF)
+        if vk and not flags & LLMHF_INJECTED:
+            _push_mouse_event(MouseEvent(time.perf_counter(), x, y, vk, msg == WM_XBUTTONDOWN))
+    elif msg == WM_MOUSEWHEEL:
+        # mouseData 高16位是滚轮 delta (signed short)
+        delta = ctypes.c_short(mouse_data >> 16).value
+        if delta == 0:
+            return
+        ev = WheelEvent(time.perf_counter(), delta, x, y)
+        with _wheel_lock:
+            if len(_wheel_queue) < WHEEL_QUEUE_CAPACITY:
+                _wheel_queue.append(ev)
+            else:
+                # 溢出: 合并进队尾事件（保留总 delta），并计数
+                last = _wheel_queue[-1]
+                _wheel_queue[-1] = last._replace(delta=last.delta + delta)
+                _wheel_overflow += 1
+        _wake_listener()
+
+
+def _push_mouse_event(ev: MouseEvent):
+    """移动与队尾移动合并；队列满时丢弃并计数"""
+    global _mouse_overflow
+    with _mouse_lock:
+        if ev.vk == 0 and _mouse_queue and _mouse_queue[-1].vk == 0:
+            _mouse_queue[-1] = ev
+        elif len(_mouse_queue) < MOUSE_QUEUE_CAPACITY:
+            _mouse_queue.append(ev)
+        else:
+            _mouse_overflow += 1
+    _wake_listener()
+
+
+def _wake_listener():
+    """自上次 poll_mouse_events 以来第一次有新事件时唤醒监听者（之后的事件等下一次取出）"""
+    global _wake_armed
+    listener = _mouse_listener
+    if listener is None:
+        return
+    with _mouse_lock:
+        if not _wake_armed:
+            return
+        _wake_armed = False
+    try:
+        listener()
+    except Exception as e:
+        logger.error(f"鼠标事件唤醒回调异常: {e}")
 
 
 def install_wheel_hook():
-    """安装全局鼠标滚轮钩子。在主线程调用。"""
-    global _hook_handle, _hook_func_ref
-    if _hook_handle is not None:
+    """安装全局低级鼠标钩子（滚轮 + 移动 / 按键）。在主线程调用。"""
+    global _hook_installed
+    if _hook_installed:
         return  # 已安装
-    _hook_func_ref = _HOOKPROC(_mouse_hook_proc)
-    _hook_handle = _SetWindowsHookExW(
-        WH_MOUSE_LL, _hook_func_ref, None, 0
-    )
-    if _hook_handle == 0:
-        logger.error("安装鼠标钩子失败")
-        _hook_handle = None
+    try:
+        _hook_installed = get_backend().install_mouse_hook(_on_mouse_hook)
+    except NotImplementedError:
+        logger.warning("当前输入后端不支持低级鼠标钩子")
 
 
 def uninstall_wheel_hook():
-    """卸载全局鼠标滚轮钩子。"""
-    global _hook_handle, _hook_func_ref
-    if _hook_handle:
-        _UnhookWindowsHookEx(_hook_handle)
-        _hook_handle = None
-        _hook_func_ref = None
+    """卸载全局低级鼠标钩子。"""
+    global _hook_installed
+    if _hook_installed:
+        get_backend().uninstall_mouse_hook()
+        _hook_installed = False
+
+
+def rehome_mouse_hook() -> bool:
+    """在调用线程重新安装已安装的钩子，返回钩子是否仍然有效。
+
+    Win32 低级钩子回调经安装线程的消息循环执行: 输入线程接管时调用，GUI 线程卡顿不再推迟钩子事件；
+    输入线程退出后由主线程再调用一次收回。
+    """
+    global _hook_installed
+    if not _hook_installed:
+        return False
+    backend = get_backend()
+    backend.uninstall_mouse_hook()
+    try:
+        _hook_installed = backend.install_mouse_hook(_on_mouse_hook)
+    except NotImplementedError:
+        _hook_installed = False
+    return _hook_installed
+
+
+def mouse_hook_installed() -> bool:
+    """低级鼠标钩子是否已安装（决定运行循环走事件驱动还是轮询）"""
+    return _hook_installed
 
 
-def poll_wheel_events():
-    """取出所有待处理的滚轮事件。返回 list of (direction, abs_x, abs_y)。"""
+def set_mouse_listener(callback):
+    """设置鼠标事件唤醒回调（None 取消）。回调在钩子线程调用，应只做跨线程投递。"""
+    global _mouse_listener, _wake_armed
+    with _mouse_lock:
+        _mouse_listener = callback
+        _wake_armed = True
+
+
+def poll_mouse_events() -> list:
+    """取出所有待处理的移动 / 按键事件（按捕获顺序），并重新允许唤醒。"""
+    global _wake_armed
+    with _mouse_lock:
+        events = list(_mouse_queue)
+        _mouse_queue.clear()
+        _wake_armed = True
+    return events
+
+
+def mouse_overflow_count() -> int:
+    """鼠标事件队列溢出（被丢弃）的事件数"""
+    return _mouse_overflow
+
+
+def poll_wheel_events() -> list:
+    """取出所有待处理的滚轮事件。返回 list of WheelEvent（按捕获顺序）。"""
     with _wheel_lock:
         events = list(_wheel_queue)
         _wheel_queue.clear()
     return events
 
 
+def wheel_overflow_count() -> int:
+    """滚轮队列溢出（被合并）的事件数"""
+    return _wheel_overflow
+
+
+# ─── 低级键盘钩子：快捷键 ─────────────────────────────────────
+
+LLKHF_INJECTED = 0x10
+_key_hook_installed = False
+
+
+def get_scan_codes(key_name: str) -> tuple:
+    """按键名 → 该键可能产生的全部扫描码（如 'ctrl' 含左右两个），只取低字节与钩子的 scanCode 对齐。
+
+    左右同名修饰键、方向键与小键盘同位键因此不区分（快捷键场景可接受）。
+    """
+    if not _keyboard_available:
+        return ()
+    try:
+        codes = _kb.key_to_scan_codes(key_name)
+    except Exception:
+        return ()
+    return tuple(dict.fromkeys(abs(c) & 0xFF for c in codes))
+
+
+def install_keyboard_hook(callback) -> bool:
+    """安装全局低级键盘钩子，callback(scan_code, down) 在钩子线程调用（自身注入的按键已滤除）。
+
+    返回是否安装成功；后端不支持时返回 False（调用方退回轮询）。
+    """
+    global _key_hook_installed
+    uninstall_keyboard_hook()
+
+    def _on_key(scan_code, down, flags=0):
+        if flags & LLKHF_INJECTED:
+            return  # SendInput 注入的键（按钮绑定 / 宏）不触发快捷键
+        callback(scan_code & 0xFF, down)
+
+    try:
+        _key_hook_installed = get_backend().install_keyboard_hook(_on_key)
+    except NotImplementedError:
+        _key_hook_installed = False
+    return _key_hook_installed
+
+
+def uninstall_keyboard_hook():
+    """卸载全局低级键盘钩子。"""
+    global _key_hook_installed
+    if _key_hook_installed:
+        get_backend().uninstall_keyboard_hook()
+        _key_hook_installed = False
@@ -0,0 +1,341 @@
+"""
+TEGG Touch 蛋挞 辅助软件 - 输入区域
+
+把场景布局（按钮矩形、轮盘圆环 / 扇区、工具栏）编译成一组互不重叠的矩形，
+交给窗口系统作为输入区域（Qt setMask → Win32 SetWindowRgn），由系统自己决定点击落在哪个窗口，
+取代"每帧检查光标是否在 UI 上 + 切换 WS_EX_TRANSPARENT"。
+
+  - 形状: rect_shape / ring_shape / sector_shape，坐标与角度约定同 scene.hit_index
+    （扇区角度: 0°=右，逆时针；覆盖 [start, start + span)）
+  - 光栅化: 像素中心落在形状内的像素属于区域；每个形状按行缓存像素区间
+  - 增量更新: set / remove / sync 只重新光栅化变化的形状，只重算它新旧位置覆盖的行
+  - 输出: rects() 按行带合并（同 Win32 / Qt 区域的 y-x 带状排序），inverted=True 取边界内的补集
+
+纯逻辑，不依赖 Qt。
+"""
+
+import math
+
+RECT = 'rect'
+RING = 'ring'
+SECTOR = 'sector'
+
+
+# ─── 形状 ────────────────────────────────────────────────────
+
+def rect_shape(left: float, top: float, right: float, bottom: float) -> tuple:
+    """矩形 [left, right) × [top, bottom)"""
+    return (RECT, float(left), float(top), float(right), float(bottom))
+
+
+def ring_shape(cx: float, cy: float, r_in: float, r_out: float) -> tuple:
+    """圆环 r_in ≤ d < r_out（r_in=0 即实心圆）"""
+    return (RING, float(cx), float(cy), float(r_in), float(r_out))
+
+
+def sector_shape(cx: float, cy: float, r_in: float, r_out: float, start: float, span: float) -> tuple:
+    """扇区: 圆环中角度 [start, start + span) 的部分"""
+    if span >= 360.0:
+        return ring_shape(cx, cy, r_in, r_out)
+    return (SECTOR, float(cx), float(cy), float(r_in), float(r_out), float(start) % 360.0, float(span))
+
+
+def shape_bbox(shape: tuple) -> tuple:
+    """(left, top, right, bottom)"""
+    if shape[0] == RECT:
+        return shape[1:5]
+    _, cx, cy, _, r_out = shape[:5]
+    return cx - r_out, cy - r_out, cx + r_out, cy + r_out
+
+
+def shape_contains(shape: tuple, x: float, y: float) -> bool:
+    kind = shape[0]
+    if kind == RECT:
+        _, l, t, r, b = shape
+        return l <= x < r and t <= y < b
+    _, cx, cy, r_in, r_out = shape[:5]
+    dx, dy = x - cx, cy - y
+    d2 = dx * dx + dy * dy
+    if not (r_in * r_in <= d2 < r_out * r_out):
+        return False
+    if kind == RING:
+        return True
+    start, span = shape[5], shape[6]
+    return (math.degrees(math.atan2(dy, dx)) - start) % 360.0 < span
+
+
+def _px(v: float) -> int:
+    """像素中心 ≥ v 的第一个像素"""
+    return math.ceil(v - 0.5)
+
+
+def _half_plane(ux: float, uy: float, py: float, sign: int):
+    """sign·(ux·py - uy·px) ≥ 0 在 px 上的解区间 (lo, hi)；无解返回 None"""
+    a, c = -uy * sign, ux * py * sign  # a·px + c ≥ 0
+    if abs(a) < 1e-12:
+        return (-math.inf, math.inf) if c >= 0 else None
+    bound = -c / a
+    return (bound, math.inf) if a > 0 else (-math.inf, bound)
+
+
+def _wedge_spans(cx, cy, r_in, r_out, start, span, yc):
+    """扇区（span ≤ 180°）在像素中心行 yc 上的浮点区间"""
+    py = cy - yc
+    s0, s1 = math.radians(start), math.radians(start + span)
+    # 角度在 [start, start+span) ⇔ u×p ≥ 0 且 p×v ≥ 0（u、v 为两条边的方向，数学坐标 y 向上）
+    h0 = _half_plane(math.cos(s0), math.sin(s0), py, 1)
+    h1 = _half_plane(math.cos(s1), math.sin(s1), py, -1)
+    if h0 is None or h1 is None:
+        return []
+    lo, hi = max(h0[0], h1[0]), min(h0[1], h1[1])
+    if lo >= hi:
+        return []
+    result = []
+    for a, b in _ring_spans(0.0, r_in, r_out, py):
+        a, b = max(a, lo), min(b, hi)
+        if a < b:
+            result.append((cx + a, cx + b))
+    return result
+
+
+def _ring_spans(cx, r_in, r_out, dy):
+    dy2 = dy * dy
+    if dy2 >= r_out * r_out:
+        return []
+    ho = math.sqrt(r_out * r_out - dy2)
+    if dy2 >= r_in * r_in:
+        return [(cx - ho, cx + ho)]
+    hi = math.sqrt(r_in * r_in - dy2)
+    return [(cx - ho, cx - hi), (cx + hi, cx + ho)]
+
+
+def shape_rows(shape: tuple) -> tuple:
+    """光栅化: (首行 y, 每行的像素区间元组 ((x0, x1), ...))，x1 不含"""
+    kind = shape[0]
+    if kind == RECT:
+        _, l, t, r, b = shape
+        y0, y1, x0, x1 = _px(t), _px(b), _px(l), _px(r)
+        row = ((x0, x1),) if x0 < x1 else ()
+        return y0, (row,) * max(0, y1 - y0)
+    _, cx, cy, r_in, r_out = shape[:5]
+    y0, y1 = _px(cy - r_out), _px(cy + r_out)
+    if kind == RING:
+        def spans(yc):
+            return _ring_spans(cx, r_in, r_out, yc - cy)
+    else:
+        start, span = shape[5], shape[6]
+        # 超过 180° 的扇区拆成两半（每半是两个半平面的交）
+        parts = ((start, span),) if span <= 180.0 else ((start, span / 2), (start + span / 2, span / 2))
+
+        def spans(yc):
+            return [s for a, w in parts for s in _wedge_spans(cx, cy, r_in, r_out, a, w, yc)]
+    rows = []
+    for y in range(y0, y1):
+        row = []
+        for a, b in spans(y + 0.5):
+            x0, x1 = _px(a), _px(b)
+            if x0 < x1:
+                row.append((x0, x1))
+        rows.append(tuple(_merge(row)))
+    return y0, tuple(rows)
+
+
+def _merge(spans):
+    """排序并合并重叠 / 相接的区间"""
+    merged = []
+    for a, b in sorted(spans):
+        if merged and a <= merged[-1][1]:
+            if b > merged[-1][1]:
+                merged[-1] = (merged[-1][0], b)
+        else:
+            merged.append((a, b))
+    return merged
+
+
+# ─── 区域 ────────────────────────────────────────────────────
+
+class _Entry:
+    __slots__ = ('shape', 'visible', 'y0', 'rows')
+
+    def __init__(self, shape, visible):
+        self.shape = shape
+        self.visible = visible
+        self.y0, self.rows = shape_rows(shape)
+
+    @property
+    def y1(self):
+        return self.y0 + len(self.rows)
+
+
+class InputRegion:
+    """按键（通常是 Item / 窗口名）登记形状的输入区域
+
+    bounds 为 (left, top, right, bottom) 整数像素，rects() 裁剪到边界内，inverted 在边界内取补集。
+    version 在区域实际变化时递增，调用方据此判断是否需要重新应用到窗口。
+    """
+
+    def __init__(self, bounds=(0, 0, 0, 0)):
+        self._entries = {}
+        self._rows = {}          # y → 合并后的区间元组（只存非空行）
+        self._dirty = set()      # 待重算的行
+        self._rects = {}         # inverted → 缓存的矩形列表
+        self.version = 0
+        self._counts = {'shapes_rasterized': 0, 'rows_rebuilt': 0, 'rect_builds': 0}
+        self._bounds = tuple(int(v) for v in bounds)
+
+    # ── 登记 ──
+
+    @property
+    def bounds(self) -> tuple:
+        return self._bounds
+
+    def set_bounds(self, left: int, top: int, right: int, bottom: int):
+        bounds = (int(left), int(top), int(right), int(bottom))
+        if bounds != self._bounds:
+            self._bounds = bounds
+            self._changed()
+
+    def set(self, key, shape: tuple, visible: bool = True) -> bool:
+        """登记 / 更新一个形状，返回区域是否变化；形状不变只切换可见性时不重新光栅化"""
+        old = self._entries.get(key)
+        if old is not None and old.shape == shape:
+            if old.visible == visible:
+                return False
+            old.visible = visible
+            self._mark(old)
+            self._changed()
+            return True
+        entry = _Entry(shape, visible)
+        self._counts['shapes_rasterized'] += 1
+        self._entries[key] = entry
+        if old is not None and old.visible:
+            self._mark(old)
+        if visible or (old is not None and old.visible):
+            self._mark(entry)
+            self._changed()
+            return True
+        return False
+
+    def remove(self, key) -> bool:
+        old = self._entries.pop(key, None)
+        if old is None:
+            return False
+        if old.visible:
+            self._mark(old)
+            self._changed()
+        return old.visible
+
+    def sync(self, shapes: dict) -> int:
+        """按完整的 键 → (形状, 可见) 映射增量更新，返回变化的键数"""
+        changed = 0
+        for key in [k for k in self._entries if k not in shapes]:
+            changed += self.remove(key)
+        for key, (shape, visible) in shapes.items():
+            changed += self.set(key, shape, visible)
+        return changed
+
+    def clear(self):
+        if self._entries:
+            self._entries.clear()
+            self._rows.clear()
+            self._dirty.clear()
+            self._changed()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    # ── 查询 ──
+
+    def contains(self, x: float, y: float) -> bool:
+        """精确几何测试（不经过光栅化）"""
+        return any(e.visible and shape_contains(e.shape, x, y) for e in self._entries.values())
+
+    def spans(self, y: int) -> tuple:
+        """第 y 行（未裁剪）的合并像素区间"""
+        self._flush()
+        return self._rows.get(y, ())
+
+    def rects(self, inverted: bool = False) -> tuple:
+        """边界内的 (x, y, w, h) 矩形，y-x 带状排序、互不重叠；相同区间的相邻行合并为一条带"""
+        self._flush()
+        cached = self._rects.get(inverted)
+        if cached is not None:
+            return cached
+        self._counts['rect_builds'] += 1
+        left, top, right, bottom = self._bounds
+        rects = []
+        band_y, band_spans = top, None
+        for y in range(top, bottom + 1):
+            if y < bottom:
+                spans = self._clip(self._rows.get(y, ()), left, right)
+                if inverted:
+                    spans = self._complement(spans, left, right)
+            else:
+                spans = None  # 哨兵: 收尾最后一条带
+            if spans != band_spans:
+                if band_spans:
+                    rects.extend((a, band_y, b - a, y - band_y) for a, b in band_spans)
+                band_y, band_spans = y, spans
+        result = tuple(rects)
+        self._rects[inverted] = result
+        return result
+
+    def area(self, inverted: bool = False) -> int:
+        return sum(w * h for _, _, w, h in self.rects(inverted))
+
+    def stats(self) -> dict:
+        return dict(self._counts, shapes=len(self._entries),
+                    visible=sum(e.visible for e in self._entries.values()),
+                    rows=len(self._rows), version=self.version)
+
+    # ── 内部 ──
+
+    def _changed(self):
+        self.version += 1
+        self._rects.clear()
+
+    def _mark(self, entry: _Entry):
+        self._dirty.update(range(entry.y0, entry.y1))
+
+    def _flush(self):
+        """重算脏行: 只合并覆盖该行的可见形状"""
+        if not self._dirty:
+            return
+        lo, hi = min(self._dirty), max(self._dirty) + 1
+        per_row = {y: [] for y in self._dirty}
+        for e in self._entries.values():
+            if not e.visible or e.y1 <= lo or e.y0 >= hi:
+                continue
+            for y in range(max(e.y0, lo), min(e.y1, hi)):
+                row = per_row.get(y)
+                if row is not None:
+                    row.extend(e.rows[y - e.y0])
+        for y, spans in per_row.items():
+            merged = tuple(_merge(spans))
+            if merged:
+                self._rows[y] = merged
+            else:
+                self._rows.pop(y, None)
+        self._counts['rows_rebuilt'] += len(per_row)
+        self._dirty.clear()
+
+    @staticmethod
+    def _clip(spans, left, right):
+        if not spans or (spans[0][0] >= left and spans[-1][1] <= right):
+            return tuple(spans)
+        return tuple((max(a, left), min(b, right)) for a, b in spans
+                     if min(b, right) > max(a, left))
+
+    @staticmethod
+    def _complement(spans, left, right):
+        result, x = [], left
+        for a, b in spans:
+            if a > x:
+                result.append((x, a))
+            x = max(x, b)
+        if x < right:
+            result.append((x, right))
+        return tuple(result)
@@ -0,0 +1,186 @@
+"""
+TEGG Touch 蛋挞 辅助软件 - 输入延迟统计
+
+运行模式管线各阶段的耗时直方图，按 (阶段, 绑定类型) 聚合:
+  tick        整帧 _tick 耗时
+  cursor      读取光标位置
+  hit_test    坐标映射 + itemAt
+  state       hover 状态机切换（leave/enter + 视觉状态）
+  trigger     _smart_trigger / hover 交接
+  submit      起点 → 事件提交（入队或同步注入前）
+  inject      提交 → 后端注入完成（含派发队列等待）
+  end_to_end  起点 → 后端注入完成
+  绑定类型: hover / click / xbutton / wheel / voice / macro（逐帧阶段为 'tick'）
+
+"起点"是观察到输入的时刻: 帧内触发取 _tick 开始，语音 / 宏取回调时刻。
+起点随线程局部的 trace 传递，send_events 据此把注入耗时归到对应绑定类型。
+
+直方图为固定对数分桶（每倍频 4 桶，约 19% 分辨率），记录一次只是一次整数运算 + 数组自增，
+可以常开；分位数 (p50/p95/p99) 在查看或导出时才计算。
+"""
+
+import json
+import math
+import threading
+import time
+
+# 阶段名（按管线顺序，用于展示排序）
+STAGES = ('tick', 'cursor', 'hit_test', 'state', 'trigger', 'submit', 'inject', 'end_to_end')
+
+_BUCKETS_PER_OCTAVE = 4
+_NUM_BUCKETS = 40 * _BUCKETS_PER_OCTAVE  # 1ns ~ 2^40ns(≈18 分钟)
+
+
+class LatencyHistogram:
+    """对数分桶直方图（纳秒）"""
+
+    __slots__ = ('counts', 'count', 'total_ns', 'max_ns')
+
+    def __init__(self):
+        self.counts = [0] * _NUM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int):
+        if ns < 1:
+            ns = 1
+        idx = int(math.log2(ns) * _BUCKETS_PER_OCTAVE)
+        if idx >= _NUM_BUCKETS:
+            idx = _NUM_BUCKETS - 1
+        self.counts[idx] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile_ns(self, q: float) -> float:
+        """分位数（取所在桶的几何中点）"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= target:
+                return min(2.0 ** ((idx + 0.5) / _BUCKETS_PER_OCTAVE), float(self.max_ns))
+        return float(self.max_ns)
+
+    def summary(self) -> dict:
+        """{count, mean/p50/p95/p99/max}（单位: 微秒）"""
+        n = self.count
+        return {
+            'count': n,
+            'mean_us': (self.total_ns / n / 1000.0) if n else 0.0,
+            'p50_us': self.percentile_ns(0.50) / 1000.0,
+            'p95_us': self.percentile_ns(0.95) / 1000.0,
+            'p99_us': self.percentile_ns(0.99) / 1000.0,
+            'max_us': self.max_ns / 1000.0,
+        }
+
+
+class LatencyRecorder:
+    """(阶段, 绑定类型) → LatencyHistogram
+
+    record() 可在主线程 / 派发线程 / 定时线程调用；锁只保护字典与桶计数，持有时间极短。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hists = {}
+        self._started = time.time()
+        self.enabled = True
+
+    def record(self, stage: str, kind: str, ns: int):
+        if not self.enabled:
+            return
+        key = (stage, kind)
+        with self._lock:
+            hist = self._hists.get(key)
+            if hist is None:
+                hist = self._hists[key] = LatencyHistogram()
+            hist.record(ns)
+
+    def reset(self):
+        with self._lock:
+            self._hists.clear()
+            self._started = time.time()
+
+    def snapshot(self) -> dict:
+        """{'stage/kind': summary}，按阶段顺序、类型字母序排列"""
+        with self._lock:
+            items = [(k, h.summary()) for k, h in self._hists.items()]
+        order = {s: i for i, s in enumerate(STAGES)}
+        items.sort(key=lambda kv: (order.get(kv[0][0], len(order)), kv[0][0], kv[0][1]))
+        return {f'{stage}/{kind}': s for (stage, kind), s in items}
+
+    def format_table(self) -> str:
+        """等宽文本表格（实时查看用）"""
+        lines = [f"{'stage/kind':<22}{'n':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (us)"]
+        for name, s in self.snapshot().items():
+            lines.append(f"{name:<22}{s['count']:>8}{s['p50_us']:>9.1f}{s['p95_us']:>9.1f}"
+                         f"{s['p99_us']:>9.1f}{s['max_us']:>9.1f}")
+        return '\n'.join(lines)
+
+    def dump(self, path: str) -> str:
+        """导出 JSON（汇总 + 原始分桶，可离线合并），返回写入路径"""
+        with self._lock:
+            raw = {f'{s}/{k}': {'counts': list(h.counts), 'max_ns': h.max_ns, 'total_ns': h.total_ns}
+                   for (s, k), h in self._hists.items()}
+        data = {
+            'started': self._started,
+            'dumped': time.time(),
+            'buckets_per_octave': _BUCKETS_PER_OCTAVE,
+            'summary': self.snapshot(),
+            'histograms': raw,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return path
+
+
+# ─── 全局记录器 ──────────────────────────────────────────────
+
+_recorder = LatencyRecorder()
+
+
+def get_latency_recorder() -> LatencyRecorder:
+    return _recorder
+
+
+# ─── 线程局部 trace ──────────────────────────────────────────
+
+_trace_local = threading.local()
+
+
+def set_trace(origin_ns: int, kind: str):
+    """设置当前线程的 trace (起点 perf_counter_ns, 绑定类型)，返回原 trace 以便恢复"""
+    old = getattr(_trace_local, 'trace', None)
+    _trace_local.trace = (origin_ns, kind)
+    return old
+
+
+def restore_trace(old):
+    """恢复 set_trace 返回的原 trace（None 表示清除）"""
+    _trace_local.trace = old
+
+
+def current_trace():
+    """当前线程的 (origin_ns, kind)；未设置时为 None"""
+    return getattr(_trace_local, 'trace', None)
+
+
+def record_submitted(trace):
+    """事件提交时调用: 记录 submit 阶段，返回带提交时刻的 (origin_ns, kind, submit_ns)"""
+    origin_ns, kind = trace
+    now = time.perf_counter_ns()
+    _recorder.record('submit', kind, now - origin_ns)
+    return origin_ns, kind, now
+
+
+def record_injected(submitted):
+    """后端注入完成后调用（派发线程或同步路径）: 记录 inject 与 end_to_end"""
+    origin_ns, kind, submit_ns = submitted
+    now = time.perf_counter_ns()
+    _recorder.record('inject', kind, now - submit_ns)
+    _recorder.record('end_to_end', kind, now - origin_ns)
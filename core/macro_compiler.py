@@ -0,0 +1,194 @@
+"""
+TEGG Touch 蛋挞 辅助软件 - 宏编译
+
+方案加载 / 宏编辑保存时，把配置里的宏列表一次性编译成按名字索引的 MacroLibrary:
+  - 三种步骤格式（type=key / type=delay / 旧格式 keys+delay）展开成扁平的指令序列
+  - 按键字符串编译成 BindingPlan（与按钮绑定共用缓存），运行时不再拆分字符串
+  - 步骤里的 macro:name 变成 'call' 指令（链接，运行时作为独立执行启动，与旧行为一致）
+  - 引用关系有环的宏（含经由其他宏间接引用到环的）在编译时拒绝，不进入索引
+  - 无法识别的动作 / 延迟 / 按键、引用不存在的宏记为 problems 并告警
+
+指令: (op, arg)
+  'p' / 'r'  按下 / 释放，arg 为 BindingPlan（不含 macro: 部分）
+  'wait'     等待，arg 为秒
+  'call'     启动另一个宏，arg 为宏名
+"""
+
+import logging
+from typing import NamedTuple
+
+from core.binding_plan import compile_binding
+
+logger = logging.getLogger(__name__)
+
+OP_WAIT = 'wait'
+OP_CALL = 'call'
+
+_ACTIONS = ('click', 'press', 'release')
+
+
+class CompiledMacro(NamedTuple):
+    """编译后的宏 — 不可变，可在线程间共享"""
+    name: str
+    program: tuple     # 指令序列
+    repeat: int
+    calls: tuple       # 直接引用的宏名（去重，按出现顺序）
+    problems: tuple    # 编译告警（已跳过的步骤 / 引用）
+
+
+def _split_macro_refs(keys: str):
+    """"macro:a+w" → ("w", ("a",))"""
+    plain, refs = [], []
+    for part in keys.split('+'):
+        p = part.strip()
+        if not p:
+            continue
+        if p.startswith('macro:'):
+            refs.append(p[6:])
+        else:
+            plain.append(p)
+    return '+'.join(plain), tuple(refs)
+
+
+def _delay_sec(value, problems, index):
+    try:
+        ms = float(value)
+    except (TypeError, ValueError):
+        problems.append(f"步骤 {index + 1}: 无效延迟 {value!r}")
+        return 0.0
+    return ms / 1000.0 if ms > 0 else 0.0
+
+
+def macro_program(steps, problems: list = None) -> tuple:
+    """宏步骤 → 指令序列
+
+    支持的步骤格式:
+      - type='key':   {"type":"key", "key":"a+b", "action":"click"}（可带旧格式的 delay）
+      - type='delay': {"type":"delay", "ms":100}
+      - 旧格式(兼容): {"keys":"a+b", "action":"click", "delay":50}
+    未知类型按旧格式处理（默认带 50ms 延迟）。无法处理的部分追加到 problems。
+    """
+    if problems is None:
+        problems = []
+    program = []
+    for i, step in enumerate(steps or ()):
+        if not isinstance(step, dict):
+            problems.append(f"步骤 {i + 1}: 无效步骤")
+            continue
+        step_type = step.get('type', 'key')
+        if step_type == 'delay':
+            sec = _delay_sec(step.get('ms', 50), problems, i)
+        else:
+            keys = step.get('key', '') or step.get('keys', '')
+            act = step.get('action', 'click')
+            if keys and act not in _ACTIONS:
+                problems.append(f"步骤 {i + 1}: 未知动作 {act!r}")
+            elif keys:
+                plain, refs = _split_macro_refs(keys)
+                plan = compile_binding(plain)
+                if plan.unknown:
+                    problems.append(f"步骤 {i + 1}: 无法识别的按键 {', '.join(plan.unknown)}")
+                if act in ('click', 'press'):
+                    if plan:
+                        program.append(('p', plan))
+                    program.extend((OP_CALL, ref) for ref in refs)
+                if act in ('click', 'release') and plan:
+                    program.append(('r', plan))
+            sec = _delay_sec(step.get('delay', 0 if step_type == 'key' else 50), problems, i)
+        if sec > 0:
+            program.append((OP_WAIT, sec))
+    return tuple(program)
+
+
+def _find_cycle(name: str, graph: dict):
+    """从 name 出发能到达的第一个环（宏名列表，首尾相同）；无环返回 None"""
+    path, on_path, done = [], set(), set()
+
+    def visit(n):
+        if n in on_path:
+            return path[path.index(n):] + [n]
+        if n in done or n not in graph:
+            return None
+        path.append(n)
+        on_path.add(n)
+        for m in graph[n]:
+            cycle = visit(m)
+            if cycle:
+                return cycle
+        path.pop()
+        on_path.discard(n)
+        done.add(n)
+        return None
+
+    return visit(name)
+
+
+class MacroLibrary:
+    """按名字索引的已编译宏
+
+    errors: 被拒绝的宏 → 环路（宏名元组，首尾相同）
+    """
+
+    def __init__(self, macros: dict = None, errors: dict = None):
+        self._macros = macros or {}
+        self.errors = errors or {}
+
+    def get(self, name: str):
+        """宏名 → CompiledMacro；不存在或被拒绝时返回 None"""
+        return self._macros.get(name)
+
+    @property
+    def names(self) -> list:
+        return list(self._macros)
+
+    def __contains__(self, name):
+        return name in self._macros
+
+
+EMPTY_LIBRARY = MacroLibrary()
+
+
+def compile_macros(macros) -> MacroLibrary:
+    """编译配置里的宏列表。同名宏只取第一个（与旧版线性查找一致）。"""
+    compiled = {}
+    for m in macros or ():
+        if not isinstance(m, dict):
+            continue
+        name = m.get('name', '')
+        if not name or name in compiled:
+            if name:
+                logger.warning("重复的宏名 '%s'，只使用第一个", name)
+            continue
+        problems = []
+        program = macro_program(m.get('steps', []), problems)
+        try:
+            repeat = max(1, int(m.get('repeat', 1)))
+        except (TypeError, ValueError):
+            problems.append(f"无效重复次数 {m.get('repeat')!r}")
+            repeat = 1
+        calls = tuple(dict.fromkeys(arg for op, arg in program if op == OP_CALL))
+        compiled[name] = CompiledMacro(name, program, repeat, calls, tuple(problems))
+
+    # 引用不存在的宏: 去掉对应的 call 指令
+    for name, macro in list(compiled.items()):
+        missing = [c for c in macro.calls if c not in compiled]
+        if missing:
+            compiled[name] = macro._replace(
+                program=tuple(op for op in macro.program
+                              if not (op[0] == OP_CALL and op[1] in missing)),
+                calls=tuple(c for c in macro.calls if c not in missing),
+                problems=macro.problems + tuple(f"引用的宏不存在: {c}" for c in missing))
+
+    graph = {name: macro.calls for name, macro in compiled.items()}
+    errors = {}
+    for name in compiled:
+        cycle = _find_cycle(name, graph)
+        if cycle:
+            errors[name] = tuple(cycle)
+    for name, cycle in errors.items():
+        del compiled[name]
+        logger.warning("宏 '%s' 存在循环引用，已禁用: %s", name, ' → '.join(cycle))
+    for macro in compiled.values():
+        for problem in macro.problems:
+            logger.warning("宏 '%s': %s", macro.name, problem)
+    return MacroLibrary(compiled, errors)
@@ -0,0 +1,202 @@
+"""
+TEGG Touch 蛋挞 辅助软件 - 宏调度器
+
+所有宏共用一个调度线程 + 按截止时间排序的小根堆（core.deadline_worker），替代"每次执行一个线程 + time.sleep":
+  - 执行 core.macro_compiler 编译好的指令序列，只推进指令指针
+  - 等待步骤不阻塞线程: 记下下一个截止时间放回堆中，期间可以执行其他宏
+  - 截止时间按计划时刻累加（不累计执行误差）；粗等待到截止前 spin_sec，剩余部分忙等
+  - 每次执行可单独取消，或按宏名 / 全部取消；取消后不再有该次执行的按键，并释放其持有的键
+  - 同时执行的宏数量有上限，超出时新的执行被拒绝
+  - 记录每一步相对计划时刻的延迟（抖动统计）
+
+不依赖 Qt。两种运行方式同 TimerService: threaded=True 自带守护线程，
+threaded=False 由调用方 run_due(now) 推进（测试 / 回放的虚拟时钟）。
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+
+from core.constants import MACRO_MAX_CONCURRENT, MACRO_SPIN_SEC
+from core.deadline_worker import DeadlineWorker
+from core.macro_compiler import OP_WAIT
+
+logger = logging.getLogger(__name__)
+
+# 抖动样本保留数量
+JITTER_SAMPLES = 4096
+
+
+class MacroRun:
+    """一次宏执行 — 由 MacroScheduler.submit 创建"""
+
+    __slots__ = ('id', 'name', 'source', 'program', 'repeat',
+                 'pc', 'loop', 'deadline', 'cancelled', 'done')
+
+    def __init__(self, run_id: int, name: str, source, program: tuple, repeat: int, deadline: float):
+        self.id = run_id
+        self.name = name
+        self.source = source      # 按键持有者，同一宏并发执行时互不释放对方的键
+        self.program = program
+        self.repeat = repeat
+        self.pc = 0
+        self.loop = 0
+        self.deadline = deadline  # 下一步的计划时刻
+        self.cancelled = False
+        self.done = False
+
+
+class MacroScheduler(DeadlineWorker):
+    """单线程宏调度器
+
+    execute(arg, op, source): 执行一条非等待指令（'p' / 'r' / 'call'），在调度线程调用
+    release(source):          取消时释放该次执行仍持有的键（可省略）
+    """
+
+    def __init__(self, execute, release=None, max_concurrent: int = MACRO_MAX_CONCURRENT,
+                 clock=time.perf_counter, threaded: bool = True, spin_sec: float = MACRO_SPIN_SEC,
+                 name: str = 'tegg-macro'):
+        super().__init__(clock, threaded, name, spin_sec)
+        self._execute = execute
+        self._release = release
+        self._max_concurrent = max_concurrent
+        self._running = {}    # run.id → MacroRun
+        self._ids = itertools.count(1)
+        # 执行指令期间持有；取消方拿到它即保证该次执行不会再注入按键
+        self._exec_lock = threading.RLock()
+        self._jitter = deque(maxlen=JITTER_SAMPLES)
+        self._counts = {'started': 0, 'completed': 0, 'cancelled': 0, 'rejected': 0}
+
+    def submit(self, name: str, program: tuple, repeat: int = 1, source=None):
+        """开始执行一个宏，返回 MacroRun；空宏或已达并发上限时返回 None"""
+        if not program:
+            return None
+        with self._cond:
+            if len(self._running) >= self._max_concurrent:
+                self._counts['rejected'] += 1
+                logger.warning("宏并发数已达上限 (%d)，忽略 '%s'", self._max_concurrent, name)
+                return None
+            run_id = next(self._ids)
+            run = MacroRun(run_id, name, source if source is not None else ('macro', name, run_id),
+                           program, max(1, repeat), self._clock())
+            self._running[run_id] = run
+            self._counts['started'] += 1
+            self._push(run.deadline, run)
+        return run
+
+    def cancel(self, run: MacroRun) -> bool:
+        """取消一次执行: 返回时不会再有它的按键，持有的键已释放"""
+        with self._cond:
+            if run.cancelled or run.done:
+                return False
+            run.cancelled = True
+            self._running.pop(run.id, None)
+            self._counts['cancelled'] += 1
+            self._cond.notify()
+        with self._exec_lock:
+            pass  # 等待正在执行的指令结束
+        if self._release is not None:
+            try:
+                self._release(run.source)
+            except Exception as e:
+                logger.error("宏取消时释放按键失败: %s, error=%s", run.name, e)
+        return True
+
+    def cancel_macro(self, name: str) -> int:
+        """取消某个宏的所有执行，返回取消数量"""
+        with self._cond:
+            runs = [r for r in self._running.values() if r.name == name]
+        return sum(self.cancel(r) for r in runs)
+
+    def cancel_all(self) -> int:
+        """取消所有执行（退出运行模式）"""
+        with self._cond:
+            runs = list(self._running.values())
+        return sum(self.cancel(r) for r in runs)
+
+    def running(self) -> list:
+        """正在执行的宏名（诊断 / 测试）"""
+        with self._cond:
+            return [r.name for r in self._running.values()]
+
+    def shutdown(self):
+        """取消所有执行并停止调度线程"""
+        self.cancel_all()
+        self._stop()
+
+    # ── 统计 ──
+
+    def jitter_stats(self) -> dict:
+        """每步实际执行时刻相对计划时刻的延迟 (µs)"""
+        with self._cond:
+            samples = sorted(self._jitter)
+        n = len(samples)
+        if not n:
+            return {'count': 0, 'mean_us': 0.0, 'p50_us': 0.0, 'p99_us': 0.0, 'max_us': 0.0}
+
+        def _q(q):
+            return samples[min(n - 1, int(q * n))] * 1e6
+
+        return {
+            'count': n,
+            'mean_us': sum(samples) / n * 1e6,
+            'p50_us': _q(0.5),
+            'p99_us': _q(0.99),
+            'max_us': samples[-1] * 1e6,
+        }
+
+    def reset_stats(self):
+        with self._cond:
+            self._jitter.clear()
+            for k in self._counts:
+                self._counts[k] = 0
+
+    def stats(self) -> dict:
+        with self._cond:
+            result = dict(self._counts, running=len(self._running))
+        result['jitter'] = self.jitter_stats()
+        return result
+
+    # ── 内部 ──
+
+    def _fire(self, run: MacroRun, now: float):
+        """执行 run 到下一个等待（或结束），再按计划时刻放回堆中"""
+        with self._exec_lock:
+            if run.cancelled:
+                return
+            self._jitter.append(max(0.0, now - run.deadline))
+            deadline = self._advance(run)
+            with self._cond:
+                if run.cancelled:
+                    return
+                if deadline is None:
+                    run.done = True
+                    self._running.pop(run.id, None)
+                    self._counts['completed'] += 1
+                    logger.info("Macro '%s' executed (repeat=%d, ops=%d)",
+                                run.name, run.repeat, len(run.program))
+                else:
+                    run.deadline = deadline
+                    self._push(deadline, run)
+
+    def _advance(self, run: MacroRun):
+        """推进指令指针，返回下一步的计划时刻；执行完毕 / 已取消返回 None"""
+        program = run.program
+        while not run.cancelled:
+            if run.pc >= len(program):
+                run.loop += 1
+                if run.loop >= run.repeat:
+                    return None
+                run.pc = 0
+            op, arg = program[run.pc]
+            run.pc += 1
+            if op == OP_WAIT:
+                return run.deadline + arg
+            try:
+                self._execute(arg, op, run.source)
+            except Exception as e:
+                logger.error("宏步骤执行失败: %s, op=%s %s, error=%s",
+                             run.name, op, getattr(arg, 'source', arg), e)
+        return None
@@ -0,0 +1,87 @@
+"""
+TEGG Touch 蛋挞 辅助软件 - 定时服务
+
+按截止时间排序的小根堆 + 单个后台线程（core.deadline_worker），替代在调用线程里 time.sleep。
+不依赖 Qt，可在主线程 / 宏线程 / 语音回调中安全调用。
+
+两种运行方式:
+  - threaded=True（默认）: 首次 call_later 时启动守护线程，到期自动执行
+  - threaded=False:        不启动线程，由调用方 run_due(now) 推进（测试 / 虚拟时钟）
+"""
+
+import logging
+import time
+
+from core.deadline_worker import DeadlineWorker
+
+logger = logging.getLogger(__name__)
+
+
+class TimerHandle:
+    """一次已调度的回调 — cancel() 后不会再执行"""
+
+    __slots__ = ('deadline', 'callback', 'args', 'cancelled')
+
+    def __init__(self, deadline: float, callback, args: tuple):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerService(DeadlineWorker):
+    """单线程定时服务
+
+    回调在服务线程中顺序执行，应保持短小（例如提交一批按键释放）。
+    """
+
+    def __init__(self, clock=time.perf_counter, threaded: bool = True, name: str = 'tegg-timer'):
+        super().__init__(clock, threaded, name)
+
+    def call_later(self, delay: float, callback, *args) -> TimerHandle:
+        """delay 秒后执行 callback(*args)，返回可取消的句柄。"""
+        handle = TimerHandle(self._clock() + max(0.0, delay), callback, args)
+        with self._cond:
+            self._push(handle.deadline, handle)
+        return handle
+
+    def pending(self) -> int:
+        """尚未执行且未取消的回调数量"""
+        with self._cond:
+            return sum(1 for _, _, h in self._heap if not h.cancelled)
+
+    def shutdown(self):
+        """停止服务线程，丢弃所有待执行回调"""
+        self._stop()
+
+    def _fire(self, handle: TimerHandle, now: float):
+        if handle.cancelled:
+            return
+        try:
+            handle.callback(*handle.args)
+        except Exception as e:
+            logger.error(f"定时回调异常: {e}")
+
+
+# ─── 全局定时服务 ────────────────────────────────────────────
+
+_service = None
+
+
+def get_timer_service() -> TimerService:
+    """返回全局定时服务（惰性创建）"""
+    global _service
+    if _service is None:
+        _service = TimerService()
+    return _service
+
+
+def set_timer_service(service: TimerService) -> TimerService:
+    """替换全局定时服务（测试 / 回放），返回原服务"""
+    global _service
+    old = _service
+    _service = service
+    return old
@@ -0,0 +1,29 @@
+"""
+TEGG Touch 蛋挞 (PyQt6) - frame_snapshot.py
+运行模式帧快照 — 每帧只采样一次光标 / 命中 / 鼠标键状态，发布给本帧所有消费者。
+
+消费者: hover/click、侧键、自动回中（控制器内部），虚拟光标（经 frame_ready 信号）。
+点击穿透由输入区域遮罩决定，不再逐帧读取快照。
+同一帧内所有消费者看到的是同一份数据，不会出现"hover 用旧坐标、回中用新坐标"的撕裂。
+"""
+
+from typing import Any, NamedTuple
+
+
+class FrameSnapshot(NamedTuple):
+    ts: float         # 采样时刻 (time.perf_counter)
+    x: int            # 光标屏幕坐标
+    y: int
+    scene_pos: Any    # 场景坐标 QPointF（映射失败时为 None）
+    item: Any         # 光标下最上层 Item（无则 None）
+    lmb: bool = False
+    rmb: bool = False
+    mmb: bool = False
+    xb1: bool = False
+    xb2: bool = False
+
+    @property
+    def on_ui(self) -> bool:
+        """光标是否在交互 Item（按钮 / 扇区 / 圆环 / 回中带）上"""
+        item = self.item
+        return item is not None and hasattr(item, 'data') and item.isVisible()
@@ -4,22 +4,73 @@ TEGG Touch 蛋挞 (PyQt6) - hover_state_machine.py
 
 旧版: 每个按钮/扇区各自用 _hover_enter_time / _hover_charged /
       _hover_release_time 等字段手动管理，代码重复 3 遍
-新版: 一个状态机类，所有可交互元素各持有一个实例
+新版: 一个状态机类，所有可交互元素各持有一个实例；
+      逻辑在 core.hover_core（不依赖 Qt），这里只把事件转成 Qt 信号。
+      所有实例共用一个动画时钟 + 一个 QTimer，只在有状态机充能 / 释放时运行
 """
 
-from enum import Enum
-from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+import math
 
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
 
-class HoverState(Enum):
-    IDLE = 'idle'
-    CHARGING = 'charging'      # hover_delay > 0 时的充能阶段
-    ACTIVE = 'active'          # hover 已激活，按键已按下
-    RELEASING = 'releasing'    # hover_release_delay > 0 时的释放倒计时
+from core.hover_core import AnimationClock, HoverCore, HoverState  # noqa: F401 (HoverState 供外部导入)
+
+
+class _AnimationDriver:
+    """用一个 QTimer 驱动 AnimationClock: 按 next_deadline 精确唤醒，空闲时停止"""
+
+    def __init__(self, anim: AnimationClock):
+        self._anim = anim
+        self._timer = None
+        anim.on_wake = self._schedule
+
+    def _ensure_timer(self) -> QTimer:
+        # QApplication 销毁时 Qt 会删除无父对象的定时器（测试中可能重建 QApplication）
+        if self._timer is None or sip.isdeleted(self._timer):
+            self._timer = QTimer()
+            self._timer.setSingleShot(True)
+            self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+            self._timer.timeout.connect(self._on_timeout)
+        return self._timer
+
+    def _schedule(self):
+        timer = self._ensure_timer()
+        deadline = self._anim.next_deadline()
+        if deadline is None:
+            timer.stop()
+            return
+        delay_ms = max(0, math.ceil((deadline - self._anim.now()) * 1000.0))
+        timer.start(delay_ms)
+
+    def _on_timeout(self):
+        self._anim.step()
+        self._schedule()
+
+
+_anim = None
+_driver = None
+
+
+def get_animation_clock() -> AnimationClock:
+    """返回全局动画时钟（惰性创建，由 Qt 定时器驱动）"""
+    global _anim, _driver
+    if _anim is None:
+        _anim = AnimationClock()
+        _driver = _AnimationDriver(_anim)
+    return _anim
+
+
+def set_animation_clock(anim: AnimationClock) -> AnimationClock:
+    """替换全局动画时钟（测试 / 回放: 调用方自行 step），返回原时钟"""
+    global _anim
+    old = _anim
+    _anim = anim
+    return old
 
 
 class HoverStateMachine(QObject):
-    """悬停状态机 — 管理 hover 充能/激活/释放的完整生命周期
+    """悬停状态机 — HoverCore 的 Qt 信号外壳
 
     状态转换:
       IDLE → CHARGING → ACTIVE → RELEASING → IDLE
@@ -33,113 +84,40 @@ class HoverStateMachine(QObject):
     charge_progress = pyqtSignal(float)   # 充能进度 0~1
     release_progress = pyqtSignal(float)  # 释放进度 1~0
 
-    _TICK_INTERVAL = 16  # ~60fps
-
-    def __init__(self, hover_delay_ms: int = 200, release_delay_ms: int = 0):
+    def __init__(self, hover_delay_ms: int = 200, release_delay_ms: int = 0, anim: AnimationClock = None):
         super().__init__()
-        self._state = HoverState.IDLE
-        self._hover_delay = hover_delay_ms
-        self._release_delay = release_delay_ms
-
-        # 充能定时器
-        self._charge_timer = QTimer(self)
-        self._charge_timer.setInterval(self._TICK_INTERVAL)
-        self._charge_elapsed = 0
-        self._charge_timer.timeout.connect(self._on_charge_tick)
-
-        # 释放定时器
-        self._release_timer = QTimer(self)
-        self._release_timer.setInterval(self._TICK_INTERVAL)
-        self._release_elapsed = 0
-        self._release_timer.timeout.connect(self._on_release_tick)
+        self._anim = anim  # 省略时使用全局动画时钟（首次进入充能 / 释放时解析）
+        self._core = HoverCore(hover_delay_ms, release_delay_ms, self._emit)
+
+    def _emit(self, name, *args):
+        getattr(self, name).emit(*args)
+
+    @property
+    def core(self) -> HoverCore:
+        return self._core
 
     @property
     def state(self) -> HoverState:
-        return self._state
+        return self._core.state
 
     @property
     def is_active(self) -> bool:
-        return self._state == HoverState.ACTIVE
+        return self._core.is_active
 
     def enter(self):
         """鼠标进入 hover 区域"""
-        if self._state == HoverState.RELEASING:
-            # 重入：取消释放倒计时，直接恢复 ACTIVE
-            self._release_timer.stop()
-            self._state = HoverState.ACTIVE
-            self.release_progress.emit(0.0)  # 清除进度条，避免与 hover 填充双层叠加
-            return
-
-        if self._state != HoverState.IDLE:
-            return
-
-        if self._hover_delay <= 0:
-            # 无充能延迟，直接激活
-            self._state = HoverState.ACTIVE
-            self.activated.emit()
-        else:
-            # 开始充能
-            self._state = HoverState.CHARGING
-            self._charge_elapsed = 0
-            self._charge_timer.start()
+        self._core.anim = self._anim or get_animation_clock()
+        self._core.enter()
 
     def leave(self):
         """鼠标离开 hover 区域"""
-        if self._state == HoverState.CHARGING:
-            # 充能中离开 → 取消充能，回到 IDLE
-            self._charge_timer.stop()
-            self._state = HoverState.IDLE
-            self.charge_progress.emit(0.0)
-            return
-
-        if self._state != HoverState.ACTIVE:
-            return
-
-        if self._release_delay <= 0:
-            # 无释放延迟，直接释放
-            self._state = HoverState.IDLE
-            self.deactivated.emit()
-        else:
-            # 开始释放倒计时
-            self._state = HoverState.RELEASING
-            self._release_elapsed = 0
-            self._release_timer.start()
+        self._core.anim = self._anim or get_animation_clock()
+        self._core.leave()
 
     def reset(self):
         """强制重置到 IDLE（切换模式/隐藏按键时调用）"""
-        was_active = self._state in (HoverState.ACTIVE, HoverState.RELEASING)
-        self._charge_timer.stop()
-        self._release_timer.stop()
-        self._state = HoverState.IDLE
-        self._charge_elapsed = 0
-        self._release_elapsed = 0
-        if was_active:
-            self.deactivated.emit()
+        self._core.reset()
 
     def update_delays(self, hover_delay_ms: int, release_delay_ms: int):
         """动态更新延迟配置"""
-        self._hover_delay = hover_delay_ms
-        self._release_delay = release_delay_ms
-
-    # ── 内部定时器回调 ──
-
-    def _on_charge_tick(self):
-        self._charge_elapsed += self._TICK_INTERVAL
-        progress = min(1.0, self._charge_elapsed / max(1, self._hover_delay))
-        self.charge_progress.emit(progress)
-
-        if progress >= 1.0:
-            self._charge_timer.stop()
-            self._state = HoverState.ACTIVE
-            self.activated.emit()
-            self.charge_progress.emit(0.0)  # 清除充能条
-
-    def _on_release_tick(self):
-        self._release_elapsed += self._TICK_INTERVAL
-        progress = max(0.0, 1.0 - self._release_elapsed / max(1, self._release_delay))
-        self.release_progress.emit(progress)
-
-        if progress <= 0.0:
-            self._release_timer.stop()
-            self._state = HoverState.IDLE
-            self.deactivated.emit()
+        self._core.update_delays(hover_delay_ms, release_delay_ms)
@@ -0,0 +1,416 @@
+"""
+TEGG Touch 蛋挞 (PyQt6) - input_loop.py
+运行模式输入线程 — 事件驱动模式下 hover / 点击 / 侧键 / 滚轮的
+"取事件 → 命中 → 状态 → 注入" 全部在独立的高优先级线程完成，GUI 线程卡顿（全屏重绘、弹窗、
+VoiceHud 动画）不再推迟按键。
+
+  - 低级鼠标钩子迁到本线程安装，由本线程的消息循环驱动（Win32 钩子回调在安装线程执行）
+  - 命中检测基于不可变的 LayoutSnapshot；GUI 线程在布局变化时整体替换，本线程随即在当前坐标重做 hover
+  - hover 充能 / 释放由本线程自有的 HoverCore + AnimationClock 计时，到期即在本线程注入
+  - 本线程不调用任何 QGraphicsItem 方法: 视觉状态、充能进度与帧快照都经 queued 信号交回 GUI 线程
+  - 快捷键、自动回中、语音仍在 GUI 线程（RunController._tick）
+
+HookEventDrain 是"按捕获顺序处理钩子事件"的公共部分，主线程事件驱动模式（RunController）同样使用。
+"""
+
+import logging
+import threading
+import time as _time
+from functools import partial
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.binding_plan import EMPTY_PLAN
+from core.hover_core import AnimationClock, HoverCore, HoverTracker
+from core.input_backend import get_backend
+from core.input_engine import (
+    poll_mouse_events, poll_wheel_events, set_mouse_listener, rehome_mouse_hook, WHEEL_DELTA,
+)
+from core.latency_stats import get_latency_recorder, set_trace, restore_trace
+from engine.frame_snapshot import FrameSnapshot
+
+logger = logging.getLogger(__name__)
+
+VK_LBUTTON = 0x01
+VK_RBUTTON = 0x02
+VK_MBUTTON = 0x04
+VK_XBUTTON1 = 0x05
+VK_XBUTTON2 = 0x06
+
+# 左 / 右 / 中键 → (绑定字段, 按下时的视觉状态)
+_CLICK_SLOTS = {
+    VK_LBUTTON: ('lclick', 'active_left'),
+    VK_RBUTTON: ('rclick', 'active_right'),
+    VK_MBUTTON: ('mclick', 'active_middle'),
+}
+_XBUTTON_SLOTS = {VK_XBUTTON1: 'xbutton1', VK_XBUTTON2: 'xbutton2'}
+
+PUMP_TIMEOUT = 0.1  # 无消息时的最长阻塞 (秒)，兜底检查退出标志
+
+
+class HookEventDrain:
+    """按捕获顺序处理低级鼠标钩子事件（RunController 主线程事件驱动 / InputLoop 共用）
+
+    子类提供 _cursor_pos 与:
+      _item_at(x, y) → hit（hit[0] 为 hover 目标）
+      _update_hover(target) → (active, 是否在回中带上)
+      _apply_mouse_button(vk, down, target, active)
+      _publish_hit(x, y, hit)
+    """
+
+    _cursor_pos = None
+
+    def _drain_mouse_events(self, events, rehover: bool = False):
+        """按键事件先在其坐标处更新 hover，再处理按下/抬起（两次轮询之间的短按不会丢）；
+        连续移动只在最后坐标做一次 hover 检测。延迟起点取钩子捕获时刻。
+        处理完后以最后坐标发布一帧快照。
+        """
+        move_ts = None
+        last = None  # 最后一个按键事件的 (x, y, hit)
+        for ev in events:
+            self._cursor_pos = (ev.x, ev.y)
+            if not ev.vk:
+                move_ts = ev.ts
+                continue
+            move_ts = None
+            old_trace = set_trace(int(ev.ts * 1e9), 'tick')
+            try:
+                hit = self._item_at(ev.x, ev.y)
+                last = (ev.x, ev.y, hit)
+                active, on_band = self._update_hover(hit[0])
+                self._apply_mouse_button(ev.vk, ev.down, hit[0], None if on_band else active)
+            finally:
+                restore_trace(old_trace)
+            if not self._draining():
+                return
+
+        if self._cursor_pos is None:
+            return
+        if move_ts is None and not rehover:
+            # 最后一个事件是按键: 其坐标处的 hover 已是最新
+            if last is not None:
+                self._publish_hit(*last)
+            return
+        old_trace = set_trace(int(move_ts * 1e9), 'tick') if move_ts is not None else None
+        try:
+            x, y = self._cursor_pos
+            hit = self._item_at(x, y)
+            self._update_hover(hit[0])
+            self._publish_hit(x, y, hit)
+        finally:
+            if move_ts is not None:
+                restore_trace(old_trace)
+
+    def _draining(self) -> bool:
+        """每个按键事件之后检查: 返回 False 时丢弃剩余事件（运行模式已退出）"""
+        return True
+
+
+class InputLoop(QObject, HookEventDrain):
+    """独立输入线程（仅事件驱动模式）
+
+    触发经 RunController._smart_trigger / _apply_hover_handoff（线程安全: 所有权计数与派发队列都有锁）。
+    held 与各 Item 的 HoverCore 由本线程写、GUI 线程只读。
+    """
+
+    visual_state = pyqtSignal(object, str)     # (item, state)；'restore' 由 GUI 按 hover 状态还原
+    hover_progress = pyqtSignal(object, float)  # (item, 充能 / 释放进度) → 进度条
+    frame_ready = pyqtSignal(object)           # FrameSnapshot
+
+    def __init__(self, controller, layout, clock=_time.perf_counter):
+        super().__init__()
+        self._ctl = controller
+        self._layout = layout
+        self._latency = get_latency_recorder()
+        self._thread = None
+        self._tid = None
+        self._running = False
+
+        # GUI → 输入线程的命令（锁保护）
+        self._cond = threading.Condition()
+        self._rehover = False
+        self._warp = None
+        self._sync_req = 0
+        self._sync_done = 0
+
+        # 线程内状态
+        self.held = 0            # 本线程按下且未释放的 hover / 点击数（自动回中判断用）
+        self._cursor_pos = None
+        self._buttons = dict.fromkeys(list(_CLICK_SLOTS) + list(_XBUTTON_SLOTS), False)
+        self._holding = {}       # vk → (SnapItem, BindingPlan)
+        self._wheel_accum = {}   # item → 未满一格的累计 delta
+        self._anim = AnimationClock(clock)  # 本线程自有，只在本线程推进
+        self._cores = {}         # item → HoverCore（首次 hover 时创建）
+        self._hover = HoverTracker(self._cores.get, self._emit_visual,
+                                   controller._apply_hover_handoff)
+
+    # ── 生命周期（GUI 线程调用） ──
+
+    @property
+    def layout(self):
+        return self._layout
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def hover_items(self) -> tuple:
+        """hover 过的 Item（退出时还原外观）"""
+        return tuple(self._cores)
+
+    def hover_active(self, item) -> bool:
+        """item 的 hover 是否已激活（GUI 线程还原外观用）"""
+        core = self._cores.get(item)
+        return core is not None and core.is_active
+
+    def start(self):
+        if self.running:
+            return
+        self._running = True
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,),
+                                        name='tegg-input-loop', daemon=True)
+        self._thread.start()
+        ready.wait(1.0)
+
+    def stop(self, timeout: float = 1.0):
+        """停止线程（释放本线程持有的 hover / 点击键），钩子收回到调用线程"""
+        self._running = False
+        if self._tid is not None:
+            get_backend().wake_thread(self._tid)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning("输入线程未在 %.1fs 内退出", timeout)
+        self._thread = None
+        self._tid = None
+        rehome_mouse_hook()
+
+    def set_layout(self, layout):
+        """替换布局快照，并在当前坐标重做 hover"""
+        self._layout = layout
+        with self._cond:
+            self._rehover = True
+        self._wake()
+
+    def warped(self, x: int, y: int):
+        """GUI 线程移动了光标（自动回中）: SetCursorPos 不经过低级钩子，需告知本线程"""
+        with self._cond:
+            self._warp = (x, y)
+        self._wake()
+
+    def sync(self, timeout: float = 1.0) -> bool:
+        """等待本线程处理完调用前已到达的全部事件（测试 / 基准用）"""
+        with self._cond:
+            self._sync_req += 1
+            target = self._sync_req
+        self._wake()
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._sync_done >= target or not self._running, timeout)
+
+    def next_deadline(self):
+        """本线程下一次充能 / 释放推进时刻（回放按虚拟时间唤醒用）"""
+        return self._anim.next_deadline()
+
+    def _wake(self):
+        if self._tid is not None:
+            get_backend().wake_thread(self._tid)
+
+    # ── 线程主体 ──
+
+    def _run(self, ready):
+        backend = get_backend()
+        try:
+            backend.pump_messages(0)  # 创建本线程消息队列，之后才能被 wake_thread 唤醒
+            self._tid = threading.get_native_id()
+            backend.raise_thread_priority()
+            rehome_mouse_hook()
+            poll_mouse_events()  # 丢弃进入运行模式前的残留事件
+            self._cursor_pos = backend.get_cursor_pos()
+            set_mouse_listener(self._wake)
+            with self._cond:
+                self._rehover = True
+        finally:
+            ready.set()
+        try:
+            while self._running:
+                try:
+                    self._step()
+                except Exception as e:
+                    logger.error("输入线程处理异常: %s", e)
+                backend.pump_messages(self._pump_timeout())
+        finally:
+            set_mouse_listener(None)
+            self._release_all()
+            with self._cond:
+                self._cond.notify_all()
+
+    def _pump_timeout(self) -> float:
+        """充能 / 释放进行中时按动画时钟的下一时刻唤醒"""
+        deadline = self._anim.next_deadline()
+        if deadline is None:
+            return PUMP_TIMEOUT
+        return min(PUMP_TIMEOUT, max(0.0, deadline - self._anim.now()))
+
+    def _step(self):
+        """一次唤醒: 处理命令 → 滚轮 → 按捕获顺序处理移动 / 按键 → 推进到期的充能 / 释放"""
+        with self._cond:
+            rehover, self._rehover = self._rehover, False
+            warp, self._warp = self._warp, None
+            sync = self._sync_req
+        if warp is not None:
+            self._cursor_pos = warp
+            rehover = True
+
+        wheel_events = poll_wheel_events()
+        if wheel_events:
+            self._dispatch_wheel(wheel_events)
+
+        self._drain_mouse_events(poll_mouse_events(), rehover)
+
+        deadline = self._anim.next_deadline()
+        if deadline is not None and self._anim.now() >= deadline:
+            # 延迟起点取计划到期时刻: 注入延迟即本线程唤醒的迟到量
+            old_trace = set_trace(int(deadline * 1e9), 'tick')
+            try:
+                self._anim.step()
+            finally:
+                restore_trace(old_trace)
+
+        with self._cond:
+            self._sync_done = sync
+            self._cond.notify_all()
+
+    def _item_at(self, x, y):
+        t0 = _time.perf_counter_ns()
+        hit = self._layout.hit(x, y)
+        self._latency.record('hit_test', 'tick', _time.perf_counter_ns() - t0)
+        return hit
+
+    def _publish_hit(self, x, y, hit):
+        _, item, scene_pos = hit
+        b = self._buttons
+        self.frame_ready.emit(FrameSnapshot(
+            _time.perf_counter(), x, y, scene_pos, item,
+            b[VK_LBUTTON], b[VK_RBUTTON], b[VK_MBUTTON], b[VK_XBUTTON1], b[VK_XBUTTON2]))
+
+    # ── hover ──
+
+    def _update_hover(self, snap):
+        """光标下 SnapItem → hover 交接，返回 (active, 是否在回中带上)"""
+        if snap is not None and snap.center_band:
+            cx, cy = self._layout.center
+            get_backend().set_cursor_pos(cx, cy)
+            self._cursor_pos = (cx, cy)
+            self.visual_state.emit(snap.item, 'hover')
+            return snap, True
+
+        if snap is not None and snap.item not in self._cores:
+            self._cores[snap.item] = HoverCore(snap.hover_delay, snap.release_delay,
+                                               partial(self._on_hover_core, snap), self._anim)
+        t_state = _time.perf_counter_ns()
+        if self._hover.update(snap.item if snap is not None else None):
+            self._latency.record('state', 'hover', _time.perf_counter_ns() - t_state)
+        return snap, False
+
+    def _on_hover_core(self, snap, name, *args):
+        """HoverCore 事件: 激活 / 释放在本线程注入，外观与进度交回 GUI"""
+        if name == 'activated':
+            self.held += 1
+            plan = snap.plans.get('hover', EMPTY_PLAN)
+            if plan:
+                self._hover.activated(('hover', id(snap.data)), plan)
+            self.visual_state.emit(snap.item, 'hover')
+        elif name == 'deactivated':
+            self.held = max(0, self.held - 1)
+            plan = snap.plans.get('hover', EMPTY_PLAN)
+            if plan:
+                self._hover.deactivated(('hover', id(snap.data)), plan)
+            self.visual_state.emit(snap.item, 'normal')
+        else:
+            self.hover_progress.emit(snap.item, args[0])
+
+    def _emit_visual(self, item, state):
+        self.visual_state.emit(item, state)
+
+    # ── 按键 ──
+
+    def _apply_mouse_button(self, vk, down, snap, active):
+        """单个按键事件: 侧键分发到命中 Item；左 / 右 / 中键按下沿记录 holding，抬起沿用 holding 释放"""
+        if vk in _XBUTTON_SLOTS:
+            if self._buttons[vk] == down:
+                return
+            self._buttons[vk] = down
+            name = _XBUTTON_SLOTS[vk]
+            if snap is not None:
+                plan = snap.plans.get(name, EMPTY_PLAN)
+                if plan:
+                    self._ctl._smart_trigger(plan, 'p' if down else 'r', source=(name, id(snap.data)))
+                    self.visual_state.emit(snap.item, f'active_{name}' if down else 'restore')
+            return
+
+        slot = _CLICK_SLOTS.get(vk)
+        if slot is None:
+            return
+        field, state = slot
+        was, self._buttons[vk] = self._buttons[vk], down
+        if down and not was and active is not None:
+            plan = active.plans.get(field, EMPTY_PLAN)
+            if plan:
+                self._holding[vk] = (active, plan)
+                self.held += 1
+                self._ctl._smart_trigger(plan, 'p', source=(field, id(active.data)))
+                self.visual_state.emit(active.item, state)
+        elif not down and was:
+            holding = self._holding.pop(vk, None)
+            if holding is not None:
+                h, plan = holding
+                self.held = max(0, self.held - 1)
+                self._ctl._smart_trigger(plan, 'r', source=(field, id(h.data)))
+                self.visual_state.emit(h.item, 'restore')
+
+    # ── 滚轮 ──
+
+    def _dispatch_wheel(self, events):
+        """同 RunController._dispatch_wheel_events: 按目标合并 delta，满格部分一次性连续点击"""
+        targets = {}   # (x, y) → SnapItem
+        totals = {}    # item → [SnapItem, 本批 delta 之和]
+        for ev in events:
+            key = (ev.x, ev.y)
+            if key not in targets:
+                targets[key] = self._item_at(ev.x, ev.y)[0]
+            snap = targets[key]
+            if snap is not None:
+                totals.setdefault(snap.item, [snap, 0])[1] += ev.delta
+
+        old_trace = set_trace(int(events[0].ts * 1e9), 'tick')
+        try:
+            accum = {}
+            for item, (snap, delta) in totals.items():
+                total = self._wheel_accum.get(item, 0) + delta
+                notches = int(total / WHEEL_DELTA)  # 向零取整
+                rest = total - notches * WHEEL_DELTA
+                if rest:
+                    accum[item] = rest
+                if notches:
+                    direction = 'wheelup' if notches > 0 else 'wheeldown'
+                    plan = snap.plans.get(direction, EMPTY_PLAN)
+                    if plan:
+                        self._ctl._smart_trigger(plan, 'c', repeat=abs(notches))
+                        self.visual_state.emit(item, f'active_{direction}')
+            self._wheel_accum = accum
+        finally:
+            restore_trace(old_trace)
+
+    # ── 退出 ──
+
+    def _release_all(self):
+        """线程退出: 释放本线程持有的 hover（含释放倒计时中的）与点击键"""
+        for core in list(self._cores.values()):
+            core.reset()
+        for vk, (h, plan) in list(self._holding.items()):
+            self._ctl._smart_trigger(plan, 'r', source=(_CLICK_SLOTS[vk][0], id(h.data)))
+        self._holding.clear()
+        self.held = 0
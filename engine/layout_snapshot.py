@@ -0,0 +1,90 @@
+"""
+TEGG Touch 蛋挞 (PyQt6) - layout_snapshot.py
+运行模式布局快照 — 输入线程做命中检测与触发所需的一切，构建后不再改变。
+
+GUI 线程在进入运行模式、以及布局 / 可见性 / 窗口位置变化时整体重建并替换（引用赋值是原子的），
+输入线程只读: 查询不调用任何 QGraphicsItem 方法，Item 引用只作为身份与回传给 GUI 的句柄。
+"""
+
+from typing import Any, NamedTuple
+
+from PyQt6.QtCore import QPointF
+from PyQt6.QtWidgets import QApplication
+
+from scene.hit_index import HitIndex
+from core.constants import BTN_TYPE_CENTER_BAND
+
+
+class SnapItem(NamedTuple):
+    """交互 Item 的只读视图"""
+    item: Any          # 场景 Item（仅作身份 / 回传 GUI）
+    data: Any          # 按钮模型（id(data) 构成按键持有者）
+    plans: dict        # 字段 → BindingPlan
+    hover_delay: int   # 充能延迟 (ms)，输入线程的 HoverCore 使用
+    release_delay: int # 释放延迟 (ms)
+    center_band: bool  # 回中带
+
+
+class LayoutSnapshot:
+    """不可变布局: 屏幕坐标 → SnapItem"""
+
+    __slots__ = ('_index', '_items', 'origin', 'center', '_source', '_visible')
+
+    def __init__(self, index, items, origin, center, source=None, visible=()):
+        self._index = index      # frozen HitIndex（场景坐标）
+        self._items = items      # id(item) → SnapItem
+        self.origin = origin     # 场景 (0, 0) 的屏幕坐标
+        self.center = center     # 主屏中心（回中带 warp 目标）
+        self._source = source    # 构建时场景的 HitIndex（判断布局是否变化）
+        self._visible = visible  # ((item, 构建时可见性), ...)
+
+    @classmethod
+    def capture(cls, scene, window):
+        """GUI 线程调用。视图带缩放 / 旋转时返回 None（命中索引只覆盖单位变换）"""
+        if not window.transform().isIdentity():
+            return None
+        index = HitIndex.build(scene, frozen=True)
+        items, visible = {}, []
+        for item in scene.items():
+            data = getattr(item, 'data', None)
+            if data is None or not hasattr(item, 'set_visual_state'):
+                continue
+            visible.append((item, item.isVisible()))
+            plans = getattr(item, 'plans', None)
+            timed = hasattr(item, '_hover_sm')  # 无状态机的 Item hover 立即激活
+            items[id(item)] = SnapItem(
+                item, data, dict(plans) if plans is not None else {},
+                getattr(data, 'hover_delay', 0) if timed else 0,
+                getattr(data, 'hover_release_delay', 0) if timed else 0,
+                getattr(data, 'btn_type', '') == BTN_TYPE_CENTER_BAND,
+            )
+        o = window.mapToGlobal(window.mapFromScene(QPointF(0, 0)))
+        ps = QApplication.primaryScreen()
+        if ps is not None:
+            g = ps.geometry()
+            center = (g.x() + g.width() // 2, g.y() + g.height() // 2)
+        else:
+            center = (960, 540)
+        return cls(index, items, (o.x(), o.y()), center,
+                   scene.hit_index() if hasattr(scene, 'hit_index') else None, tuple(visible))
+
+    def is_stale(self, scene, window) -> bool:
+        """GUI 线程调用: 布局重编译 / 可见性变化 / 窗口移动 / 视图变换后需要重建"""
+        if hasattr(scene, 'hit_index') and scene.hit_index() is not self._source:
+            return True
+        if not window.transform().isIdentity():
+            return True
+        o = window.mapToGlobal(window.mapFromScene(QPointF(0, 0)))
+        if (o.x(), o.y()) != self.origin:
+            return True
+        return any(item.isVisible() != vis for item, vis in self._visible)
+
+    def hit(self, x: int, y: int):
+        """屏幕坐标 → (SnapItem | None, 命中的 Item | None, 场景坐标 QPointF)
+
+        命中非交互 Item（无绑定）时 SnapItem 为 None，Item 仍返回（光标在 UI 上）。
+        """
+        sx, sy = x - self.origin[0], y - self.origin[1]
+        item = self._index.item_at(sx, sy)
+        snap = self._items.get(id(item)) if item is not None else None
+        return snap, item, QPointF(sx, sy)
@@ -0,0 +1,57 @@
+"""
+TEGG Touch 蛋挞 (PyQt6) - repaint_meter.py
+重绘量统计 — 每次视口重绘报告本次重绘的像素数，统计每秒重绘像素 / 次数（诊断用）。
+
+全屏半透明覆盖层上，每个被重绘的像素都要参与 alpha 合成，
+像素/秒比帧率更直接地反映绘制开销。
+纯逻辑，不依赖 Qt；时间由 clock 提供（默认 time.perf_counter）。
+"""
+
+import time
+
+STATS_WINDOW_SEC = 1.0  # 每秒像素数的统计窗口
+
+
+class RepaintMeter:
+    """累计 + 上一个完整窗口的每秒重绘像素 / 次数"""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self.reset()
+
+    def reset(self, now: float = None):
+        now = self._clock() if now is None else now
+        self._pixels = 0
+        self._paints = 0
+        self._win_start = now
+        self._win_pixels = 0
+        self._win_paints = 0
+        self._rates = (0.0, 0.0)  # 上一个完整窗口: (像素/s, 次数/s)
+
+    def add(self, pixels: int, now: float = None):
+        """报告一次重绘（像素 = 重绘区域面积）"""
+        self._roll(self._clock() if now is None else now)
+        self._pixels += pixels
+        self._paints += 1
+        self._win_pixels += pixels
+        self._win_paints += 1
+
+    def _roll(self, now: float):
+        elapsed = now - self._win_start
+        if elapsed < STATS_WINDOW_SEC:
+            return
+        self._rates = (self._win_pixels / elapsed, self._win_paints / elapsed)
+        self._win_start = now
+        self._win_pixels = 0
+        self._win_paints = 0
+
+    def stats(self, now: float = None) -> dict:
+        """累计像素 / 次数 + 每秒像素 / 次数（停止重绘后下一个窗口归零）"""
+        self._roll(self._clock() if now is None else now)
+        pixels_rate, paints_rate = self._rates
+        return {
+            'pixels': self._pixels,
+            'paints': self._paints,
+            'pixels_per_sec': pixels_rate,
+            'paints_per_sec': paints_rate,
+        }
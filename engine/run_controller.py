@@ -4,44 +4,91 @@ TEGG Touch 蛋挞 (PyQt6) - run_controller.py
 
 旧版: update_loop() 单函数 400 行，轮询一切
 新版:
-  - hover/click 由轮询 GetCursorPos + itemAt 驱动（与原版一致）
+  - hover/click 由轮询光标位置 (输入后端) + 命中索引 (等价 itemAt) 驱动（与原版一致）
   - 解决 WS_EX_TRANSPARENT 下 Qt 事件丢失的问题
   - Controller 负责: 快捷键轮询 + hover/click轮询 + 侧键 + 自动回中 + 滚轮
+  - 事件驱动模式下 hover/click/侧键/滚轮交给独立输入线程 (InputLoop + LayoutSnapshot)，GUI 线程只收视觉状态
 """
 
-import ctypes
-import ctypes.wintypes
 import logging
-import threading
 import time as _time
 
-from PyQt6.QtCore import QObject, QTimer, QPoint, QRect, pyqtSignal
+from PyQt6.QtCore import Qt, QObject, QTimer, QPoint, QRect, pyqtSignal
 from PyQt6.QtWidgets import QApplication
 
 from core.input_engine import (
-    trigger, is_key_pressed, poll_wheel_events, release_all_keys,
-    mouse_press, mouse_release, mouse_wheel,
+    trigger_events, send_events, is_key_pressed, poll_wheel_events, release_all_keys,
+    handoff_owned,
+    start_dispatcher, stop_dispatcher, get_dispatcher, wheel_overflow_count, WHEEL_DELTA,
+    mouse_hook_installed, set_mouse_listener, poll_mouse_events, mouse_overflow_count,
+    install_keyboard_hook, uninstall_keyboard_hook, get_scan_codes, release_source,
 )
+from core.input_backend import get_backend
+from core.latency_stats import get_latency_recorder, set_trace, restore_trace, current_trace
+from core.binding_plan import BindingPlan, EMPTY_PLAN, compile_binding
 from core.config_manager import load_hotkeys
-from core.constants import UPDATE_INTERVAL, BTN_TYPE_CENTER_BAND, HOTKEY_DEBOUNCE_SEC
+from core.hotkey_registry import HotkeyRegistry
+from core.hover_core import HoverTracker
+from core.macro_compiler import EMPTY_LIBRARY, OP_CALL
+from core.macro_scheduler import MacroScheduler
+from engine.frame_snapshot import FrameSnapshot
+from engine.hover_state_machine import get_animation_clock
+from engine.input_loop import HookEventDrain, InputLoop
+from engine.layout_snapshot import LayoutSnapshot
+from engine.signal_gate import SignalGate
+from engine.tick_scheduler import AdaptiveTickScheduler
+from core.constants import (
+    UPDATE_INTERVAL, HOOK_IDLE_INTERVAL, BTN_TYPE_CENTER_BAND, HOTKEY_DEBOUNCE_SEC,
+    LATENCY_DUMP_FILE, TICK_IDLE_AFTER_MS, POLL_IDLE_INTERVAL, HOOK_SLEEP_INTERVAL,
+    TICK_BURST_WINDOW_MS, TICK_BURST_INTERVAL, INPUT_THREAD, DEFAULT_HOTKEYS, AUTO_CENTER_BAR_W,
+)
 
-user32 = ctypes.windll.user32
 logger = logging.getLogger(__name__)
 
-# ── ctypes 类型声明 ──
-user32.GetCursorPos.argtypes = [ctypes.POINTER(ctypes.wintypes.POINT)]
-user32.GetCursorPos.restype = ctypes.wintypes.BOOL
-
-user32.GetAsyncKeyState.argtypes = [ctypes.c_int]
-user32.GetAsyncKeyState.restype = ctypes.c_short
-
-user32.SetCursorPos.argtypes = [ctypes.c_int, ctypes.c_int]
-user32.SetCursorPos.restype = ctypes.wintypes.BOOL
-
 # VK 常量
 VK_LBUTTON = 0x01
 VK_RBUTTON = 0x02
 VK_MBUTTON = 0x04
+VK_XBUTTON1 = 0x05
+VK_XBUTTON2 = 0x06
+
+# 运行模式快捷键（轮询兜底时按此顺序检测；穿透三键互斥，一帧只取第一个）
+_HOTKEY_NAMES = (
+    'stop', 'voice', 'toggle_buttons', 'soft_keyboard', 'auto_center',
+    'latency_hud', 'latency_dump', 'repaint_debug', 'pt_on', 'pt_off', 'pt_block',
+)
+_PT_HOTKEYS = ('pt_on', 'pt_off', 'pt_block')
+
+# 按键持有者标签 → 延迟统计的绑定类型
+_LATENCY_KINDS = {
+    'hover': 'hover', 'macro': 'macro', 'voice': 'voice',
+    'xbutton1': 'xbutton', 'xbutton2': 'xbutton',
+}
+
+
+def _latency_kind(source) -> str:
+    """由按键持有者推断绑定类型（无持有者的连续点击来自滚轮）"""
+    if source is None:
+        return 'wheel'
+    return _LATENCY_KINDS.get(source[0], 'click')
+
+
+def _item_plan(item, field: str) -> BindingPlan:
+    """取 item 上某个字段的编译绑定（无 plans 属性时现场编译）"""
+    plans = getattr(item, 'plans', None)
+    if plans is not None:
+        return plans.get(field, EMPTY_PLAN)
+    return compile_binding(getattr(item.data, field, ''))
+
+
+def _hover_machine(item):
+    """Item 的 hover 状态机（扇区 / 圆环 / 按钮），没有时返回 None"""
+    return getattr(item, '_hover_sm', None)
+
+
+def _set_visual(item, state: str):
+    if hasattr(item, 'set_visual_state'):
+        item.set_visual_state(state)
 
 
 def _is_alive(item) -> bool:
@@ -53,7 +100,7 @@ def _is_alive(item) -> bool:
         return True
 
 
-class RunController(QObject):
+class RunController(QObject, HookEventDrain):
     """运行模式控制器"""
     # 信号
     request_edit_mode = pyqtSignal()
@@ -62,9 +109,14 @@ class RunController(QObject):
     request_toggle_auto_center = pyqtSignal()
     request_soft_keyboard = pyqtSignal()
     passthrough_changed = pyqtSignal(str)   # 'pt_on' | 'pt_off' | 'pt_block'
-    cursor_on_ui = pyqtSignal(bool)         # 每帧: 光标是否在 UI 元素上
-    auto_center_progress = pyqtSignal(float, float, float)  # progress, x, y
+    frame_ready = pyqtSignal(object)        # 每帧: FrameSnapshot（虚拟光标等外部消费者）
+    auto_center_progress = pyqtSignal(float, float, float)  # progress, x, y（量化后变化时发出）
     voice_command_triggered = pyqtSignal(str, str, str)  # phrase, keys, action
+    request_latency_hud = pyqtSignal()
+    request_latency_dump = pyqtSignal()
+    request_repaint_debug = pyqtSignal()
+    _input_wake = pyqtSignal()              # 钩子线程 → 主线程: 有新的鼠标事件
+    _hotkey_pressed = pyqtSignal(str)       # 键盘钩子线程 → 主线程: 快捷键触发
 
     def __init__(self, scene, window):
         super().__init__()
@@ -82,13 +134,14 @@ class RunController(QObject):
         self._active_key_count = 0
 
         # 轮询式 hover 检测状态 (解决 WS_EX_TRANSPARENT 下 Qt 事件丢失)
-        self._poll_hover_item = None  # 当前 hover 的 item
+        # 当前 hover 的 item = _hover.target；同一帧内的 leave + enter 合并为一次交接
+        self._hover = HoverTracker(_hover_machine, _set_visual, self._apply_hover_handoff)
         self._prev_lmb = False  # 左键上一帧状态
         self._prev_rmb = False  # 右键
         self._prev_mmb = False  # 中键
 
         # 原版 holding_btn 模式: 按下时记住按钮，释放时用存储的按钮（光标可能已移走）
-        self._holding_lclick = None   # (item, key_str) or None
+        self._holding_lclick = None   # (item, BindingPlan) or None
         self._holding_rclick = None
         self._holding_mclick = None
 
@@ -100,6 +153,22 @@ class RunController(QObject):
         self._timer.setInterval(UPDATE_INTERVAL)
         self._timer.timeout.connect(self._tick)
 
+        # 事件驱动模式: 低级鼠标钩子已安装时，移动/按键/滚轮由钩子唤醒处理，
+        # 定时器降频到 HOOK_IDLE_INTERVAL（持续空闲时 HOOK_SLEEP_INTERVAL）只做快捷键 + 自动回中 + 兜底
+        self._event_driven = False
+        self._cursor_pos = None  # 最近一次钩子事件的屏幕坐标
+        self._frame = None       # 最近发布的帧快照
+        self._input_wake.connect(self._on_input_wake, Qt.ConnectionType.QueuedConnection)
+
+        # 独立输入线程（事件驱动 + 单位视图变换时）: 命中 / 状态 / 注入不经过 GUI 线程
+        self._input_loop = None
+
+        # 自适应节拍: 空闲降频，活动 / hover 充能释放中保持全速
+        self._scheduler = AdaptiveTickScheduler(
+            UPDATE_INTERVAL, POLL_IDLE_INTERVAL,
+            idle_after_ms=TICK_IDLE_AFTER_MS, burst_window_ms=TICK_BURST_WINDOW_MS)
+        self._activity_key = None   # 上一帧的 (坐标, 命中, 按键)，用于判断本帧是否有活动
+
         # 自动回中
         self._auto_center = False
         self._auto_center_delay = 1500
@@ -107,13 +176,61 @@ class RunController(QObject):
 
         self._hotkeys = load_hotkeys()
 
+        # 快捷键: 键盘钩子可用时由按下沿驱动（每帧不再逐个 is_pressed），否则退回轮询
+        self._hotkey_registry = HotkeyRegistry(get_scan_codes, HOTKEY_DEBOUNCE_SEC)
+        self._hotkeys_evented = False
+        self._hotkey_pressed.connect(self._on_hotkey, Qt.ConnectionType.QueuedConnection)
+
+        # 宏: 所有执行共用一个调度线程，退出运行模式时立即中止并释放按键
+        self._macros = MacroScheduler(self._macro_step, release_source)
+        self._macro_library = EMPTY_LIBRARY  # start() 时取场景里已编译的宏
+
         # 语音引擎（延迟创建，仅在配置启用时）
         self._voice_engine = None
+        self._voice_plans = {}  # phrase → BindingPlan (启动语音时编译)
+
+        # 滚轮: item → 未满一格的累计 delta
+        self._wheel_accum = {}
+
+        # 上一次运行结束时的输入派发指标
+        self._dispatch_stats = None
+        # 每帧状态类信号的变化检测（未变化的帧不再发出）
+        self._signal_gate = SignalGate()
+
+        # 各阶段输入延迟直方图（全局，常开）
+        self._latency = get_latency_recorder()
 
     def reload_hotkeys(self):
         """重新加载快捷键配置"""
         self._hotkeys = load_hotkeys()
         self._auto_center_delay = self._hotkeys.get('auto_center_delay', 1500)
+        self._rebuild_hotkeys()
+
+    def _rebuild_hotkeys(self):
+        """按当前快捷键配置重建注册表（进入运行模式 / 快捷键设置保存后）"""
+        self._hotkey_registry.rebuild({
+            name: self._hotkeys.get(name, DEFAULT_HOTKEYS.get(name, '')) for name in _HOTKEY_NAMES})
+
+    def dispatch_stats(self):
+        """输入派发指标: 运行中为实时快照，停止后为最后一次运行的汇总"""
+        dispatcher = get_dispatcher()
+        return dispatcher.stats() if dispatcher is not None else self._dispatch_stats
+
+    def signal_stats(self) -> dict:
+        """状态类信号每秒报告 (旧实现的发出次数) / 实际发出次数"""
+        return self._signal_gate.stats()
+
+    def tick_stats(self) -> dict:
+        """自适应节拍指标: 当前模式 / 间隔、有效帧率、每秒节拍耗时 (ms)"""
+        return self._scheduler.stats()
+
+    def latency_stats(self) -> dict:
+        """各阶段 / 绑定类型的延迟分位数快照（微秒）"""
+        return self._latency.snapshot()
+
+    def dump_latency(self, path: str = LATENCY_DUMP_FILE) -> str:
+        """导出延迟直方图到 JSON 文件，返回写入路径"""
+        return self._latency.dump(path)
 
     @property
     def auto_center(self):
@@ -136,13 +253,45 @@ class RunController(QObject):
         self._hotkeys = load_hotkeys()
         self._auto_center_delay = self._hotkeys.get('auto_center_delay', 1500)
         self._debounce.clear()
-        self._poll_hover_item = None
+        self._signal_gate.reset()
+        self._rebuild_hotkeys()
+        self._hotkey_registry.reset()
+        self._hotkeys_evented = (bool(self._hotkey_registry.hotkeys)
+                                 and install_keyboard_hook(self._on_key_event))
+        if hasattr(self._scene, 'macro_library'):
+            self._macro_library = self._scene.macro_library()
+        self._hover.target = None
         self._prev_lmb = False
         self._prev_rmb = False
         self._prev_mmb = False
         self._holding_lclick = None
         self._holding_rclick = None
         self._holding_mclick = None
+        self._prev_xb1 = False
+        self._prev_xb2 = False
+        self._frame = None
+        self._activity_key = None
+        # 运行期间所有注入经由单一输出线程（主线程 / 宏 / 语音 / 定时释放统一排序）
+        start_dispatcher()
+        self._event_driven = mouse_hook_installed()
+        if self._event_driven:
+            layout = LayoutSnapshot.capture(self._scene, self._window) if INPUT_THREAD else None
+            if layout is not None:
+                self._start_input_loop(layout)
+            else:
+                poll_mouse_events()  # 丢弃进入运行模式前的残留事件
+                self._cursor_pos = get_backend().get_cursor_pos()
+                set_mouse_listener(self._input_wake.emit)
+            # 移动 / 按键由钩子即时唤醒，空闲时可以睡得更久
+            self._scheduler.configure(HOOK_IDLE_INTERVAL, HOOK_SLEEP_INTERVAL,
+                                      idle_after_ms=TICK_IDLE_AFTER_MS, burst_window_ms=0)
+        else:
+            self._cursor_pos = None
+            self._scheduler.configure(UPDATE_INTERVAL, POLL_IDLE_INTERVAL,
+                                      TICK_BURST_INTERVAL,
+                                      TICK_IDLE_AFTER_MS, TICK_BURST_WINDOW_MS)
+        self._scheduler.reset()
+        self._timer.setInterval(self._scheduler.interval)
         self._timer.start()
 
         # 启动语音引擎
@@ -152,23 +301,29 @@ class RunController(QObject):
         """退出运行模式"""
         self._active = False
         self._timer.stop()
+        if self._hotkeys_evented:
+            uninstall_keyboard_hook()
+            self._hotkeys_evented = False
+        self._stop_input_loop()
+        if self._event_driven:
+            set_mouse_listener(None)
+            poll_mouse_events()
+            self._event_driven = False
+            self._cursor_pos = None
+        self._frame = None
         self._ac_start_time = None
         self._stop_voice()
         self._active_key_count = 0
         # 释放当前 hover
-        if self._poll_hover_item is not None:
-            item = self._poll_hover_item
-            self._poll_hover_item = None
-            if hasattr(item, '_hover_sm'):
-                item._hover_sm.leave()
-            if hasattr(item, 'set_visual_state'):
-                item.set_visual_state('normal')
+        self._hover.update(None)
         # 释放所有 holding 的点击键
-        for holding in (self._holding_lclick, self._holding_rclick, self._holding_mclick):
+        for slot, holding in (('lclick', self._holding_lclick),
+                              ('rclick', self._holding_rclick),
+                              ('mclick', self._holding_mclick)):
             if holding:
                 _item, _key = holding
                 if _is_alive(_item):
-                    self.on_action_triggered(_item.data, _key, 'r')
+                    self.on_action_triggered(_item.data, _key, 'r', slot)
         self._holding_lclick = None
         self._holding_rclick = None
         self._holding_mclick = None
@@ -177,62 +332,282 @@ class RunController(QObject):
         for item in self._scene.button_items:
             if hasattr(item, '_hover_sm'):
                 item._hover_sm.reset()
-        # 兜底释放所有残留按键，防止卡键
+        self._wheel_accum = {}
+        if wheel_overflow_count():
+            logger.info("滚轮队列累计溢出合并 %d 次", wheel_overflow_count())
+        if mouse_overflow_count():
+            logger.warning("鼠标事件队列累计溢出丢弃 %d 次", mouse_overflow_count())
+        # 中止执行中的宏（返回后不会再有宏按键），再兜底释放所有残留按键，防止卡键
+        self._macros.cancel_all()
         release_all_keys()
+        self._dispatch_stats = stop_dispatcher() or self._dispatch_stats
 
     # ── 获取光标下的 item ──
 
+    def _item_at(self, abs_x, abs_y):
+        """屏幕坐标 → (item, scene_pos)，映射 + 命中检测计入 hit_test 阶段"""
+        t0 = _time.perf_counter_ns()
+        view_pos = self._window.mapFromGlobal(QPoint(abs_x, abs_y))
+        scene_pos = self._window.mapToScene(view_pos)
+        item = self._scene_item_at(scene_pos)
+        self._latency.record('hit_test', 'tick', _time.perf_counter_ns() - t0)
+        return item, scene_pos
+
+    def _scene_item_at(self, scene_pos):
+        """场景坐标处最上层 Item — 优先查布局编译的命中索引（视图无缩放时与 itemAt 等价）"""
+        transform = self._window.transform()
+        if transform.isIdentity() and hasattr(self._scene, 'hit_index'):
+            return self._scene.hit_index().item_at(scene_pos.x(), scene_pos.y())
+        return self._scene.itemAt(scene_pos, transform)
+
     def _get_cursor_item(self):
-        """获取光标位置和光标下的 item（使用 Win32 GetCursorPos，不依赖 Qt 事件）"""
+        """获取光标位置和光标下的 item（经输入后端查询光标，不依赖 Qt 事件）"""
         try:
-            pt = ctypes.wintypes.POINT()
-            user32.GetCursorPos(ctypes.byref(pt))
-            cursor_pos = QPoint(pt.x, pt.y)
-            view_pos = self._window.mapFromGlobal(cursor_pos)
-            scene_pos = self._window.mapToScene(view_pos)
-            item = self._scene.itemAt(scene_pos, self._window.transform())
-            return item, scene_pos, pt.x, pt.y
+            t0 = _time.perf_counter_ns()
+            x, y = get_backend().get_cursor_pos()
+            self._latency.record('cursor', 'tick', _time.perf_counter_ns() - t0)
+            item, scene_pos = self._item_at(x, y)
+            return item, scene_pos, x, y
         except Exception:
             return None, None, 0, 0
 
+    def _capture_frame(self) -> FrameSnapshot:
+        """采样本帧: 光标 → 场景坐标 → 命中 Item，加五个鼠标键状态（轮询模式每帧一次）"""
+        item, scene_pos, x, y = self._get_cursor_item()
+        backend = get_backend()
+        return FrameSnapshot(
+            _time.perf_counter(), x, y, scene_pos, item,
+            backend.is_key_down(VK_LBUTTON), backend.is_key_down(VK_RBUTTON),
+            backend.is_key_down(VK_MBUTTON),
+            backend.is_key_down(VK_XBUTTON1), backend.is_key_down(VK_XBUTTON2),
+        )
+
+    def _publish_hit(self, x, y, hit):
+        """事件驱动模式的帧: 钩子坐标 + 已算出的命中，按键状态取事件累积的状态"""
+        item, scene_pos = hit
+        self._publish_frame(FrameSnapshot(
+            _time.perf_counter(), x, y, scene_pos, item,
+            self._prev_lmb, self._prev_rmb, self._prev_mmb, self._prev_xb1, self._prev_xb2,
+        ))
+
+    def _publish_frame(self, frame: FrameSnapshot):
+        """本帧快照 → 外部消费者 (frame_ready)"""
+        self._frame = frame
+        self.frame_ready.emit(frame)
+
+    def _warp_cursor(self, x, y):
+        """移动光标（回中带 / 自动回中），同步事件驱动模式下记录的光标位置"""
+        get_backend().set_cursor_pos(x, y)
+        if self._cursor_pos is not None:
+            self._cursor_pos = (x, y)
+        if self._input_loop is not None:
+            self._input_loop.warped(x, y)
+
     # ── 主循环 ──
 
     def _tick(self):
-        """轮询循环 — 快捷键 + hover/click + 侧键 + 滚轮 + 自动回中"""
+        """定时循环 — 快捷键 + hover/click + 侧键 + 滚轮 + 自动回中
+
+        帧开始时刻作为本帧所有触发的延迟起点（线程局部 trace），整帧耗时记入 tick 阶段。
+        """
         if not self._active:
             return
-
+        t0 = _time.perf_counter_ns()
+        old_trace = set_trace(t0, 'tick')
+        try:
+            self._tick_once()
+        finally:
+            restore_trace(old_trace)
+            cost = _time.perf_counter_ns() - t0
+            self._latency.record('tick', 'tick', cost)
+        self._scheduler.record_tick(cost)
+        if self._active:
+            self._set_interval(self._scheduler.update(self._frame_changed() or self._pipeline_busy()))
+
+    def _tick_once(self):
         hk = self._hotkeys
 
-        # 1. 快捷键检测
-        self._check_hotkeys(hk)
+        # 1. 快捷键检测（键盘钩子可用时由按键事件驱动，这里不再轮询）
+        if not self._hotkeys_evented:
+            self._check_hotkeys(hk)
         if not self._active:  # stop 可能在 _check_hotkeys 中被调用
             return
 
-        # 2. 处理滚轮事件
+        if self._input_loop is not None:
+            # 2''. 输入线程: 这里只在布局 / 窗口变化时替换快照
+            self._refresh_layout()
+        elif self._event_driven:
+            # 2'. 事件驱动: 鼠标事件已在唤醒时处理；这里兜底取出残留事件，
+            #     并在最后坐标重做 hover 检测（按钮显隐 / 轮盘切换时光标未动）
+            self._drain_input_events(rehover=True)
+        else:
+            # 2. 处理滚轮事件（按目标 item 合并）
+            wheel_events = poll_wheel_events()
+            if wheel_events:
+                self._dispatch_wheel_events(wheel_events)
+
+            # 3. 本帧快照: 光标 / 命中 / 按键只采样一次，后续阶段共用
+            frame = self._capture_frame()
+
+            # 4. 侧键
+            self._poll_hardware_buttons(frame)
+
+            # 5. 轮询式 hover/click 检测 (核心! 解决 WS_EX_TRANSPARENT 问题)
+            self._poll_hover_and_click(frame)
+            self._publish_frame(frame)
+
+        # 6. 自动回中管理（与 hover 共用本帧快照）
+        self._poll_auto_center(self._frame)
+
+    # ── 自适应节拍 ──
+
+    def _set_interval(self, interval: int):
+        """间隔变化时才重设定时器（setInterval 会重启计时）"""
+        if interval != self._timer.interval():
+            self._timer.setInterval(interval)
+
+    def _frame_changed(self) -> bool:
+        """自上一帧以来光标 / 命中 / 按键是否有变化"""
+        f = self._frame
+        key = None if f is None else (f.x, f.y, id(f.item), f.lmb, f.rmb, f.mmb, f.xb1, f.xb2)
+        changed = key != self._activity_key
+        self._activity_key = key
+        return changed
+
+    def _pipeline_busy(self) -> bool:
+        """按键按住 / 点击持有 / 自动回中倒计时 / hover 充能或释放中 → 保持全速"""
+        if (self._ac_start_time is not None or self._holding_lclick
+                or self._holding_rclick or self._holding_mclick):
+            return True
+        f = self._frame
+        if f is not None and (f.lmb or f.rmb or f.mmb or f.xb1 or f.xb2):
+            return True
+        return len(get_animation_clock()) > 0  # 动画时钟只登记充能 / 释放中的状态机
+
+    # ── 事件驱动: 低级鼠标钩子 ──
+
+    def _on_input_wake(self):
+        """钩子线程投递的唤醒（QueuedConnection，主线程执行）"""
+        if not self._active or not self._event_driven:
+            poll_mouse_events()
+            return
+        self._drain_input_events()
+        if self._active:
+            self._set_interval(self._scheduler.wake())
+
+    def _drain_input_events(self, rehover: bool = False):
+        """取出滚轮与鼠标钩子事件，按捕获顺序处理（HookEventDrain）"""
         wheel_events = poll_wheel_events()
-        for direction, wx, wy in wheel_events:
-            self._dispatch_wheel(direction, wx, wy)
+        if wheel_events:
+            self._dispatch_wheel_events(wheel_events)
+        self._drain_mouse_events(poll_mouse_events(), rehover)
+
+    def _draining(self) -> bool:
+        return self._active
+
+    def _apply_mouse_button(self, vk, down, item, active_item):
+        """单个按键事件 → 点击 (L/R/M) 或侧键分发（item: 事件坐标处的命中）"""
+        if vk in (VK_XBUTTON1, VK_XBUTTON2):
+            name = 'xbutton1' if vk == VK_XBUTTON1 else 'xbutton2'
+            attr = '_prev_xb1' if vk == VK_XBUTTON1 else '_prev_xb2'
+            if getattr(self, attr) != down:
+                setattr(self, attr, down)
+                self._dispatch_xbutton(name, 'p' if down else 'r', item)
+            return
+        lmb, rmb, mmb = self._prev_lmb, self._prev_rmb, self._prev_mmb
+        if vk == VK_LBUTTON:
+            lmb = down
+        elif vk == VK_RBUTTON:
+            rmb = down
+        elif vk == VK_MBUTTON:
+            mmb = down
+        self._apply_click_states(active_item, lmb, rmb, mmb)
+
+    # ── 独立输入线程 ──
+
+    def _start_input_loop(self, layout):
+        loop = InputLoop(self, layout, get_animation_clock().now)  # 与 GUI 动画同一时间源
+        loop.visual_state.connect(self._on_loop_visual)
+        loop.hover_progress.connect(self._on_loop_progress)
+        loop.frame_ready.connect(self._on_loop_frame)
+        self._input_loop = loop
+        loop.start()
+
+    def _stop_input_loop(self):
+        """停止输入线程（线程退出时已释放其持有的键），还原其 hover 过的 Item 的外观与进度条"""
+        loop, self._input_loop = self._input_loop, None
+        if loop is None:
+            return
+        loop.stop()
+        for item in loop.hover_items:
+            if _is_alive(item):
+                item.set_visual_state('normal')
+                if hasattr(item, '_on_charge_progress'):
+                    item._on_charge_progress(0.0)
 
-        # 3. 侧键轮询
-        self._poll_hardware_buttons()
+    def _refresh_layout(self):
+        """布局重编译 / 显隐 / 窗口移动后重建快照；视图出现缩放时退回主线程事件驱动"""
+        loop = self._input_loop
+        if not loop.layout.is_stale(self._scene, self._window):
+            return
+        layout = LayoutSnapshot.capture(self._scene, self._window)
+        if layout is not None:
+            loop.set_layout(layout)
+            return
+        self._stop_input_loop()
+        poll_mouse_events()
+        self._cursor_pos = get_backend().get_cursor_pos()
+        set_mouse_listener(self._input_wake.emit)
+
+    def _on_loop_visual(self, item, state):
+        """输入线程 → 视觉状态（'restore': 按 hover 状态还原；滚轮高亮 150ms 后自动还原）"""
+        if not self._active or not _is_alive(item):
+            return
+        if state == 'restore':
+            self._restore_visual(item)
+            return
+        item.set_visual_state(state)
+        if state.startswith('active_wheel'):
+            QTimer.singleShot(150, lambda: _is_alive(item) and self._restore_visual(item))
+
+    def _restore_visual(self, item):
+        loop = self._input_loop
+        if loop is not None:
+            hovered = loop.hover_active(item)
+        else:
+            sm = _hover_machine(item)
+            hovered = sm is not None and sm.is_active
+        item.set_visual_state('hover' if hovered else 'normal')
 
-        # 4. 轮询式 hover/click 检测 (核心! 解决 WS_EX_TRANSPARENT 问题)
-        self._poll_hover_and_click()
+    def _on_loop_progress(self, item, progress):
+        """输入线程 → 充能 / 释放进度条（计时与注入都在输入线程，这里只画）"""
+        if self._active and _is_alive(item):
+            item._on_charge_progress(progress)
 
-        # 5. 自动回中管理
-        self._poll_auto_center()
+    def _on_loop_frame(self, frame):
+        if not self._active:
+            return
+        self._publish_frame(frame)
+        self._set_interval(self._scheduler.wake())
 
     # ── 轮询式 hover/click 检测 ──
 
-    def _poll_hover_and_click(self):
-        """轮询光标位置，驱动 hover 状态机和 click 检测
+    def _poll_hover_and_click(self, frame: FrameSnapshot = None):
+        """按本帧快照驱动 hover 状态机和 click 检测（省略 frame 时现场采样）
         
         与原版 Tkinter 一致：使用 GetCursorPos + 坐标碰撞检测，
         不依赖 Qt 的 hoverEnterEvent/mousePressEvent（WS_EX_TRANSPARENT 下不触发）。
         """
-        item, scene_pos, abs_x, abs_y = self._get_cursor_item()
+        if frame is None:
+            frame = self._capture_frame()
+        active_item, on_band = self._update_hover(frame.item)
+        if on_band:
+            return  # 跳过后续 click 逻辑 (原版 continue)
+
+        self._apply_click_states(active_item, frame.lmb, frame.rmb, frame.mmb)
 
+    def _update_hover(self, item):
+        """光标下 item → 驱动 hover 状态机，返回 (active_item, 是否在回中带上)"""
         # 只关注有 data 属性的交互 item（按钮/扇区/圆环）
         active_item = item if (item and hasattr(item, 'data') and item.isVisible()) else None
 
@@ -243,76 +618,44 @@ class RunController(QObject):
             screen = _ps.geometry() if _ps else QRect(0, 0, 1920, 1080)
             cx = screen.x() + screen.width() // 2
             cy = screen.y() + screen.height() // 2
-            user32.SetCursorPos(cx, cy)
+            self._warp_cursor(cx, cy)
             if hasattr(active_item, 'set_visual_state'):
                 active_item.set_visual_state('hover')
-            self.cursor_on_ui.emit(True)
-            return  # 跳过后续 hover/click 逻辑 (原版 continue)
-
-        prev_item = self._poll_hover_item
-
-        # ── hover 状态变化 ──
-        if active_item != prev_item:
-            # 离开旧 item
-            if prev_item is not None:
-                if hasattr(prev_item, '_hover_sm'):
-                    prev_item._hover_sm.leave()
-                if hasattr(prev_item, 'set_visual_state'):
-                    # RELEASING 时也设 normal — 蓝色充能条在深色背景上递减可见
-                    # （原版: 光标离开后 target_state='normal', charge_bar 画在深色背景上）
-                    prev_item.set_visual_state('normal')
-
-            # 进入新 item
-            if active_item is not None:
-                if hasattr(active_item, '_hover_sm'):
-                    active_item._hover_sm.enter()
-                    # 原版行为: 充能期间保持 normal（充能条在 normal 背景上可见）
-                    # 只有 delay=0 直接激活时才立刻设 hover
-                    if active_item._hover_sm.is_active:
-                        if hasattr(active_item, 'set_visual_state'):
-                            active_item.set_visual_state('hover')
-                    # CHARGING 状态: 不设 hover，保持 normal，充能条可见
-                else:
-                    # 无状态机的 item，直接设 hover
-                    if hasattr(active_item, 'set_visual_state'):
-                        active_item.set_visual_state('hover')
-
-            self._poll_hover_item = active_item
-
-        # ── 通知穿透管理器当前是否在 UI 上（驱动 PT_OFF/PT_BLOCK 动态切换）──
-        self.cursor_on_ui.emit(active_item is not None)
+            return active_item, True
 
-        # ── 硬件按键状态 ──
-        lmb = (user32.GetAsyncKeyState(VK_LBUTTON) & 0x8000) != 0
-        rmb = (user32.GetAsyncKeyState(VK_RBUTTON) & 0x8000) != 0
-        mmb = (user32.GetAsyncKeyState(VK_MBUTTON) & 0x8000) != 0
+        t_state = _time.perf_counter_ns()
+        if self._hover.update(active_item):
+            self._latency.record('state', 'hover', _time.perf_counter_ns() - t_state)
+        return active_item, False
 
+    def _apply_click_states(self, active_item, lmb, rmb, mmb):
+        """左/中/右键新状态 → 按下沿记录 holding + trigger 'p'，抬起沿用 holding 按钮 trigger 'r'"""
         # ── 按下检测: 光标在按钮上 + 按键刚按下 → 记录 holding + trigger 'p' ──
         if active_item and hasattr(active_item, 'data'):
             if lmb and not self._prev_lmb:
-                click_key = getattr(active_item.data, 'lclick', '')
+                click_key = _item_plan(active_item, 'lclick')
                 if click_key:
                     self._holding_lclick = (active_item, click_key)
-                    self.on_action_triggered(active_item.data, click_key, 'p')
+                    self.on_action_triggered(active_item.data, click_key, 'p', 'lclick')
                     active_item.set_visual_state('active_left')
             if rmb and not self._prev_rmb:
-                rclick_key = getattr(active_item.data, 'rclick', '')
+                rclick_key = _item_plan(active_item, 'rclick')
                 if rclick_key:
                     self._holding_rclick = (active_item, rclick_key)
-                    self.on_action_triggered(active_item.data, rclick_key, 'p')
+                    self.on_action_triggered(active_item.data, rclick_key, 'p', 'rclick')
                     active_item.set_visual_state('active_right')
             if mmb and not self._prev_mmb:
-                mclick_key = getattr(active_item.data, 'mclick', '')
+                mclick_key = _item_plan(active_item, 'mclick')
                 if mclick_key:
                     self._holding_mclick = (active_item, mclick_key)
-                    self.on_action_triggered(active_item.data, mclick_key, 'p')
+                    self.on_action_triggered(active_item.data, mclick_key, 'p', 'mclick')
                     active_item.set_visual_state('active_middle')
 
         # ── 释放检测: 用存储的 holding 按钮（光标可能已移走）→ trigger 'r' ──
         if not lmb and self._prev_lmb and self._holding_lclick:
             h_item, h_key = self._holding_lclick
             if _is_alive(h_item):
-                self.on_action_triggered(h_item.data, h_key, 'r')
+                self.on_action_triggered(h_item.data, h_key, 'r', 'lclick')
                 if hasattr(h_item, '_hover_sm') and h_item._hover_sm.is_active:
                     h_item.set_visual_state('hover')
                 else:
@@ -321,14 +664,14 @@ class RunController(QObject):
         if not rmb and self._prev_rmb and self._holding_rclick:
             h_item, h_key = self._holding_rclick
             if _is_alive(h_item):
-                self.on_action_triggered(h_item.data, h_key, 'r')
+                self.on_action_triggered(h_item.data, h_key, 'r', 'rclick')
                 if hasattr(h_item, 'set_visual_state'):
                     h_item.set_visual_state('hover' if (hasattr(h_item, '_hover_sm') and h_item._hover_sm.is_active) else 'normal')
             self._holding_rclick = None
         if not mmb and self._prev_mmb and self._holding_mclick:
             h_item, h_key = self._holding_mclick
             if _is_alive(h_item):
-                self.on_action_triggered(h_item.data, h_key, 'r')
+                self.on_action_triggered(h_item.data, h_key, 'r', 'mclick')
                 if hasattr(h_item, 'set_visual_state'):
                     h_item.set_visual_state('hover' if (hasattr(h_item, '_hover_sm') and h_item._hover_sm.is_active) else 'normal')
             self._holding_mclick = None
@@ -339,12 +682,13 @@ class RunController(QObject):
 
     # ── 自动回中 ──
 
-    def _poll_auto_center(self):
-        """自动回中管理 (匹配原版 elapsed-time 模型 + 倒计时进度条)"""
-        if self._auto_center and self._active_key_count <= 0:
+    def _poll_auto_center(self, frame: FrameSnapshot = None):
+        """自动回中管理 (匹配原版 elapsed-time 模型 + 倒计时进度条)，光标取本帧快照"""
+        held = self._active_key_count + (self._input_loop.held if self._input_loop else 0)
+        if self._auto_center and held <= 0:
             _on_btn = False
+            item, scene_pos = (frame.item, frame.scene_pos) if frame is not None else (None, None)
             try:
-                item, scene_pos, _, _ = self._get_cursor_item()
                 if item and hasattr(item, 'data'):
                     _on_btn = True
                 # 光标接近中心也重置 (50px)
@@ -358,7 +702,7 @@ class RunController(QObject):
 
             if _on_btn:
                 self._ac_start_time = None
-                self.auto_center_progress.emit(-1, 0, 0)
+                self._emit_auto_center_progress(-1, 0, 0)
             else:
                 now = _time.time()
                 if self._ac_start_time is None:
@@ -367,95 +711,139 @@ class RunController(QObject):
                 if elapsed_ms >= self._auto_center_delay:
                     self._do_auto_center()
                     self._ac_start_time = now
-                    self.auto_center_progress.emit(-1, 0, 0)
+                    self._emit_auto_center_progress(-1, 0, 0)
                 else:
                     progress = max(0.0, 1.0 - elapsed_ms / self._auto_center_delay)
                     try:
                         if scene_pos:
-                            self.auto_center_progress.emit(
+                            self._emit_auto_center_progress(
                                 progress, scene_pos.x() + 15, scene_pos.y())
                     except Exception:
                         pass
         else:
             self._ac_start_time = None
-            self.auto_center_progress.emit(-1, 0, 0)
+            self._emit_auto_center_progress(-1, 0, 0)
+
+    def _emit_auto_center_progress(self, progress, x, y):
+        """倒计时进度条: 填充像素宽度或位置（取整）变化时才发出，隐藏只发一次"""
+        key = (int(AUTO_CENTER_BAR_W * progress), int(x), int(y)) if progress >= 0 else None
+        if self._signal_gate.offer('auto_center_progress', key):
+            self.auto_center_progress.emit(progress, x, y)
 
     def _check_hotkeys(self, hk):
-        """检测快捷键，带防抖"""
+        """轮询快捷键（键盘钩子不可用时的兜底），带防抖"""
         now = _time.time()
 
-        def _debounced(name, key_name):
-            if is_key_pressed(key_name):
+        def _debounced(name):
+            if is_key_pressed(hk.get(name, DEFAULT_HOTKEYS.get(name, ''))):
                 last = self._debounce.get(name, 0)
                 if now - last > HOTKEY_DEBOUNCE_SEC:
                     self._debounce[name] = now
                     return True
             return False
 
-        if _debounced('stop', hk.get('stop', 'f12')):
+        for name in _HOTKEY_NAMES:
+            if name in _PT_HOTKEYS:
+                continue
+            if _debounced(name):
+                self._fire_hotkey(name)
+                if not self._active:  # stop
+                    return
+        for name in _PT_HOTKEYS:
+            if _debounced(name):
+                self._fire_hotkey(name)
+                break
+
+    def _on_key_event(self, scan_code, down):
+        """键盘钩子回调（钩子线程）: 只做边沿检测，触发的快捷键投递到主线程"""
+        for name in self._hotkey_registry.on_key(scan_code, down):
+            self._hotkey_pressed.emit(name)
+
+    def _on_hotkey(self, name):
+        if self._active:
+            self._fire_hotkey(name)
+
+    def _fire_hotkey(self, name):
+        """快捷键动作（轮询与事件驱动共用）"""
+        if name == 'stop':
             self.stop()
             self.request_edit_mode.emit()
-            return
-
-        if _debounced('voice', hk.get('voice', 'f5')):
+        elif name == 'voice':
             self.request_toggle_voice.emit()
-
-        if _debounced('toggle_buttons', hk.get('toggle_buttons', 'f7')):
+        elif name == 'toggle_buttons':
             self.request_toggle_buttons.emit()
-
-        if _debounced('soft_keyboard', hk.get('soft_keyboard', 'f8')):
+        elif name == 'soft_keyboard':
             self.request_soft_keyboard.emit()
-
-        if _debounced('auto_center', hk.get('auto_center', 'f6')):
+        elif name == 'auto_center':
             self.request_toggle_auto_center.emit()
-
+        # 诊断: 延迟统计 HUD / 导出
+        elif name == 'latency_hud':
+            self.request_latency_hud.emit()
+        elif name == 'latency_dump':
+            self.request_latency_dump.emit()
+        elif name == 'repaint_debug':
+            self.request_repaint_debug.emit()
         # 穿透模式快捷键
-        if _debounced('pt_on', hk.get('pt_on', 'f9')):
-            self.passthrough_changed.emit('pt_on')
-        elif _debounced('pt_off', hk.get('pt_off', 'f10')):
-            self.passthrough_changed.emit('pt_off')
-        elif _debounced('pt_block', hk.get('pt_block', 'f11')):
-            self.passthrough_changed.emit('pt_block')
-
-    def _dispatch_wheel(self, direction, abs_x, abs_y):
-        """将滚轮事件分发到场景坐标处的 Item"""
+        elif name in _PT_HOTKEYS:
+            self.passthrough_changed.emit(name)
+
+    def _wheel_target(self, abs_x, abs_y):
+        """屏幕坐标处可响应滚轮的 Item（无则 None）"""
         try:
-            global_pos = QPoint(abs_x, abs_y)
-            view_pos = self._window.mapFromGlobal(global_pos)
-            scene_pos = self._window.mapToScene(view_pos)
-            item = self._scene.itemAt(scene_pos, self._window.transform())
-            if item and hasattr(item, 'on_wheel'):
-                item.on_wheel(direction)
+            item, _ = self._item_at(abs_x, abs_y)
         except Exception:
-            pass
-
-    def _poll_hardware_buttons(self):
-        """轮询侧键状态（XButton1/2，Scene 事件无法捕获）"""
-        xb1 = (user32.GetAsyncKeyState(0x05) & 0x8000) != 0
-        xb2 = (user32.GetAsyncKeyState(0x06) & 0x8000) != 0
+            return None
+        return item if (item is not None and hasattr(item, 'on_wheel')) else None
 
-        if xb1 != self._prev_xb1:
-            self._prev_xb1 = xb1
-            self._dispatch_xbutton('xbutton1', 'p' if xb1 else 'r')
+    def _dispatch_wheel_events(self, events):
+        """合并本帧滚轮事件: 同一坐标只做一次命中检测，按目标 item 累加有符号 delta
 
-        if xb2 != self._prev_xb2:
-            self._prev_xb2 = xb2
-            self._dispatch_xbutton('xbutton2', 'p' if xb2 else 'r')
-
-    def _dispatch_xbutton(self, btn_name, action):
-        """将侧键事件分发到鼠标下的 Item"""
-        pt = ctypes.wintypes.POINT()
-        user32.GetCursorPos(ctypes.byref(pt))
-        cursor_pos = QPoint(pt.x, pt.y)
-
-        view_pos = self._window.mapFromGlobal(cursor_pos)
-        scene_pos = self._window.mapToScene(view_pos)
-        item = self._scene.itemAt(scene_pos, self._window.transform())
+        未满一格 (WHEEL_DELTA) 的余量保留到后续帧（高精度触控板 / 无级滚轮），
+        满格部分按格数一次性交给 item.on_wheel(direction, count)。
+        本帧有滚动但未命中的 item，其余量作废（避免很久之后被"补"出一格）。
+        """
+        targets = {}   # (x, y) → item
+        totals = {}    # item → 本帧 delta 之和（保持首次出现顺序）
+        for ev in events:
+            key = (ev.x, ev.y)
+            if key in targets:
+                item = targets[key]
+            else:
+                item = targets[key] = self._wheel_target(ev.x, ev.y)
+            if item is not None:
+                totals[item] = totals.get(item, 0) + ev.delta
+
+        accum = {}
+        for item, delta in totals.items():
+            total = self._wheel_accum.get(item, 0) + delta
+            notches = int(total / WHEEL_DELTA)  # 向零取整
+            rest = total - notches * WHEEL_DELTA
+            if rest:
+                accum[item] = rest
+            if notches:
+                try:
+                    item.on_wheel('up' if notches > 0 else 'down', abs(notches))
+                except RuntimeError:
+                    pass  # item 已被删除
+        self._wheel_accum = accum
+
+    def _poll_hardware_buttons(self, frame: FrameSnapshot):
+        """侧键状态变化（XButton1/2，Scene 事件无法捕获）→ 分发到本帧命中的 Item"""
+        if frame.xb1 != self._prev_xb1:
+            self._prev_xb1 = frame.xb1
+            self._dispatch_xbutton('xbutton1', 'p' if frame.xb1 else 'r', frame.item)
+
+        if frame.xb2 != self._prev_xb2:
+            self._prev_xb2 = frame.xb2
+            self._dispatch_xbutton('xbutton2', 'p' if frame.xb2 else 'r', frame.item)
+
+    def _dispatch_xbutton(self, btn_name, action, item):
+        """将侧键事件分发到光标下的 Item"""
 
         if item and hasattr(item, 'data'):
-            key_val = getattr(item.data, btn_name, '')
-            if key_val:
-                trigger(key_val, action)
+            plan = _item_plan(item, btn_name)
+            if plan:
+                self._smart_trigger(plan, action, source=(btn_name, id(item.data)))
                 state_name = f'active_{btn_name}'
                 if action == 'p':
                     item.set_visual_state(state_name)
@@ -473,155 +861,136 @@ class RunController(QObject):
         screen = _ps.geometry() if _ps else QRect(0, 0, 1920, 1080)
         cx = screen.x() + screen.width() // 2
         cy = screen.y() + screen.height() // 2
-        user32.SetCursorPos(cx, cy)
+        self._warp_cursor(cx, cy)
 
     # ── 接收 Item 信号的槽 ──
 
-    def on_hover_activated(self, data):
+    def on_hover_activated(self, data, plan=None):
         """按钮 hover 激活 → 按下按键"""
         self._active_key_count += 1
         self._ac_start_time = None
-        if data.hover:
-            self._smart_trigger(data.hover, 'p')
+        if plan is None:
+            plan = compile_binding(data.hover)
+        if plan:
+            self._hover.activated(('hover', id(data)), plan)
 
-    def on_hover_deactivated(self, data):
+    def on_hover_deactivated(self, data, plan=None):
         """按钮 hover 释放 → 释放按键"""
         self._active_key_count = max(0, self._active_key_count - 1)
-        if data.hover:
-            self._smart_trigger(data.hover, 'r')
+        if plan is None:
+            plan = compile_binding(data.hover)
+        if plan:
+            self._hover.deactivated(('hover', id(data)), plan)
+
+    def _apply_hover_handoff(self, presses, releases):
+        """提交 hover 触发（HoverTracker 的 commit，主线程 / 输入线程共用）
 
-    def on_action_triggered(self, data, key_str, action):
-        """按钮点击/滚轮 → 触发按键"""
+        恰好一进一出（相邻扇区/按钮间滑动）且都不含滚轮/宏时，只注入键集合的对称差；
+        其余情况先按下、后释放，共享键由所有权计数保持按下。
+        """
+        if len(presses) == 1 and len(releases) == 1:
+            (new_src, new_plan), (old_src, old_plan) = presses[0], releases[0]
+            if not (new_plan.wheel or new_plan.macros or old_plan.macros):
+                outer = current_trace()
+                t0 = _time.perf_counter_ns()
+                old_trace = set_trace(outer[0] if outer else t0, 'hover')
+                try:
+                    handoff_owned(old_src, old_plan.press, old_plan.release,
+                                  new_src, new_plan.press)
+                except Exception as e:
+                    logger.error("hover 交接失败: %s → %s, error=%s",
+                                 old_plan.source, new_plan.source, e)
+                finally:
+                    restore_trace(old_trace)
+                    self._latency.record('trigger', 'hover', _time.perf_counter_ns() - t0)
+                return
+        for src, plan in presses:
+            self._smart_trigger(plan, 'p', source=src)
+        for src, plan in releases:
+            self._smart_trigger(plan, 'r', source=src)
+
+    def on_action_triggered(self, data, binding, action, slot=None):
+        """按钮点击 → 触发按键 (binding: BindingPlan 或按键字符串)
+
+        slot: 'lclick' / 'rclick' / 'mclick' 等，与 data 一起构成按键持有者；
+              省略时（Qt 事件路径）以绑定字符串区分。
+        """
         if action == 'p':
             self._active_key_count += 1
             self._ac_start_time = None
         elif action == 'r':
             self._active_key_count = max(0, self._active_key_count - 1)
-        self._smart_trigger(key_str, action)
+        if slot is None:
+            slot = binding.source if isinstance(binding, BindingPlan) else binding
+        self._smart_trigger(binding, action, source=(slot, id(data)))
+
+    def on_wheel_triggered(self, data, binding, count):
+        """滚轮 (本帧合并后的 count 格) → 连续点击，同批提交"""
+        self._smart_trigger(binding, 'c', repeat=count)
 
     # ── 宏感知的智能触发 ──
 
-    def _smart_trigger(self, key_str: str, action: str):
-        """解析 key_str, 分离普通键、mouse:xxx 和 macro:name 标签, 分别执行"""
-        if not key_str:
+    def _smart_trigger(self, binding, action: str, repeat: int = 1, source=None):
+        """执行编译后的绑定: 普通键 + mouse:xxx 同批提交, 滚轮与 macro:name 仅在按下时触发
+
+        binding 可以是 BindingPlan，也可以是按键字符串（宏步骤等，经缓存编译）。
+        repeat 仅对 'c' 生效（滚轮多格合并）。
+        source 为按键持有者（hover / 点击槽 / 宏 / 语音），'p'/'r' 按引用计数处理。
+        延迟起点沿用当前线程的 trace（帧内 / 语音回调），没有时（宏线程等）取当前时刻。
+        """
+        plan = binding if isinstance(binding, BindingPlan) else compile_binding(binding)
+        if not plan:
             return
-        parts = [p.strip() for p in key_str.split('+')]
-        normal_keys = []
-        macro_names = []
-        mouse_buttons = []   # mouse:left, mouse:right, mouse:middle, mouse:x1, mouse:x2
-        mouse_wheels = []    # mouse:wheelup, mouse:wheeldown
-        for p in parts:
-            if p.startswith('macro:'):
-                macro_names.append(p[6:])
-            elif p.startswith('mouse:'):
-                mouse_val = p[6:]  # "left", "right", "middle", "x1", "x2", "wheelup", "wheeldown"
-                if mouse_val in ('wheelup', 'wheeldown'):
-                    mouse_wheels.append(mouse_val)
-                else:
-                    mouse_buttons.append(mouse_val)
-            else:
-                normal_keys.append(p)
 
-        # 普通键照常触发
-        if normal_keys:
-            trigger('+'.join(normal_keys), action)
+        kind = _latency_kind(source)
+        outer = current_trace()
+        t0 = _time.perf_counter_ns()
+        old_trace = set_trace(outer[0] if outer else t0, kind)
+        try:
+            self._run_plan(plan, action, repeat, source)
+        finally:
+            restore_trace(old_trace)
+            self._latency.record('trigger', kind, _time.perf_counter_ns() - t0)
 
-        # 鼠标按钮: press → mouse_press, release → mouse_release
-        for mb in mouse_buttons:
-            if action == 'p':
-                mouse_press(mb)
-            elif action == 'r':
-                mouse_release(mb)
+    def _run_plan(self, plan: BindingPlan, action: str, repeat: int, source):
+        """_smart_trigger 的主体（已在延迟 trace 内）"""
+        try:
+            if action == 'c':
+                # 点击只作用于普通键 (鼠标按钮仅响应 press/release)
+                trigger_events(plan.tap_press, plan.tap_release, 'c', repeat=repeat)
+            else:
+                trigger_events(plan.press, plan.release, action, source=source)
+        except Exception as e:
+            logger.error("触发按键失败: keys=%s, action=%s, error=%s", plan.source, action, e)
 
         # 鼠标滚轮: 仅在 press/click 时触发一次 (release 忽略)
-        if mouse_wheels and action in ('p', 'click'):
-            for mw in mouse_wheels:
-                direction = 'up' if mw == 'wheelup' else 'down'
-                mouse_wheel(direction)
+        if plan.wheel and action in ('p', 'click'):
+            send_events(list(plan.wheel))
 
         # 宏: 仅在 press / click 时触发 (release 忽略, 避免重复)
-        if macro_names and action in ('p', 'click'):
-            for name in macro_names:
-                macro_data = self._find_macro(name)
-                if macro_data:
-                    self._execute_macro(macro_data)
-                else:
-                    logger.warning("Macro not found: '%s'", name)
-
-    def _find_macro(self, name: str):
-        """从当前 config 中查找宏"""
-        config = self._scene.get_config() if hasattr(self._scene, 'get_config') else {}
-        for m in config.get('macros', []):
-            if m.get('name') == name:
-                return m
-        return None
-
-    def _execute_macro(self, macro_data: dict):
-        """在后台线程中顺序执行宏步骤 (避免 delay 阻塞主循环)
-
-        支持两种步骤格式:
-          - type='key':  {"type":"key", "key":"a+b", "action":"click"}
-          - type='delay': {"type":"delay", "ms":100}
-          - 旧格式(兼容): {"keys":"a+b", "action":"click", "delay":50}
-        """
-        steps = macro_data.get('steps', [])
-        repeat = max(1, macro_data.get('repeat', 1))
-        name = macro_data.get('name', '?')
-        if not steps:
+        if plan.macros and action in ('p', 'click'):
+            for name in plan.macros:
+                self._start_macro(name)
+
+    def _start_macro(self, name: str):
+        """按名字启动已编译的宏（延迟步骤不阻塞任何线程，stop() 时立即中止）"""
+        macro = self._macro_library.get(name)
+        if macro is None:
+            if name in self._macro_library.errors:
+                logger.warning("Macro '%s' disabled: reference cycle", name)
+            else:
+                logger.warning("Macro not found: '%s'", name)
             return
+        self._macros.submit(name, macro.program, macro.repeat)
 
-        def _run():
-            for r in range(repeat):
-                for step in steps:
-                    if not self._active:
-                        return
-                    step_type = step.get('type', 'key')
-
-                    if step_type == 'delay':
-                        # 延迟步骤: {"type":"delay", "ms":100}
-                        ms = step.get('ms', 50)
-                        if ms > 0:
-                            _time.sleep(ms / 1000.0)
-
-                    elif step_type == 'key':
-                        # 按键步骤: {"type":"key", "key":"a+b", "action":"click"}
-                        # 兼容旧格式 "keys" 字段
-                        # 使用 _smart_trigger 以支持 mouse: 和 macro: 前缀
-                        keys = step.get('key', '') or step.get('keys', '')
-                        act = step.get('action', 'click')
-                        if keys:
-                            if act == 'click':
-                                self._smart_trigger(keys, 'p')
-                                self._smart_trigger(keys, 'r')
-                            elif act == 'press':
-                                self._smart_trigger(keys, 'p')
-                            elif act == 'release':
-                                self._smart_trigger(keys, 'r')
-                        # 旧格式可能有内嵌 delay
-                        delay = step.get('delay', 0)
-                        if delay > 0:
-                            _time.sleep(delay / 1000.0)
-
-                    else:
-                        # 未知类型，尝试旧格式兼容
-                        keys = step.get('keys', '') or step.get('key', '')
-                        act = step.get('action', 'click')
-                        delay = step.get('delay', 50)
-                        if keys:
-                            if act == 'click':
-                                self._smart_trigger(keys, 'p')
-                                self._smart_trigger(keys, 'r')
-                            elif act == 'press':
-                                self._smart_trigger(keys, 'p')
-                            elif act == 'release':
-                                self._smart_trigger(keys, 'r')
-                        if delay > 0:
-                            _time.sleep(delay / 1000.0)
-
-            logger.info("Macro '%s' executed (repeat=%d, steps=%d)", name, repeat, len(steps))
-
-        t = threading.Thread(target=_run, daemon=True)
-        t.start()
+    def _macro_step(self, arg, op: str, source):
+        """宏调度线程: 一条按键指令（编译好的 BindingPlan）或嵌套宏的启动"""
+        if not self._active:
+            return
+        if op == OP_CALL:
+            self._start_macro(arg)
+        else:
+            self._smart_trigger(arg, op, source=source)
 
     # ── 语音引擎集成 ──
 
@@ -636,6 +1005,9 @@ class RunController(QObject):
         mic_device = voice_config.get('voice_mic_device', None)
         if not commands:
             return
+        self._voice_plans = {
+            c.get('phrase', ''): compile_binding(c.get('keys', '')) for c in commands
+        }
 
         try:
             from engine.voice_engine import VoiceEngine
@@ -661,12 +1033,21 @@ class RunController(QObject):
         """语音指令识别回调 → 触发按键 (支持宏)"""
         if not self._active or not keys:
             return
-        if action == 'click':
-            self._smart_trigger(keys, 'p')
-            self._smart_trigger(keys, 'r')
-        elif action == 'press':
-            self._smart_trigger(keys, 'p')
-        elif action == 'release':
-            self._smart_trigger(keys, 'r')
+        plan = self._voice_plans.get(phrase)
+        if plan is None or plan.source != keys:
+            plan = compile_binding(keys)
+        source = ('voice', phrase)
+        # 延迟起点: 音频块采集时刻（latency_ms 为采集 → 识别耗时）
+        old_trace = set_trace(_time.perf_counter_ns() - int(latency_ms) * 1_000_000, 'voice')
+        try:
+            if action == 'click':
+                self._smart_trigger(plan, 'p', source=source)
+                self._smart_trigger(plan, 'r', source=source)
+            elif action == 'press':
+                self._smart_trigger(plan, 'p', source=source)
+            elif action == 'release':
+                self._smart_trigger(plan, 'r', source=source)
+        finally:
+            restore_trace(old_trace)
         self.voice_command_triggered.emit(phrase, keys, action)
         logger.info(f"语音指令触发: '{phrase}' → keys='{keys}', action='{action}'")
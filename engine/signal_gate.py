@@ -0,0 +1,78 @@
+"""
+TEGG Touch 蛋挞 (PyQt6) - signal_gate.py
+控制器信号的变化检测 — 每帧"报告"一次状态，只有状态（量化后的键）变化时才真正发出信号。
+
+  auto_center_progress  进度量化到进度条像素宽度、坐标取整，隐藏状态只发一次
+
+同时统计每个信号每秒被报告（= 旧实现的发出次数）与实际发出的次数，用于对比。
+纯逻辑，不依赖 Qt；时间由 clock 提供（默认 time.perf_counter）。
+"""
+
+import time
+
+STATS_WINDOW_SEC = 1.0  # 每秒次数的统计窗口
+
+_UNSET = object()
+
+
+class SignalGate:
+    """按信号名缓存上次发出的键"""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self.reset()
+
+    def reset(self, now: float = None):
+        """清空缓存与统计（进入运行模式）: 之后每个信号的首次报告一定发出"""
+        now = self._clock() if now is None else now
+        self._last = {}
+        self._offered = {}      # 累计报告次数
+        self._emitted = {}      # 累计发出次数
+        self._win_start = now
+        self._win_offered = {}
+        self._win_emitted = {}
+        self._rates = {}        # 上一个完整窗口: 名字 → (报告/s, 发出/s)
+
+    def invalidate(self, name: str = None):
+        """忘记某个（省略时全部）信号的上次值，下次报告照常发出"""
+        if name is None:
+            self._last.clear()
+        else:
+            self._last.pop(name, None)
+
+    def offer(self, name: str, key) -> bool:
+        """报告本帧的状态键，返回是否需要发出信号"""
+        self._roll(self._clock())
+        self._offered[name] = self._offered.get(name, 0) + 1
+        self._win_offered[name] = self._win_offered.get(name, 0) + 1
+        if self._last.get(name, _UNSET) == key:
+            return False
+        self._last[name] = key
+        self._emitted[name] = self._emitted.get(name, 0) + 1
+        self._win_emitted[name] = self._win_emitted.get(name, 0) + 1
+        return True
+
+    def _roll(self, now: float):
+        elapsed = now - self._win_start
+        if elapsed < STATS_WINDOW_SEC:
+            return
+        self._rates = {
+            name: (n / elapsed, self._win_emitted.get(name, 0) / elapsed)
+            for name, n in self._win_offered.items()
+        }
+        self._win_start = now
+        self._win_offered = {}
+        self._win_emitted = {}
+
+    def stats(self) -> dict:
+        """名字 → 累计报告 / 发出次数 + 上一个统计窗口的每秒次数"""
+        result = {}
+        for name, offered in self._offered.items():
+            offered_rate, emitted_rate = self._rates.get(name, (0.0, 0.0))
+            result[name] = {
+                'offered': offered,
+                'emitted': self._emitted.get(name, 0),
+                'offered_per_sec': offered_rate,
+                'emitted_per_sec': emitted_rate,
+            }
+        return result
@@ -0,0 +1,120 @@
+"""
+TEGG Touch 蛋挞 (PyQt6) - tick_scheduler.py
+运行模式自适应节拍 — 光标 / 按键 / 状态机都空闲时降频，首次活动立即恢复全速。
+
+  ACTIVE  有活动（或空闲未满 idle_after_ms）: active_ms
+  IDLE    持续空闲 idle_after_ms 之后: idle_ms
+  BURST   空闲后的首次活动: burst_ms（可比 active_ms 更快），持续 burst_window_ms 后回到 ACTIVE
+
+"活动"由调用方判定（光标移动、按键变化、hover 充能 / 释放中等）；事件驱动模式下钩子唤醒
+调用 wake()，首次移动不必等到下一个空闲节拍。
+
+纯逻辑，不依赖 Qt；时间由调用方传入（默认 time.perf_counter），可在虚拟时钟下回放。
+"""
+
+import time
+
+MODE_ACTIVE = 'active'
+MODE_IDLE = 'idle'
+MODE_BURST = 'burst'
+
+STATS_WINDOW_SEC = 1.0  # 有效帧率 / CPU 占用的统计窗口
+
+
+class AdaptiveTickScheduler:
+    """根据活动情况给出下一次节拍间隔 (ms)"""
+
+    def __init__(self, active_ms: int, idle_ms: int, burst_ms: int = None,
+                 idle_after_ms: int = 500, burst_window_ms: int = 250,
+                 clock=time.perf_counter):
+        self._clock = clock
+        self.configure(active_ms, idle_ms, burst_ms, idle_after_ms, burst_window_ms)
+        self.reset()
+
+    def configure(self, active_ms: int, idle_ms: int, burst_ms: int = None,
+                  idle_after_ms: int = 500, burst_window_ms: int = 250):
+        self.active_ms = max(1, int(active_ms))
+        self.idle_ms = max(self.active_ms, int(idle_ms))
+        self.burst_ms = max(1, int(burst_ms)) if burst_ms else self.active_ms
+        self.idle_after_ms = idle_after_ms
+        self.burst_window_ms = burst_window_ms
+
+    def reset(self, now: float = None):
+        now = self._clock() if now is None else now
+        self._mode = MODE_ACTIVE
+        self._last_activity = now
+        self._burst_until = 0.0
+        # 统计: 当前窗口累计 + 上一个完整窗口的结果
+        self._win_start = now
+        self._win_ticks = 0
+        self._win_cost_ns = 0
+        self._win_idle_ticks = 0
+        self._rate = 0.0
+        self._cpu_ms = 0.0
+        self._idle_ratio = 0.0
+        self._total_ticks = 0
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def interval(self) -> int:
+        """当前模式的节拍间隔 (ms)"""
+        if self._mode == MODE_IDLE:
+            return self.idle_ms
+        if self._mode == MODE_BURST:
+            return self.burst_ms
+        return self.active_ms
+
+    def wake(self, now: float = None) -> int:
+        """外部活动（钩子事件 / 手动触发）: 记为活动，空闲中则进入 BURST"""
+        return self.update(True, now)
+
+    def update(self, active: bool, now: float = None) -> int:
+        """一帧结束后调用: 报告本帧是否有活动，返回下一次节拍间隔 (ms)"""
+        now = self._clock() if now is None else now
+        if active:
+            if self._mode == MODE_IDLE and self.burst_window_ms > 0:
+                self._mode = MODE_BURST
+                self._burst_until = now + self.burst_window_ms / 1000.0
+            elif self._mode == MODE_IDLE:
+                self._mode = MODE_ACTIVE
+            self._last_activity = now
+        if self._mode == MODE_BURST and now >= self._burst_until:
+            self._mode = MODE_ACTIVE
+        if (self._mode == MODE_ACTIVE
+                and (now - self._last_activity) * 1000.0 >= self.idle_after_ms):
+            self._mode = MODE_IDLE
+        return self.interval
+
+    def record_tick(self, cost_ns: int, now: float = None):
+        """记录一帧的耗时（用于有效帧率 / CPU 占用统计）"""
+        now = self._clock() if now is None else now
+        self._total_ticks += 1
+        self._win_ticks += 1
+        self._win_cost_ns += cost_ns
+        if self._mode == MODE_IDLE:
+            self._win_idle_ticks += 1
+        elapsed = now - self._win_start
+        if elapsed >= STATS_WINDOW_SEC:
+            self._rate = self._win_ticks / elapsed
+            self._cpu_ms = self._win_cost_ns / 1e6 / elapsed
+            self._idle_ratio = self._win_idle_ticks / self._win_ticks
+            self._win_start = now
+            self._win_ticks = self._win_cost_ns = self._win_idle_ticks = 0
+
+    def stats(self) -> dict:
+        """{mode, interval_ms, ticks_per_sec, cpu_ms_per_sec, idle_ratio, total_ticks}
+
+        ticks_per_sec / cpu_ms_per_sec 为最近一个完整统计窗口的值；
+        cpu_ms_per_sec 是每秒花在节拍处理上的时间（主线程，毫秒）。
+        """
+        return {
+            'mode': self._mode,
+            'interval_ms': self.interval,
+            'ticks_per_sec': self._rate,
+            'cpu_ms_per_sec': self._cpu_ms,
+            'idle_ratio': self._idle_ratio,
+            'total_ticks': self._total_ticks,
+        }
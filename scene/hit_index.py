@@ -0,0 +1,220 @@
+"""
+TEGG Touch 蛋挞 (PyQt6) - hit_index.py
+命中检测索引 — 替代每帧 QGraphicsScene.itemAt（BSP 遍历 + QPainterPath 包含测试）。
+
+由场景布局一次编译，布局变化（增删 Item / 移动 / 缩放 / 轮盘重建）时由 OverlayScene 作废重建:
+  - 矩形 Item（按钮 / 缩放手柄 / 轮盘控制按钮）: 网格分桶，半开区间 [l, r) × [t, b) 与 Qt 一致
+  - 轮盘扇区: 同心同半径同跨度的一组扇区合并为一项，半径带选组、(角度 - 起始角) / 跨度 选扇区
+  - 中心圆环: 半径带
+  - 其他形状: 回退到 item.contains
+  - 空 shape 的 Item（Tooltip / 回中进度条 / 虚拟光标）: 永不命中，不入索引
+
+多个候选时取 Qt 叠放顺序最上层（scene.items(DescendingOrder) 的序号），可见性在查询时检查。
+
+frozen=True 编译不可变版本（供输入线程使用）: 构建时剔除不可见 Item、路径项保存场景坐标下的
+QPainterPath 副本，查询不再调用任何 QGraphicsItem 方法；可见性变化需重新编译。
+"""
+
+import math
+
+from PyQt6.QtCore import Qt, QPointF
+from PyQt6.QtGui import QTransform
+from PyQt6.QtWidgets import QGraphicsItem, QGraphicsObject
+
+CELL_SIZE = 64  # 分桶边长 (px)
+
+_BASE_SHAPES = (QGraphicsItem.shape, QGraphicsObject.shape)
+
+
+def _overrides_shape(item) -> bool:
+    """Item 类型是否在 Python 侧重写了 shape()（未重写时 shape 即 boundingRect 矩形）"""
+    for cls in type(item).__mro__:
+        fn = cls.__dict__.get('shape')
+        if fn is not None:
+            return fn not in _BASE_SHAPES
+    return False
+
+
+# ─── 索引项 ──────────────────────────────────────────────────
+
+class _RectEntry:
+    __slots__ = ('min_rank', 'item', 'live', 'l', 't', 'r', 'b')
+
+    def __init__(self, rank, item, rect, live=True):
+        self.min_rank = rank
+        self.item = item
+        self.live = live
+        self.l, self.t = rect.left(), rect.top()
+        self.r, self.b = rect.right(), rect.bottom()
+
+    def bbox(self):
+        return self.l, self.t, self.r, self.b
+
+    def hit(self, x, y):
+        if (self.l <= x < self.r and self.t <= y < self.b
+                and (not self.live or self.item.isVisible())):
+            return self.min_rank, self.item
+        return None
+
+
+class _RingEntry:
+    __slots__ = ('min_rank', 'item', 'live', 'cx', 'cy', 'r_in', 'r_out', 'r2_in', 'r2_out')
+
+    def __init__(self, rank, item, cx, cy, r_in, r_out, live=True):
+        self.min_rank = rank
+        self.item = item
+        self.live = live
+        self.cx, self.cy = cx, cy
+        self.r_in, self.r_out = r_in, r_out
+        self.r2_in, self.r2_out = r_in * r_in, r_out * r_out
+
+    def bbox(self):
+        return self.cx - self.r_out, self.cy - self.r_out, self.cx + self.r_out, self.cy + self.r_out
+
+    def hit(self, x, y):
+        dx, dy = x - self.cx, y - self.cy
+        d2 = dx * dx + dy * dy
+        if self.r2_in <= d2 < self.r2_out and (not self.live or self.item.isVisible()):
+            return self.min_rank, self.item
+        return None
+
+
+class _SectorGroup:
+    """同一圈扇区: slots[k] 覆盖角度 [start + k·span, start + (k+1)·span)（Qt 角度: 0°=右，逆时针）"""
+
+    __slots__ = ('min_rank', 'live', 'cx', 'cy', 'r2_in', 'r2_out', 'r_out', 'start', 'span', 'slots')
+
+    def __init__(self, cx, cy, r_in, r_out, start, span, n_slots, live=True):
+        self.min_rank = math.inf
+        self.live = live
+        self.cx, self.cy = cx, cy
+        self.r2_in, self.r2_out = r_in * r_in, r_out * r_out
+        self.r_out = r_out
+        self.start = start
+        self.span = span
+        self.slots = [None] * n_slots  # (rank, item)
+
+    def add(self, slot, rank, item):
+        self.slots[slot] = (rank, item)
+        self.min_rank = min(self.min_rank, rank)
+
+    def bbox(self):
+        return self.cx - self.r_out, self.cy - self.r_out, self.cx + self.r_out, self.cy + self.r_out
+
+    def hit(self, x, y):
+        dx, dy = x - self.cx, self.cy - y
+        d2 = dx * dx + dy * dy
+        if not (self.r2_in <= d2 < self.r2_out):
+            return None
+        angle = (math.degrees(math.atan2(dy, dx)) - self.start) % 360.0
+        slot = int(angle / self.span)
+        if slot >= len(self.slots):
+            return None
+        entry = self.slots[slot]
+        if entry is not None and (not self.live or entry[1].isVisible()):
+            return entry
+        return None
+
+
+class _PathEntry:
+    __slots__ = ('min_rank', 'item', 'path', '_bbox')
+
+    def __init__(self, rank, item, live=True):
+        self.min_rank = rank
+        self.item = item
+        # 不可变版本: 场景坐标下的 shape 副本（值类型，可跨线程只读）
+        self.path = None if live else item.sceneTransform().map(item.shape())
+        r = item.sceneBoundingRect()
+        self._bbox = (r.left(), r.top(), r.right(), r.bottom())
+
+    def bbox(self):
+        return self._bbox
+
+    def hit(self, x, y):
+        if self.path is not None:
+            if self.path.contains(QPointF(x, y)):
+                return self.min_rank, self.item
+            return None
+        item = self.item
+        if item.isVisible() and item.contains(item.mapFromScene(QPointF(x, y))):
+            return self.min_rank, item
+        return None
+
+
+# ─── 索引 ────────────────────────────────────────────────────
+
+class HitIndex:
+    """场景命中检测索引: item_at(x, y) 与 scene.itemAt(QPointF(x, y), QTransform()) 返回同一 Item"""
+
+    def __init__(self, entries, cell: int = CELL_SIZE):
+        self._cell = cell
+        self._cells = {}
+        for e in entries:
+            l, t, r, b = e.bbox()
+            for cx in range(int(l // cell), int(r // cell) + 1):
+                for cy in range(int(t // cell), int(b // cell) + 1):
+                    self._cells.setdefault((cx, cy), []).append(e)
+        for bucket in self._cells.values():
+            bucket.sort(key=lambda e: e.min_rank)
+        self.entry_count = len(entries)
+
+    @classmethod
+    def build(cls, scene, cell: int = CELL_SIZE, frozen: bool = False) -> 'HitIndex':
+        from scene.wheel_sector_item import WheelSectorItem
+        from scene.wheel_ring_item import WheelRingItem
+
+        live = not frozen
+        entries = []
+        groups = {}  # (cx, cy, r_in, r_out, span) → [(rank, item)]
+        for rank, item in enumerate(scene.items(Qt.SortOrder.DescendingOrder)):
+            if frozen and not item.isVisible():
+                continue
+            if item.sceneTransform().type().value > QTransform.TransformationType.TxTranslate.value:
+                entries.append(_PathEntry(rank, item, live))
+            elif isinstance(item, WheelSectorItem):
+                key = (item._cx, item._cy, item._r_inner, item._r_outer, item._span_angle)
+                groups.setdefault(key, []).append((rank, item))
+            elif isinstance(item, WheelRingItem):
+                entries.append(_RingEntry(rank, item, item._cx, item._cy,
+                                          item._r_inner, item._r_outer, live))
+            elif not _overrides_shape(item):
+                entries.append(_RectEntry(rank, item, item.sceneBoundingRect(), live))
+            elif not item.shape().isEmpty():
+                entries.append(_PathEntry(rank, item, live))
+
+        for (cx, cy, r_in, r_out, span), members in groups.items():
+            entries.extend(cls._compile_sectors(cx, cy, r_in, r_out, span, members, live))
+        return cls(entries, cell)
+
+    @staticmethod
+    def _compile_sectors(cx, cy, r_in, r_out, span, members, live=True):
+        """扇区恰好按 span 等分圆周时合并为 _SectorGroup；否则逐个回退到路径测试"""
+        n_slots = round(360.0 / span) if span > 0 else 0
+        if n_slots <= 0 or abs(n_slots * span - 360.0) > 1e-6:
+            return [_PathEntry(rank, item, live) for rank, item in members]
+        start = members[0][1]._start_angle
+        group = _SectorGroup(cx, cy, r_in, r_out, start, span, n_slots, live)
+        fallback = []
+        for rank, item in members:
+            k = (item._start_angle - start) / span
+            slot = round(k) % n_slots
+            if abs(k - round(k)) > 1e-6 or group.slots[slot] is not None:
+                fallback.append(_PathEntry(rank, item, live))
+            else:
+                group.add(slot, rank, item)
+        return [group] + fallback
+
+    def item_at(self, x: float, y: float):
+        """场景坐标处最上层的可见 Item（无则 None）"""
+        cell = self._cell
+        bucket = self._cells.get((int(x // cell), int(y // cell)))
+        if not bucket:
+            return None
+        best_rank, best = math.inf, None
+        for e in bucket:
+            if e.min_rank >= best_rank:
+                break
+            hit = e.hit(x, y)
+            if hit is not None and hit[0] < best_rank:
+                best_rank, best = hit
+        return best
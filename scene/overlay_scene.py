@@ -4,12 +4,13 @@ TEGG Touch 蛋挞 (PyQt6) - overlay_scene.py
 """
 
 from PyQt6.QtWidgets import QGraphicsScene
-from PyQt6.QtGui import QPen, QColor, QPainter
+from PyQt6.QtGui import QPen, QColor, QPainter, QPixmap
 from PyQt6.QtCore import QRectF, pyqtSignal
 
 from PyQt6.QtWidgets import QGraphicsObject, QGraphicsItem
 from PyQt6.QtCore import QRectF, Qt as _Qt
 from PyQt6.QtGui import QPainter as _QPainter, QColor as _QColor, QFont as _QFont, QPen as _QPen
+from PyQt6.QtGui import QTransform
 
 from core.constants import (
     DEFAULT_GRID_SIZE, BTN_TYPE_WHEEL_SECTOR, BTN_TYPE_WHEEL_RING,
@@ -24,8 +25,29 @@ from core.constants import (
     WHEEL_DUAL_INNER_SECTOR_INNER, WHEEL_DUAL_INNER_SECTOR_OUTER,
     WHEEL_DUAL_OUTER_SECTOR_INNER, WHEEL_DUAL_OUTER_SECTOR_OUTER,
     WHEEL_SECTOR_COUNT, WHEEL_MAX_OFFSET, WHEEL_RESIZE_BTN_SIZE,
+    AUTO_CENTER_BAR_W, AUTO_CENTER_BAR_H,
 )
 from core.i18n import t
+from core.input_region import InputRegion, rect_shape, ring_shape, sector_shape
+from core.macro_compiler import EMPTY_LIBRARY, MacroLibrary, compile_macros
+from scene.hit_index import HitIndex, _overrides_shape
+
+
+def _input_shape(item):
+    """Item 在输入区域中的形状（场景坐标，分类同 HitIndex.build）；空 shape 的 Item 返回 None"""
+    from scene.wheel_sector_item import WheelSectorItem
+    from scene.wheel_ring_item import WheelRingItem
+
+    if item.sceneTransform().type().value <= QTransform.TransformationType.TxTranslate.value:
+        if isinstance(item, WheelSectorItem):
+            return sector_shape(item._cx, item._cy, item._r_inner, item._r_outer,
+                                item._start_angle, item._span_angle)
+        if isinstance(item, WheelRingItem):
+            return ring_shape(item._cx, item._cy, item._r_inner, item._r_outer)
+    if _overrides_shape(item) and item.shape().isEmpty():
+        return None
+    r = item.sceneBoundingRect()
+    return rect_shape(r.left(), r.top(), r.right(), r.bottom())
 
 
 # ── 图标字体检测 (与 edit_toolbar 共用逻辑) ──
@@ -194,8 +216,8 @@ class _WheelResizeBtn(QGraphicsObject):
 class _AutoCenterBar(QGraphicsObject):
     """自动回中倒计时进度条 — 跟随光标位置 (匹配原版 50×6px 绿色条)"""
 
-    BAR_W = 50
-    BAR_H = 6
+    BAR_W = AUTO_CENTER_BAR_W
+    BAR_H = AUTO_CENTER_BAR_H
 
     def __init__(self):
         super().__init__()
@@ -239,6 +261,7 @@ class OverlayScene(QGraphicsScene):
     button_double_clicked = pyqtSignal(object)  # TouchButtonItem
     toast_requested = pyqtSignal(str)           # toast 文字
     wheel_rebuilt = pyqtSignal()                # 轮盘重建完成（需要重新设置透明度等）
+    layout_changed = pyqtSignal()               # 布局变化（输入区域需要重新同步）
 
     def __init__(self):
         super().__init__()
@@ -258,6 +281,12 @@ class OverlayScene(QGraphicsScene):
         self._wheel_offset = 0          # 轮盘缩放偏移 (px)
         self._wheel_style_btn = None
         self._wheel_resize_btn = None
+        self._hit_index = None
+        self._input_region = InputRegion()
+        self._macro_library = EMPTY_LIBRARY
+        self._grid_pixmap = None    # 编辑模式网格背景缓存
+        self._grid_key = None       # (宽, 高, grid_size, dpr, 抗锯齿)
+        self.grid_builds = 0        # 网格光栅化次数（诊断 / 测试）
 
         # 场景内自定义 Tooltip（替代 Qt 原生 setToolTip）
         from scene.tooltip_item import TooltipItem
@@ -272,6 +301,59 @@ class OverlayScene(QGraphicsScene):
         """公开访问当前配置引用（替代直接访问 _config）"""
         return self._config
 
+    # ── 宏 ──
+
+    def macro_library(self) -> MacroLibrary:
+        """当前方案已编译的宏（方案加载 / 宏列表保存时编译）"""
+        return self._macro_library
+
+    def set_macros(self, macros: list):
+        """宏列表变更（宏编辑器保存 / 删除 / 复制）→ 写入配置并重新编译"""
+        self._config['macros'] = macros
+        self._macro_library = compile_macros(macros)
+
+    # ── 命中检测索引 ──
+
+    def hit_index(self) -> HitIndex:
+        """当前布局的命中检测索引（惰性编译，布局变化后作废）"""
+        if self._hit_index is None:
+            self._hit_index = HitIndex.build(self)
+        return self._hit_index
+
+    def invalidate_hit_index(self):
+        """布局变化（增删 / 移动 / 缩放 Item / 显隐）后调用 — 同时通知输入区域需要更新"""
+        self._hit_index = None
+        self.layout_changed.emit()
+
+    def addItem(self, item):
+        super().addItem(item)
+        self.invalidate_hit_index()
+
+    def removeItem(self, item):
+        super().removeItem(item)
+        self.invalidate_hit_index()
+
+    def setSceneRect(self, *args):
+        super().setSceneRect(*args)
+        self.invalidate_hit_index()
+
+    # ── 输入区域 ──
+
+    def input_region(self, extra: dict = None) -> InputRegion:
+        """可交互 Item 形状组成的输入区域（场景坐标）— 每次调用按当前布局增量同步，只重算变化的 Item
+
+        extra: 场景之外同样接收点击的区域（工具栏等独立窗口），名字 → 形状
+        """
+        r = self.sceneRect()
+        self._input_region.set_bounds(int(r.left()), int(r.top()), int(r.right()), int(r.bottom()))
+        shapes = {key: (shape, True) for key, shape in (extra or {}).items()}
+        for item in self.items():
+            shape = _input_shape(item)
+            if shape is not None:
+                shapes[item] = (shape, item.isVisible())
+        self._input_region.sync(shapes)
+        return self._input_region
+
     # ── 背景绘制 ──
 
     def drawBackground(self, painter: QPainter, rect: QRectF):
@@ -281,6 +363,43 @@ class OverlayScene(QGraphicsScene):
         if self.mode != 'edit':
             return
 
+        # 网格只光栅化一次，之后只贴出脏矩形对应的部分（拖动按钮时不再逐线重画）
+        scene_rect = self.sceneRect()
+        bounds = QRectF(0, 0, scene_rect.width(), scene_rect.height())
+        if (painter.worldTransform().type().value > QTransform.TransformationType.TxTranslate.value
+                or not bounds.contains(rect)):
+            self._paint_grid(painter, rect)
+            return
+        dpr = painter.device().devicePixelRatioF()
+        pixmap = self._grid_background(dpr, painter.testRenderHint(QPainter.RenderHint.Antialiasing))
+        painter.drawPixmap(rect, pixmap, QRectF(rect.x() * dpr, rect.y() * dpr,
+                                                rect.width() * dpr, rect.height() * dpr))
+
+    def _grid_background(self, dpr: float, antialias: bool) -> QPixmap:
+        """整屏网格背景位图 — 场景尺寸 / 网格大小 / 像素比变化时重建"""
+        scene_rect = self.sceneRect()
+        key = (scene_rect.width(), scene_rect.height(), self.grid_size, dpr, antialias)
+        if self._grid_key != key:
+            pixmap = QPixmap(max(1, round(scene_rect.width() * dpr)), max(1, round(scene_rect.height() * dpr)))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(_Qt.GlobalColor.transparent)
+            p = QPainter(pixmap)
+            p.setRenderHint(QPainter.RenderHint.Antialiasing, antialias)
+            self._paint_grid(p, QRectF(0, 0, scene_rect.width(), scene_rect.height()))
+            p.end()
+            self._grid_pixmap = pixmap
+            self._grid_key = key
+            self.grid_builds += 1
+        return self._grid_pixmap
+
+    def invalidate_grid(self):
+        """丢弃网格背景缓存并重绘背景层"""
+        self._grid_pixmap = None
+        self._grid_key = None
+        self.invalidate(self.sceneRect(), QGraphicsScene.SceneLayer.BackgroundLayer)
+
+    def _paint_grid(self, painter: QPainter, rect: QRectF):
+        """遮罩 + 网格线 + 中心十字线"""
         # 20% 黑色遮罩
         painter.fillRect(rect, QColor(0, 0, 0, 50))
 
@@ -322,6 +441,7 @@ class OverlayScene(QGraphicsScene):
         from scene.touch_button_item import TouchButtonItem
 
         self._config = config
+        self._macro_library = compile_macros(config.get('macros', []))
         buttons = config.get('buttons', [])
         offset_x = self.sceneRect().width() / 2
         offset_y = self.sceneRect().height() / 2
@@ -642,6 +762,7 @@ class OverlayScene(QGraphicsScene):
         self._wheel_resize_btn.setVisible(show)
         self._wheel_style_btn.setPos(style_x, style_y)
         self._wheel_style_btn.setVisible(show)
+        self.invalidate_hit_index()
 
     def _on_wheel_style_clicked(self):
         """打开轮盘样式管理弹窗"""
@@ -846,9 +967,10 @@ class OverlayScene(QGraphicsScene):
             item.prepareGeometryChange()
             item._update_handle_pos()
             item.update()
+        self.invalidate_hit_index()
 
         # 重绘网格
-        self.invalidate()
+        self.invalidate_grid()
 
     def _find_empty_slot(self, w, h, start_x=0, start_y=0):
         """在网格上查找不与现有按钮重叠的空位（逻辑坐标，中心原点）。"""
@@ -0,0 +1,66 @@
+"""
+TEGG Touch 蛋挞 (PyQt6) - sprite_cache.py
+预渲染精灵缓存 — 静态外观只光栅化一次，paint() 只贴图。
+
+键由调用方按"决定外观的全部内容"构造（尺寸、样式、文字、字体、设备像素比…），
+内容变了键就变了，无需显式失效；旧精灵按 LRU 淘汰。
+"""
+
+import math
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPainter, QPixmap
+
+# 缓存精灵数量上限（按钮外观按状态 × 尺寸共享，通常远小于此值）
+SPRITE_CACHE_MAX = 512
+
+
+class SpriteCache:
+    """按键缓存 QPixmap 的 LRU
+
+    get(key, w, h, dpr, render): 命中直接返回；未命中时新建 w×h（逻辑像素）透明位图，
+    交给 render(painter) 绘制后缓存。enabled=False 时调用方应退回直接绘制（基准对比用）。
+    """
+
+    def __init__(self, max_entries: int = SPRITE_CACHE_MAX):
+        self._entries = OrderedDict()
+        self._max = max_entries
+        self.enabled = True
+        self._counts = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key, w: float, h: float, dpr: float, render) -> QPixmap:
+        pixmap = self._entries.get(key)
+        if pixmap is not None:
+            self._entries.move_to_end(key)
+            self._counts['hits'] += 1
+            return pixmap
+
+        self._counts['misses'] += 1
+        pixmap = QPixmap(max(1, math.ceil(w * dpr)), max(1, math.ceil(h * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+        render(painter)
+        painter.end()
+
+        self._entries[key] = pixmap
+        if len(self._entries) > self._max:
+            self._entries.popitem(last=False)
+            self._counts['evictions'] += 1
+        return pixmap
+
+    def clear(self):
+        """清空精灵与计数"""
+        self._entries.clear()
+        self._counts = dict.fromkeys(self._counts, 0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """命中 / 未命中 / 淘汰次数 + 当前条目数与位图内存 (字节)"""
+        return dict(self._counts, entries=len(self._entries),
+                    bytes=sum(p.width() * p.height() * 4 for p in self._entries.values()))
@@ -3,9 +3,11 @@ TEGG Touch 蛋挞 (PyQt6) - touch_button_item.py
 触控按钮 QGraphicsObject — 封装绘制、编辑交互、运行交互于一体。
 """
 
+from typing import NamedTuple
+
 from PyQt6.QtWidgets import QGraphicsObject, QGraphicsItem
 from PyQt6.QtCore import Qt, QRectF, QPointF, QTimer, pyqtSignal, pyqtProperty
-from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QFont, QPainterPath
+from PyQt6.QtGui import QPainter, QPen, QBrush, QColor, QFont, QPainterPath, QTransform
 
 from core.constants import (
     BTN_RADIUS, BTN_MARGIN, BTN_TYPE_CENTER_BAND,
@@ -15,7 +17,9 @@ from core.constants import (
 from core.i18n import t, get_font
 from models.button_model import ButtonData
 from engine.hover_state_machine import HoverStateMachine
+from core.binding_plan import compile_bindings
 from scene.tooltip_item import build_edit_tooltip
+from scene.sprite_cache import SpriteCache
 
 # 字体缓存 (避免 paint() 每帧创建 QFont)
 _font_cache: dict = {}
@@ -35,10 +39,20 @@ def _get_cached_font(font_name: str, px: int, bold: bool = True) -> QFont:
     return f
 
 
+# 按钮精灵缓存（所有按钮共享: 同尺寸同状态的外观只光栅化一次）
+_sprites = SpriteCache()
+
+
+def button_sprite_cache() -> SpriteCache:
+    return _sprites
+
+
 # 回中带专用配色
 COLOR_CENTER_BAND = "#176F2C"
 COLOR_CENTER_BAND_BG = "#0A2E12"
 COLOR_CENTER_BAND_TEXT = "#4ADE80"   # 明亮薄荷绿（文字/icon）
+_BAND_COLORS = (QColor(COLOR_CENTER_BAND_BG), QColor(COLOR_CENTER_BAND), QColor(COLOR_CENTER_BAND_TEXT))
+COLOR_CHARGE = QColor("#0284C7")
 
 # 状态配色表: (fill, border, text_color)
 STATE_COLORS = {
@@ -76,6 +90,20 @@ STATE_TO_KEY = {
 }
 
 
+class _Look(NamedTuple):
+    """按钮当前外观（决定精灵内容的全部参数）"""
+    state: str            # STATE_COLORS 键或 'band'
+    fill: QColor
+    border: QColor
+    border_width: int
+    btn_r: int            # 按钮圆角
+    charge_r: int         # 充能条圆角
+    sharp_br: bool        # 右下直角（编辑模式）
+    text: str
+    font: QFont
+    text_color: QColor
+
+
 def _format_btn_name(name):
     """格式化按钮名称：最多2行，过长截断。"""
     limit = 8
@@ -96,9 +124,10 @@ class TouchButtonItem(QGraphicsObject):
 
     # ── 信号 ──
     doubleClicked = pyqtSignal(object)           # 双击 → 打开编辑器
-    hoverActivated = pyqtSignal(object)          # hover 激活 → 触发按键
-    hoverDeactivated = pyqtSignal(object)        # hover 释放 → 释放按键
-    actionTriggered = pyqtSignal(object, str, str)  # (data, key_str, 'p'|'r'|'c')
+    hoverActivated = pyqtSignal(object, object)  # (data, hover BindingPlan) → 触发按键
+    hoverDeactivated = pyqtSignal(object, object)  # (data, hover BindingPlan) → 释放按键
+    actionTriggered = pyqtSignal(object, object, str)  # (data, BindingPlan, 'p'|'r'|'c')
+    wheelTriggered = pyqtSignal(object, object, int)  # (data, BindingPlan, 格数)
     data_changed = pyqtSignal()                  # 数据变更
 
     MARGIN = BTN_MARGIN
@@ -113,6 +142,9 @@ class TouchButtonItem(QGraphicsObject):
         self._mode = 'edit'  # 'edit' | 'run'
         self._charge_progress = 0.0  # 充能进度 0~1
 
+        # 编译后的按键绑定 (按键字符串只在加载/编辑保存时解析)
+        self.plans = compile_bindings(data)
+
         # 层级: 按钮(15) > 中心环(10) > 轮盘扇区(5)
         self.setZValue(15)
 
@@ -157,24 +189,46 @@ class TouchButtonItem(QGraphicsObject):
     # ── 绘制 ──
 
     def paint(self, painter: QPainter, option, widget=None):
-        """绘制按钮 — 圆角矩形 + 名称文字"""
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        rect = self.boundingRect().adjusted(
-            self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        """绘制按钮 — 圆角矩形 + 名称文字
 
+        静态外观（底板、文字）按外观键缓存为精灵，每帧只贴图 + 绘制充能条；
+        视图带缩放 / 旋转或缓存关闭时退回直接绘制。
+        """
+        look = self._resolve_look()
+        rect = self.boundingRect()
+        charging = self._charge_progress > 0.01
+        if not _sprites.enabled or painter.worldTransform().type().value > QTransform.TransformationType.TxTranslate.value:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            self._paint_body(painter, look)
+            if charging:
+                self._paint_charge(painter, look)
+            self._paint_label(painter, look)
+            return
+
+        dpr = painter.device().devicePixelRatioF()
+        w, h = rect.width(), rect.height()
+        body = _sprites.get(('body', w, h, look.state, look.border_width, look.btn_r, look.sharp_br, dpr),
+                            w, h, dpr, lambda p: self._paint_body(p, look))
+        label = _sprites.get(('label', w, h, look.text, look.font.family(), look.font.pixelSize(),
+                              look.text_color.rgba(), dpr),
+                             w, h, dpr, lambda p: self._paint_label(p, look))
+        painter.drawPixmap(rect.topLeft(), body)
+        if charging:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            self._paint_charge(painter, look)
+        painter.drawPixmap(rect.topLeft(), label)
+
+    def _resolve_look(self) -> _Look:
+        """由数据 / 状态 / 网格 / 语言解析当前外观"""
         is_band = self.data.btn_type == BTN_TYPE_CENTER_BAND
 
         if is_band:
             # 回中带：深绿背景 + 绿色边框 + 明亮绿文字
-            fill = QColor(COLOR_CENTER_BAND_BG)
-            border = QColor(COLOR_CENTER_BAND)
-            text_color = QColor(COLOR_CENTER_BAND_TEXT)
-        elif self._visual_state == 'normal':
-            fill, border, text_color = STATE_COLORS['normal']
+            fill, border, text_color = _BAND_COLORS
+            state = 'band'
         else:
-            fill, border, text_color = STATE_COLORS.get(
-                self._visual_state, STATE_COLORS['normal'])
+            state = self._visual_state if self._visual_state in STATE_COLORS else 'normal'
+            fill, border, text_color = STATE_COLORS[state]
 
         border_width = 3 if self._visual_state != 'normal' else 2
 
@@ -182,49 +236,51 @@ class TouchButtonItem(QGraphicsObject):
         gs = self.scene().grid_size if self.scene() else DEFAULT_GRID_SIZE
         font_px, btn_r, charge_r = _GRID_STYLE.get(gs, _GRID_STYLE_DEFAULT)
 
-        # 按钮路径：编辑模式右下直角（与缩放手柄贴合），运行模式全圆角
-        painter.setPen(QPen(border, border_width))
-        painter.setBrush(QBrush(fill))
-        btn_path = self._build_btn_path(rect, btn_r,
-                                         sharp_br=(self._mode == 'edit'))
-        painter.drawPath(btn_path)
-
-        # 充能进度条
-        if self._charge_progress > 0.01:
-            charge_rect = rect.adjusted(2, 2, -2, -2)
-            charge_rect.setWidth(charge_rect.width() * self._charge_progress)
-            painter.setPen(Qt.PenStyle.NoPen)
-            painter.setBrush(QColor("#0284C7"))
-            charge_path = self._build_btn_path(charge_rect, charge_r,
-                                                sharp_br=(self._mode == 'edit'))
-            painter.drawPath(charge_path)
-
         # 确定显示文字 — 字体大小随网格动态缩放 (px)
         font_name = get_font()
-
-        def _make_px_font(px, bold=True):
-            return _get_cached_font(font_name, px, bold)
-
         if is_band:
             display_text = t("canvas.center_band_label")
-            painter.setFont(_make_px_font(font_px))
         elif self._visual_state != 'normal':
             # 运行时有状态：显示键值
             key_field = STATE_TO_KEY.get(self._visual_state)
             key_val = getattr(self.data, key_field, '') if key_field else ''
             if key_val:
                 display_text = key_val if len(key_val) <= 3 else key_val[:2] + '..'
-                painter.setFont(_make_px_font(font_px + 6))
+                font_px += 6
             else:
                 display_text = _format_btn_name(self.data.name)
-                painter.setFont(_make_px_font(font_px))
         else:
             display_text = _format_btn_name(self.data.name)
-            painter.setFont(_make_px_font(font_px))
 
-        painter.setPen(text_color)
-        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, display_text)
+        # 按钮路径：编辑模式右下直角（与缩放手柄贴合），运行模式全圆角
+        return _Look(state, fill, border, border_width, btn_r, charge_r, self._mode == 'edit',
+                     display_text, _get_cached_font(font_name, font_px), text_color)
 
+    def _inner_rect(self) -> QRectF:
+        return self.boundingRect().adjusted(
+            self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+
+    def _paint_body(self, painter: QPainter, look: _Look):
+        painter.setPen(QPen(look.border, look.border_width))
+        painter.setBrush(QBrush(look.fill))
+        painter.drawPath(self._build_btn_path(self._inner_rect(), look.btn_r, sharp_br=look.sharp_br))
+
+    def _charge_rect(self, progress) -> QRectF:
+        charge_rect = self._inner_rect().adjusted(2, 2, -2, -2)
+        charge_rect.setWidth(charge_rect.width() * progress)
+        return charge_rect
+
+    def _paint_charge(self, painter: QPainter, look: _Look):
+        """充能进度条（动态部分，不进缓存）"""
+        charge_rect = self._charge_rect(self._charge_progress)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(COLOR_CHARGE)
+        painter.drawPath(self._build_btn_path(charge_rect, look.charge_r, sharp_br=look.sharp_br))
+
+    def _paint_label(self, painter: QPainter, look: _Look):
+        painter.setFont(look.font)
+        painter.setPen(look.text_color)
+        painter.drawText(self._inner_rect(), Qt.AlignmentFlag.AlignCenter, look.text)
 
     # ── 充能进度属性（用于 QPropertyAnimation）──
 
@@ -234,8 +290,22 @@ class TouchButtonItem(QGraphicsObject):
 
     @chargeProgress.setter
     def chargeProgress(self, val):
-        self._charge_progress = val
-        self.update()
+        self._set_charge(val)
+
+    def _set_charge(self, progress):
+        """更新充能进度，只重绘进度条新旧右端之间的竖条"""
+        old = self._charge_progress if self._charge_progress > 0.01 else 0.0
+        self._charge_progress = progress
+        new = progress if progress > 0.01 else 0.0
+        if new == old:
+            return
+        gs = self.scene().grid_size if self.scene() else DEFAULT_GRID_SIZE
+        d = _GRID_STYLE.get(gs, _GRID_STYLE_DEFAULT)[2] * 2
+        bar = self._charge_rect(1.0)
+        # 右端圆角随进度移动: 变化范围 = 较短一端往左一个圆角直径 ~ 较长一端（窄条时圆角会越过左右边界）
+        left = bar.left() + min(old, new) * bar.width() - d
+        right = bar.left() + max(max(old, new) * bar.width(), d)
+        self.update(QRectF(left - 1, bar.top() - 1, right - left + 2, bar.height() + 2))
 
     # ── 状态设置 ──
 
@@ -244,6 +314,10 @@ class TouchButtonItem(QGraphicsObject):
             self._visual_state = state
             self.update()
 
+    def rebuild_plans(self):
+        """按键字段被编辑后重新编译绑定"""
+        self.plans = compile_bindings(self.data)
+
     def set_mode(self, mode: str):
         self._mode = mode
         movable = (mode == 'edit')
@@ -282,6 +356,10 @@ class TouchButtonItem(QGraphicsObject):
                 self.data.x = new_pos.x() - self._offset_x
                 self.data.y = new_pos.y() - self._offset_y
                 return new_pos
+        elif change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged:
+            scene = self.scene()
+            if scene is not None and hasattr(scene, 'invalidate_hit_index'):
+                scene.invalidate_hit_index()
         return super().itemChange(change, value)
 
     def mouseDoubleClickEvent(self, event):
@@ -300,6 +378,8 @@ class TouchButtonItem(QGraphicsObject):
         self.data.w = max(gs, new_w)
         self.data.h = max(gs, new_h)
         self._update_handle_pos()
+        if self.scene() is not None and hasattr(self.scene(), 'invalidate_hit_index'):
+            self.scene().invalidate_hit_index()
         self.update()
         self.data_changed.emit()
 
@@ -309,13 +389,13 @@ class TouchButtonItem(QGraphicsObject):
         if self._mode == 'run':
             btn = event.button()
             if btn == Qt.MouseButton.LeftButton and self.data.lclick:
-                self.actionTriggered.emit(self.data, self.data.lclick, 'p')
+                self.actionTriggered.emit(self.data, self.plans['lclick'], 'p')
                 self.set_visual_state('active_left')
             elif btn == Qt.MouseButton.RightButton and self.data.rclick:
-                self.actionTriggered.emit(self.data, self.data.rclick, 'p')
+                self.actionTriggered.emit(self.data, self.plans['rclick'], 'p')
                 self.set_visual_state('active_right')
             elif btn == Qt.MouseButton.MiddleButton and self.data.mclick:
-                self.actionTriggered.emit(self.data, self.data.mclick, 'p')
+                self.actionTriggered.emit(self.data, self.plans['mclick'], 'p')
                 self.set_visual_state('active_middle')
             event.accept()
         else:
@@ -324,11 +404,11 @@ class TouchButtonItem(QGraphicsObject):
     def mouseReleaseEvent(self, event):
         if self._mode == 'run':
             key_map = {
-                Qt.MouseButton.LeftButton: ('lclick', self.data.lclick),
-                Qt.MouseButton.RightButton: ('rclick', self.data.rclick),
-                Qt.MouseButton.MiddleButton: ('mclick', self.data.mclick),
+                Qt.MouseButton.LeftButton: ('lclick', self.plans['lclick']),
+                Qt.MouseButton.RightButton: ('rclick', self.plans['rclick']),
+                Qt.MouseButton.MiddleButton: ('mclick', self.plans['mclick']),
             }
-            field, key = key_map.get(event.button(), (None, ''))
+            field, key = key_map.get(event.button(), (None, None))
             if key:
                 self.actionTriggered.emit(self.data, key, 'r')
             # 恢复 hover 或 normal 状态
@@ -349,14 +429,14 @@ class TouchButtonItem(QGraphicsObject):
         elif self._mode == 'run':
             # 回中带：立即回中 (匹配原版 handle_run_interaction: center_band → SetCursorPos)
             if self.data.btn_type == BTN_TYPE_CENTER_BAND:
-                import ctypes
                 from PyQt6.QtWidgets import QApplication
                 from PyQt6.QtCore import QRect
+                from core.input_backend import get_backend
                 _ps = QApplication.primaryScreen()
                 screen = _ps.geometry() if _ps else QRect(0, 0, 1920, 1080)
                 cx = screen.x() + screen.width() // 2
                 cy = screen.y() + screen.height() // 2
-                ctypes.windll.user32.SetCursorPos(cx, cy)
+                get_backend().set_cursor_pos(cx, cy)
             elif self.data.hover:
                 self._hover_sm.enter()
         super().hoverEnterEvent(event)
@@ -381,11 +461,11 @@ class TouchButtonItem(QGraphicsObject):
 
     # ── 滚轮事件（由 RunController 分发）──
 
-    def on_wheel(self, direction):
-        """滚轮事件"""
-        key = self.data.wheelup if direction == 'up' else self.data.wheeldown
+    def on_wheel(self, direction, count: int = 1):
+        """滚轮事件（count: 本帧合并后的格数）"""
+        key = self.plans['wheelup'] if direction == 'up' else self.plans['wheeldown']
         if key:
-            self.actionTriggered.emit(self.data, key, 'c')
+            self.wheelTriggered.emit(self.data, key, count)
             state = 'active_wheelup' if direction == 'up' else 'active_wheeldown'
             self.set_visual_state(state)
             QTimer.singleShot(150, lambda: self.set_visual_state(
@@ -394,24 +474,22 @@ class TouchButtonItem(QGraphicsObject):
     # ── 状态机回调 ──
 
     def _on_hover_activated(self):
-        self.hoverActivated.emit(self.data)
+        self.hoverActivated.emit(self.data, self.plans['hover'])
         self._charge_progress = 0.0  # 充能完成，清除进度条
         self.set_visual_state('hover')
 
     def _on_hover_deactivated(self):
-        self.hoverDeactivated.emit(self.data)
+        self.hoverDeactivated.emit(self.data, self.plans['hover'])
         self._charge_progress = 0.0  # 释放完成，清除进度条
         self.set_visual_state('normal')
 
     def _on_charge_progress(self, progress):
         """充能进度回调 — 进度条从 0→1"""
-        self._charge_progress = progress
-        self.update()
+        self._set_charge(progress)
 
     def _on_release_progress(self, progress):
         """释放倒计时进度回调 — 进度条从 1→0"""
-        self._charge_progress = progress
-        self.update()
+        self._set_charge(progress)
 
     # ── 路径构建辅助 ──
 
@@ -77,9 +77,14 @@ class VirtualCursorItem(QGraphicsItem):
         self._load_cursor_image()
         self.update()
 
-    def start_tracking(self):
-        """开始跟踪光标位置"""
-        self._tracker.start()
+    def start_tracking(self, follow_frames: bool = False):
+        """开始跟踪光标位置
+
+        follow_frames=True: 由运行控制器的帧快照驱动（follow_frame），不启用自身定时器，
+        避免与控制器各自查询一次光标。
+        """
+        if not follow_frames:
+            self._tracker.start()
         self.setVisible(True)
 
     def stop_tracking(self):
@@ -87,6 +92,12 @@ class VirtualCursorItem(QGraphicsItem):
         self._tracker.stop()
         self.setVisible(False)
 
+    def follow_frame(self, frame):
+        """运行控制器发布的帧快照 → 直接使用其中已映射好的场景坐标"""
+        if self._tracker.isActive() or not self.isVisible() or frame.scene_pos is None:
+            return
+        self.setPos(frame.scene_pos)
+
     def _update_pos(self):
         """更新位置到当前鼠标坐标（通过 view 做 global→scene 坐标变换）"""
         scene = self.scene()
@@ -0,0 +1,198 @@
+"""
+TEGG Touch 蛋挞 (PyQt6) - wheel_geometry.py
+轮盘几何内核 — 扇面 / 圆环 / 充能层路径与重绘区域，扇面、圆环 Item 与样式弹窗预览共用。
+
+路径以圆心为原点构建（调用方 translated / painter.translate 到实际圆心），
+按量化后的半径 / 角度缓存在一个有上限的 LRU 中:
+  - 静态形状（碰撞 / 视觉路径、预览）半径按 1/8 px 量化
+  - 充能层半径对齐到显示器的设备像素（snap_radius），充能动画的帧数有限，
+    第一次充能后后续充能全部命中缓存
+
+charge_band_rects(): 充能层半径变化时需要重绘的区域。
+整块 boundingRect 对大环来说几乎是整个轮盘，这里把 [r1, r2] 环带按角度切成小段，
+每段取外接矩形，面积接近环带本身。
+"""
+
+import math
+from collections import OrderedDict
+
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QGuiApplication, QPainterPath
+
+# 每段最大角度（越小越贴合环带，矩形数量越多）
+BAND_SEGMENT_DEG = 15.0
+# 抗锯齿边缘外扩 (px)
+BAND_PAD = 2.0
+
+# 路径缓存上限（dual 模式 16 扇面 × 每扇面 ~80 帧充能仍可全部容纳）
+PATH_CACHE_MAX = 2048
+# 静态形状半径 / 角度的量化步长
+RADIUS_STEPS_PER_PX = 8
+ANGLE_STEPS_PER_DEG = 100
+
+
+class _PathCache:
+    """QPainterPath 的 LRU（键为量化后的几何参数）"""
+
+    def __init__(self, max_entries: int = PATH_CACHE_MAX):
+        self._entries = OrderedDict()
+        self._max = max_entries
+        self._counts = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key, build) -> QPainterPath:
+        path = self._entries.get(key)
+        if path is not None:
+            self._entries.move_to_end(key)
+            self._counts['hits'] += 1
+            return path
+        self._counts['misses'] += 1
+        path = build()
+        self._entries[key] = path
+        if len(self._entries) > self._max:
+            self._entries.popitem(last=False)
+            self._counts['evictions'] += 1
+        return path
+
+    def clear(self):
+        self._entries.clear()
+        self._counts = dict.fromkeys(self._counts, 0)
+
+    def stats(self) -> dict:
+        return dict(self._counts, entries=len(self._entries))
+
+
+_paths = _PathCache()
+_resolution = None
+
+
+def path_cache_stats() -> dict:
+    """路径缓存的命中 / 未命中 / 淘汰次数与当前条目数"""
+    return _paths.stats()
+
+
+def clear_path_cache():
+    """清空路径缓存与计数"""
+    _paths.clear()
+
+
+def display_resolution() -> float:
+    """充能帧的半径分辨率: 每逻辑像素的设备像素数（主屏 devicePixelRatio）"""
+    global _resolution
+    if _resolution is None:
+        screen = QGuiApplication.primaryScreen()
+        _resolution = screen.devicePixelRatio() if screen is not None else 1.0
+    return _resolution
+
+
+def snap_radius(r: float, resolution: float = None) -> float:
+    """半径对齐到设备像素（充能层: 相邻帧至少相差一个物理像素）"""
+    res = resolution or display_resolution()
+    return round(r * res) / res
+
+
+def _q(r: float) -> int:
+    return round(r * RADIUS_STEPS_PER_PX)
+
+
+def _qa(a: float) -> int:
+    return round(a * ANGLE_STEPS_PER_DEG)
+
+
+def half_gap_angle(radius, gap_px) -> float:
+    """将像素间隔转换为该半径处的角度偏移"""
+    if radius <= 0 or gap_px <= 0:
+        return 0
+    return math.degrees(math.atan2(gap_px / 2, radius))
+
+
+def sector_path(r_inner, r_outer, start_angle, span_angle, gap_px=0) -> QPainterPath:
+    """环形扇区路径（圆心在原点）
+
+    Args:
+        r_inner: 内圆半径
+        r_outer: 外圆半径
+        gap_px: 扇面间视觉间距(像素), 0=无间隙(碰撞路径)
+    """
+    key = ('sector', _q(r_inner), _q(r_outer), _qa(start_angle), _qa(span_angle), _q(gap_px))
+    return _paths.get(key, lambda: _build_sector(
+        key[1] / RADIUS_STEPS_PER_PX, key[2] / RADIUS_STEPS_PER_PX,
+        key[3] / ANGLE_STEPS_PER_DEG, key[4] / ANGLE_STEPS_PER_DEG, key[5] / RADIUS_STEPS_PER_PX))
+
+
+def ring_path(r_inner, r_outer) -> QPainterPath:
+    """圆环路径 = 外圆 - 内圆（布尔减法，圆心在原点）"""
+    key = ('ring', _q(r_inner), _q(r_outer))
+    return _paths.get(key, lambda: _build_ring(
+        key[1] / RADIUS_STEPS_PER_PX, key[2] / RADIUS_STEPS_PER_PX))
+
+
+def _build_sector(r_inner, r_outer, start_angle, span_angle, gap_px) -> QPainterPath:
+    gap_outer = half_gap_angle(r_outer, gap_px)
+    gap_inner = half_gap_angle(r_inner, gap_px)
+
+    outer_start = start_angle + gap_outer
+    outer_span = span_angle - 2 * gap_outer
+    inner_start = start_angle + gap_inner
+    inner_span = span_angle - 2 * gap_inner
+
+    outer_rect = QRectF(-r_outer, -r_outer, r_outer * 2, r_outer * 2)
+    inner_rect = QRectF(-r_inner, -r_inner, r_inner * 2, r_inner * 2)
+
+    # 外弧
+    path = QPainterPath()
+    path.arcMoveTo(outer_rect, outer_start)
+    path.arcTo(outer_rect, outer_start, outer_span)
+
+    # 连接到内弧终点
+    inner_end_angle = math.radians(inner_start + inner_span)
+    path.lineTo(r_inner * math.cos(inner_end_angle), -r_inner * math.sin(inner_end_angle))
+
+    # 内弧（反向）
+    path.arcTo(inner_rect, inner_start + inner_span, -inner_span)
+
+    path.closeSubpath()
+    return path
+
+
+def _build_ring(r_inner, r_outer) -> QPainterPath:
+    outer = QPainterPath()
+    outer.addEllipse(-r_outer, -r_outer, r_outer * 2, r_outer * 2)
+    inner = QPainterPath()
+    inner.addEllipse(-r_inner, -r_inner, r_inner * 2, r_inner * 2)
+    return outer.subtracted(inner)
+
+
+def charge_band_rects(cx, cy, r1, r2, start_deg=0.0, span_deg=360.0,
+                      segment_deg=BAND_SEGMENT_DEG, pad=BAND_PAD) -> list:
+    """覆盖环形扇区 r1 ≤ r ≤ r2、start_deg ~ start_deg+span_deg 的矩形列表
+
+    角度与 QPainterPath.arcTo 一致（度，逆时针，y 轴向下）。
+    """
+    if r2 < r1:
+        r1, r2 = r2, r1
+    r1 = max(0.0, r1 - pad)
+    r2 = r2 + pad
+    n = max(1, math.ceil(abs(span_deg) / segment_deg))
+    step = span_deg / n
+    rects = []
+    for i in range(n):
+        a0 = start_deg + step * i
+        a1 = a0 + step
+        angles = [a0, a1]
+        # 段内经过的坐标轴方向（外接矩形的极值点）
+        lo, hi = min(a0, a1), max(a0, a1)
+        k = math.ceil(lo / 90.0)
+        while k * 90.0 < hi:
+            angles.append(k * 90.0)
+            k += 1
+        xs, ys = [], []
+        for a in angles:
+            rad = math.radians(a)
+            c, s = math.cos(rad), -math.sin(rad)
+            for r in (r1, r2):
+                xs.append(cx + r * c)
+                ys.append(cy + r * s)
+        # 径向两边的抗锯齿边缘再外扩 1px
+        x0, y0 = min(xs) - 1, min(ys) - 1
+        rects.append(QRectF(x0, y0, max(xs) + 1 - x0, max(ys) + 1 - y0))
+    return rects
@@ -11,7 +11,9 @@ from core.i18n import get_font
 from core.constants import WHEEL_VISUAL_INSET
 from models.wheel_model import WheelRingData
 from engine.hover_state_machine import HoverStateMachine
+from core.binding_plan import compile_bindings
 from scene.tooltip_item import build_edit_tooltip
+from scene.wheel_geometry import charge_band_rects, ring_path, snap_radius
 
 
 _RING_COLORS = {
@@ -36,9 +38,10 @@ class WheelRingItem(QGraphicsObject):
 
     # 信号
     doubleClicked = pyqtSignal(object)
-    hoverActivated = pyqtSignal(object)
-    hoverDeactivated = pyqtSignal(object)
-    actionTriggered = pyqtSignal(object, str, str)
+    hoverActivated = pyqtSignal(object, object)        # (data, hover BindingPlan)
+    hoverDeactivated = pyqtSignal(object, object)
+    actionTriggered = pyqtSignal(object, object, str)  # (data, BindingPlan, 'p'|'r'|'c')
+    wheelTriggered = pyqtSignal(object, object, int)  # (data, BindingPlan, 格数)
 
     def __init__(self, data: WheelRingData, cx, cy, r_inner, r_outer):
         super().__init__()
@@ -51,15 +54,16 @@ class WheelRingItem(QGraphicsObject):
         self._mode = 'edit'
         self._charge_progress = 0.0
 
+        # 编译后的按键绑定 (按键字符串只在加载/编辑保存时解析)
+        self.plans = compile_bindings(data)
+
         # 视觉半径（碰撞半径各方向缩进 VISUAL_INSET）
         self._v_inner = r_inner + WHEEL_VISUAL_INSET
         self._v_outer = r_outer - WHEEL_VISUAL_INSET
 
         # 预计算路径：碰撞路径(hit) + 视觉路径(visual)
-        self._hit_path = self._build_ring_path(r_inner, r_outer)
-        self._visual_path = self._build_ring_path(self._v_inner, self._v_outer)
-        # 充能路径缓存 (key = (r_in, charge_r))
-        self._charge_path_cache = {}
+        self._hit_path = ring_path(r_inner, r_outer).translated(cx, cy)
+        self._visual_path = ring_path(self._v_inner, self._v_outer).translated(cx, cy)
 
         self.setAcceptHoverEvents(True)
         self.setAcceptedMouseButtons(
@@ -79,20 +83,6 @@ class WheelRingItem(QGraphicsObject):
         self._hover_sm.charge_progress.connect(self._on_charge_progress)
         self._hover_sm.release_progress.connect(self._on_release_progress)
 
-    def _build_ring_path(self, r_inner, r_outer) -> QPainterPath:
-        """圆环 = 外圆 - 内圆（布尔减法）"""
-        outer = QPainterPath()
-        outer.addEllipse(
-            self._cx - r_outer, self._cy - r_outer,
-            r_outer * 2, r_outer * 2)
-
-        inner = QPainterPath()
-        inner.addEllipse(
-            self._cx - r_inner, self._cy - r_inner,
-            r_inner * 2, r_inner * 2)
-
-        return outer.subtracted(inner)
-
     def boundingRect(self) -> QRectF:
         return self._hit_path.boundingRect().adjusted(-2, -2, 2, 2)
 
@@ -112,24 +102,13 @@ class WheelRingItem(QGraphicsObject):
 
         # 充能进度 — 径向扩展（在视觉区域内从内圆向外圆扩展）
         if self._charge_progress > 0.01:
-            charge_r = self._v_inner + (self._v_outer - self._v_inner) * self._charge_progress
+            charge_r = self._charge_radius(self._charge_progress)
             r_in = self._v_inner + 2  # 略微内缩，避免覆盖内圆边框
-            cache_key = (round(r_in, 1), round(charge_r, 1))
-            charge_path = self._charge_path_cache.get(cache_key)
-            if charge_path is None:
-                charge_outer = QPainterPath()
-                charge_outer.addEllipse(
-                    self._cx - charge_r, self._cy - charge_r,
-                    charge_r * 2, charge_r * 2)
-                charge_inner = QPainterPath()
-                charge_inner.addEllipse(
-                    self._cx - r_in, self._cy - r_in,
-                    r_in * 2, r_in * 2)
-                charge_path = charge_outer.subtracted(charge_inner)
-                self._charge_path_cache[cache_key] = charge_path
             painter.setPen(Qt.PenStyle.NoPen)
             painter.setBrush(QBrush(QColor("#0284C7")))
-            painter.drawPath(charge_path)
+            painter.translate(self._cx, self._cy)
+            painter.drawPath(ring_path(r_in, charge_r))
+            painter.translate(-self._cx, -self._cy)
 
         # 中心文字: 不在场景中显示，避免遮挡视线（仍可在编辑弹窗中设定）
 
@@ -141,8 +120,24 @@ class WheelRingItem(QGraphicsObject):
 
     @chargeProgress.setter
     def chargeProgress(self, val):
-        self._charge_progress = val
-        self.update()
+        self._set_charge(val)
+
+    def _charge_radius(self, progress) -> float:
+        """充能层外半径；无充能层时为其内边界"""
+        if progress <= 0.01:
+            return self._v_inner + 2
+        # 对齐设备像素: 充能帧数有限，路径全部可缓存
+        return snap_radius(self._v_inner + (self._v_outer - self._v_inner) * progress)
+
+    def _set_charge(self, progress):
+        """更新充能进度，只重绘新旧充能半径之间的环带"""
+        old_r = self._charge_radius(self._charge_progress)
+        self._charge_progress = progress
+        new_r = self._charge_radius(progress)
+        if new_r == old_r:
+            return
+        for rect in charge_band_rects(self._cx, self._cy, old_r, new_r):
+            self.update(rect)
 
     # ── 状态 ──
 
@@ -151,6 +146,10 @@ class WheelRingItem(QGraphicsObject):
             self._visual_state = state
             self.update()
 
+    def rebuild_plans(self):
+        """按键字段被编辑后重新编译绑定"""
+        self.plans = compile_bindings(self.data)
+
     def set_mode(self, mode: str):
         self._mode = mode
         # 编辑模式持久化手型光标
@@ -169,13 +168,13 @@ class WheelRingItem(QGraphicsObject):
         if self._mode == 'run':
             btn = event.button()
             if btn == Qt.MouseButton.LeftButton and self.data.lclick:
-                self.actionTriggered.emit(self.data, self.data.lclick, 'p')
+                self.actionTriggered.emit(self.data, self.plans['lclick'], 'p')
                 self.set_visual_state('active_left')
             elif btn == Qt.MouseButton.RightButton and self.data.rclick:
-                self.actionTriggered.emit(self.data, self.data.rclick, 'p')
+                self.actionTriggered.emit(self.data, self.plans['rclick'], 'p')
                 self.set_visual_state('active_right')
             elif btn == Qt.MouseButton.MiddleButton and self.data.mclick:
-                self.actionTriggered.emit(self.data, self.data.mclick, 'p')
+                self.actionTriggered.emit(self.data, self.plans['mclick'], 'p')
                 self.set_visual_state('active_middle')
             event.accept()
         else:
@@ -184,11 +183,11 @@ class WheelRingItem(QGraphicsObject):
     def mouseReleaseEvent(self, event):
         if self._mode == 'run':
             key_map = {
-                Qt.MouseButton.LeftButton: self.data.lclick,
-                Qt.MouseButton.RightButton: self.data.rclick,
-                Qt.MouseButton.MiddleButton: self.data.mclick,
+                Qt.MouseButton.LeftButton: self.plans['lclick'],
+                Qt.MouseButton.RightButton: self.plans['rclick'],
+                Qt.MouseButton.MiddleButton: self.plans['mclick'],
             }
-            key = key_map.get(event.button(), '')
+            key = key_map.get(event.button())
             if key:
                 self.actionTriggered.emit(self.data, key, 'r')
             self.set_visual_state('hover' if self._hover_sm.is_active else 'normal')
@@ -232,10 +231,11 @@ class WheelRingItem(QGraphicsObject):
 
     # ── 滚轮 ──
 
-    def on_wheel(self, direction):
-        key = self.data.wheelup if direction == 'up' else self.data.wheeldown
+    def on_wheel(self, direction, count: int = 1):
+        """滚轮事件（count: 本帧合并后的格数）"""
+        key = self.plans['wheelup'] if direction == 'up' else self.plans['wheeldown']
         if key:
-            self.actionTriggered.emit(self.data, key, 'c')
+            self.wheelTriggered.emit(self.data, key, count)
             state = 'active_wheelup' if direction == 'up' else 'active_wheeldown'
             self.set_visual_state(state)
             QTimer.singleShot(150, lambda: self.set_visual_state(
@@ -244,21 +244,19 @@ class WheelRingItem(QGraphicsObject):
     # ── 状态机回调 ──
 
     def _on_hover_activated(self):
-        self.hoverActivated.emit(self.data)
+        self.hoverActivated.emit(self.data, self.plans['hover'])
         self._charge_progress = 0.0  # 充能完成，清除进度条
         self.set_visual_state('hover')
 
     def _on_hover_deactivated(self):
-        self.hoverDeactivated.emit(self.data)
+        self.hoverDeactivated.emit(self.data, self.plans['hover'])
         self._charge_progress = 0.0  # 释放完成，清除进度条
         self.set_visual_state('normal')
 
     def _on_charge_progress(self, progress):
         """充能进度回调 — 径向从内向外扩展 (0→1)"""
-        self._charge_progress = progress
-        self.update()
+        self._set_charge(progress)
 
     def _on_release_progress(self, progress):
         """释放倒计时进度回调 — 径向从外向内收缩 (1→0)"""
-        self._charge_progress = progress
-        self.update()
+        self._set_charge(progress)
@@ -13,7 +13,9 @@ from core.i18n import get_font
 from core.constants import WHEEL_GAP_PX, WHEEL_VISUAL_INSET
 from models.wheel_model import WheelSectorData
 from engine.hover_state_machine import HoverStateMachine
+from core.binding_plan import compile_bindings
 from scene.tooltip_item import build_edit_tooltip
+from scene.wheel_geometry import charge_band_rects, sector_path, snap_radius
 
 
 # 状态配色: (fill, border)
@@ -39,9 +41,10 @@ class WheelSectorItem(QGraphicsObject):
 
     # 信号
     doubleClicked = pyqtSignal(object)
-    hoverActivated = pyqtSignal(object)
-    hoverDeactivated = pyqtSignal(object)
-    actionTriggered = pyqtSignal(object, str, str)
+    hoverActivated = pyqtSignal(object, object)        # (data, hover BindingPlan)
+    hoverDeactivated = pyqtSignal(object, object)
+    actionTriggered = pyqtSignal(object, object, str)  # (data, BindingPlan, 'p'|'r'|'c')
+    wheelTriggered = pyqtSignal(object, object, int)  # (data, BindingPlan, 格数)
 
     def __init__(self, data: WheelSectorData, cx, cy,
                  r_inner, r_outer, start_angle, span_angle):
@@ -57,16 +60,19 @@ class WheelSectorItem(QGraphicsObject):
         self._mode = 'edit'
         self._charge_progress = 0.0
 
+        # 编译后的按键绑定 (按键字符串只在加载/编辑保存时解析)
+        self.plans = compile_bindings(data)
+
         # 视觉半径（碰撞半径各方向缩进 VISUAL_INSET）
         self._v_inner = r_inner + WHEEL_VISUAL_INSET
         self._v_outer = r_outer - WHEEL_VISUAL_INSET
 
         # 预计算路径：碰撞路径(hit, 无间隙) + 视觉路径(visual, 有间隙+缩进半径)
-        self._hit_path = self._build_sector_path(r_inner, r_outer, gap_px=0)
-        self._visual_path = self._build_sector_path(self._v_inner, self._v_outer, gap_px=WHEEL_GAP_PX)
+        self._hit_path = sector_path(
+            r_inner, r_outer, start_angle, span_angle).translated(cx, cy)
+        self._visual_path = sector_path(
+            self._v_inner, self._v_outer, start_angle, span_angle, WHEEL_GAP_PX).translated(cx, cy)
 
-        # 充能路径缓存 (key = (r_in, r_out))
-        self._charge_path_cache = {}
         # 文字 QFont 缓存
         self._text_font_cache = None
         self._text_font_name = None
@@ -88,83 +94,6 @@ class WheelSectorItem(QGraphicsObject):
         self._hover_sm.charge_progress.connect(self._on_charge_progress)
         self._hover_sm.release_progress.connect(self._on_release_progress)
 
-    @staticmethod
-    def _half_gap_angle(radius, gap_px):
-        """将像素间隔转换为该半径处的角度偏移"""
-        if radius <= 0 or gap_px <= 0:
-            return 0
-        return math.degrees(math.atan2(gap_px / 2, radius))
-
-    def _build_sector_path(self, r_inner, r_outer, gap_px=0) -> QPainterPath:
-        """构建环形扇区路径
-
-        Args:
-            r_inner: 内圆半径
-            r_outer: 外圆半径
-            gap_px: 扇面间视觉间距(像素), 0=无间隙(碰撞路径)
-        """
-        gap_outer = self._half_gap_angle(r_outer, gap_px)
-        gap_inner = self._half_gap_angle(r_inner, gap_px)
-
-        outer_start = self._start_angle + gap_outer
-        outer_span = self._span_angle - 2 * gap_outer
-        inner_start = self._start_angle + gap_inner
-        inner_span = self._span_angle - 2 * gap_inner
-
-        outer_rect = QRectF(
-            self._cx - r_outer, self._cy - r_outer,
-            r_outer * 2, r_outer * 2)
-        inner_rect = QRectF(
-            self._cx - r_inner, self._cy - r_inner,
-            r_inner * 2, r_inner * 2)
-
-        # 外弧
-        path = QPainterPath()
-        path.arcMoveTo(outer_rect, outer_start)
-        path.arcTo(outer_rect, outer_start, outer_span)
-
-        # 连接到内弧终点
-        inner_end_angle = math.radians(inner_start + inner_span)
-        ix = self._cx + r_inner * math.cos(inner_end_angle)
-        iy = self._cy - r_inner * math.sin(inner_end_angle)
-        path.lineTo(ix, iy)
-
-        # 内弧（反向）
-        path.arcTo(inner_rect, inner_start + inner_span, -inner_span)
-
-        path.closeSubpath()
-        return path
-
-    def _build_charge_path(self, r_in, r_out) -> QPainterPath:
-        """构建充能层扇区路径 — 从 r_in 到 r_out 的环形扇区（视觉间隙）"""
-        gap_outer = self._half_gap_angle(r_out, WHEEL_GAP_PX)
-        gap_inner = self._half_gap_angle(r_in, WHEEL_GAP_PX)
-
-        outer_start = self._start_angle + gap_outer
-        outer_span = self._span_angle - 2 * gap_outer
-        inner_start = self._start_angle + gap_inner
-        inner_span = self._span_angle - 2 * gap_inner
-
-        outer_rect = QRectF(
-            self._cx - r_out, self._cy - r_out,
-            r_out * 2, r_out * 2)
-        inner_rect = QRectF(
-            self._cx - r_in, self._cy - r_in,
-            r_in * 2, r_in * 2)
-
-        path = QPainterPath()
-        path.arcMoveTo(outer_rect, outer_start)
-        path.arcTo(outer_rect, outer_start, outer_span)
-
-        inner_end_angle = math.radians(inner_start + inner_span)
-        ix = self._cx + r_in * math.cos(inner_end_angle)
-        iy = self._cy - r_in * math.sin(inner_end_angle)
-        path.lineTo(ix, iy)
-
-        path.arcTo(inner_rect, inner_start + inner_span, -inner_span)
-        path.closeSubpath()
-        return path
-
     def boundingRect(self) -> QRectF:
         return self._hit_path.boundingRect().adjusted(-2, -2, 2, 2)
 
@@ -184,17 +113,14 @@ class WheelSectorItem(QGraphicsObject):
 
         # 充能进度 — 径向扩展（在视觉区域内从内圆向外圆扩展）
         if self._charge_progress > 0.01:
-            charge_r = self._v_inner + (self._v_outer - self._v_inner) * self._charge_progress
             r_in = self._v_inner + 2
-            r_out = max(self._v_inner + 3, charge_r - 2)
-            cache_key = (round(r_in, 1), round(r_out, 1))
-            charge_path = self._charge_path_cache.get(cache_key)
-            if charge_path is None:
-                charge_path = self._build_charge_path(r_in, r_out)
-                self._charge_path_cache[cache_key] = charge_path
+            r_out = self._charge_radius(self._charge_progress)
             painter.setPen(Qt.PenStyle.NoPen)
             painter.setBrush(QBrush(QColor("#0284C7")))
-            painter.drawPath(charge_path)
+            painter.translate(self._cx, self._cy)
+            painter.drawPath(sector_path(
+                r_in, r_out, self._start_angle, self._span_angle, WHEEL_GAP_PX))
+            painter.translate(-self._cx, -self._cy)
 
         # 扇面文字（沿半径方向居中 — 基于视觉半径）
         mid_angle_deg = self._start_angle + self._span_angle / 2
@@ -221,8 +147,26 @@ class WheelSectorItem(QGraphicsObject):
 
     @chargeProgress.setter
     def chargeProgress(self, val):
-        self._charge_progress = val
-        self.update()
+        self._set_charge(val)
+
+    def _charge_radius(self, progress) -> float:
+        """充能层外半径；无充能层时为其内边界"""
+        if progress <= 0.01:
+            return self._v_inner + 2
+        charge_r = self._v_inner + (self._v_outer - self._v_inner) * progress
+        # 对齐设备像素: 充能帧数有限，路径全部可缓存
+        return max(self._v_inner + 3, snap_radius(charge_r - 2))
+
+    def _set_charge(self, progress):
+        """更新充能进度，只重绘新旧充能半径之间的环带"""
+        old_r = self._charge_radius(self._charge_progress)
+        self._charge_progress = progress
+        new_r = self._charge_radius(progress)
+        if new_r == old_r:
+            return
+        for rect in charge_band_rects(self._cx, self._cy, old_r, new_r,
+                                      self._start_angle, self._span_angle):
+            self.update(rect)
 
     # ── 状态 ──
 
@@ -231,6 +175,10 @@ class WheelSectorItem(QGraphicsObject):
             self._visual_state = state
             self.update()
 
+    def rebuild_plans(self):
+        """按键字段被编辑后重新编译绑定"""
+        self.plans = compile_bindings(self.data)
+
     def set_mode(self, mode: str):
         self._mode = mode
         # 编辑模式持久化手型光标
@@ -249,13 +197,13 @@ class WheelSectorItem(QGraphicsObject):
         if self._mode == 'run':
             btn = event.button()
             if btn == Qt.MouseButton.LeftButton and self.data.lclick:
-                self.actionTriggered.emit(self.data, self.data.lclick, 'p')
+                self.actionTriggered.emit(self.data, self.plans['lclick'], 'p')
                 self.set_visual_state('active_left')
             elif btn == Qt.MouseButton.RightButton and self.data.rclick:
-                self.actionTriggered.emit(self.data, self.data.rclick, 'p')
+                self.actionTriggered.emit(self.data, self.plans['rclick'], 'p')
                 self.set_visual_state('active_right')
             elif btn == Qt.MouseButton.MiddleButton and self.data.mclick:
-                self.actionTriggered.emit(self.data, self.data.mclick, 'p')
+                self.actionTriggered.emit(self.data, self.plans['mclick'], 'p')
                 self.set_visual_state('active_middle')
             event.accept()
         else:
@@ -264,11 +212,11 @@ class WheelSectorItem(QGraphicsObject):
     def mouseReleaseEvent(self, event):
         if self._mode == 'run':
             key_map = {
-                Qt.MouseButton.LeftButton: self.data.lclick,
-                Qt.MouseButton.RightButton: self.data.rclick,
-                Qt.MouseButton.MiddleButton: self.data.mclick,
+                Qt.MouseButton.LeftButton: self.plans['lclick'],
+                Qt.MouseButton.RightButton: self.plans['rclick'],
+                Qt.MouseButton.MiddleButton: self.plans['mclick'],
             }
-            key = key_map.get(event.button(), '')
+            key = key_map.get(event.button())
             if key:
                 self.actionTriggered.emit(self.data, key, 'r')
             self.set_visual_state('hover' if self._hover_sm.is_active else 'normal')
@@ -312,10 +260,11 @@ class WheelSectorItem(QGraphicsObject):
 
     # ── 滚轮 ──
 
-    def on_wheel(self, direction):
-        key = self.data.wheelup if direction == 'up' else self.data.wheeldown
+    def on_wheel(self, direction, count: int = 1):
+        """滚轮事件（count: 本帧合并后的格数）"""
+        key = self.plans['wheelup'] if direction == 'up' else self.plans['wheeldown']
         if key:
-            self.actionTriggered.emit(self.data, key, 'c')
+            self.wheelTriggered.emit(self.data, key, count)
             state = 'active_wheelup' if direction == 'up' else 'active_wheeldown'
             self.set_visual_state(state)
             QTimer.singleShot(150, lambda: self.set_visual_state(
@@ -324,21 +273,19 @@ class WheelSectorItem(QGraphicsObject):
     # ── 状态机回调 ──
 
     def _on_hover_activated(self):
-        self.hoverActivated.emit(self.data)
+        self.hoverActivated.emit(self.data, self.plans['hover'])
         self._charge_progress = 0.0  # 充能完成，清除进度条
         self.set_visual_state('hover')
 
     def _on_hover_deactivated(self):
-        self.hoverDeactivated.emit(self.data)
+        self.hoverDeactivated.emit(self.data, self.plans['hover'])
         self._charge_progress = 0.0  # 释放完成，清除进度条
         self.set_visual_state('normal')
 
     def _on_charge_progress(self, progress):
         """充能进度回调 — 径向从内向外扩展 (0→1)"""
-        self._charge_progress = progress
-        self.update()
+        self._set_charge(progress)
 
     def _on_release_progress(self, progress):
         """释放倒计时进度回调 — 径向从外向内收缩 (1→0)"""
-        self._charge_progress = progress
-        self.update()
+        self._set_charge(progress)
@@ -0,0 +1,106 @@
+"""
+TEGG Touch - 按钮绘制基准：直接绘制 vs 按状态预渲染的精灵缓存（offscreen）
+
+用法:
+    python -m tests.bench_button_render
+
+1920×1080 透明场景，网格排布的按钮（含回中带），每帧:
+若干按钮充能进度推进、一个按钮在 hover / 各 active_* 状态间轮换，然后整帧渲染到 ARGB 图像。
+分别统计两种绘制方式的帧时间（均值 / p50 / p95 / max）与缓存命中情况。
+"""
+
+import logging
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QImage, QPainter
+from PyQt6.QtWidgets import QApplication
+
+from core.i18n import load_locale
+from scene.overlay_scene import OverlayScene
+from scene.touch_button_item import STATE_COLORS, button_sprite_cache
+
+W, H = 1920, 1080
+COLS, ROWS = 12, 6
+FRAMES = 300
+CHARGING = 6
+
+_qapp = None
+
+
+def _make_scene():
+    buttons = []
+    for r in range(ROWS):
+        for c in range(COLS):
+            buttons.append(dict(x=-900 + c * 150, y=-500 + r * 150, w=100 + 100 * (c % 2), h=100,
+                                name=f'Button {r * COLS + c}', lclick='e', hover='w',
+                                btn_type='center_band' if (r, c) == (0, 0) else 'normal'))
+    scene = OverlayScene()
+    scene.setSceneRect(0, 0, W, H)
+    scene.load_from_config({'buttons': buttons})
+    scene.set_mode('run')
+    for item in scene.button_items:
+        item.setOpacity(0.8)
+    return scene
+
+
+def _run(scene, cached):
+    cache = button_sprite_cache()
+    cache.clear()
+    cache.enabled = cached
+    items = scene.button_items
+    states = ['normal'] + list(STATE_COLORS)
+    img = QImage(W, H, QImage.Format.Format_ARGB32_Premultiplied)
+    target = QRectF(0, 0, W, H)
+    frames = []
+    for f in range(FRAMES):
+        for i in range(CHARGING):
+            items[1 + i]._on_charge_progress((f * 0.02 + i * 0.15) % 1.0)
+        items[-1].set_visual_state(states[(f // 10) % len(states)])
+        t0 = time.perf_counter()
+        img.fill(0)
+        painter = QPainter(img)
+        scene.render(painter, target, target)
+        painter.end()
+        frames.append(time.perf_counter() - t0)
+    cache.enabled = True
+    frames.sort()
+    n = len(frames)
+    return {
+        'mean': sum(frames) / n * 1e3,
+        'p50': frames[n // 2] * 1e3,
+        'p95': frames[int(n * 0.95)] * 1e3,
+        'max': frames[-1] * 1e3,
+        'stats': cache.stats(),
+    }
+
+
+def main():
+    global _qapp
+    logging.disable(logging.WARNING)  # 无 keyboard 扫描码时的绑定告警
+    _qapp = QApplication.instance() or QApplication([])
+    load_locale('en')
+    scene = _make_scene()
+    print(f"按钮绘制: {len(scene.button_items)} 个按钮，{CHARGING} 个充能中，{FRAMES} 帧 @ {W}x{H}")
+    _run(scene, True)  # 预热（字体 / 字形缓存）
+    results = {}
+    for label, cached in (('直接绘制', False), ('精灵缓存', True)):
+        r = results[label] = _run(scene, cached)
+        print(f"  {label}  mean={r['mean']:6.2f} ms  p50={r['p50']:6.2f} ms  "
+              f"p95={r['p95']:6.2f} ms  max={r['max']:6.2f} ms")
+    stats = results['精灵缓存']['stats']
+    print(f"  x{results['直接绘制']['mean'] / results['精灵缓存']['mean']:.2f}  "
+          f"精灵={stats['entries']}  命中={stats['hits']}  未命中={stats['misses']}  "
+          f"内存={stats['bytes'] / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
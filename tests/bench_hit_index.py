@@ -0,0 +1,81 @@
+"""
+TEGG Touch - 命中检测基准：QGraphicsScene.itemAt vs 布局编译的 HitIndex
+
+用法:
+    python -m tests.bench_hit_index
+
+1920×1080 场景，各轮盘模式 + 若干按钮，随机光标点（一半集中在轮盘附近），
+先校验两种方法结果一致（跳过弧线近似误差范围内的边界点），再分别计时。
+"""
+
+import logging
+import os
+import random
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QTransform
+
+from tests.test_hit_index import W, H, _app, _make_scene, _near_wheel_edge
+
+POINTS = 20000
+
+
+def _points(seed):
+    rng = random.Random(seed)
+    pts = []
+    for _ in range(POINTS):
+        if rng.random() < 0.5:
+            pts.append((W / 2 + rng.uniform(-420, 420), H / 2 + rng.uniform(-420, 420)))
+        else:
+            pts.append((float(round(rng.uniform(0, W))), float(round(rng.uniform(0, H)))))
+    return pts
+
+
+def _bench(wheel_mode):
+    scene = _make_scene(wheel_mode)
+    pts = _points(wheel_mode)
+    transform = QTransform()
+    qpts = [QPointF(x, y) for x, y in pts]
+
+    t0 = time.perf_counter()
+    index = scene.hit_index()
+    build = time.perf_counter() - t0
+
+    mismatches = sum(1 for (x, y), q in zip(pts, qpts)
+                     if not _near_wheel_edge(scene, x, y)
+                     and index.item_at(x, y) is not scene.itemAt(q, transform))
+
+    t0 = time.perf_counter()
+    for q in qpts:
+        scene.itemAt(q, transform)
+    t_qt = time.perf_counter() - t0
+
+    item_at = index.item_at
+    t0 = time.perf_counter()
+    for x, y in pts:
+        item_at(x, y)
+    t_idx = time.perf_counter() - t0
+
+    print(f"  {wheel_mode:<7} itemAt={t_qt / POINTS * 1e6:6.2f} us  "
+          f"index={t_idx / POINTS * 1e6:6.2f} us  x{t_qt / t_idx:5.1f}  "
+          f"build={build * 1e3:.2f} ms  entries={index.entry_count}  mismatches={mismatches}")
+
+
+def main():
+    logging.disable(logging.WARNING)  # 无 keyboard 扫描码时的绑定告警
+    _app()
+    print(f"命中检测: {POINTS} 点 / 模式")
+    for mode in ('small', 'large', 'double', 'dual'):
+        _bench(mode)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+TEGG Touch - 批量注入基准：逐键提交 vs 整批提交
+
+用法:
+    python -m tests.bench_input_batch
+
+使用内存记录后端统计"系统调用"次数（批次数）与构建开销，
+模拟一圈轮盘扇区切换（每个扇区释放旧键 + 按下新键）。
+"""
+
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core import input_engine
+from core.constants import WHEEL_SECTORS_DEF
+from core.input_backend import RecordingBackend, set_backend
+
+_SCAN = {'shift': 42, 'w': 17, 'a': 30, 's': 31, 'd': 32}
+ROUNDS = 2000
+
+
+def _per_key(keys, action):
+    """旧路径: 每个键单独提交一次"""
+    for sc, ext in input_engine._resolve_keys(keys):
+        input_engine.send_events([input_engine.key_event(sc, ext, up=(action == 'r'))])
+
+
+def _run(label, fn):
+    backend = RecordingBackend()
+    set_backend(backend)
+    sectors = [s['hover'] for s in WHEEL_SECTORS_DEF]
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        prev = sectors[-1]
+        for cur in sectors:
+            fn(prev, 'r')
+            fn(cur, 'p')
+            prev = cur
+    dt = time.perf_counter() - t0
+    n_trans = ROUNDS * len(sectors)
+    print(f"  {label:<10} batches/transition={backend.batches / n_trans:.2f}  "
+          f"events={len(backend.records)}  {dt / n_trans * 1e6:.2f} us/transition")
+    input_engine._pressed_keys.clear()
+
+
+def main():
+    input_engine.get_scan_code = lambda k: _SCAN.get(k, 0)
+    print(f"轮盘一圈扇区切换 × {ROUNDS}")
+    _run('per-key', _per_key)
+    _run('batched', input_engine.trigger)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+TEGG Touch - 宏定时抖动基准：每次执行一个线程 + time.sleep vs 单线程调度器
+
+用法:
+    python -m tests.bench_macro_jitter [--macros N] [--steps N] [--delay-ms N]
+
+N 个宏同时执行，每个宏 steps 个"按键 + 延迟"步骤；统计每个按键步骤
+相对计划时刻（起点 + 前面所有延迟之和）的滞后 (µs)，以及线程数。
+  thread-sleep  旧实现: 每次执行一个线程，延迟用 time.sleep（误差逐步累积）
+  sched-nospin  调度器，只用条件变量等待（spin_sec=0）
+  sched-spin    调度器，截止前最后 1ms 忙等（默认配置）
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.constants import MACRO_SPIN_SEC
+from core.macro_compiler import macro_program
+from core.macro_scheduler import MacroScheduler
+
+
+def _steps(n, delay_ms):
+    return [s for _ in range(n) for s in ({'key': 'w', 'action': 'press'},
+                                          {'type': 'delay', 'ms': delay_ms})]
+
+
+def _summary(lateness):
+    s = sorted(lateness)
+    n = len(s)
+    return {
+        'count': n,
+        'mean_us': sum(s) / n * 1e6,
+        'p50_us': s[n // 2] * 1e6,
+        'p99_us': s[min(n - 1, int(n * 0.99))] * 1e6,
+        'max_us': s[-1] * 1e6,
+    }
+
+
+def _thread_sleep(macros, steps, delay_ms):
+    """旧实现的等价物: 每个宏一个线程，按键后 sleep"""
+    lateness, lock = [], threading.Lock()
+    start = time.perf_counter()
+    peak = threading.active_count()
+
+    def _run():
+        planned = start
+        for _ in range(steps):
+            now = time.perf_counter()
+            with lock:
+                lateness.append(max(0.0, now - planned))
+            time.sleep(delay_ms / 1000.0)
+            planned += delay_ms / 1000.0
+
+    threads = [threading.Thread(target=_run, daemon=True) for _ in range(macros)]
+    for t in threads:
+        t.start()
+    peak = max(peak, threading.active_count())
+    for t in threads:
+        t.join()
+    return _summary(lateness), peak - 1
+
+
+def _scheduler(macros, steps, delay_ms, spin_sec):
+    done = threading.Semaphore(0)
+    remaining = [macros * steps]
+    lock = threading.Lock()
+
+    def execute(keys, action, source):
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.release()
+
+    sched = MacroScheduler(execute, max_concurrent=macros, spin_sec=spin_sec)
+    program = macro_program(_steps(steps, delay_ms))
+    base = threading.active_count()
+    for i in range(macros):
+        sched.submit(f'm{i}', program)
+    peak = threading.active_count() - base
+    done.acquire()
+    stats = sched.jitter_stats()
+    sched.shutdown()
+    return stats, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--macros', type=int, default=8, help='同时执行的宏数量')
+    parser.add_argument('--steps', type=int, default=50, help='每个宏的步骤数')
+    parser.add_argument('--delay-ms', type=float, default=5.0, help='每步延迟')
+    args = parser.parse_args()
+
+    print(f"{args.macros} 个宏 × {args.steps} 步，每步延迟 {args.delay_ms}ms")
+    print(f"{'variant':<14}{'threads':>8}{'steps':>7}{'mean us':>10}{'p50 us':>10}"
+          f"{'p99 us':>10}{'max us':>10}")
+    runs = (
+        ('thread-sleep', lambda: _thread_sleep(args.macros, args.steps, args.delay_ms)),
+        ('sched-nospin', lambda: _scheduler(args.macros, args.steps, args.delay_ms, 0.0)),
+        ('sched-spin', lambda: _scheduler(args.macros, args.steps, args.delay_ms, MACRO_SPIN_SEC)),
+    )
+    for name, fn in runs:
+        s, threads = fn()
+        print(f"{name:<14}{threads:>8}{s['count']:>7}{s['mean_us']:>10.1f}{s['p50_us']:>10.1f}"
+              f"{s['p99_us']:>10.1f}{s['max_us']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
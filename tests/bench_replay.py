@@ -0,0 +1,109 @@
+"""
+TEGG Touch - 运行模式吞吐基准：确定性回放下的节拍速率与每拍耗时
+
+用法:
+    python -m tests.bench_replay [--mode poll|hook|both] [--seconds N]
+
+场景（虚拟时钟，输入流固定种子，结果可复现；耗时为真实 CPU 时间）:
+  buttons       默认配置（11 个按钮）随机游走: 移动 / 点击 / 滚轮 / 侧键
+  wheel-<mode>  small / large / double / dual 轮盘: 环带扫掠 + 随机游走
+  grid-<n>      n 个 60×60 按钮的密集网格随机游走
+
+sig/s 列: 状态信号（auto_center_progress）每秒报告次数（= 逐帧发出时的次数）
+与变化检测后实际发出的次数；--auto-center 打开自动回中倒计时。
+
+hook 模式的每拍耗时只含 GUI 线程节拍（快捷键 / 自动回中 / 快照检查），命中与注入在输入线程。
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from tests.replay import (
+    DEFAULT_PROFILE, ReplayHarness, random_walk_stream, wheel_sweep_stream,
+)
+
+W, H = 2560, 1440
+GRID_SIZES = (100, 400)
+
+
+def _default_profile():
+    with open(DEFAULT_PROFILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _wheel_profile(wheel_mode):
+    config = _default_profile()
+    config['wheel_visible'] = True
+    config['wheel_mode'] = wheel_mode
+    return config
+
+
+def _grid_profile(n):
+    """n 个按钮铺满屏幕中部（中心坐标系），hover 键循环使用 WASD 组合"""
+    keys = ('w', 'a', 's', 'd', 'w+a', 'w+d', 'a+s', 's+d', 'shift+w', 'space')
+    cols = int(n ** 0.5 * W / H) or 1
+    rows = (n + cols - 1) // cols
+    size, gap = 60, 4
+    x0 = -cols * (size + gap) // 2
+    y0 = -rows * (size + gap) // 2
+    return {
+        'geometry': f'{W}x{H}+0+0',
+        'buttons': [
+            dict(x=x0 + (i % cols) * (size + gap), y=y0 + (i // cols) * (size + gap),
+                 w=size, h=size, name=str(i), hover=keys[i % len(keys)],
+                 hover_delay=0 if i % 3 else 150, lclick='e', wheelup='q', wheeldown='z')
+            for i in range(n)
+        ],
+    }
+
+
+def _scenarios():
+    yield 'buttons', _default_profile(), False
+    for mode in ('small', 'large', 'double', 'dual'):
+        yield f'wheel-{mode}', _wheel_profile(mode), True
+    for n in GRID_SIZES:
+        yield f'grid-{n}', _grid_profile(n), False
+
+
+def _run(profile, mode, sweep, seconds, auto_center=False):
+    with ReplayHarness(profile, mode=mode, size=(W, H), auto_center=auto_center) as h:
+        stream = wheel_sweep_stream(h.items) if sweep else []
+        t0 = stream[-1].t + 0.1 if stream else 0.0
+        walk = random_walk_stream(h.items, seconds, seed=1)
+        stream += [e._replace(t=e.t + t0) for e in walk]
+        return h.run(stream), len(h.items)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=('poll', 'hook', 'both'), default='both')
+    parser.add_argument('--seconds', type=float, default=20.0, help='随机游走的虚拟时长')
+    parser.add_argument('--auto-center', action='store_true', help='打开自动回中')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    modes = ('poll', 'hook') if args.mode == 'both' else (args.mode,)
+
+    print(f"{'scenario':<14}{'mode':<6}{'items':>6}{'virt s':>8}{'ticks/s':>9}"
+          f"{'mean us':>9}{'p50 us':>8}{'p99 us':>9}{'cpu ms/s':>10}{'events':>8}{'batches':>8}"
+          f"{'sig/s':>16}")
+    for name, profile, sweep in _scenarios():
+        for mode in modes:
+            result, n_items = _run(profile, mode, sweep, args.seconds, args.auto_center)
+            s = result.summary()
+            print(f"{name:<14}{mode:<6}{n_items:>6}{s['duration_s']:>8.1f}{s['ticks_per_sec']:>9.1f}"
+                  f"{s['tick_mean_us']:>9.1f}{s['tick_p50_us']:>8.1f}{s['tick_p99_us']:>9.1f}"
+                  f"{s['cpu_ms_per_sec']:>10.2f}{s['injected']:>8}{s['batches']:>8}"
+                  f"{s['signals_offered_per_sec']:>9.1f}->{s['signals_emitted_per_sec']:<5.1f}")
+
+
+if __name__ == '__main__':
+    main()
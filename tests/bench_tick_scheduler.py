@@ -0,0 +1,166 @@
+"""
+TEGG Touch - 自适应节拍回放基准：固定 8ms vs 自适应（轮询 / 事件驱动）
+
+用法:
+    python -m tests.bench_tick_scheduler
+
+虚拟时钟下回放 60s 会话（长时间静止 + 间歇移动），真实 RunController + 内存记录后端。
+对比三种配置的节拍次数、每秒节拍耗时、以及静止后首次移动到帧快照反映新坐标的延迟:
+  fixed      轮询，固定 UPDATE_INTERVAL（改动前的行为）
+  adaptive   轮询，自适应降频（无唤醒源）
+  hook       事件驱动，自适应降频 + 钩子即时唤醒
+"""
+
+import logging
+import os
+import random
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication, QGraphicsView
+
+from core import input_engine
+from core.constants import UPDATE_INTERVAL
+from core.input_backend import RecordingBackend, set_backend
+from engine import run_controller
+from engine.run_controller import RunController
+from scene.overlay_scene import OverlayScene
+
+SESSION_SEC = 60.0
+MOVE_STEP_SEC = 0.004  # 移动时每 4ms 一个新坐标
+
+_qapp = None
+
+
+def _session(seed):
+    """[(t, x, y)] 光标变化序列，及每段移动的起点时刻"""
+    rng = random.Random(seed)
+    t, x, y = 0.0, 600, 400
+    changes, onsets = [], []
+    while t < SESSION_SEC:
+        t += rng.uniform(0.8, 4.0)          # 静止
+        onsets.append(t)
+        end = t + rng.uniform(0.05, 0.6)    # 移动
+        while t < end:
+            x = min(1200, max(0, x + rng.randint(-20, 20)))
+            y = min(780, max(0, y + rng.randint(-20, 20)))
+            changes.append((t, x, y))
+            t += MOVE_STEP_SEC
+    return changes, onsets
+
+
+def _setup():
+    global _qapp
+    _qapp = QApplication.instance() or QApplication([])
+    run_controller.is_key_pressed = lambda k: False
+    scene = OverlayScene()
+    scene.setSceneRect(0, 0, 1280, 800)
+    scene.load_from_config({'buttons': [
+        dict(x=-600 + 120 * i, y=-300 + 120 * j, w=100, h=100, hover="w", hover_delay=0)
+        for i in range(10) for j in range(5)
+    ]})
+    scene.set_mode('run')
+    view = QGraphicsView(scene)
+    view.setFrameShape(QGraphicsView.Shape.NoFrame)
+    view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    view.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+    view.setGeometry(0, 0, 1280, 800)
+    view.show()
+    _qapp.processEvents()
+    return scene, view
+
+
+def _replay(view, config, changes, onsets):
+    rec = RecordingBackend()
+    old = set_backend(rec)
+    if config == 'hook':
+        input_engine.install_wheel_hook()
+    ctl = RunController(view.scene(), view)
+    now = [0.0]
+    frames = []
+    ctl.frame_ready.connect(lambda f: frames.append((now[0], f.x, f.y)))
+    ctl.start()
+    ctl._timer.stop()  # 由虚拟时钟驱动
+    sched = ctl._scheduler
+    if config == 'fixed':
+        sched.configure(UPDATE_INTERVAL, UPDATE_INTERVAL)
+    sched._clock = lambda: now[0]
+    sched.reset(0.0)
+
+    origin = view.mapToGlobal(view.mapFromScene(0, 0))
+    ox, oy = origin.x(), origin.y()
+    rec.move_cursor(ox + 600, oy + 400)
+
+    ticks = 0
+    cost_ns = 0
+    next_tick = 0.0
+    i = 0
+    while next_tick < SESSION_SEC + 1.0:
+        if i < len(changes) and changes[i][0] < next_tick:
+            now[0], x, y = changes[i]
+            rec.move_cursor(ox + x, oy + y)
+            if config == 'hook':
+                rec.feed_mouse_hook(input_engine.WM_MOUSEMOVE, ox + x, oy + y)
+                if ctl._input_loop is not None:
+                    ctl._input_loop.sync()  # 输入线程处理完，帧快照已排队
+                _qapp.processEvents()  # 钩子唤醒 / 帧快照（QueuedConnection）
+            i += 1
+            continue
+        now[0] = next_tick
+        t0 = time.perf_counter_ns()
+        ctl._tick()
+        cost_ns += time.perf_counter_ns() - t0
+        ticks += 1
+        next_tick += ctl._timer.interval() / 1000.0
+        input_engine.get_dispatcher().flush()
+
+    # 首次移动延迟: 起点 → 第一个坐标不同于起点前位置的帧
+    lat = []
+    before = {}
+    prev = (600, 400)
+    for t, x, y in changes:
+        before[t] = prev
+        prev = (x, y)
+    for onset in onsets:
+        if onset not in before:
+            continue
+        still = before[onset]
+        for t, x, y in frames:
+            if t >= onset and (x - ox, y - oy) != still:
+                lat.append((t - onset) * 1000.0)
+                break
+
+    ctl.stop()
+    input_engine.uninstall_wheel_hook()
+    set_backend(old)
+    return ticks, cost_ns, lat
+
+
+def main():
+    logging.disable(logging.WARNING)
+    _, view = _setup()
+    changes, onsets = _session(7)
+    print(f"session {SESSION_SEC:.0f}s, {len(onsets)} motion onsets, {len(changes)} cursor samples")
+    print(f"{'config':<10}{'ticks':>8}{'ticks/s':>9}{'cpu ms/s':>10}"
+          f"{'first-move mean':>17}{'p95':>8}{'max':>8}  (ms)")
+    for config in ('fixed', 'adaptive', 'hook'):
+        ticks, cost_ns, lat = _replay(view, config, changes, onsets)
+        lat.sort()
+        mean = sum(lat) / len(lat) if lat else 0.0
+        p95 = lat[int(0.95 * (len(lat) - 1))] if lat else 0.0
+        mx = lat[-1] if lat else 0.0
+        print(f"{config:<10}{ticks:>8}{ticks / SESSION_SEC:>9.1f}"
+              f"{cost_ns / 1e6 / SESSION_SEC:>10.2f}{mean:>17.2f}{p95:>8.2f}{mx:>8.2f}")
+    view.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+TEGG Touch - 轮盘滑动基准：先释放后按下 vs 对称差交接
+
+用法:
+    python -m tests.bench_wheel_sweep
+
+用一条合成的光标轨迹（单环一圈 + 双轮盘内/外圈各一圈 + 每个方向内外往返）
+模拟 hover 在扇区间滑动，统计注入的事件数与批次数:
+  release+press: 旧路径，旧扇区全部释放、新扇区全部按下
+  handoff:       handoff_owned，只注入两组键的对称差
+"""
+
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core import input_engine
+from core.binding_plan import compile_binding
+from core.constants import (
+    WHEEL_SECTORS_DEF, WHEEL_DUAL_INNER_SECTOR_INNER, WHEEL_DUAL_OUTER_SECTOR_INNER,
+    WHEEL_DUAL_OUTER_SECTOR_OUTER, default_wheel_outer_sectors,
+)
+from core.input_backend import RecordingBackend, set_backend
+
+_SCAN = {'shift': 42, 'w': 17, 'a': 30, 's': 31, 'd': 32}
+ROUNDS = 200
+STEP_DEG = 0.5
+
+_INNER = [s['hover'] for s in WHEEL_SECTORS_DEF]
+_OUTER = [s['hover'] for s in default_wheel_outer_sectors()]
+
+
+def _sector_at(angle_deg: float, radius: float):
+    """轨迹点 → 扇区绑定（角度按 tkinter 约定: 0°=右，逆时针）"""
+    if radius < WHEEL_DUAL_INNER_SECTOR_INNER or radius >= WHEEL_DUAL_OUTER_SECTOR_OUTER:
+        return None
+    idx = round((angle_deg - WHEEL_SECTORS_DEF[0]['angle']) / 45.0) % 8
+    return (_OUTER if radius >= WHEEL_DUAL_OUTER_SECTOR_INNER else _INNER)[idx]
+
+
+def _trace():
+    """合成轨迹: [(angle, radius), ...]"""
+    r_in = (WHEEL_DUAL_INNER_SECTOR_INNER + WHEEL_DUAL_OUTER_SECTOR_INNER) / 2
+    r_out = (WHEEL_DUAL_OUTER_SECTOR_INNER + WHEEL_DUAL_OUTER_SECTOR_OUTER) / 2
+    pts = []
+    n = int(360 / STEP_DEG)
+    for r in (r_in, r_out):
+        pts += [(i * STEP_DEG, r) for i in range(n)]
+    for s in WHEEL_SECTORS_DEF:  # 每个方向内外往返（共享 shift 以外的键）
+        pts += [(s['angle'], r_in), (s['angle'], r_out), (s['angle'], r_in)]
+    return pts
+
+
+def _transitions():
+    """轨迹 → 相邻 hover 交接序列 [(old_binding, new_binding)]"""
+    out, prev = [], None
+    for angle, radius in _trace():
+        cur = _sector_at(angle, radius)
+        if cur != prev:
+            out.append((prev, cur))
+            prev = cur
+    if prev is not None:
+        out.append((prev, None))  # 离开轮盘，保证每轮结束时没有残留按键
+    return out
+
+
+def _release_press(i, old, new):
+    if old:
+        p = compile_binding(old)
+        input_engine.trigger_events(p.press, p.release, 'r')
+    if new:
+        p = compile_binding(new)
+        input_engine.trigger_events(p.press, p.release, 'p')
+
+
+def _handoff(i, old, new):
+    o = compile_binding(old) if old else None
+    n = compile_binding(new) if new else None
+    if o and n:
+        input_engine.handoff_owned(('hover', i - 1), o.press, o.release, ('hover', i), n.press)
+    elif o:
+        input_engine.release_owned(('hover', i - 1), o.press, o.release)
+    elif n:
+        input_engine.press_owned(('hover', i), n.press)
+
+
+def _run(label, fn, transitions):
+    backend = RecordingBackend()
+    set_backend(backend)
+    t0 = time.perf_counter()
+    for _ in range(ROUNDS):
+        for i, (old, new) in enumerate(transitions):
+            fn(i, old, new)
+    dt = time.perf_counter() - t0
+    input_engine.release_all_keys()
+    n = ROUNDS * len(transitions)
+    events = len(backend.records)
+    print(f"  {label:<14} events/transition={events / n:.2f}  "
+          f"batches/transition={backend.batches / n:.2f}  {dt / n * 1e6:.2f} us/transition")
+    return events
+
+
+def main():
+    input_engine.get_scan_code = lambda k: _SCAN.get(k, 0)
+    transitions = _transitions()
+    print(f"轮盘滑动轨迹: {len(_trace())} 点, {len(transitions)} 次交接 × {ROUNDS}")
+    before = _run('release+press', _release_press, transitions)
+    after = _run('handoff', _handoff, transitions)
+    print(f"  注入事件减少 {100.0 * (before - after) / before:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,541 @@
+"""
+TEGG Touch - 运行模式确定性回放（虚拟时钟 + 内存记录后端 + Qt offscreen）
+
+加载配置 → 构建运行模式场景 → 按虚拟时钟回放光标 / 按键 / 滚轮 / 侧键输入流，
+记录每一条注入事件；输出节拍统计（ticks/s、每拍耗时）与可与 golden 文件逐行对比的事件轨迹。
+
+输入流（每行一个事件；时间为毫秒，坐标为场景坐标；# 开头为注释）:
+    0      move 960 540
+    120    down left
+    180    up left
+    200    wheel 120
+按键名: left / right / middle / x1 / x2
+
+虚拟化:
+  - 节拍: RunController 的 QTimer 停用，按 AdaptiveTickScheduler 给出的间隔在虚拟时间推进
+  - 点击释放: 全局定时服务换成非线程版本，到期时 run_due
+  - hover 充能 / 释放: 全局动画时钟换成虚拟时钟上的版本，到期 / 下一帧时 step
+  - 自动回中 / 快捷键防抖: run_controller 的 time.time() 取虚拟时间
+  - 扫描码: 固定映射表（不依赖 keyboard 库与键盘布局）
+  - 点击按住时长: 固定种子的随机数
+  - 宏: 调度器换成非线程版本，步骤到期时 run_due
+
+用法:
+    from tests.replay import ReplayHarness, load_stream
+    with ReplayHarness('profile.json') as h:
+        result = h.run(load_stream('session.txt'))
+    print(result.summary())
+"""
+
+import copy
+import difflib
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from typing import NamedTuple
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from core import input_engine
+from core.binding_plan import clear_plan_cache
+from core.hover_core import AnimationClock
+from core.input_backend import RecordingBackend, INPUT_KEYBOARD, set_backend
+from core.macro_scheduler import MacroScheduler
+from core.timer_service import TimerService, set_timer_service
+
+DEFAULT_PROFILE = os.path.join(project_root, 'core', 'default_profile.json')
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+TAIL_SEC = 0.5          # 最后一个输入事件之后继续回放的时长
+
+_qapp = None
+
+
+# ─── 输入流 ─────────────────────────────────────────────────
+
+class ReplayEvent(NamedTuple):
+    t: float      # 虚拟时间 (秒)
+    kind: str     # move / down / up / wheel
+    args: tuple   # move: (x, y)；down / up: (按键名,)；wheel: (delta,)
+
+
+# 按键名 → (VK, 钩子按下消息, 钩子抬起消息, mouseData)
+_BUTTONS = {
+    'left': (0x01, input_engine.WM_LBUTTONDOWN, input_engine.WM_LBUTTONUP, 0),
+    'right': (0x02, input_engine.WM_RBUTTONDOWN, input_engine.WM_RBUTTONUP, 0),
+    'middle': (0x04, input_engine.WM_MBUTTONDOWN, input_engine.WM_MBUTTONUP, 0),
+    'x1': (0x05, input_engine.WM_XBUTTONDOWN, input_engine.WM_XBUTTONUP, 1 << 16),
+    'x2': (0x06, input_engine.WM_XBUTTONDOWN, input_engine.WM_XBUTTONUP, 2 << 16),
+}
+
+
+def parse_stream(text: str) -> list:
+    """文本 → [ReplayEvent]（按时间稳定排序）"""
+    events = []
+    for lineno, line in enumerate(text.splitlines(), 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        parts = line.split()
+        t, kind, rest = float(parts[0]) / 1000.0, parts[1], parts[2:]
+        if kind == 'move':
+            args = (float(rest[0]), float(rest[1]))
+        elif kind in ('down', 'up'):
+            if rest[0] not in _BUTTONS:
+                raise ValueError(f"第 {lineno} 行: 未知按键 '{rest[0]}'")
+            args = (rest[0],)
+        elif kind == 'wheel':
+            args = (int(rest[0]),)
+        else:
+            raise ValueError(f"第 {lineno} 行: 未知事件 '{kind}'")
+        events.append(ReplayEvent(t, kind, args))
+    events.sort(key=lambda e: e.t)
+    return events
+
+
+def format_stream(events) -> str:
+    """[ReplayEvent] → 文本（parse_stream 的逆操作）"""
+    lines = []
+    for ev in events:
+        args = ' '.join(f'{a:g}' if isinstance(a, float) else str(a) for a in ev.args)
+        lines.append(f'{ev.t * 1000.0:g} {ev.kind} {args}')
+    return '\n'.join(lines) + '\n'
+
+
+def load_stream(path: str) -> list:
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_stream(f.read())
+
+
+def wheel_sweep_stream(items, step_deg: float = 5.0, dt: float = 0.05, t0: float = 0.0) -> list:
+    """合成输入流: 在每个轮盘环带（扇区 / 圆环）的中线上各绕一圈，最后回到轮盘外
+
+    默认每个 45° 扇区停留约 450ms，超过默认 hover_delay (200ms)，每个扇区都会激活。
+    """
+    import math
+    bands = sorted({(item._cx, item._cy, (item._r_inner + item._r_outer) / 2)
+                    for item in items if hasattr(item, '_r_inner') and item.isVisible()},
+                   key=lambda b: b[2])
+    events, t = [], t0
+    for cx, cy, r in bands:
+        for i in range(int(round(360 / step_deg)) + 1):
+            a = math.radians(i * step_deg + step_deg / 2)
+            events.append(ReplayEvent(t, 'move', (round(cx + r * math.cos(a), 1),
+                                                  round(cy - r * math.sin(a), 1))))
+            t += dt
+    if bands:
+        events.append(ReplayEvent(t, 'move', (10.0, 10.0)))
+    return events
+
+
+def random_walk_stream(items, duration: float, seed: int = 0, dt: float = 0.008) -> list:
+    """合成输入流: 在随机可见交互 Item 之间移动，到达后随机停留 / 点击 / 滚轮 / 侧键"""
+    rng = random.Random(seed)
+    targets = [item.sceneBoundingRect().center() for item in items if item.isVisible()]
+    events, t = [], 0.0
+    x, y = 10.0, 10.0
+    while t < duration and targets:
+        p = rng.choice(targets)
+        steps = rng.randint(3, 12)
+        for k in range(1, steps + 1):
+            events.append(ReplayEvent(t, 'move', (round(x + (p.x() - x) * k / steps, 1),
+                                                  round(y + (p.y() - y) * k / steps, 1))))
+            t += dt
+        x, y = p.x(), p.y()
+        action = rng.random()
+        if action < 0.3:
+            button = rng.choice(('left', 'right', 'middle', 'x1', 'x2'))
+            events.append(ReplayEvent(t, 'down', (button,)))
+            t += rng.uniform(0.02, 0.15)
+            events.append(ReplayEvent(t, 'up', (button,)))
+        elif action < 0.45:
+            for _ in range(rng.randint(1, 4)):
+                events.append(ReplayEvent(t, 'wheel', (rng.choice((120, -120, 60, -60)),)))
+                t += 0.004
+        t += rng.uniform(0.0, 0.6)
+    return events
+
+
+# ─── 固定扫描码 ─────────────────────────────────────────────
+
+_SCAN_CODES = {
+    'esc': 1, 'backspace': 14, 'tab': 15, 'enter': 28, 'space': 57, 'caps lock': 58,
+    'ctrl': 29, 'left ctrl': 29, 'shift': 42, 'left shift': 42, 'right shift': 54,
+    'alt': 56, 'left alt': 56, '-': 12, '=': 13,
+    'up': 72, 'left': 75, 'right': 77, 'down': 80,
+    'f11': 87, 'f12': 88,
+}
+_SCAN_CODES.update({c: 16 + i for i, c in enumerate('qwertyuiop')})
+_SCAN_CODES.update({c: 30 + i for i, c in enumerate('asdfghjkl')})
+_SCAN_CODES.update({c: 44 + i for i, c in enumerate('zxcvbnm')})
+_SCAN_CODES.update({str(d): 2 + (d - 1) % 10 for d in range(10)})
+_SCAN_CODES.update({f'f{n}': 58 + n for n in range(1, 11)})
+
+
+class _ScanTable:
+    """按键名 → 扫描码（未列出的键按名字哈希到 0x100 以上），并可反查名字写进轨迹"""
+
+    def __init__(self):
+        self._names = {}
+
+    def __call__(self, name: str) -> int:
+        name = name.lower()
+        code = _SCAN_CODES.get(name)
+        if code is None:
+            code = 0x100 + zlib.crc32(name.encode('utf-8')) % 0x6F00
+        self._names.setdefault(code, name)
+        return code
+
+    def name(self, code: int) -> str:
+        return self._names.get(code, f'sc{code}')
+
+
+class _VirtualTime:
+    """替换 run_controller 的 time 模块: time() 取虚拟时间，其余照常（节拍耗时仍是真实耗时）"""
+
+    def __init__(self, clock):
+        self._clock = clock
+
+    def time(self):
+        return self._clock()
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+# ─── 回放结果 ───────────────────────────────────────────────
+
+class ReplayResult:
+    """一次回放: 节拍统计 + 注入事件轨迹"""
+
+    def __init__(self, duration, tick_costs_ns, trace, injected, batches, signals=None):
+        self.duration = duration            # 虚拟时长 (秒)
+        self.tick_costs_ns = tick_costs_ns  # 每拍真实耗时 (ns)
+        self.trace = trace                  # ['时刻 ms  批次  事件', ...]
+        self.injected = injected            # 注入事件总数
+        self.batches = batches              # 注入批次（系统调用）总数
+        self.signals = signals or {}        # 状态信号: 名字 → 累计报告 / 发出次数
+
+    @property
+    def ticks(self) -> int:
+        return len(self.tick_costs_ns)
+
+    @property
+    def ticks_per_sec(self) -> float:
+        return self.ticks / self.duration if self.duration > 0 else 0.0
+
+    def cost_us(self, q: float) -> float:
+        """每拍耗时的分位数 (微秒)"""
+        if not self.tick_costs_ns:
+            return 0.0
+        costs = sorted(self.tick_costs_ns)
+        return costs[min(len(costs) - 1, int(q * len(costs)))] / 1000.0
+
+    def signal_rate(self, field: str) -> float:
+        """状态信号（auto_center_progress）每虚拟秒的 报告 / 发出 次数"""
+        total = sum(s[field] for s in self.signals.values())
+        return total / self.duration if self.duration > 0 else 0.0
+
+    def summary(self) -> dict:
+        costs = self.tick_costs_ns
+        return {
+            'duration_s': self.duration,
+            'ticks': self.ticks,
+            'ticks_per_sec': self.ticks_per_sec,
+            'tick_mean_us': sum(costs) / len(costs) / 1000.0 if costs else 0.0,
+            'tick_p50_us': self.cost_us(0.5),
+            'tick_p99_us': self.cost_us(0.99),
+            'cpu_ms_per_sec': sum(costs) / 1e6 / self.duration if self.duration > 0 else 0.0,
+            'injected': self.injected,
+            'batches': self.batches,
+            'signals_offered_per_sec': self.signal_rate('offered'),
+            'signals_emitted_per_sec': self.signal_rate('emitted'),
+        }
+
+    def trace_text(self) -> str:
+        return '\n'.join(self.trace) + '\n'
+
+
+def golden_diff(name: str, result: ReplayResult, update: bool = None) -> str:
+    """与 tests/golden/<name>.trace 对比，返回 unified diff（一致时为空串）。
+
+    update 为真（默认取环境变量 TEGG_UPDATE_GOLDEN）时改写 golden 文件。
+    """
+    if update is None:
+        update = bool(os.environ.get('TEGG_UPDATE_GOLDEN'))
+    path = os.path.join(GOLDEN_DIR, f'{name}.trace')
+    actual = result.trace_text()
+    if update or not os.path.exists(path):
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(actual)
+        return ''
+    with open(path, 'r', encoding='utf-8') as f:
+        expected = f.read()
+    if expected == actual:
+        return ''
+    return ''.join(difflib.unified_diff(
+        expected.splitlines(True), actual.splitlines(True),
+        fromfile=f'golden/{name}.trace', tofile='replay'))
+
+
+# ─── 回放框架 ───────────────────────────────────────────────
+
+class ReplayHarness:
+    """构建场景 + RunController，在虚拟时钟下回放输入流
+
+    mode: 'poll' — 轮询光标 / 键状态（无钩子）
+          'hook' — 事件驱动（低级钩子 + 输入线程），每个输入事件后等待输入线程处理完
+    """
+
+    def __init__(self, profile=None, mode: str = 'poll', size=None, auto_center: bool = False,
+                 seed: int = 0):
+        global _qapp
+        from PyQt6.QtCore import Qt
+        from PyQt6.QtWidgets import QApplication, QGraphicsView
+        from engine import run_controller
+        from engine.hover_state_machine import set_animation_clock
+        from engine.run_controller import RunController
+        from scene.overlay_scene import OverlayScene
+
+        if mode not in ('poll', 'hook'):
+            raise ValueError(f"未知回放模式: {mode}")
+        self.mode = mode
+        self.config = self._load_profile(profile)
+        w, h = size or self._profile_size(self.config)
+
+        self._now = 0.0
+        clock = self.clock
+        self.backend = RecordingBackend(clock=clock)
+        self.timers = TimerService(clock=clock, threaded=False)
+        self.anim = AnimationClock(clock=clock)
+        self.scan = _ScanTable()
+        self._old_backend = set_backend(self.backend)
+        self._old_timers = set_timer_service(self.timers)
+        self._old_anim = set_animation_clock(self.anim)
+        self._patches = [
+            (input_engine, 'get_scan_code', self.scan),
+            (run_controller, 'is_key_pressed', lambda k: False),
+            (run_controller, '_time', _VirtualTime(clock)),
+            (input_engine, 'random', random.Random(seed)),
+        ]
+        self._patches = [(mod, attr, getattr(mod, attr), new) for mod, attr, new in self._patches]
+        for mod, attr, _, new in self._patches:
+            setattr(mod, attr, new)
+        input_engine._pressed_keys.clear()
+        clear_plan_cache()
+
+        _qapp = QApplication.instance() or QApplication([])
+        self.scene = OverlayScene()
+        self.scene.setSceneRect(0, 0, w, h)
+        self.scene.load_from_config(self.config)
+        self.scene.set_mode('run')
+
+        view = QGraphicsView(self.scene)
+        view.setFrameShape(QGraphicsView.Shape.NoFrame)
+        view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        view.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+        view.setGeometry(0, 0, w, h)
+        view.show()
+        _qapp.processEvents()
+        self.view = view
+        origin = view.mapToGlobal(view.mapFromScene(0, 0))
+        self._origin = (origin.x(), origin.y())
+
+        self.controller = ctl = RunController(self.scene, view)
+        self.items = self._interactive_items()
+        for item in self.items:
+            item.hoverActivated.connect(ctl.on_hover_activated)
+            item.hoverDeactivated.connect(ctl.on_hover_deactivated)
+            item.actionTriggered.connect(ctl.on_action_triggered)
+            item.wheelTriggered.connect(ctl.on_wheel_triggered)
+        self._auto_center = auto_center
+        self.macros = ctl._macros = MacroScheduler(
+            ctl._macro_step, input_engine.release_source, clock=clock, threaded=False)
+
+    # ── 配置 / 场景 ──
+
+    @staticmethod
+    def _load_profile(profile) -> dict:
+        if profile is None:
+            profile = DEFAULT_PROFILE
+        if isinstance(profile, str):
+            with open(profile, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return copy.deepcopy(profile)
+
+    @staticmethod
+    def _profile_size(config):
+        try:
+            w, h = config.get('geometry', '').split('+', 1)[0].split('x')
+            return int(w), int(h)
+        except ValueError:
+            return 1920, 1080
+
+    def _interactive_items(self):
+        s = self.scene
+        items = list(s.button_items) + list(s.wheel_items) + list(s.outer_wheel_items)
+        return items + [i for i in (s.ring_item, s.inner_ring_item) if i is not None]
+
+    def clock(self) -> float:
+        return self._now
+
+    def to_global(self, x, y):
+        """场景坐标 → 屏幕坐标（视图无缩放，仅平移）"""
+        return int(round(x + self._origin[0])), int(round(y + self._origin[1]))
+
+    # ── 回放 ──
+
+    def run(self, stream, until: float = None) -> ReplayResult:
+        """回放输入流，until 为虚拟结束时刻（秒，默认最后一个事件之后 TAIL_SEC）"""
+        ctl = self.controller
+        events = sorted(stream, key=lambda e: e.t)
+        end = until if until is not None else (events[-1].t if events else 0.0) + TAIL_SEC
+        self._now = 0.0
+        self.backend.clear()
+        self._trace = []
+        self._seen = (0, 0)
+        if self.mode == 'hook':
+            input_engine.install_wheel_hook()
+        ctl.start()
+        ctl._timer.stop()  # 节拍由虚拟时钟驱动
+        ctl.auto_center = self._auto_center
+        ctl._scheduler._clock = self.clock
+        ctl._scheduler.reset(0.0)
+
+        costs = []
+        next_tick = 0.0
+        i = 0
+        try:
+            while True:
+                t_event = events[i].t if i < len(events) else None
+                t_anim = self.anim.next_deadline()
+                t_timer = self.timers.next_deadline()
+                t_macro = self.macros.next_deadline()
+                loop = ctl._input_loop
+                t_loop = loop.next_deadline() if loop is not None else None
+                t = min(x for x in (next_tick, t_event, t_anim, t_timer, t_macro, t_loop)
+                        if x is not None)
+                if t > end:
+                    break
+                self._now = t
+                if t_event is not None and t_event <= t:
+                    self._apply(events[i])
+                    i += 1
+                elif t_anim is not None and t_anim <= t:
+                    self.anim.step(t)
+                elif t_timer is not None and t_timer <= t:
+                    self.timers.run_due(t)
+                elif t_macro is not None and t_macro <= t:
+                    self.macros.run_due(t)
+                elif t_loop is not None and t_loop <= t:
+                    pass  # 输入线程的充能 / 释放: _settle 的 sync 唤醒后由其自行推进
+                else:
+                    t0 = time.perf_counter_ns()
+                    ctl._tick()
+                    costs.append(time.perf_counter_ns() - t0)
+                    next_tick = t + ctl._timer.interval() / 1000.0
+                self._settle()
+        finally:
+            self._now = end
+            signals = ctl.signal_stats()
+            ctl.stop()
+            input_engine.uninstall_wheel_hook()
+            self._collect()
+        return ReplayResult(end, costs, self._trace, len(self.backend.records), self.backend.batches,
+                            signals)
+
+    def _apply(self, ev: ReplayEvent):
+        """一个输入事件 → 模拟系统状态（轮询读取）+ 钩子回调（事件驱动 / 滚轮）"""
+        rec = self.backend
+        x, y = rec.get_cursor_pos()
+        if ev.kind == 'move':
+            x, y = self.to_global(*ev.args)
+            rec.move_cursor(x, y)
+            rec.feed_mouse_hook(input_engine.WM_MOUSEMOVE, x, y)
+        elif ev.kind == 'wheel':
+            data = (ev.args[0] & 0xFFFF) << 16
+            if rec.hook_installed:
+                rec.feed_mouse_hook(input_engine.WM_MOUSEWHEEL, x, y, data)
+            else:
+                input_engine._on_mouse_hook(input_engine.WM_MOUSEWHEEL, x, y, data)
+        else:
+            vk, msg_down, msg_up, data = _BUTTONS[ev.args[0]]
+            down = ev.kind == 'down'
+            rec.set_key_state(vk, down)
+            rec.feed_mouse_hook(msg_down if down else msg_up, x, y, data)
+
+    def _settle(self):
+        """等待本步的输入线程处理 / 跨线程信号 / 派发线程注入全部完成，再收集轨迹"""
+        loop = self.controller._input_loop
+        if loop is not None:
+            loop.sync()
+            _qapp.processEvents()
+        dispatcher = input_engine.get_dispatcher()
+        if dispatcher is not None:
+            dispatcher.flush()
+        self._collect()
+
+    def _collect(self):
+        """新增的注入事件 / 光标 warp → 轨迹行"""
+        rec = self.backend
+        n_rec, n_warp = self._seen
+        records = rec.records[n_rec:]
+        warps = rec.cursor_moves[n_warp:]
+        self._seen = (n_rec + len(records), n_warp + len(warps))
+        for ts, batch, ev in records:
+            self._trace.append(f'{ts * 1000.0:10.3f}  #{batch:<4d} {self._describe(ev)}')
+        ox, oy = self._origin
+        for ts, x, y in warps:
+            self._trace.append(f'{ts * 1000.0:10.3f}  -     warp {x - ox} {y - oy}')
+
+    def _describe(self, ev) -> str:
+        if ev.kind == INPUT_KEYBOARD:
+            up = ev.flags & input_engine.KEYEVENTF_KEYUP
+            return f"key {self.scan.name(ev.code)} {'up' if up else 'down'}"
+        f = ev.flags
+        if f & input_engine.MOUSEEVENTF_WHEEL:
+            delta = ev.data - (1 << 32) if ev.data >= 1 << 31 else ev.data
+            return f'wheel {delta:+d}'
+        for flag, name in ((input_engine.MOUSEEVENTF_LEFTDOWN, 'left down'),
+                           (input_engine.MOUSEEVENTF_LEFTUP, 'left up'),
+                           (input_engine.MOUSEEVENTF_RIGHTDOWN, 'right down'),
+                           (input_engine.MOUSEEVENTF_RIGHTUP, 'right up'),
+                           (input_engine.MOUSEEVENTF_MIDDLEDOWN, 'middle down'),
+                           (input_engine.MOUSEEVENTF_MIDDLEUP, 'middle up')):
+            if f & flag:
+                return f'mouse {name}'
+        if f & (input_engine.MOUSEEVENTF_XDOWN | input_engine.MOUSEEVENTF_XUP):
+            side = 'down' if f & input_engine.MOUSEEVENTF_XDOWN else 'up'
+            return f'mouse x{ev.data} {side}'
+        return f'mouse flags={f:#x} data={ev.data}'
+
+    # ── 清理 ──
+
+    def close(self):
+        from engine.hover_state_machine import set_animation_clock
+        if self.view is None:
+            return
+        self.controller.stop()
+        self.view.close()
+        self.view = None
+        for mod, attr, old, _ in self._patches:
+            setattr(mod, attr, old)
+        input_engine._pressed_keys.clear()
+        clear_plan_cache()
+        set_timer_service(self._old_timers)
+        set_animation_clock(self._old_anim)
+        set_backend(self._old_backend)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,97 @@
+"""
+TEGG Touch - 按键绑定编译测试
+
+用法:
+    python -m pytest tests/test_binding_plan.py
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+
+from core import input_engine
+from core.binding_plan import (
+    compile_binding, compile_bindings, clear_plan_cache, EMPTY_PLAN, BINDING_FIELDS,
+)
+from core.input_backend import INPUT_MOUSE
+from models.button_model import ButtonData
+
+_SCAN = {'shift': 42, 'w': 17, 'a': 30, 'r': 19, 'up': 72}
+
+
+@pytest.fixture(autouse=True)
+def scan_codes(monkeypatch):
+    calls = []
+
+    def _lookup(k):
+        calls.append(k)
+        return _SCAN.get(k, 0)
+
+    monkeypatch.setattr(input_engine, 'get_scan_code', _lookup)
+    clear_plan_cache()
+    yield calls
+    clear_plan_cache()
+
+
+def test_plain_combo():
+    plan = compile_binding("shift+w")
+    assert plan.source == "shift+w"
+    assert plan.press == (input_engine.key_event(42, False, False),
+                          input_engine.key_event(17, False, False))
+    assert plan.release == (input_engine.key_event(42, False, True),
+                            input_engine.key_event(17, False, True))
+    assert plan.tap_press == plan.press
+    assert not plan.macros and not plan.wheel and not plan.unknown
+
+
+def test_macro_mouse_and_wheel_tags():
+    plan = compile_binding("r+macro:reload+mouse:left+mouse:wheelup")
+    assert plan.macros == ('reload',)
+    assert len(plan.press) == 2 and plan.press[1].kind == INPUT_MOUSE
+    assert plan.tap_press == (input_engine.key_event(19, False, False),)
+    assert len(plan.wheel) == 1
+    assert plan.wheel[0].flags == input_engine.MOUSEEVENTF_WHEEL
+    assert plan.wheel[0].data == input_engine.WHEEL_DELTA
+
+
+def test_unknown_keys_reported():
+    plan = compile_binding("w+bogus+mouse:side")
+    assert plan.unknown == ('bogus', 'mouse:side')
+    assert len(plan.press) == 1
+    assert plan  # 非空绑定，仍按原字符串判真
+
+
+def test_extended_flag_resolved_at_compile():
+    plan = compile_binding("up")
+    assert plan.press[0].flags & input_engine.KEYEVENTF_EXTENDEDKEY
+
+
+def test_cache_avoids_repeat_lookups(scan_codes):
+    first = compile_binding("shift+w")
+    n = len(scan_codes)
+    assert compile_binding("shift+w") is first
+    assert len(scan_codes) == n
+
+
+
+def test_cache_is_bounded():
+    from core import binding_plan
+    first = compile_binding("shift+w")
+    for i in range(binding_plan.PLAN_CACHE_MAX):  # 反复编辑出的新字符串
+        compile_binding(f"w+a{'+w' * i}")
+    info = binding_plan._compile.cache_info()
+    assert info.currsize == binding_plan.PLAN_CACHE_MAX
+    assert compile_binding("shift+w") is not first  # 最早的已淘汰，重新编译
+
+def test_empty_and_compile_bindings():
+    assert compile_binding('') is EMPTY_PLAN
+    assert not EMPTY_PLAN
+    plans = compile_bindings(ButtonData(hover="w", lclick="mouse:left"))
+    assert set(plans) == set(BINDING_FIELDS)
+    assert plans['hover'].source == "w"
+    assert plans['rclick'] is EMPTY_PLAN
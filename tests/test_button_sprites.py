@@ -0,0 +1,115 @@
+"""
+TEGG Touch - 按钮精灵缓存测试（贴图结果与直接绘制一致、按外观键共享 / 切换，Qt offscreen）
+
+用法:
+    python -m pytest tests/test_button_sprites.py
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from core.i18n import load_locale
+
+_qapp = None
+
+W, H = 800, 600
+
+
+@pytest.fixture
+def scene():
+    from PyQt6.QtWidgets import QApplication
+    from scene.overlay_scene import OverlayScene
+    from scene.touch_button_item import button_sprite_cache
+    global _qapp
+    _qapp = QApplication.instance() or QApplication([])
+    load_locale('en')
+    button_sprite_cache().clear()
+    button_sprite_cache().enabled = True
+    s = OverlayScene()
+    s.setSceneRect(0, 0, W, H)
+    s.load_from_config({'buttons': [
+        dict(x=-300, y=-200, w=100, h=100, name='Jump', lclick='space', hover='w'),
+        dict(x=-100, y=-200, w=100, h=100, name='Crouch', lclick='c'),
+        dict(x=100, y=0, w=200, h=100, name='Center', btn_type='center_band'),
+    ]})
+    s.set_mode('run')
+    yield s
+    button_sprite_cache().enabled = True
+
+
+def _render(scene):
+    from PyQt6.QtCore import QRectF
+    from PyQt6.QtGui import QImage, QPainter
+    img = QImage(W, H, QImage.Format.Format_ARGB32_Premultiplied)
+    img.fill(0)
+    painter = QPainter(img)
+    scene.render(painter, QRectF(0, 0, W, H), QRectF(0, 0, W, H))
+    painter.end()
+    return img
+
+
+def _max_diff(a, b):
+    pa, pb = a.constBits().asstring(a.sizeInBytes()), b.constBits().asstring(b.sizeInBytes())
+    return max(abs(x - y) for x, y in zip(pa, pb))
+
+
+def _states(scene):
+    jump, crouch, _ = scene.button_items
+    yield 'normal'
+    jump.set_visual_state('hover')
+    yield 'hover'
+    crouch.set_visual_state('active_left')
+    jump._on_charge_progress(0.4)
+    yield 'charging'
+    scene.set_grid_size(60)
+    yield 'grid60'
+
+
+def test_sprites_match_direct_painting(scene):
+    from scene.touch_button_item import button_sprite_cache
+    cache = button_sprite_cache()
+    for label in _states(scene):
+        cache.enabled = True
+        cached = _render(scene)
+        cache.enabled = False
+        direct = _render(scene)
+        cache.enabled = True
+        assert _max_diff(cached, direct) <= 2, label
+
+
+def test_sprites_are_shared_and_keyed_by_look(scene):
+    from scene.touch_button_item import button_sprite_cache
+    cache = button_sprite_cache()
+    _render(scene)
+    first = cache.stats()
+    # 两个同尺寸 normal 按钮共用底板精灵；文字各一张；回中带底板 + 文字
+    assert first['entries'] == 5 and first['misses'] == 5 and first['hits'] == 1
+
+    for _ in range(3):
+        _render(scene)
+    assert cache.stats()['misses'] == first['misses']  # 外观未变: 只贴图
+
+    jump = scene.button_items[0]
+    jump.set_visual_state('hover')
+    _render(scene)
+    jump.set_visual_state('normal')
+    _render(scene)
+    after = cache.stats()
+    assert after['misses'] == first['misses'] + 2      # hover 底板 + 键值文字，回到 normal 命中旧精灵
+
+    for pct in (0.1, 0.5, 0.9):                         # 充能只重绘动态进度条
+        jump._on_charge_progress(pct)
+        _render(scene)
+    assert cache.stats()['misses'] == after['misses']
+
+    jump.data.name = 'Leap'
+    _render(scene)
+    assert cache.stats()['misses'] == after['misses'] + 1
@@ -0,0 +1,158 @@
+"""
+TEGG Touch - 充能进度局部重绘测试（只重绘变化的条带 / 环带，结果与整帧重绘一致；重绘统计，Qt offscreen）
+
+用法:
+    python -m pytest tests/test_damage_repaint.py
+"""
+
+import math
+import os
+import random
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from core.constants import default_wheel_sectors, default_wheel_center_ring
+from core.i18n import load_locale
+from engine.repaint_meter import RepaintMeter
+
+_qapp = None
+
+W, H = 800, 600
+PROGRESS = [0.0, 0.05, 0.2, 0.21, 0.5, 0.9, 1.0, 0.0, 0.7, 0.3, 0.0]
+
+
+def _app():
+    global _qapp
+    from PyQt6.QtWidgets import QApplication
+    _qapp = QApplication.instance() or QApplication([])
+    load_locale('en')
+    return _qapp
+
+
+@pytest.fixture
+def scene():
+    from scene.overlay_scene import OverlayScene
+    _app()
+    s = OverlayScene()
+    s.setSceneRect(0, 0, W, H)
+    s.load_from_config({
+        'buttons': [dict(x=-380, y=-280, w=200, h=100, name='Jump', hover='w')],
+        'wheel_visible': True,
+        'wheel_mode': 'large',
+        'wheel_sectors': default_wheel_sectors(),
+        'wheel_center_ring': default_wheel_center_ring(),
+    })
+    s.set_mode('run')
+    return s
+
+
+def _render(scene, img=None, clip=None):
+    from PyQt6.QtCore import QRectF, Qt
+    from PyQt6.QtGui import QImage, QPainter
+    if img is None:
+        img = QImage(W, H, QImage.Format.Format_ARGB32_Premultiplied)
+        img.fill(0)
+    painter = QPainter(img)
+    if clip is not None:
+        painter.setClipRect(clip)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        painter.fillRect(clip, Qt.GlobalColor.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+    scene.render(painter, QRectF(0, 0, W, H), QRectF(0, 0, W, H))
+    painter.end()
+    return img
+
+
+def _max_diff(a, b):
+    pa, pb = a.constBits().asstring(a.sizeInBytes()), b.constBits().asstring(b.sizeInBytes())
+    return max(abs(x - y) for x, y in zip(pa, pb))
+
+
+def _record_updates(item):
+    """截获 item.update(rect)，记录场景坐标的脏矩形（无参数 = 整个 boundingRect）"""
+    damage = []
+
+    def update(rect=None):
+        damage.append(item.mapRectToScene(rect if rect is not None else item.boundingRect()))
+    item.update = update
+    return damage
+
+
+@pytest.mark.parametrize('which', ['button', 'sector', 'ring'])
+def test_partial_repaints_match_full_frame(scene, which):
+    item = {'button': scene.button_items[0],
+            'sector': scene.wheel_items[2],
+            'ring': scene.ring_item}[which]
+    damage = _record_updates(item)
+    frame = _render(scene)
+    full_area = item.sceneBoundingRect().width() * item.sceneBoundingRect().height()
+    for progress in PROGRESS:
+        damage.clear()
+        item._on_charge_progress(progress)
+        for rect in damage:
+            frame = _render(scene, frame, rect.toAlignedRect())
+            assert rect.width() * rect.height() < full_area
+        # 扇面侧边是斜线: 端点不同时沿线的抗锯齿覆盖率有 ~1% 的光栅化误差
+        assert _max_diff(frame, _render(scene)) <= 4, (which, progress)
+    # 60fps 充能的典型一步: 重绘面积远小于整个 Item
+    item._on_charge_progress(0.5)
+    damage.clear()
+    item._on_charge_progress(0.52)
+    assert sum(r.width() * r.height() for r in damage) < full_area * 0.25
+
+
+def test_band_rects_cover_band():
+    from PyQt6.QtCore import QPointF
+    from scene.wheel_geometry import charge_band_rects
+    rng = random.Random(5)
+    for start, span in ((0, 360), (80, 45), (350, 60), (-30, 200)):
+        rects = charge_band_rects(400, 300, 120, 135, start, span)
+        for _ in range(2000):
+            r = rng.uniform(120, 135)
+            a = math.radians(start + rng.uniform(0, span))
+            p = QPointF(400 + r * math.cos(a), 300 - r * math.sin(a))
+            assert any(rect.contains(p) for rect in rects)
+        area = sum(rect.width() * rect.height() for rect in rects)
+        band = math.pi * (135 ** 2 - 120 ** 2) * span / 360
+        assert area < band * 3
+
+
+def test_repaint_meter_rates():
+    meter = RepaintMeter(clock=lambda: 0.0)
+    meter.reset(now=0.0)
+    for i in range(30):
+        meter.add(1000, now=i * 0.02)
+    assert meter.stats(now=0.59)['pixels_per_sec'] == 0.0   # 首个窗口未结束
+    stats = meter.stats(now=1.0)
+    assert stats['pixels'] == 30000 and stats['paints'] == 30
+    assert stats['pixels_per_sec'] == pytest.approx(30000.0)
+    assert meter.stats(now=2.5)['pixels_per_sec'] == 0.0     # 停止重绘后归零
+
+
+def test_monitor_ignores_its_own_fade_repaints():
+    from PyQt6.QtCore import QRect
+    from PyQt6.QtGui import QRegion
+    from PyQt6.QtWidgets import QGraphicsView
+    from views.repaint_monitor import RepaintMonitor, region_rects
+    _app()
+    view = QGraphicsView()
+    monitor = RepaintMonitor(view)
+    region = QRegion(QRect(0, 0, 10, 10)).united(QRect(5, 5, 20, 5))
+    assert sum(r.width() * r.height() for r in region_rects(region)) == 100 + 15 * 5
+
+    monitor.toggle_flash()
+    monitor.begin(QRegion(QRect(0, 0, 40, 10)))
+    assert monitor.stats()['pixels'] == 400
+    monitor._on_fade()                                   # 淡出请求重绘闪烁区域
+    monitor.begin(QRegion(QRect(0, 0, 40, 10)).united(QRect(0, 20, 10, 10)))
+    assert monitor.stats()['pixels'] == 500               # 只计入新的脏区域
+    monitor.toggle_flash()
+    assert not monitor._flashes
+    view.deleteLater()
@@ -0,0 +1,105 @@
+"""
+TEGG Touch - 编辑模式网格背景缓存测试（贴图与逐线绘制一致、只光栅化一次、网格变化时重建，Qt offscreen）
+
+用法:
+    python -m pytest tests/test_grid_background.py
+"""
+
+import os
+import random
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+_qapp = None
+
+W, H = 1280, 720
+
+
+@pytest.fixture
+def scene():
+    from PyQt6.QtWidgets import QApplication
+    from scene.overlay_scene import OverlayScene
+    global _qapp
+    _qapp = QApplication.instance() or QApplication([])
+    s = OverlayScene()
+    s.setSceneRect(0, 0, W, H)
+    s._tooltip.setVisible(False)
+    s._ac_bar.setVisible(False)
+    return s
+
+
+def _image():
+    from PyQt6.QtGui import QImage
+    img = QImage(W, H, QImage.Format.Format_ARGB32_Premultiplied)
+    img.fill(0)
+    return img
+
+
+def _render(scene, img, rect=None, antialias=False):
+    """按视图的方式渲染: 先清空脏矩形（透明窗口），目标 = 源（无缩放）"""
+    from PyQt6.QtCore import QRectF, Qt
+    from PyQt6.QtGui import QPainter
+    rect = rect or QRectF(0, 0, W, H)
+    painter = QPainter(img)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+    painter.fillRect(rect, Qt.GlobalColor.transparent)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing, antialias)
+    scene.render(painter, rect, rect)
+    painter.end()
+    return img
+
+
+def _direct(scene, antialias=False):
+    """旧实现: 每次重绘逐线绘制"""
+    from PyQt6.QtCore import QRectF
+    from PyQt6.QtGui import QPainter
+    img = _image()
+    painter = QPainter(img)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing, antialias)
+    scene._paint_grid(painter, QRectF(0, 0, W, H))
+    painter.end()
+    return img
+
+
+@pytest.mark.parametrize('antialias', [False, True])
+def test_cached_grid_matches_direct_drawing(scene, antialias):
+    assert _render(scene, _image(), antialias=antialias) == _direct(scene, antialias)
+    assert scene.grid_builds == 1
+
+
+def test_dirty_rect_repaints_blit_without_rebuilding(scene):
+    from PyQt6.QtCore import QRectF
+    expected = _direct(scene)
+    img = _image()
+    rng = random.Random(2)
+    for _ in range(50):  # 拖动按钮: 每次只重绘新旧位置
+        x, y = rng.randrange(0, W - 120), rng.randrange(0, H - 120)
+        _render(scene, img, QRectF(x, y, 120, 120))
+    assert scene.grid_builds == 1
+    _render(scene, img)
+    assert img == expected and scene.grid_builds == 1
+
+
+def test_grid_size_changes_rebuild(scene):
+    _render(scene, _image())
+    scene.set_grid_size(60)
+    assert _render(scene, _image()) == _direct(scene)
+    assert scene.grid_builds == 2
+
+    scene.grid_size = 80  # 加载配置时直接赋值: 按键值重建
+    assert _render(scene, _image()) == _direct(scene)
+    assert scene.grid_builds == 3
+
+    scene.set_mode('run')
+    assert _render(scene, _image()) == _image()  # 运行模式无网格
+    scene.set_mode('edit')
+    _render(scene, _image())
+    assert scene.grid_builds == 3
@@ -0,0 +1,138 @@
+"""
+TEGG Touch - 命中检测索引测试（与 QGraphicsScene.itemAt 的一致性，Qt offscreen）
+
+用法:
+    python -m pytest tests/test_hit_index.py
+"""
+
+import math
+import os
+import random
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from core.constants import (
+    default_wheel_sectors, default_wheel_center_ring, default_wheel_outer_sectors,
+    default_wheel_inner_ring,
+)
+
+W, H = 1920, 1080
+# 弧线由贝塞尔曲线近似，圆周 / 扇区边界附近的点两种方法可能不同，采样时跳过
+EDGE_EPS = 0.75
+
+
+_qapp = None
+
+
+def _app():
+    global _qapp
+    from PyQt6.QtWidgets import QApplication
+    _qapp = QApplication.instance() or QApplication([])
+    return _qapp
+
+
+def _make_scene(wheel_mode, mode='run'):
+    from scene.overlay_scene import OverlayScene
+    _app()
+    scene = OverlayScene()
+    scene.setSceneRect(0, 0, W, H)
+    scene.load_from_config({
+        'buttons': [
+            dict(x=-900, y=-500, w=200, h=100, hover="w"),
+            dict(x=-150, y=-150, w=100, h=100, hover="e"),      # 压在轮盘中心
+            dict(x=150, y=-50, w=300, h=100, hover="a"),        # 跨越扇区
+            dict(x=600, y=300, w=100, h=200, hover="d"),
+        ],
+        'wheel_visible': True,
+        'wheel_mode': wheel_mode,
+        'wheel_sectors': default_wheel_sectors(),
+        'wheel_center_ring': default_wheel_center_ring(),
+        'wheel_outer_sectors': default_wheel_outer_sectors(),
+        'wheel_inner_ring': default_wheel_inner_ring(),
+    })
+    scene.set_mode(mode)
+    return scene
+
+
+def _near_wheel_edge(scene, x, y):
+    items = list(scene.wheel_items) + list(scene.outer_wheel_items)
+    items += [i for i in (scene.ring_item, scene.inner_ring_item) if i is not None]
+    for item in items:
+        r = math.hypot(x - item._cx, y - item._cy)
+        if min(abs(r - item._r_inner), abs(r - item._r_outer)) < EDGE_EPS:
+            return True
+        span = getattr(item, '_span_angle', None)
+        if span:
+            angle = math.degrees(math.atan2(item._cy - y, x - item._cx))
+            off = (angle - item._start_angle) % span
+            if r * math.radians(min(off, span - off)) < EDGE_EPS:
+                return True
+    return False
+
+
+@pytest.mark.parametrize('wheel_mode', ['small', 'large', 'double', 'dual'])
+@pytest.mark.parametrize('mode', ['run', 'edit'])
+def test_index_matches_item_at(wheel_mode, mode):
+    from PyQt6.QtCore import QPointF
+    from PyQt6.QtGui import QTransform
+    scene = _make_scene(wheel_mode, mode)
+    index = scene.hit_index()
+    rng = random.Random(f'{wheel_mode}-{mode}')
+    cx, cy = W / 2, H / 2
+    checked = hits = 0
+    for _ in range(4000):
+        if rng.random() < 0.5:  # 一半集中在轮盘附近
+            x, y = cx + rng.uniform(-420, 420), cy + rng.uniform(-420, 420)
+        else:
+            x, y = rng.uniform(0, W), rng.uniform(0, H)
+        if rng.random() < 0.3:
+            x, y = float(round(x)), float(round(y))  # 光标坐标都是整数
+        if _near_wheel_edge(scene, x, y):
+            continue
+        expect = scene.itemAt(QPointF(x, y), QTransform())
+        assert index.item_at(x, y) is expect, (x, y, expect)
+        checked += 1
+        hits += expect is not None
+    assert checked > 3000 and hits > 200
+
+
+def test_rect_edges_are_half_open():
+    from PyQt6.QtCore import QPointF
+    from PyQt6.QtGui import QTransform
+    scene = _make_scene('small')
+    btn = scene.button_items[0]
+    r = btn.sceneBoundingRect()
+    index = scene.hit_index()
+    for x, y in ((r.left(), r.top()), (r.right(), r.top()), (r.left(), r.bottom()),
+                 (r.right() - 1, r.bottom() - 1), (r.left() - 1, r.top())):
+        assert index.item_at(x, y) is scene.itemAt(QPointF(x, y), QTransform())
+
+
+def test_index_follows_layout_and_visibility_changes():
+    scene = _make_scene('dual')
+    sector = scene.wheel_items[0]
+    p = sector._hit_path.pointAtPercent(0.0)
+    c = sector._hit_path.boundingRect().center()
+    x, y = (c.x() + p.x()) / 2, (c.y() + p.y()) / 2
+
+    first = scene.hit_index()
+    assert scene.hit_index() is first  # 布局未变不重建
+
+    sector.setVisible(False)  # 可见性在查询时检查，无需重建
+    assert scene.hit_index().item_at(x, y) is not sector
+    sector.setVisible(True)
+
+    item = scene.add_button(_toast=False)
+    assert scene.hit_index() is not first
+    r = item.sceneBoundingRect()
+    assert scene.hit_index().item_at(r.center().x(), r.center().y()) is item
+
+    item.setPos(item.pos().x() + 300, item.pos().y())
+    assert scene.hit_index().item_at(r.center().x() + 300, r.center().y()) is item
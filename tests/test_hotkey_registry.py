@@ -0,0 +1,147 @@
+"""
+TEGG Touch - 全局快捷键注册表测试（纯逻辑 + 内存记录后端的键盘钩子）
+
+用法:
+    python -m pytest tests/test_hotkey_registry.py
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from core import input_engine
+from core.hotkey_registry import HotkeyRegistry
+from core.input_backend import RecordingBackend, set_backend
+
+# 测试用扫描码表（ctrl / shift 左右各一个）
+_CODES = {
+    'f5': (0x3F,), 'f9': (0x43,), 'f10': (0x44,), 'f12': (0x58,),
+    'l': (0x26,), 'ctrl': (0x1D, 0x9D), 'shift': (0x2A, 0x36),
+}
+CTRL, SHIFT, L, F12 = 0x1D, 0x36, 0x26, 0x58
+
+_qapp = None
+
+
+def _resolve(name):
+    return _CODES.get(name, ())
+
+
+def _registry(bindings, repeat_sec=0.3):
+    reg = HotkeyRegistry(_resolve, repeat_sec)
+    reg.rebuild(bindings)
+    return reg
+
+
+def test_fires_on_down_edge_only():
+    reg = _registry({'stop': 'f12'})
+    assert reg.on_key(F12, True, now=0.0) == ['stop']
+    assert reg.on_key(F12, True, now=0.05) == []   # 自动重复
+    assert reg.on_key(F12, False, now=0.1) == []
+    assert reg.on_key(F12, True, now=0.2) == []    # 最短间隔内
+    assert reg.stats()['suppressed'] == 1
+    reg.on_key(F12, False, now=0.25)
+    assert reg.on_key(F12, True, now=0.5) == ['stop']
+    assert reg.stats()['fired'] == 2
+
+
+def test_combo_requires_modifiers_and_most_specific_wins():
+    reg = _registry({'plain': 'l', 'hud': 'ctrl+shift+l', 'half': 'ctrl+l'})
+    assert reg.on_key(L, True, now=0.0) == ['plain']
+    reg.on_key(L, False, now=0.0)
+    reg.on_key(CTRL, True, now=1.0)
+    assert reg.on_key(L, True, now=1.0) == ['half']
+    reg.on_key(L, False, now=1.0)
+    reg.on_key(SHIFT, True, now=2.0)  # 右 shift 同样满足
+    assert reg.on_key(L, True, now=2.0) == ['hud']
+
+
+def test_rebuild_reports_unresolved_and_reset_clears_held():
+    reg = HotkeyRegistry(_resolve)
+    assert reg.rebuild({'stop': 'f12', 'bad': 'ctrl+nokey', 'off': ''}) == ['bad']
+    assert [h.name for h in reg.hotkeys] == ['stop']
+    reg.on_key(F12, True, now=0.0)
+    assert reg.stats()['held'] == 1
+    reg.reset()
+    assert reg.stats()['held'] == 0
+    reg.rebuild({'voice': 'f12'})
+    assert reg.on_key(F12, True, now=0.1) == ['voice']
+
+
+
+def test_missed_key_up_does_not_disable_hotkey():
+    reg = _registry({'stop': 'f12'})
+    assert reg.on_key(F12, True, now=0.0) == ['stop']
+    for i in range(1, 30):                         # 按住: 自动重复
+        assert reg.on_key(F12, True, now=0.5 + i * 0.033) == []
+    # 抬起事件被钩子漏掉（如 UAC 安全桌面），之后的按下仍然触发
+    assert reg.on_key(F12, True, now=5.0) == ['stop']
+    assert reg.on_key(F12, True, now=5.5) == []    # 新一轮按住的自动重复
+    assert reg.stats()['fired'] == 2
+
+
+@pytest.mark.skipif(bool(os.environ.get('TEGG_DEBUG_HOTKEYS')), reason='诊断快捷键已显式启用')
+def test_diagnostic_hotkeys_are_opt_in():
+    from core.constants import DEFAULT_HOTKEYS, DEBUG_HOTKEYS
+    reg = HotkeyRegistry(_resolve)
+    assert reg.rebuild({n: DEFAULT_HOTKEYS[n] for n in DEBUG_HOTKEYS}) == []
+    assert reg.hotkeys == []   # 默认不占用 ctrl+shift+L/D/R
+
+# ─── 运行控制器: 键盘钩子驱动 ───
+
+@pytest.fixture
+def controller(monkeypatch):
+    global _qapp
+    from PyQt6.QtWidgets import QApplication, QGraphicsView
+    from engine import run_controller
+    from engine.run_controller import RunController
+    from scene.overlay_scene import OverlayScene
+
+    _qapp = QApplication.instance() or QApplication([])
+    backend = RecordingBackend()
+    old = set_backend(backend)
+    monkeypatch.setattr(run_controller, 'get_scan_codes', _resolve)
+    monkeypatch.setattr(run_controller, 'is_key_pressed',
+                        lambda k: pytest.fail('hook 可用时不应轮询快捷键'))
+    monkeypatch.setattr(run_controller, 'load_hotkeys', lambda: {})
+
+    scene = OverlayScene()
+    scene.setSceneRect(0, 0, 400, 300)
+    scene.load_from_config({'buttons': []})
+    scene.set_mode('run')
+    view = QGraphicsView(scene)
+    view.setGeometry(0, 0, 400, 300)
+    ctl = RunController(scene, view)
+    yield ctl, backend
+    ctl.stop()
+    view.close()
+    set_backend(old)
+
+
+def test_controller_hotkeys_are_event_driven(controller):
+    ctl, rec = controller
+    ctl.start()
+    assert ctl._hotkeys_evented and rec.key_hook_installed
+    ctl._tick()  # 不轮询（is_key_pressed 会直接失败）
+
+    passthrough, edits = [], []
+    ctl.passthrough_changed.connect(passthrough.append)
+    ctl.request_edit_mode.connect(lambda: edits.append(1))
+
+    rec.feed_key_hook(0x43, True)   # f9
+    rec.feed_key_hook(0x43, False)
+    rec.feed_key_hook(0x58, True, flags=input_engine.LLKHF_INJECTED)  # 自身注入的 f12 忽略
+    _qapp.processEvents()
+    assert passthrough == ['pt_on'] and ctl._active
+
+    rec.feed_key_hook(0x58, True)   # f12
+    _qapp.processEvents()
+    assert edits == [1] and not ctl._active
+    assert not rec.key_hook_installed
@@ -0,0 +1,186 @@
+"""
+TEGG Touch - hover 状态机核心 + 共享动画时钟测试（虚拟时钟；Qt 外壳用 offscreen）
+
+用法:
+    python -m pytest tests/test_hover_core.py
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from core.hover_core import AnimationClock, HoverCore, HoverState, HoverTracker
+
+_qapp = None
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+@pytest.fixture
+def anim():
+    clock = _Clock()
+    a = AnimationClock(clock=clock)
+    a.fake = clock
+    return a
+
+
+def _core(anim, hover_ms=200, release_ms=0):
+    events = []
+    core = HoverCore(hover_ms, release_ms, lambda name, *args: events.append((anim.now(), name) + args), anim)
+    return core, events
+
+
+def _run_until_idle(anim, limit=100):
+    """按 next_deadline 推进（等价于 Qt 驱动在准点唤醒）"""
+    for _ in range(limit):
+        t = anim.next_deadline()
+        if t is None:
+            return
+        anim.fake.t = t
+        anim.step(t)
+    raise AssertionError('动画时钟未回到空闲')
+
+
+def test_charge_fires_at_delay_not_tick_multiple(anim):
+    core, events = _core(anim, hover_ms=200)
+    core.enter()
+    assert core.state == HoverState.CHARGING and len(anim) == 1
+    _run_until_idle(anim)
+    fired = [t for t, name, *_ in events if name == 'activated']
+    assert fired == [pytest.approx(0.2)]  # 旧实现: 13 个 16ms 节拍 = 208ms
+    progress = [args[0] for _, name, *args in events if name == 'charge_progress']
+    assert progress == sorted(progress[:-1]) + [0.0] and progress[-2] == 1.0
+    assert anim.stats()['lateness_max_us'] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_late_steps_use_timestamps(anim):
+    """事件循环卡顿: 推进次数少、间隔不均，进度仍按实际经过的时间计算"""
+    core, events = _core(anim, hover_ms=200)
+    core.enter()
+    for t in (0.05, 0.13):
+        anim.fake.t = t
+        anim.step(t)
+    assert [args[0] for _, name, *args in events] == [pytest.approx(0.25), pytest.approx(0.65)]
+    anim.fake.t = 0.31  # 卡顿 180ms 后的第一次推进
+    anim.step(0.31)
+    assert core.is_active and len(anim) == 0
+    assert anim.stats()['lateness_max_us'] == pytest.approx(110000.0)
+
+
+def test_leave_cancels_and_release_reenters(anim):
+    core, events = _core(anim, hover_ms=100, release_ms=300)
+    core.enter()
+    anim.fake.t = 0.05
+    core.leave()
+    assert core.state == HoverState.IDLE and len(anim) == 0 and anim.next_deadline() is None
+    assert events[-1][1:] == ('charge_progress', 0.0)
+
+    anim.fake.t = 1.0
+    core.enter()
+    _run_until_idle(anim)
+    assert core.is_active and events[-2][:2] == (pytest.approx(1.1), 'activated')
+
+    anim.fake.t = 2.0
+    core.leave()
+    assert core.state == HoverState.RELEASING
+    anim.fake.t = 2.1
+    anim.step(2.1)
+    core.enter()                                 # 释放中重入: 保持激活，不发 deactivated
+    assert core.is_active and len(anim) == 0
+    assert not [e for e in events if e[1] == 'deactivated']
+
+    anim.fake.t = 3.0
+    core.leave()
+    _run_until_idle(anim)
+    assert events[-1][:2] == (pytest.approx(3.3), 'deactivated')
+
+
+def test_only_busy_machines_are_stepped(anim):
+    cores = [_core(anim, hover_ms=100 + 50 * i)[0] for i in range(40)]
+    cores[3].enter()
+    cores[7].enter()
+    cores[9].enter()
+    cores[9].leave()
+    assert len(anim) == 2
+    _run_until_idle(anim)
+    stats = anim.stats()
+    assert stats['completed'] == 2 and stats['active'] == 0
+    # 每次推进只处理忙碌的状态机（至多 2 个），而不是全部 40 个
+    assert stats['advanced'] <= 2 * stats['steps']
+
+
+def test_reset_while_busy_unregisters(anim):
+    core, events = _core(anim, hover_ms=0, release_ms=200)
+    core.enter()
+    core.leave()
+    assert len(anim) == 1
+    core.reset()
+    assert len(anim) == 0 and core.state == HoverState.IDLE
+    assert [e[1] for e in events] == ['activated', 'deactivated']
+
+
+def test_tracker_merges_leave_and_enter_into_one_commit(anim):
+    commits, visuals, cores = [], [], {}
+    tracker = HoverTracker(cores.get, lambda t, state: visuals.append((t, state)),
+                           lambda p, r: commits.append((p, r)))
+
+    def emit(target, name, *args):
+        if name == 'activated':
+            tracker.activated(target, 'plan')
+        elif name == 'deactivated':
+            tracker.deactivated(target, 'plan')
+
+    for target, hover_ms in (('a', 0), ('b', 0), ('c', 200)):
+        cores[target] = HoverCore(hover_ms, 0, lambda n, *a, t=target: emit(t, n, *a), anim)
+
+    assert tracker.update('a') and not tracker.update('a')
+    assert commits == [([('a', 'plan')], [])]
+    tracker.update('b')                                  # 一进一出: 同一次提交
+    assert commits[-1] == ([('b', 'plan')], [('a', 'plan')])
+    assert visuals[-2:] == [('a', 'normal'), ('b', 'hover')]
+
+    tracker.update('c')                                  # 充能中: 只释放 b，外观保持 normal
+    assert commits[-1] == ([], [('b', 'plan')]) and visuals[-1] == ('b', 'normal')
+    _run_until_idle(anim)                                # 到期激活立即提交
+    assert commits[-1] == ([('c', 'plan')], []) and len(commits) == 4
+
+
+def test_qt_state_machines_share_one_driver():
+    from PyQt6.QtCore import QElapsedTimer, QTimer
+    from PyQt6.QtWidgets import QApplication
+    from engine.hover_state_machine import HoverStateMachine, get_animation_clock
+    global _qapp
+    _qapp = QApplication.instance() or QApplication([])
+
+    sms = [HoverStateMachine(40, 0) for _ in range(20)]
+    assert all(not sm.findChildren(QTimer) for sm in sms)  # 状态机自身不再持有定时器
+    fired = []
+    sms[0].activated.connect(lambda: fired.append(elapsed.elapsed()))
+    progress = []
+    sms[0].charge_progress.connect(progress.append)
+
+    elapsed = QElapsedTimer()
+    elapsed.start()
+    sms[0].enter()
+    sms[1].enter()
+    assert len(get_animation_clock()) == 2
+    while not fired and elapsed.elapsed() < 2000:
+        _qapp.processEvents()
+    assert fired and fired[0] >= 40
+    assert progress and progress[-1] == 0.0
+    for sm in sms:
+        sm.reset()
+    assert len(get_animation_clock()) == 0
@@ -0,0 +1,348 @@
+"""
+TEGG Touch - 输入后端测试（内存记录后端 + Qt offscreen，跨平台）
+
+用法:
+    python -m pytest tests/test_input_backend.py
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from core import input_engine
+from core.input_backend import RecordingBackend, INPUT_KEYBOARD, INPUT_MOUSE, set_backend
+from core.binding_plan import clear_plan_cache
+
+_SCAN = {'w': 17, 'e': 18}
+
+
+@pytest.fixture
+def rec(monkeypatch):
+    backend = RecordingBackend(clock=iter(range(1000)).__next__)
+    old = set_backend(backend)
+    monkeypatch.setattr(input_engine, 'get_scan_code', lambda k: _SCAN.get(k, 0))
+    input_engine._pressed_keys.clear()
+    clear_plan_cache()
+    yield backend
+    input_engine.uninstall_wheel_hook()
+    input_engine.set_mouse_listener(None)
+    input_engine.poll_mouse_events()
+    input_engine._pressed_keys.clear()
+    clear_plan_cache()
+    set_backend(old)
+
+
+def test_records_are_timestamped_with_injected_clock(rec):
+    input_engine.trigger("w", 'p')
+    rec.set_cursor_pos(10, 20)
+    input_engine.trigger("w", 'r')
+    assert [ts for ts, _, _ in rec.records] == [0, 2]
+    assert rec.cursor_moves == [(1, 10, 20)]
+    assert rec.get_cursor_pos() == (10, 20)
+
+
+def test_wheel_hook_routes_through_backend(rec):
+    input_engine.install_wheel_hook()
+    assert rec.hook_installed
+    rec.feed_mouse_hook(input_engine.WM_MOUSEWHEEL, 5, 6, 120 << 16)
+    rec.feed_mouse_hook(input_engine.WM_MOUSEWHEEL, 7, 8, (-120 & 0xFFFF) << 16)
+    rec.feed_mouse_hook(input_engine.WM_MOUSEMOVE, 9, 9)  # 移动不进滚轮队列
+    assert [(e.delta, e.x, e.y) for e in input_engine.poll_wheel_events()] == [(120, 5, 6), (-120, 7, 8)]
+    input_engine.uninstall_wheel_hook()
+    assert not rec.hook_installed
+
+
+# ─── 运行模式控制器（Qt offscreen） ─────────────────────────
+
+@pytest.fixture
+def overlay(rec, monkeypatch):
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication, QGraphicsView
+    from engine import run_controller
+    from engine.run_controller import RunController
+    from scene.overlay_scene import OverlayScene
+
+    app = QApplication.instance() or QApplication([])
+    monkeypatch.setattr(run_controller, 'is_key_pressed', lambda k: False)
+
+    scene = OverlayScene()
+    scene.setSceneRect(0, 0, 400, 300)
+    scene.load_from_config({'buttons': [
+        dict(x=0, y=0, w=80, h=80, lclick="e", hover="w", hover_delay=0),
+    ]})
+    scene.set_mode('run')
+    item = scene.button_items[0]
+
+    view = QGraphicsView(scene)
+    view.setFrameShape(QGraphicsView.Shape.NoFrame)
+    view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    view.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+    view.setGeometry(0, 0, 400, 300)
+    view.show()
+    app.processEvents()
+
+    ctl = RunController(scene, view)
+    item.hoverActivated.connect(ctl.on_hover_activated)
+    item.hoverDeactivated.connect(ctl.on_hover_deactivated)
+    yield ctl, view, item
+    ctl.stop()
+    view.close()
+
+
+def _to_global(view, x, y):
+    p = view.mapToGlobal(view.mapFromScene(x, y))
+    return p.x(), p.y()
+
+
+def test_controller_tick_drives_hover_and_click(rec, overlay):
+    from engine.run_controller import VK_LBUTTON
+    ctl, view, item = overlay
+    ctl.start()
+    rec.clear()
+
+    def tick():
+        ctl._tick()
+        input_engine.get_dispatcher().flush()
+
+    c = item.sceneBoundingRect().center()
+    rec.move_cursor(*_to_global(view, c.x(), c.y()))
+    tick()
+    assert [(ev.code, ev.kind) for ev in rec.events] == [(17, INPUT_KEYBOARD)]  # hover 'w' 按下
+
+    rec.set_key_state(VK_LBUTTON, True)
+    tick()
+    rec.set_key_state(VK_LBUTTON, False)
+    tick()
+    codes = [(ev.code, bool(ev.flags & input_engine.KEYEVENTF_KEYUP)) for ev in rec.events]
+    assert codes[1:] == [(18, False), (18, True)]  # 左键 'e' 按下/抬起
+
+    rec.move_cursor(*_to_global(view, 2, 2))
+    tick()
+    assert (17, True) in [(ev.code, bool(ev.flags & input_engine.KEYEVENTF_KEYUP))
+                          for ev in rec.events]
+    assert not any(ev.kind == INPUT_MOUSE for ev in rec.events)
+
+    ctl.stop()
+    assert input_engine.get_dispatcher() is None
+    assert ctl.dispatch_stats()['injected'] == 4
+
+
+def test_mouse_hook_queues_moves_and_buttons(rec):
+    wakes = []
+    input_engine.install_wheel_hook()
+    input_engine.set_mouse_listener(lambda: wakes.append(1))
+    rec.feed_mouse_hook(input_engine.WM_MOUSEMOVE, 1, 1)
+    rec.feed_mouse_hook(input_engine.WM_MOUSEMOVE, 2, 2)  # 与队尾移动合并
+    rec.feed_mouse_hook(input_engine.WM_LBUTTONDOWN, 2, 2)
+    rec.feed_mouse_hook(input_engine.WM_LBUTTONUP, 2, 2, flags=input_engine.LLMHF_INJECTED)
+    rec.feed_mouse_hook(input_engine.WM_XBUTTONDOWN, 3, 3, 2 << 16)
+    assert wakes == [1]  # 取出前只唤醒一次
+    events = input_engine.poll_mouse_events()
+    assert [(e.x, e.vk, e.down) for e in events] == [(2, 0, False), (2, 0x01, True), (3, 0x06, True)]
+    rec.feed_mouse_hook(input_engine.WM_MOUSEMOVE, 4, 4)
+    assert wakes == [1, 1]
+
+
+def test_event_driven_controller_catches_short_click(rec, overlay):
+    from PyQt6.QtWidgets import QApplication
+    from core.constants import HOOK_IDLE_INTERVAL
+    ctl, view, item = overlay
+    input_engine.install_wheel_hook()
+    ctl.start()
+    assert ctl._event_driven and ctl._timer.interval() == HOOK_IDLE_INTERVAL
+    rec.clear()
+
+    def pump():
+        if ctl._input_loop is not None:
+            assert ctl._input_loop.sync()
+        QApplication.processEvents()
+        input_engine.get_dispatcher().flush()
+
+    def log():
+        return [(ev.code, bool(ev.flags & input_engine.KEYEVENTF_KEYUP)) for ev in rec.events]
+
+    c = item.sceneBoundingRect().center()
+    x, y = _to_global(view, c.x(), c.y())
+    rec.feed_mouse_hook(input_engine.WM_MOUSEMOVE, x, y)
+    pump()
+    assert log() == [(17, False)]  # hover 'w'
+
+    # 按下 + 抬起在同一次唤醒前到达: 轮询会漏掉，事件驱动逐个处理
+    rec.feed_mouse_hook(input_engine.WM_LBUTTONDOWN, x, y)
+    rec.feed_mouse_hook(input_engine.WM_LBUTTONUP, x, y)
+    pump()
+    assert log()[1:] == [(18, False), (18, True)]
+
+    # 自身注入的鼠标键不回环
+    rec.feed_mouse_hook(input_engine.WM_LBUTTONDOWN, x, y, flags=input_engine.LLMHF_INJECTED)
+    pump()
+    assert len(log()) == 3
+
+    rec.feed_mouse_hook(input_engine.WM_MOUSEMOVE, *_to_global(view, 300, 250))
+    pump()
+    assert log()[3:] == [(17, True)]
+
+    ctl.stop()
+    assert not ctl._event_driven
+
+
+def test_passthrough_styles_are_recorded(rec, overlay):
+    from engine.passthrough_manager import PassthroughManager, WS_EX_TRANSPARENT
+    from views.input_shield_widget import InputShieldWidget
+    from core.constants import PT_ON, PT_OFF, PT_BLOCK
+    _, view, _ = overlay
+    shield = InputShieldWidget(view)
+    pm = PassthroughManager(view, shield)
+    pm.init_hwnd()
+    hwnd = pm._hwnd
+    assert rec.get_window_ex_style(hwnd) & WS_EX_TRANSPARENT
+    writes = len(rec.style_writes)
+    # 模式 / 布局变化只改遮罩形状，不再改写覆盖层样式
+    for mode in (PT_ON, PT_BLOCK, PT_OFF):
+        pm.set_mode(mode)
+        pm.set_input_region(view.scene().input_region())
+    assert len(rec.style_writes) == writes
+    assert [h for _, h, _ in rec.style_writes] == [hwnd] * writes
+    shield.close()
+
+
+def test_controller_tick_records_latency_stages(rec, overlay):
+    from core.latency_stats import get_latency_recorder
+    ctl, view, item = overlay
+    recorder = get_latency_recorder()
+    ctl.start()
+    recorder.reset()
+
+    c = item.sceneBoundingRect().center()
+    rec.move_cursor(*_to_global(view, c.x(), c.y()))
+    ctl._tick()
+    input_engine.get_dispatcher().flush()
+
+    snap = ctl.latency_stats()
+    for name in ('tick/tick', 'cursor/tick', 'hit_test/tick', 'state/hover',
+                 'trigger/hover', 'submit/hover', 'inject/hover', 'end_to_end/hover'):
+        assert snap[name]['count'] >= 1, name
+    recorder.reset()
+
+
+def test_tick_samples_one_frame_for_all_consumers(rec, overlay, monkeypatch):
+    from engine.run_controller import VK_XBUTTON1
+    from scene.virtual_cursor_item import VirtualCursorItem
+    ctl, view, item = overlay
+    cursor = VirtualCursorItem()
+    view.scene().addItem(cursor)
+    ctl.frame_ready.connect(cursor.follow_frame)
+    frames = []
+    ctl.frame_ready.connect(frames.append)
+    ctl.start()
+    ctl.auto_center = True
+    cursor.start_tracking(follow_frames=True)
+    assert not cursor._tracker.isActive()
+
+    calls = {'cursor': 0, 'hit': 0}
+    get_pos, item_at = rec.get_cursor_pos, ctl._item_at
+
+    def counted_pos():
+        calls['cursor'] += 1
+        return get_pos()
+
+    def counted_hit(x, y):
+        calls['hit'] += 1
+        return item_at(x, y)
+
+    monkeypatch.setattr(rec, 'get_cursor_pos', counted_pos)
+    monkeypatch.setattr(ctl, '_item_at', counted_hit)
+
+    rec.move_cursor(*_to_global(view, 300, 250))
+    rec.set_key_state(VK_XBUTTON1, True)  # 侧键沿 + 自动回中都复用本帧快照
+    ctl._tick()
+    assert calls == {'cursor': 1, 'hit': 1}
+    assert len(frames) == 1 and not frames[0].on_ui
+    frame = frames[0]
+    assert frame.item is None and frame.xb1 and not frame.lmb
+    assert (cursor.pos().x(), cursor.pos().y()) == (300, 250)
+
+    c = item.sceneBoundingRect().center()
+    rec.move_cursor(*_to_global(view, c.x(), c.y()))
+    ctl._tick()
+    assert calls == {'cursor': 2, 'hit': 2}
+    assert frames[-1].item is item and frames[-1].on_ui
+    assert cursor.pos() == c
+    ctl.stop()
+
+
+def test_controller_backs_off_when_idle_and_snaps_back_on_motion(rec, overlay):
+    from core.constants import UPDATE_INTERVAL, POLL_IDLE_INTERVAL
+    from engine.run_controller import VK_LBUTTON
+    ctl, view, item = overlay
+    ctl.start()
+    now = [0.0]
+    ctl._scheduler._clock = lambda: now[0]
+    ctl._scheduler.reset()
+
+    def tick_at(t):
+        now[0] = t
+        ctl._tick()
+        return ctl._timer.interval()
+
+    rec.move_cursor(*_to_global(view, 300, 250))
+    assert tick_at(0.0) == UPDATE_INTERVAL
+    assert tick_at(0.6) == POLL_IDLE_INTERVAL
+    assert ctl.tick_stats()['mode'] == 'idle'
+
+    rec.move_cursor(*_to_global(view, 301, 250))
+    assert tick_at(0.7) <= UPDATE_INTERVAL
+    assert ctl.tick_stats()['mode'] == 'burst'
+
+    # 按键按住期间保持全速
+    rec.set_key_state(VK_LBUTTON, True)
+    assert tick_at(2.0) == UPDATE_INTERVAL
+    assert tick_at(3.0) == UPDATE_INTERVAL
+    rec.set_key_state(VK_LBUTTON, False)
+    tick_at(3.1)
+    assert tick_at(4.0) == POLL_IDLE_INTERVAL
+    ctl.stop()
+
+
+def test_state_signals_fire_only_on_transitions(rec, overlay, monkeypatch):
+    from core.constants import AUTO_CENTER_BAR_W
+    from engine import run_controller
+    ctl, view, item = overlay
+    now = [0.0]
+
+    class _Clock:
+        time = perf_counter = staticmethod(lambda: now[0])
+        perf_counter_ns = staticmethod(lambda: int(now[0] * 1e9))
+
+    monkeypatch.setattr(run_controller, '_time', _Clock)
+    progress = []
+    ctl.auto_center_progress.connect(lambda p, x, y: progress.append(p))
+    ctl.start()
+    ctl.auto_center = True
+    rec.move_cursor(*_to_global(view, 300, 250))   # 空白处，远离中心
+    for i in range(120):                            # 1 秒 120 帧
+        now[0] = i / 120
+        ctl._tick()
+    # 1.5s 倒计时走了 1 秒: 进度条 50px 宽，最多每像素一次
+    assert 1 < len(progress) <= AUTO_CENTER_BAR_W
+    stats = ctl.signal_stats()
+    assert stats['auto_center_progress']['offered'] == 120
+    assert stats['auto_center_progress']['emitted'] == len(progress)
+
+    c = item.sceneBoundingRect().center()
+    rec.move_cursor(*_to_global(view, c.x(), c.y()))
+    ctl._tick()
+    ctl._tick()
+    assert progress[-1] == -1
+    n = len(progress)
+    ctl._tick()
+    assert len(progress) == n   # 隐藏只发一次
+    ctl.stop()
@@ -0,0 +1,116 @@
+"""
+TEGG Touch - 批量输入注入测试（内存记录后端，跨平台）
+
+用法:
+    python -m pytest tests/test_input_batch.py
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+
+from core import input_engine
+from core.input_backend import (
+    RecordingBackend, InputEvent, INPUT_KEYBOARD, INPUT_MOUSE, set_backend,
+)
+from core.timer_service import TimerService, set_timer_service
+
+# 测试用扫描码表（Linux 下 keyboard 库无法解析扫描码）
+_SCAN = {'shift': 42, 'w': 17, 'a': 30, 's': 31, 'd': 32, 'up': 72}
+
+
+@pytest.fixture
+def rec(monkeypatch):
+    backend = RecordingBackend()
+    old = set_backend(backend)
+    monkeypatch.setattr(input_engine, 'get_scan_code', lambda k: _SCAN.get(k, 0))
+    old_timers = set_timer_service(TimerService(clock=lambda: 0.0, threaded=False))
+    input_engine._pressed_keys.clear()
+    yield backend
+    input_engine.release_all_keys()
+    set_timer_service(old_timers)
+    set_backend(old)
+
+
+def test_combo_press_is_one_batch(rec):
+    input_engine.trigger("shift+w+a", 'p')
+    assert rec.batches == 1
+    assert [ev.code for ev in rec.events] == [42, 17, 30]
+    assert all(ev.kind == INPUT_KEYBOARD for ev in rec.events)
+    assert input_engine._pressed_keys == {(42, False), (17, False), (30, False)}
+
+    input_engine.trigger("shift+w+a", 'r')
+    assert rec.batches == 2
+    assert all(ev.flags & input_engine.KEYEVENTF_KEYUP for ev in rec.events[3:])
+    assert input_engine._pressed_keys == set()
+
+
+def test_mouse_buttons_join_key_batch(rec):
+    input_engine.trigger("w", 'p', ('left',))
+    assert rec.batches == 1
+    assert rec.events == [
+        input_engine.key_event(17, False, up=False),
+        InputEvent(INPUT_MOUSE, 0, input_engine.MOUSEEVENTF_LEFTDOWN, 0),
+    ]
+
+
+def test_click_returns_before_release(rec):
+    from core.timer_service import get_timer_service
+    input_engine.trigger("w+a", 'c')
+    assert rec.batches == 1  # 只提交了按下，释放交给定时服务
+    assert input_engine.pending_click_count() == 1
+
+    timers = get_timer_service()
+    assert input_engine.CLICK_HOLD_MIN_SEC <= timers.next_deadline() <= input_engine.CLICK_HOLD_MAX_SEC
+    assert timers.run_due(1.0) == 1
+    assert rec.batches == 2
+    assert all(ev.flags & input_engine.KEYEVENTF_KEYUP for ev in rec.events[2:])
+    assert input_engine.pending_click_count() == 0
+    assert input_engine._pressed_keys == set()
+
+
+def test_release_all_cancels_overlapping_clicks(rec):
+    from core.timer_service import get_timer_service
+    input_engine.trigger("w", 'c')
+    input_engine.trigger("a", 'c')
+    assert input_engine.pending_click_count() == 2
+    rec.clear()
+
+    input_engine.release_all_keys()
+    assert input_engine.pending_click_count() == 0
+    assert rec.batches == 1 and len(rec.events) == 2
+    assert get_timer_service().run_due(1.0) == 0  # 已取消，不再重复释放
+
+
+
+def test_release_all_releases_pending_mouse_click(rec):
+    from core.timer_service import get_timer_service
+    input_engine.trigger("w", 'c', ('left',))
+    rec.clear()
+
+    input_engine.release_all_keys()  # 点击尚未到期时停止运行模式
+    get_timer_service().run_due(1e9)
+    assert rec.batches == 1
+    assert rec.events == [
+        input_engine.key_event(17, False, up=True),
+        InputEvent(INPUT_MOUSE, 0, input_engine.MOUSEEVENTF_LEFTUP, 0),
+    ]
+
+def test_unknown_keys_skipped_and_extended_flag(rec):
+    input_engine.trigger("nosuchkey+up", 'p')
+    assert rec.events == [input_engine.key_event(72, True, up=False)]
+    assert rec.events[0].flags & input_engine.KEYEVENTF_EXTENDEDKEY
+
+
+def test_release_all_is_one_batch(rec):
+    input_engine.trigger("shift+w", 'p')
+    input_engine.trigger("d", 'p')
+    rec.clear()
+    input_engine.release_all_keys()
+    assert rec.batches == 1
+    assert sorted(ev.code for ev in rec.events) == [17, 32, 42]
@@ -0,0 +1,122 @@
+"""
+TEGG Touch - 输入派发线程测试
+
+用法:
+    python -m pytest tests/test_input_dispatcher.py
+"""
+
+import os
+import sys
+import threading
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+
+from core import input_engine
+from core.input_backend import RecordingBackend, set_backend
+from core.input_dispatcher import InputDispatcher
+
+
+class _GatedBackend(RecordingBackend):
+    """注入前等待闸门打开 — 模拟 SendInput 卡顿"""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+
+    def send(self, events):
+        self.gate.wait(2.0)
+        return super().send(events)
+
+
+@pytest.fixture
+def gated():
+    backend = _GatedBackend()
+    old = set_backend(backend)
+    input_engine._pressed_keys.clear()
+    yield backend
+    backend.gate.set()
+    input_engine.stop_dispatcher()
+    input_engine._pressed_keys.clear()
+    set_backend(old)
+
+
+def test_producers_do_not_block_and_order_is_global(gated):
+    input_engine.start_dispatcher()
+    down = [input_engine.key_event(17, False, up=False)]
+
+    def producer():
+        for _ in range(10):
+            input_engine.send_events(down)
+
+    t = threading.Thread(target=producer)
+    t.start()
+    t.join(1.0)
+    assert not t.is_alive()  # 后端卡住时生产者仍立即返回
+    input_engine.send_events([input_engine.key_event(17, False, up=True)])
+
+    gated.gate.set()
+    assert input_engine.get_dispatcher().flush(2.0)
+    flags = [ev.flags & input_engine.KEYEVENTF_KEYUP for ev in gated.events]
+    assert flags == [0] * 10 + [input_engine.KEYEVENTF_KEYUP]
+
+
+def test_full_ring_drops_presses_but_keeps_releases(gated):
+    d = input_engine.start_dispatcher(capacity=4)
+    for sc in range(1, 9):
+        input_engine.send_events([input_engine.key_event(sc, False, up=False)])
+    input_engine.release_all_keys()  # 闸门关闭: flush 超时，但释放批次已入队
+
+    stats = d.stats()
+    assert stats['dropped'] > 0
+    assert stats['max_depth'] > 4  # 释放批次可以越过容量
+    gated.gate.set()
+    assert d.flush(2.0)
+
+    pressed = {ev.code for ev in gated.events if not ev.flags & input_engine.KEYEVENTF_KEYUP}
+    released = {ev.code for ev in gated.events if ev.flags & input_engine.KEYEVENTF_KEYUP}
+    assert pressed == released  # 被丢弃的按下不会留下孤立释放，也没有卡键
+
+
+def test_full_ring_keeps_handoff_releases(gated):
+    input_engine.release_all_keys()  # 清空所有权登记
+    d = input_engine.start_dispatcher(capacity=4)
+    w, a, x = (input_engine.key_event(sc, False, up=False) for sc in (17, 30, 45))
+    up = [input_engine._release_event(ev) for ev in (w, a)]
+    input_engine.press_owned('nw', [w, a])
+    sc = 100
+    while d.stats()['dropped'] == 0:  # 填满队列
+        input_engine.send_events([input_engine.key_event(sc, False, up=False)])
+        sc += 1
+
+    # ↖(w+a) → x: 按下被丢弃，旧来源的释放仍然入队
+    assert input_engine.handoff_owned('nw', [w, a], up, 'x', [x]) == 2
+    assert input_engine.key_owners(x) == frozenset()
+    gated.gate.set()
+    assert d.flush(2.0)
+
+    log = [(ev.code, bool(ev.flags & input_engine.KEYEVENTF_KEYUP))
+           for ev in gated.events if ev.code in (17, 30, 45)]
+    assert log == [(17, False), (30, False), (17, True), (30, True)]
+    assert input_engine.key_owners(w) == input_engine.key_owners(a) == frozenset()
+
+
+def test_latency_metrics():
+    now = [0.0]
+    backend = RecordingBackend()
+    old = set_backend(backend)
+    try:
+        d = InputDispatcher(clock=lambda: now[0])
+        d.submit([input_engine.key_event(1, False, up=False)])
+        now[0] = 0.004
+        d.start()
+        assert d.flush(1.0)
+        d.stop()
+        s = d.stats()
+        assert s['injected'] == 1 and s['depth'] == 0
+        assert s['latency_p50_ms'] == pytest.approx(4.0)
+    finally:
+        set_backend(old)
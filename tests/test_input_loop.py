@@ -0,0 +1,233 @@
+"""
+TEGG Touch - 独立输入线程测试（内存记录后端 + Qt offscreen）
+
+GUI 线程卡顿期间，钩子事件仍由输入线程即时命中并注入（含充能 / 释放延迟的 hover）；
+布局变化后快照被替换。
+
+用法:
+    python -m pytest tests/test_input_loop.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from core import input_engine
+from core.input_backend import RecordingBackend, set_backend
+from core.binding_plan import clear_plan_cache
+
+_SCAN = {'w': 17, 'e': 18}
+STALL_SEC = 0.4     # GUI 线程卡顿时长
+CLICKS = 20         # 卡顿期间的点击次数
+MAX_LATENCY = 0.1   # 卡顿期间单次点击的注入延迟上限 (秒)
+
+_qapp = None
+
+
+@pytest.fixture
+def rec(monkeypatch):
+    backend = RecordingBackend()
+    old = set_backend(backend)
+    monkeypatch.setattr(input_engine, 'get_scan_code', lambda k: _SCAN.get(k, 0))
+    input_engine._pressed_keys.clear()
+    clear_plan_cache()
+    yield backend
+    input_engine.uninstall_wheel_hook()
+    input_engine.set_mouse_listener(None)
+    input_engine.poll_mouse_events()
+    input_engine._pressed_keys.clear()
+    clear_plan_cache()
+    set_backend(old)
+
+
+@pytest.fixture
+def overlay(rec, monkeypatch, request):
+    global _qapp
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication, QGraphicsView
+    from engine import run_controller
+    from engine.run_controller import RunController
+    from scene.overlay_scene import OverlayScene
+
+    _qapp = QApplication.instance() or QApplication([])
+    monkeypatch.setattr(run_controller, 'is_key_pressed', lambda k: False)
+
+    scene = OverlayScene()
+    scene.setSceneRect(0, 0, 400, 300)
+    delays = getattr(request, 'param', dict(hover_delay=0))  # 间接参数化: hover 延迟
+    scene.load_from_config({'buttons': [
+        dict(x=-180 + 100 * i, y=-130, w=80, h=80, lclick="e", hover="w", **delays)
+        for i in range(4)
+    ]})
+    scene.set_mode('run')
+
+    view = QGraphicsView(scene)
+    view.setFrameShape(QGraphicsView.Shape.NoFrame)
+    view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    view.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+    view.setGeometry(0, 0, 400, 300)
+    view.show()
+    _qapp.processEvents()
+
+    ctl = RunController(scene, view)
+    for item in scene.button_items:
+        item.hoverActivated.connect(ctl.on_hover_activated)
+        item.hoverDeactivated.connect(ctl.on_hover_deactivated)
+    input_engine.install_wheel_hook()
+    yield ctl, view, scene.button_items
+    ctl.stop()
+    view.close()
+
+
+def _center(view, item):
+    c = item.sceneBoundingRect().center()
+    p = view.mapToGlobal(view.mapFromScene(c))
+    return p.x(), p.y()
+
+
+def _key_downs(rec, code):
+    return [ts for ts, _, ev in rec.records
+            if ev.code == code and not ev.flags & input_engine.KEYEVENTF_KEYUP]
+
+
+def _key_ups(rec, code):
+    return [ts for ts, _, ev in rec.records
+            if ev.code == code and ev.flags & input_engine.KEYEVENTF_KEYUP]
+
+
+def _stalled_clicks(rec, view, items):
+    """辅助线程按固定节奏在各按钮上点击，主线程同时卡住（不处理 Qt 事件）。
+    返回 (每次按下的送达时刻, 卡顿结束时刻)"""
+    targets = [_center(view, item) for item in items]
+    fed = []
+
+    def feeder():
+        for i in range(CLICKS):
+            x, y = targets[i % len(targets)]
+            rec.feed_mouse_hook(input_engine.WM_MOUSEMOVE, x, y)
+            fed.append(time.perf_counter())
+            rec.feed_mouse_hook(input_engine.WM_LBUTTONDOWN, x, y)
+            rec.feed_mouse_hook(input_engine.WM_LBUTTONUP, x, y)
+            time.sleep(0.01)
+
+    t = threading.Thread(target=feeder)
+    t.start()
+    time.sleep(STALL_SEC)  # GUI 线程卡顿
+    stall_end = time.perf_counter()
+    t.join()
+    return fed, stall_end
+
+
+def test_clicks_inject_while_gui_thread_is_stalled(rec, overlay):
+    ctl, view, items = overlay
+    ctl.start()
+    loop = ctl._input_loop
+    assert loop is not None and loop.running
+    rec.clear()
+
+    fed, stall_end = _stalled_clicks(rec, view, items)
+    assert loop.sync()
+    input_engine.get_dispatcher().flush()
+
+    downs = _key_downs(rec, _SCAN['e'])
+    assert len(downs) == CLICKS
+    latency = [d - f for d, f in zip(downs, fed)]
+    assert all(d < stall_end for d in downs)
+    assert max(latency) < MAX_LATENCY
+    # hover 交接照常（每次换按钮按下新 hover 'w'，共享键不中断）
+    assert _key_downs(rec, _SCAN['w'])
+
+    # 视觉状态在 GUI 线程恢复处理后补上
+    _qapp.processEvents()
+    assert items[(CLICKS - 1) % len(items)]._visual_state == 'hover'
+    assert ctl._frame is not None and ctl._frame.item is items[(CLICKS - 1) % len(items)]
+
+
+def test_gui_thread_path_defers_clicks_until_stall_ends(rec, overlay, monkeypatch):
+    from engine import run_controller
+    monkeypatch.setattr(run_controller, 'INPUT_THREAD', False)
+    ctl, view, items = overlay
+    ctl.start()
+    assert ctl._input_loop is None and ctl._event_driven
+    rec.clear()
+
+    _, stall_end = _stalled_clicks(rec, view, items)
+    assert _key_downs(rec, _SCAN['e']) == []
+    _qapp.processEvents()
+    input_engine.get_dispatcher().flush()
+    downs = _key_downs(rec, _SCAN['e'])
+    assert len(downs) == CLICKS and all(d >= stall_end for d in downs)
+
+
+@pytest.mark.parametrize('overlay', [dict(hover_delay=200, hover_release_delay=100)], indirect=True)
+def test_timed_hover_fires_while_gui_thread_is_stalled(rec, overlay):
+    from PyQt6.QtCore import QPoint
+    ctl, view, items = overlay
+    ctl.start()
+    loop = ctl._input_loop
+    x, y = _center(view, items[0])
+    out = view.mapToGlobal(QPoint(390, 290))   # 空白处
+    rec.clear()
+    fed = []
+
+    def feeder():
+        fed.append(time.perf_counter())
+        rec.feed_mouse_hook(input_engine.WM_MOUSEMOVE, x, y)
+        time.sleep(0.3)
+        fed.append(time.perf_counter())
+        rec.feed_mouse_hook(input_engine.WM_MOUSEMOVE, out.x(), out.y())
+
+    t = threading.Thread(target=feeder)
+    t.start()
+    time.sleep(0.6)  # GUI 线程卡顿，覆盖充能 (200ms) 与释放 (100ms)
+    stall_end = time.perf_counter()
+    t.join()
+    assert loop.sync()
+    input_engine.get_dispatcher().flush()
+
+    downs, ups = _key_downs(rec, _SCAN['w']), _key_ups(rec, _SCAN['w'])
+    assert len(downs) == 1 and len(ups) == 1
+    assert 0.2 <= downs[0] - fed[0] < 0.2 + MAX_LATENCY
+    assert 0.1 <= ups[0] - fed[1] < 0.1 + MAX_LATENCY
+    assert ups[0] < stall_end
+    assert loop.held == 0
+
+    # 进度条与外观在 GUI 线程恢复后补上，最终回到 normal / 空进度
+    _qapp.processEvents()
+    assert items[0]._visual_state == 'normal'
+    assert items[0]._charge_progress == 0.0
+
+
+def test_layout_change_replaces_snapshot(rec, overlay):
+    ctl, view, items = overlay
+    ctl.start()
+    loop = ctl._input_loop
+    first = loop.layout
+    x, y = _center(view, items[0])
+
+    items[0].setVisible(False)
+    ctl._tick()
+    assert loop.layout is not first
+    rec.clear()
+    rec.feed_mouse_hook(input_engine.WM_MOUSEMOVE, x, y)
+    rec.feed_mouse_hook(input_engine.WM_LBUTTONDOWN, x, y)
+    rec.feed_mouse_hook(input_engine.WM_LBUTTONUP, x, y)
+    assert loop.sync()
+    input_engine.get_dispatcher().flush()
+    assert rec.events == []
+
+    items[0].setVisible(True)
+    ctl._tick()
+    assert loop.sync()
+    input_engine.get_dispatcher().flush()
+    assert _key_downs(rec, _SCAN['w'])  # 快照替换后在当前坐标重做 hover
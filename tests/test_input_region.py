@@ -0,0 +1,274 @@
+"""
+TEGG Touch - 输入区域测试（纯几何 + 场景布局 / 输入遮罩窗口，Qt offscreen）
+
+用法:
+    python -m pytest tests/test_input_region.py
+"""
+
+import math
+import os
+import random
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from core.constants import default_wheel_sectors, default_wheel_center_ring
+from core.input_region import InputRegion, rect_shape, ring_shape, sector_shape
+
+_qapp = None
+
+
+def _app():
+    global _qapp
+    from PyQt6.QtWidgets import QApplication
+    _qapp = QApplication.instance() or QApplication([])
+    return _qapp
+
+
+def _pixels(rects):
+    covered = set()
+    for x, y, w, h in rects:
+        for i in range(x, x + w):
+            for j in range(y, y + h):
+                assert (i, j) not in covered  # 矩形互不重叠
+                covered.add((i, j))
+    return covered
+
+
+# ─── 纯几何 ──────────────────────────────────────────────────
+
+SHAPES = {
+    'btn': rect_shape(10.5, 12, 60, 40),
+    'ring': ring_shape(200, 150, 30, 60),
+    'disc': ring_shape(330, 240, 0, 25),
+    'sector': sector_shape(320, 70, 10, 50, 30, 100),
+    'wrap': sector_shape(90, 220, 15, 45, 300, 90),      # 跨越 0°
+    'wide': sector_shape(200, 150, 70, 90, 200, 250),    # 超过 180°
+    'edge': rect_shape(380, -20, 450, 30),               # 超出边界
+}
+
+
+def test_rasterization_matches_geometry():
+    region = InputRegion((0, 0, 400, 300))
+    for key, shape in SHAPES.items():
+        region.set(key, shape)
+    covered = _pixels(region.rects())
+    for x in range(400):
+        for y in range(300):
+            assert ((x, y) in covered) == region.contains(x + 0.5, y + 0.5), (x, y)
+    # 带状排序: 按 y 再按 x
+    rects = region.rects()
+    assert list(rects) == sorted(rects, key=lambda r: (r[1], r[0]))
+    # 补集
+    inverted = _pixels(region.rects(inverted=True))
+    assert not covered & inverted
+    assert len(covered) + len(inverted) == 400 * 300
+
+
+def test_incremental_updates_match_full_rebuild():
+    rng = random.Random(7)
+    region = InputRegion((0, 0, 400, 300))
+    current = {}
+    for step in range(200):
+        key = rng.choice(list(SHAPES) + ['extra%d' % i for i in range(5)])
+        op = rng.random()
+        if op < 0.2:
+            region.remove(key)
+            current.pop(key, None)
+        elif op < 0.4 and key in current:
+            visible = not current[key][1]
+            region.set(key, current[key][0], visible)
+            current[key] = (current[key][0], visible)
+        else:
+            x, y = rng.uniform(-20, 380), rng.uniform(-20, 280)
+            shape = (rect_shape(x, y, x + rng.uniform(5, 80), y + rng.uniform(5, 80))
+                     if rng.random() < 0.5 else
+                     sector_shape(x, y, rng.uniform(0, 20), rng.uniform(25, 60),
+                                  rng.uniform(0, 360), rng.uniform(10, 360)))
+            region.set(key, shape)
+            current[key] = (shape, True)
+        if step % 10 == 0:
+            fresh = InputRegion((0, 0, 400, 300))
+            fresh.sync(current)
+            assert region.rects() == fresh.rects()
+            assert region.rects(inverted=True) == fresh.rects(inverted=True)
+
+
+def test_updates_touch_only_changed_shapes_and_rows():
+    region = InputRegion((0, 0, 400, 300))
+    region.sync({k: (s, True) for k, s in SHAPES.items()})
+    region.rects()
+    before = region.stats()
+
+    # 移动一个按钮: 只光栅化它，只重算新旧位置覆盖的行
+    region.set('btn', rect_shape(10.5, 100, 60, 128))
+    region.rects()
+    after = region.stats()
+    assert after['shapes_rasterized'] == before['shapes_rasterized'] + 1
+    assert after['rows_rebuilt'] - before['rows_rebuilt'] == 28 + 28
+
+    # 显隐不重新光栅化；相同内容不改变 version
+    region.set('ring', SHAPES['ring'], visible=False)
+    region.set('ring', SHAPES['ring'], visible=True)
+    version = region.version
+    assert region.sync({k: (region_shape, True) for k, region_shape in
+                        dict(SHAPES, btn=rect_shape(10.5, 100, 60, 128)).items()}) == 0
+    assert region.version == version
+    assert region.stats()['shapes_rasterized'] == after['shapes_rasterized']
+
+
+# ─── 场景布局 ────────────────────────────────────────────────
+
+W, H = 800, 600
+EDGE_EPS = 0.75
+
+
+def _make_scene():
+    from scene.overlay_scene import OverlayScene
+    _app()
+    scene = OverlayScene()
+    scene.setSceneRect(0, 0, W, H)
+    scene.load_from_config({
+        'buttons': [
+            dict(x=-380, y=-280, w=100, h=60, lclick="e"),
+            dict(x=200, y=150, w=100, h=100, hover="w"),
+        ],
+        'wheel_visible': True,
+        'wheel_mode': 'large',
+        'wheel_sectors': default_wheel_sectors(),
+        'wheel_center_ring': default_wheel_center_ring(),
+    })
+    scene.set_mode('run')
+    return scene
+
+
+def _near_edge(scene, x, y):
+    for item in scene.button_items:
+        r = item.sceneBoundingRect()
+        if min(abs(x - r.left()), abs(x - r.right()), abs(y - r.top()), abs(y - r.bottom())) < EDGE_EPS:
+            return True
+    for item in list(scene.wheel_items) + [i for i in (scene.ring_item,) if i is not None]:
+        r = math.hypot(x - item._cx, y - item._cy)
+        if min(abs(r - item._r_inner), abs(r - item._r_outer)) < EDGE_EPS:
+            return True
+    return False
+
+
+def test_scene_region_matches_hit_index():
+    scene = _make_scene()
+    region = scene.input_region()
+    index = scene.hit_index()
+    rng = random.Random(3)
+    hits = 0
+    for _ in range(3000):
+        x, y = rng.uniform(0, W), rng.uniform(0, H)
+        if _near_edge(scene, x, y):
+            continue
+        on_ui = index.item_at(x, y) is not None
+        assert region.contains(x, y) == on_ui, (x, y)
+        hits += on_ui
+    assert hits > 100
+    # 空 shape 的 Item（Tooltip / 回中进度条）不进入区域
+    assert scene._tooltip not in region and scene._ac_bar not in region
+
+
+def test_scene_region_follows_move_resize_and_visibility():
+    scene = _make_scene()
+    btn = scene.button_items[0]
+    region = scene.input_region()
+    version, rasterized = region.version, region.stats()['shapes_rasterized']
+    assert scene.input_region().version == version  # 布局未变 → 区域不变
+
+    c = btn.sceneBoundingRect().center()
+    btn.setVisible(False)
+    assert not scene.input_region().contains(c.x(), c.y())
+    btn.setVisible(True)
+    assert scene.input_region().contains(c.x(), c.y())
+    assert region.stats()['shapes_rasterized'] == rasterized
+
+    btn.setPos(btn.pos().x() + 300, btn.pos().y())
+    moved = btn.sceneBoundingRect().center()
+    region = scene.input_region()
+    assert region.contains(moved.x(), moved.y()) and not region.contains(c.x(), c.y())
+    assert region.stats()['shapes_rasterized'] - rasterized <= 2  # 按钮 + 它的缩放手柄
+
+    toolbar = {'run_toolbar': rect_shape(0, 560, 300, 600)}
+    assert scene.input_region(extra=toolbar).contains(10, 580)
+    assert not scene.input_region().contains(10, 580)
+
+
+# ─── 输入遮罩窗口 ────────────────────────────────────────────
+
+@pytest.fixture
+def shielded():
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QGraphicsView
+    from engine.passthrough_manager import PassthroughManager
+    from views.input_shield_widget import InputShieldWidget
+
+    scene = _make_scene()
+    view = QGraphicsView(scene)
+    view.setFrameShape(QGraphicsView.Shape.NoFrame)
+    view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+    view.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+    view.setGeometry(0, 0, W, H)
+    view.show()
+    shield = InputShieldWidget(view)
+    pm = PassthroughManager(view, shield)
+    yield scene, view, shield, pm
+    shield.close()
+    view.close()
+
+
+def test_shield_shape_follows_mode_and_layout_only(shielded):
+    from PyQt6.QtCore import QPoint
+    from core.constants import PT_ON, PT_OFF, PT_BLOCK
+    scene, view, shield, pm = shielded
+    btn = scene.button_items[0]
+    on_btn = btn.sceneBoundingRect().center().toPoint()
+    blank = QPoint(W - 5, 5)
+
+    pm.set_input_region(scene.input_region())       # 默认 pt_off
+    assert shield.isVisible()
+    assert shield.mask().contains(on_btn) and not shield.mask().contains(blank)
+    applied = shield.apply_count
+
+    for _ in range(5):                              # 布局未变: 不重新设置形状
+        pm.set_input_region(scene.input_region())
+    assert shield.apply_count == applied
+
+    pm.set_mode(PT_BLOCK)
+    assert not shield.mask().contains(on_btn) and shield.mask().contains(blank)
+    pm.set_mode(PT_ON)
+    assert not shield.isVisible()
+    pm.set_mode(PT_OFF)
+    btn.setVisible(False)
+    pm.set_input_region(scene.input_region())
+    assert not shield.mask().contains(on_btn)
+
+
+def test_shield_forwards_clicks_to_scene_items(shielded):
+    from PyQt6.QtCore import Qt, QEvent, QPointF
+    from PyQt6.QtGui import QMouseEvent
+    from PyQt6.QtWidgets import QApplication
+    scene, view, shield, pm = shielded
+    pm.set_input_region(scene.input_region())
+    btn = scene.button_items[0]
+    fired = []
+    btn.actionTriggered.connect(lambda data, plan, action: fired.append(action))
+
+    local = QPointF(view.mapFromScene(btn.sceneBoundingRect().center()))
+    gpos = QPointF(shield.mapToGlobal(local))
+    for etype in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease):
+        QApplication.sendEvent(shield, QMouseEvent(
+            etype, local, gpos, Qt.MouseButton.LeftButton,
+            Qt.MouseButton.LeftButton if etype == QEvent.Type.MouseButtonPress else Qt.MouseButton.NoButton,
+            Qt.KeyboardModifier.NoModifier))
+    assert fired == ['p', 'r']
@@ -0,0 +1,164 @@
+"""
+TEGG Touch - 按键所有权（引用计数）测试
+
+用法:
+    python -m pytest tests/test_key_ownership.py
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+
+from core import input_engine
+from core.binding_plan import compile_binding, clear_plan_cache
+from core.input_backend import RecordingBackend, set_backend
+from core.timer_service import TimerService, set_timer_service
+
+_SCAN = {'shift': 42, 'w': 17, 'a': 30}
+KEYUP = input_engine.KEYEVENTF_KEYUP
+
+
+@pytest.fixture
+def rec(monkeypatch):
+    backend = RecordingBackend()
+    old = set_backend(backend)
+    old_timers = set_timer_service(TimerService(clock=lambda: 0.0, threaded=False))
+    monkeypatch.setattr(input_engine, 'get_scan_code', lambda k: _SCAN.get(k, 0))
+    clear_plan_cache()
+    input_engine.release_all_keys()
+    backend.clear()
+    yield backend
+    input_engine.release_all_keys()
+    clear_plan_cache()
+    set_timer_service(old_timers)
+    set_backend(old)
+
+
+def _hold(source, keys):
+    plan = compile_binding(keys)
+    input_engine.trigger_events(plan.press, plan.release, 'p', source=source)
+
+
+def _drop(source, keys):
+    plan = compile_binding(keys)
+    input_engine.trigger_events(plan.press, plan.release, 'r', source=source)
+
+
+def _log(rec):
+    return [(ev.code, bool(ev.flags & KEYUP)) for ev in rec.events]
+
+
+def test_shared_modifier_survives_first_release(rec):
+    _hold('sector', "shift+w")
+    _hold('button', "shift")
+    assert _log(rec) == [(42, False), (17, False)]  # shift 只按一次
+
+    _drop('sector', "shift+w")
+    assert _log(rec)[2:] == [(17, True)]  # button 仍持有 shift
+    _drop('button', "shift")
+    assert _log(rec)[3:] == [(42, True)]
+
+
+def test_adjacent_handoff_keeps_shared_key(rec):
+    _hold('nw', "w+a")
+    _hold('w', "a")      # 新扇区先按下
+    _drop('nw', "w+a")   # 旧扇区后释放
+    assert _log(rec) == [(17, False), (30, False), (17, True)]
+    assert input_engine.key_owners(input_engine.key_event(30, False, up=False)) == {'w'}
+
+
+def test_release_all_force_releases_owned_keys(rec):
+    _hold('a', "shift")
+    _hold('b', "shift+w")
+    input_engine.release_all_keys()
+    assert sorted(_log(rec)[2:]) == [(17, True), (42, True)]
+    assert input_engine.key_owners(input_engine.key_event(42, False, up=False)) == frozenset()
+    _drop('a', "shift")  # 未登记 → 照常释放
+    assert _log(rec)[-1] == (42, True)
+
+
+def test_click_does_not_release_held_key(rec):
+    from core.timer_service import get_timer_service
+    _hold('hover', "w")
+    plan = compile_binding("w+a")
+    input_engine.trigger_events(plan.tap_press, plan.tap_release, 'c')
+    get_timer_service().run_due(1.0)
+    assert _log(rec) == [(17, False), (30, False), (30, True)]
+
+
+# ─── 控制器: 同帧 hover 交接 ─────────────────────────────────
+
+class _FakeItem:
+    """最小 hover item: 真实 HoverStateMachine（delay=0），信号直连控制器"""
+
+    def __init__(self, ctl, hover):
+        from engine.hover_state_machine import HoverStateMachine
+        from models.button_model import ButtonData
+        self.data = ButtonData(hover=hover)
+        self.plans = {'hover': compile_binding(hover)}
+        self._hover_sm = HoverStateMachine(0, 0)
+        self._hover_sm.activated.connect(lambda: ctl.on_hover_activated(self.data, self.plans['hover']))
+        self._hover_sm.deactivated.connect(lambda: ctl.on_hover_deactivated(self.data, self.plans['hover']))
+
+    def isVisible(self):
+        return True
+
+    def set_visual_state(self, state):
+        pass
+
+
+def test_controller_handoff_emits_symmetric_difference(rec, monkeypatch):
+    from PyQt6.QtCore import QCoreApplication
+    from engine.run_controller import RunController
+    QCoreApplication.instance() or QCoreApplication([])
+
+    ctl = RunController(scene=None, window=None)
+    nw, west, dual = _FakeItem(ctl, "w+a"), _FakeItem(ctl, "a"), _FakeItem(ctl, "shift+a")
+    under = [nw]
+    monkeypatch.setattr(ctl, '_get_cursor_item', lambda: (under[0], None, 0, 0))
+
+    ctl._poll_hover_and_click()
+    assert _log(rec) == [(17, False), (30, False)]
+
+    under[0] = west       # ↖ → ←: 只释放 w
+    ctl._poll_hover_and_click()
+    under[0] = dual       # ← → 外圈 shift+← : 只按下 shift
+    ctl._poll_hover_and_click()
+    assert _log(rec)[2:] == [(17, True), (42, False)]
+    assert rec.batches == 3
+
+    under[0] = None
+    ctl._poll_hover_and_click()
+    assert sorted(_log(rec)[4:]) == [(30, True), (42, True)]
+
+
+def test_dropped_press_does_not_register_owner(rec):
+    from core.input_dispatcher import InputDispatcher
+    w = input_engine.key_event(17, False, up=False)
+    full = InputDispatcher(capacity=0)  # 未启动: 所有可丢弃批次都被丢弃
+    input_engine._dispatcher = full
+    try:
+        _hold('sector', "w")
+    finally:
+        input_engine._dispatcher = None
+    assert full.stats()['dropped'] == 1
+    assert input_engine.key_owners(w) == frozenset()
+
+    _hold('button', "w")  # 其他来源之后按下同一个键: 真正注入
+    assert _log(rec) == [(17, False)]
+    assert input_engine.key_owners(w) == {'button'}
+
+
+def test_release_all_releases_owned_mouse_buttons(rec):
+    plan = compile_binding("w+mouse:left")
+    input_engine.trigger_events(plan.press, plan.release, 'p', source='hover')
+    rec.clear()
+    input_engine.release_all_keys()
+    assert rec.batches == 1
+    assert list(rec.events) == list(plan.release)
+    assert input_engine.key_owners(plan.press[1]) == frozenset()
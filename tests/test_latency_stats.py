@@ -0,0 +1,103 @@
+"""
+TEGG Touch - 输入延迟统计测试（纯 Python，跨平台）
+
+用法:
+    python -m pytest tests/test_latency_stats.py
+"""
+
+import json
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pytest
+
+from core import input_engine, latency_stats
+from core.input_backend import RecordingBackend, set_backend
+from core.latency_stats import LatencyHistogram, LatencyRecorder
+
+
+@pytest.fixture
+def recorder():
+    rec = latency_stats.get_latency_recorder()
+    rec.reset()
+    yield rec
+    rec.reset()
+
+
+@pytest.fixture
+def backend():
+    b = RecordingBackend()
+    old = set_backend(b)
+    input_engine._pressed_keys.clear()
+    yield b
+    input_engine._pressed_keys.clear()
+    set_backend(old)
+
+
+def test_histogram_percentiles_within_bucket_resolution():
+    h = LatencyHistogram()
+    for us in range(1, 1001):  # 1us .. 1ms 均匀分布
+        h.record(us * 1000)
+    s = h.summary()
+    assert s['count'] == 1000
+    assert s['max_us'] == 1000.0
+    for key, expect in (('p50_us', 500), ('p95_us', 950), ('p99_us', 990)):
+        assert abs(s[key] - expect) / expect < 0.2  # 每倍频 4 桶 → 误差 < 19%
+    assert LatencyHistogram().summary()['p99_us'] == 0.0
+
+
+def test_recorder_snapshot_orders_by_stage_and_dumps(tmp_path):
+    r = LatencyRecorder()
+    r.record('end_to_end', 'hover', 2_000_000)
+    r.record('cursor', 'tick', 5_000)
+    r.record('trigger', 'click', 40_000)
+    assert list(r.snapshot()) == ['cursor/tick', 'trigger/click', 'end_to_end/hover']
+    assert 'end_to_end/hover' in r.format_table()
+
+    path = r.dump(str(tmp_path / 'lat.json'))
+    data = json.load(open(path, encoding='utf-8'))
+    assert data['summary']['end_to_end/hover']['count'] == 1
+    assert sum(data['histograms']['cursor/tick']['counts']) == 1
+
+    r.enabled = False
+    r.record('cursor', 'tick', 1)
+    assert r.snapshot()['cursor/tick']['count'] == 1
+
+
+def test_send_events_records_stages_only_under_trace(recorder, backend):
+    ev = [input_engine.key_event(17, False, up=False)]
+    input_engine.send_events(ev)
+    assert recorder.snapshot() == {}
+
+    old = latency_stats.set_trace(0, 'hover')  # 起点很早 → end_to_end 远大于 inject
+    try:
+        input_engine.send_events([input_engine.key_event(17, False, up=True)])
+    finally:
+        latency_stats.restore_trace(old)
+    snap = recorder.snapshot()
+    assert set(snap) == {'submit/hover', 'inject/hover', 'end_to_end/hover'}
+    assert snap['end_to_end/hover']['max_us'] >= snap['inject/hover']['max_us']
+    assert latency_stats.current_trace() is None
+
+
+def test_dispatcher_records_inject_on_output_thread(recorder, backend):
+    input_engine.start_dispatcher()
+    try:
+        old = latency_stats.set_trace(time.perf_counter_ns(), 'voice')
+        try:
+            input_engine.send_events([input_engine.key_event(18, False, up=False)])
+            input_engine.send_events([input_engine.key_event(18, False, up=True)])
+        finally:
+            latency_stats.restore_trace(old)
+        assert input_engine.get_dispatcher().flush(1.0)
+    finally:
+        input_engine.stop_dispatcher()
+    snap = recorder.snapshot()
+    assert snap['submit/voice']['count'] == 2
+    assert snap['inject/voice']['count'] == 2
+    assert snap['end_to_end/voice']['count'] == 2
@@ -0,0 +1,123 @@
+"""
+TEGG Touch - 宏编译测试：步骤格式展开、按名字索引、嵌套宏链接与循环引用检测
+
+用法:
+    python -m pytest tests/test_macro_compiler.py
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from core import input_engine
+from core.binding_plan import clear_plan_cache
+from core.macro_compiler import OP_CALL, OP_WAIT, compile_macros, macro_program
+
+_SCAN = {'w': 17, 'e': 18, 'r': 19}
+
+_qapp = None
+
+
+@pytest.fixture(autouse=True)
+def scan_codes(monkeypatch):
+    monkeypatch.setattr(input_engine, 'get_scan_code', lambda k: _SCAN.get(k, 0))
+    clear_plan_cache()
+    yield
+    clear_plan_cache()
+
+
+def _ops(program):
+    return [(op, getattr(arg, 'source', arg)) for op, arg in program]
+
+
+def _macro(name, *keys, delay=0):
+    steps = [{'type': 'key', 'key': k, 'action': 'click'} for k in keys]
+    if delay:
+        steps.append({'type': 'delay', 'ms': delay})
+    return {'name': name, 'steps': steps}
+
+
+def test_program_formats():
+    program = macro_program([
+        {'type': 'key', 'key': 'w', 'action': 'click'},
+        {'type': 'delay', 'ms': 100},
+        {'type': 'key', 'key': 'e', 'action': 'press', 'delay': 20},
+        {'keys': 'e', 'action': 'release'},               # 旧格式
+        {'type': 'tap', 'keys': 'w', 'action': 'click'},  # 未知类型: 默认 50ms
+        {'type': 'key', 'key': '', 'action': 'click'},
+    ])
+    assert _ops(program) == [('p', 'w'), ('r', 'w'), ('wait', 0.1), ('p', 'e'), ('wait', 0.02),
+                             ('r', 'e'), ('p', 'w'), ('r', 'w'), ('wait', 0.05)]
+    assert program[0][1].press  # 已编译成事件
+    assert macro_program([]) == ()
+
+
+def test_invalid_steps_are_reported_and_skipped():
+    problems = []
+    program = macro_program([
+        {'type': 'key', 'key': 'w', 'action': 'hold'},
+        {'type': 'delay', 'ms': 'soon'},
+        {'type': 'key', 'key': 'nokey', 'action': 'click'},
+        'garbage',
+    ], problems)
+    assert len(problems) == 4
+    assert [op for op, _ in program] == ['p', 'r']
+
+
+def test_nested_macros_link_and_index_by_name():
+    lib = compile_macros([
+        {'name': 'combo', 'repeat': 2, 'steps': [
+            {'type': 'key', 'key': 'macro:reload+w', 'action': 'click'},
+            {'type': 'key', 'key': 'macro:ghost', 'action': 'press'},
+        ]},
+        _macro('reload', 'r', delay=30),
+        _macro('reload', 'e'),   # 重名只取第一个
+    ])
+    combo = lib.get('combo')
+    assert _ops(combo.program) == [('p', 'w'), (OP_CALL, 'reload'), ('r', 'w')]
+    assert combo.repeat == 2 and combo.calls == ('reload',)
+    assert any('ghost' in p for p in combo.problems)
+    assert _ops(lib.get('reload').program) == [('p', 'r'), ('r', 'r'), (OP_WAIT, 0.03)]
+    assert lib.get('ghost') is None and not lib.errors
+
+
+def test_cycles_are_rejected_at_compile_time():
+    lib = compile_macros([
+        _macro('a', 'macro:b'),
+        _macro('b', 'w+macro:c'),
+        _macro('c', 'macro:a'),
+        _macro('self', 'macro:self'),
+        _macro('caller', 'macro:a'),   # 经由其他宏到达环
+        _macro('ok', 'macro:leaf'),
+        _macro('leaf', 'e'),
+    ])
+    assert lib.errors['a'] == ('a', 'b', 'c', 'a')
+    assert lib.errors['self'] == ('self', 'self')
+    assert lib.errors['caller'] == ('a', 'b', 'c', 'a')
+    assert sorted(lib.names) == ['leaf', 'ok']
+
+
+def test_editor_rejects_save_that_creates_cycle():
+    from PyQt6.QtWidgets import QApplication
+    from core.i18n import load_locale
+    from views.macro_editor_dialog import MacroEditorDialog
+
+    global _qapp
+    _qapp = QApplication.instance() or QApplication([])
+    load_locale('en')
+    macros = [_macro('a', 'macro:b'), _macro('b', 'w')]
+    edited = _macro('b', 'macro:a')
+    dlg = MacroEditorDialog(macro_data=edited, existing_names=['a', 'b'], macros=macros)
+    saved = []
+    dlg.macro_saved.connect(saved.append)
+    dlg._on_save()
+    assert saved == [] and not dlg._error_lbl.isHidden()
+    assert 'b → a → b' in dlg._error_lbl.text()
+    dlg.close()
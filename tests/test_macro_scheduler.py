@@ -0,0 +1,167 @@
+"""
+TEGG Touch - 宏调度器测试（虚拟时钟 + 运行控制器退出时中止）
+
+用法:
+    python -m pytest tests/test_macro_scheduler.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from core import input_engine
+from core.input_backend import RecordingBackend, set_backend
+from core.binding_plan import clear_plan_cache
+from core.macro_compiler import macro_program
+from core.macro_scheduler import MacroScheduler
+
+_SCAN = {'w': 17, 'e': 18}
+
+_qapp = None
+
+
+def _scheduler(**kw):
+    now = [0.0]
+    log, released = [], []
+
+    def execute(keys, action, source):
+        log.append((round(now[0], 3), source[1], action, keys))
+
+    sched = MacroScheduler(execute, released.append, clock=lambda: now[0], threaded=False, **kw)
+
+    def advance(t):
+        while True:
+            due = sched.next_deadline()
+            if due is None or due > t:
+                break
+            now[0] = due
+            sched.run_due(due)
+        now[0] = t
+
+    return sched, log, released, advance
+
+
+def test_steps_run_at_planned_times_and_interleave():
+    sched, log, _, advance = _scheduler()
+    a = macro_program([{'key': 'w'}, {'type': 'delay', 'ms': 100}])
+    b = macro_program([{'key': 'e'}, {'type': 'delay', 'ms': 30}])
+    sched.submit('a', a, repeat=2)
+    sched.submit('b', b, repeat=3)
+    advance(1.0)
+    presses = [(t, name) for t, name, act, _ in log if act == 'p']
+    assert presses == [(0.0, 'a'), (0.0, 'b'), (0.03, 'b'), (0.06, 'b'), (0.1, 'a')]
+    assert sched.running() == []
+    s = sched.stats()
+    assert s['completed'] == 2 and s['jitter']['max_us'] == 0.0
+
+
+def test_cancel_stops_run_and_releases_its_keys():
+    sched, log, released, advance = _scheduler()
+    hold = macro_program([{'key': 'w', 'action': 'press'}, {'type': 'delay', 'ms': 500},
+                          {'key': 'w', 'action': 'release'}])
+    run = sched.submit('hold', hold)
+    other = sched.submit('other', hold)
+    advance(0.1)
+    assert sched.cancel(run)
+    assert not sched.cancel(run)
+    assert released == [run.source]
+    advance(1.0)
+    assert [(name, act) for _, name, act, _ in log] == [
+        ('hold', 'p'), ('other', 'p'), ('other', 'r')]
+    assert other.done and not run.done
+
+    sched.submit('hold', hold)
+    sched.submit('hold', hold)
+    assert sched.cancel_macro('hold') == 2 and sched.running() == []
+
+
+def test_concurrency_limit_rejects_new_runs():
+    sched, _, _, advance = _scheduler(max_concurrent=2)
+    wait = macro_program([{'key': 'w'}, {'type': 'delay', 'ms': 100}])
+    assert sched.submit('m', wait) and sched.submit('m', wait)
+    assert sched.submit('m', wait) is None
+    assert sched.stats()['rejected'] == 1
+    advance(0.2)
+    assert sched.submit('m', wait) is not None
+
+
+def test_threaded_scheduler_is_not_blocked_by_delays():
+    done = threading.Event()
+    fired = []
+
+    def execute(keys, action, source):
+        fired.append(source[1])
+        if source[1] == 'fast':
+            done.set()
+
+    sched = MacroScheduler(execute)
+    sched.submit('slow', macro_program([{'type': 'delay', 'ms': 2000}, {'key': 'w'}]))
+    sched.submit('fast', macro_program([{'type': 'delay', 'ms': 10}, {'key': 'e'}]))
+    assert done.wait(1.0)
+    assert 'slow' not in fired
+    sched.shutdown()
+    assert sched.running() == []
+
+
+# ─── 运行控制器: 退出运行模式时中止 ───
+
+@pytest.fixture
+def controller(monkeypatch):
+    global _qapp
+    from PyQt6.QtWidgets import QApplication, QGraphicsView
+    from engine import run_controller
+    from engine.run_controller import RunController
+    from scene.overlay_scene import OverlayScene
+
+    _qapp = QApplication.instance() or QApplication([])
+    backend = RecordingBackend()
+    old = set_backend(backend)
+    monkeypatch.setattr(input_engine, 'get_scan_code', lambda k: _SCAN.get(k, 0))
+    monkeypatch.setattr(run_controller, 'is_key_pressed', lambda k: False)
+    input_engine._pressed_keys.clear()
+    clear_plan_cache()
+
+    scene = OverlayScene()
+    scene.setSceneRect(0, 0, 400, 300)
+    scene.load_from_config({'buttons': [], 'macros': [{'name': 'hold', 'steps': [
+        {'type': 'key', 'key': 'w', 'action': 'press'},
+        {'type': 'delay', 'ms': 1000},
+        {'type': 'key', 'key': 'e', 'action': 'click'},
+        {'type': 'key', 'key': 'w', 'action': 'release'},
+    ]}]})
+    scene.set_mode('run')
+    view = QGraphicsView(scene)
+    view.setGeometry(0, 0, 400, 300)
+    ctl = RunController(scene, view)
+    yield ctl, backend
+    ctl.stop()
+    view.close()
+    input_engine._pressed_keys.clear()
+    clear_plan_cache()
+    set_backend(old)
+
+
+def test_stop_aborts_sleeping_macro_and_releases_keys(controller):
+    ctl, rec = controller
+    ctl.start()
+    ctl._start_macro('hold')
+    deadline = time.perf_counter() + 1.0
+    while not rec.events and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    assert ctl._macros.running() == ['hold']
+
+    ctl.stop()
+    assert ctl._macros.running() == []
+    codes = [(ev.code, bool(ev.flags & input_engine.KEYEVENTF_KEYUP)) for ev in rec.events]
+    assert codes == [(_SCAN['w'], False), (_SCAN['w'], True)]
+    time.sleep(0.05)
+    assert len(rec.events) == 2
@@ -0,0 +1,71 @@
+"""
+TEGG Touch - 确定性回放测试：注入事件轨迹与 tests/golden/*.trace 逐行对比
+
+行为有意变化时，重新生成 golden 并在提交中审阅 diff:
+    TEGG_UPDATE_GOLDEN=1 python -m pytest tests/test_replay.py
+
+用法:
+    python -m pytest tests/test_replay.py
+"""
+
+import json
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from tests.replay import (
+    DEFAULT_PROFILE, GOLDEN_DIR, ReplayHarness, golden_diff, load_stream, parse_stream,
+    format_stream, wheel_sweep_stream,
+)
+
+DEFAULT_STREAM = os.path.join(GOLDEN_DIR, 'default_profile.stream')
+
+
+def _wheel_profile(wheel_mode):
+    with open(DEFAULT_PROFILE, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config['wheel_visible'] = True
+    config['wheel_mode'] = wheel_mode
+    return config
+
+
+def test_stream_text_roundtrip():
+    text = "0 move 10 20.5\n16 down x1\n# 注释\n32 up x1\n40 wheel -120\n"
+    events = parse_stream(text)
+    assert [e.kind for e in events] == ['move', 'down', 'up', 'wheel']
+    assert parse_stream(format_stream(events)) == events
+    with pytest.raises(ValueError):
+        parse_stream("0 down thumb\n")
+
+
+@pytest.mark.parametrize('mode', ['poll', 'hook'])
+def test_default_profile_matches_golden(mode):
+    with ReplayHarness(mode=mode) as h:
+        result = h.run(load_stream(DEFAULT_STREAM))
+    assert result.injected > 0
+    diff = golden_diff(f'default_profile_{mode}', result)
+    assert not diff, diff
+
+
+@pytest.mark.parametrize('wheel_mode', ['small', 'large', 'double', 'dual'])
+def test_wheel_sweep_matches_golden(wheel_mode):
+    with ReplayHarness(_wheel_profile(wheel_mode)) as h:
+        result = h.run(wheel_sweep_stream(h.items))
+    diff = golden_diff(f'wheel_sweep_{wheel_mode}', result)
+    assert not diff, diff
+
+
+def test_replay_is_deterministic():
+    stream = load_stream(DEFAULT_STREAM)
+    traces = []
+    for _ in range(2):
+        with ReplayHarness(mode='hook') as h:
+            traces.append(h.run(stream).trace)
+    assert traces[0] == traces[1]
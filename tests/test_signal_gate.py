@@ -0,0 +1,40 @@
+"""
+TEGG Touch - 控制器信号变化检测测试（虚拟时钟）
+
+用法:
+    python -m pytest tests/test_signal_gate.py
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from engine.signal_gate import SignalGate
+
+
+def test_emits_only_on_change():
+    now = [0.0]
+    gate = SignalGate(clock=lambda: now[0])
+    assert [gate.offer('on_ui', v) for v in (False, False, True, True, False)] == [
+        True, False, True, False, True]
+    gate.invalidate('on_ui')
+    assert gate.offer('on_ui', False)
+    s = gate.stats()['on_ui']
+    assert (s['offered'], s['emitted']) == (6, 4)
+
+
+def test_rates_per_window_and_reset():
+    now = [0.0]
+    gate = SignalGate(clock=lambda: now[0])
+    for i in range(120):
+        now[0] = i / 120
+        gate.offer('progress', i // 30)   # 每 30 帧变化一次
+    now[0] = 1.0
+    gate.offer('progress', 3)
+    s = gate.stats()['progress']
+    assert round(s['offered_per_sec']) == 120 and round(s['emitted_per_sec']) == 4
+    gate.reset()
+    assert gate.stats() == {} and gate.offer('progress', 3)
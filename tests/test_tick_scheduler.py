@@ -0,0 +1,55 @@
+"""
+TEGG Touch - 自适应节拍测试（虚拟时钟）
+
+用法:
+    python -m pytest tests/test_tick_scheduler.py
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from engine.tick_scheduler import (
+    AdaptiveTickScheduler, MODE_ACTIVE, MODE_IDLE, MODE_BURST,
+)
+
+
+def _sched(**kw):
+    now = [0.0]
+    s = AdaptiveTickScheduler(8, 24, clock=lambda: now[0], **kw)
+    return s, now
+
+
+def test_idle_backoff_and_burst_on_first_motion():
+    s, now = _sched(burst_ms=4, idle_after_ms=500, burst_window_ms=100)
+    assert s.update(True, 0.0) == 8
+    assert s.update(False, 0.499) == 8
+    assert s.update(False, 0.5) == 24 and s.mode == MODE_IDLE
+
+    assert s.update(True, 1.0) == 4 and s.mode == MODE_BURST
+    assert s.update(False, 1.05) == 4
+    assert s.update(False, 1.1) == 8 and s.mode == MODE_ACTIVE
+    assert s.update(False, 1.5) == 24
+
+
+def test_wake_without_burst_returns_to_active():
+    s, now = _sched(burst_window_ms=0)
+    s.update(False, 1.0)
+    assert s.mode == MODE_IDLE
+    assert s.wake(1.2) == 8 and s.mode == MODE_ACTIVE
+
+
+def test_stats_report_rate_and_cost_per_window():
+    s, now = _sched()
+    t = 0.0
+    while t < 1.0:
+        s.record_tick(200_000, t)  # 0.2 ms / 帧
+        t += 0.008
+    s.record_tick(200_000, 1.0)
+    st = s.stats()
+    assert 120 <= st['ticks_per_sec'] <= 130
+    assert abs(st['cpu_ms_per_sec'] - st['ticks_per_sec'] * 0.2) < 1e-6
+    assert st['idle_ratio'] == 0.0
@@ -0,0 +1,40 @@
+"""
+TEGG Touch - 定时服务测试
+
+用法:
+    python -m pytest tests/test_timer_service.py
+"""
+
+import os
+import sys
+import threading
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from core.timer_service import TimerService
+
+
+def test_run_due_in_deadline_order():
+    now = [0.0]
+    svc = TimerService(clock=lambda: now[0], threaded=False)
+    fired = []
+    svc.call_later(0.05, fired.append, 'b')
+    svc.call_later(0.01, fired.append, 'a')
+    late = svc.call_later(0.10, fired.append, 'c')
+    assert svc.run_due(0.0) == 0
+    assert svc.run_due(0.05) == 2
+    assert fired == ['a', 'b']
+    late.cancel()
+    assert svc.pending() == 0
+    assert svc.next_deadline() is None
+    assert svc.run_due(1.0) == 0
+
+
+def test_threaded_service_fires_without_blocking_caller():
+    svc = TimerService()
+    done = threading.Event()
+    svc.call_later(0.01, done.set)
+    assert done.wait(1.0)
+    svc.shutdown()
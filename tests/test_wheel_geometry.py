@@ -0,0 +1,155 @@
+"""
+TEGG Touch - 轮盘几何内核测试（共享路径与旧构建结果一致、LRU 有上限、充能帧对齐设备像素并命中缓存，Qt offscreen）
+
+用法:
+    python -m pytest tests/test_wheel_geometry.py
+"""
+
+import math
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from core.constants import default_wheel_sectors, default_wheel_center_ring
+from core.i18n import load_locale
+
+_qapp = None
+
+W, H = 800, 600
+
+
+@pytest.fixture
+def geometry():
+    from PyQt6.QtWidgets import QApplication
+    from scene import wheel_geometry
+    global _qapp
+    _qapp = QApplication.instance() or QApplication([])
+    load_locale('en')
+    wheel_geometry.clear_path_cache()
+    return wheel_geometry
+
+
+def _old_sector(cx, cy, r_inner, r_outer, start_angle, span_angle, gap_px=0):
+    """旧实现: 每个 Item 各自在实际圆心处构建"""
+    from PyQt6.QtCore import QRectF
+    from PyQt6.QtGui import QPainterPath
+
+    def half_gap(radius):
+        if radius <= 0 or gap_px <= 0:
+            return 0
+        return math.degrees(math.atan2(gap_px / 2, radius))
+    go, gi = half_gap(r_outer), half_gap(r_inner)
+    outer_rect = QRectF(cx - r_outer, cy - r_outer, r_outer * 2, r_outer * 2)
+    inner_rect = QRectF(cx - r_inner, cy - r_inner, r_inner * 2, r_inner * 2)
+    path = QPainterPath()
+    path.arcMoveTo(outer_rect, start_angle + go)
+    path.arcTo(outer_rect, start_angle + go, span_angle - 2 * go)
+    ie = math.radians(start_angle + span_angle - gi)
+    path.lineTo(cx + r_inner * math.cos(ie), cy - r_inner * math.sin(ie))
+    path.arcTo(inner_rect, start_angle + span_angle - gi, -(span_angle - 2 * gi))
+    path.closeSubpath()
+    return path
+
+
+def _fill(path):
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QImage, QPainter
+    img = QImage(W, H, QImage.Format.Format_ARGB32_Premultiplied)
+    img.fill(0)
+    painter = QPainter(img)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(Qt.GlobalColor.white)
+    painter.drawPath(path)
+    painter.end()
+    return img
+
+
+def _max_diff(a, b):
+    pa, pb = a.constBits().asstring(a.sizeInBytes()), b.constBits().asstring(b.sizeInBytes())
+    return max(abs(x - y) for x, y in zip(pa, pb))
+
+
+@pytest.mark.parametrize('gap', [0, 4])
+def test_shared_sector_matches_old_builder(geometry, gap):
+    for start in (-22.5, 22.5, 112.5, 292.5):
+        shared = geometry.sector_path(120, 230, start, 45, gap).translated(400, 300)
+        assert _max_diff(_fill(shared), _fill(_old_sector(400, 300, 120, 230, start, 45, gap))) <= 2
+
+
+def test_ring_hit_test_matches_subtraction(geometry):
+    ring = geometry.ring_path(60, 110).translated(400, 300)
+    from PyQt6.QtCore import QPointF
+    assert ring.contains(QPointF(400 + 85, 300))
+    assert not ring.contains(QPointF(400, 300))          # 真正镂空
+    assert not ring.contains(QPointF(400 + 115, 300))
+
+
+def test_lru_is_bounded(geometry, monkeypatch):
+    cache = geometry._PathCache(max_entries=8)
+    monkeypatch.setattr(geometry, '_paths', cache)
+    for r in range(20):
+        geometry.ring_path(10, 20 + r)
+    stats = geometry.path_cache_stats()
+    assert stats['entries'] == 8 and stats['evictions'] == 12 and stats['misses'] == 20
+    geometry.ring_path(10, 39)                           # 最近使用的仍在
+    assert geometry.path_cache_stats()['hits'] == 1
+    geometry.ring_path(10, 20)                           # 最早的已淘汰
+    assert geometry.path_cache_stats()['misses'] == 21
+
+
+def test_quantized_keys_share_entries(geometry):
+    a = geometry.sector_path(120.0, 230.0, 22.5, 45.0, 4)
+    b = geometry.sector_path(120.01, 229.99, 22.5001, 45.0, 4)
+    assert a is b
+    assert geometry.path_cache_stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'entries': 1}
+
+
+def test_snap_radius_to_device_pixels(geometry):
+    assert geometry.snap_radius(100.3, 1.0) == 100.0
+    assert geometry.snap_radius(100.3, 2.0) == 100.5
+    assert geometry.snap_radius(100.6, 1.5) == pytest.approx(100.0 + 2 / 3)
+
+
+@pytest.mark.parametrize('which', ['sector', 'ring'])
+def test_repeated_charges_hit_cache(geometry, which):
+    from PyQt6.QtGui import QImage, QPainter
+    from scene.overlay_scene import OverlayScene
+    scene = OverlayScene()
+    scene.setSceneRect(0, 0, W, H)
+    scene.load_from_config({
+        'buttons': [],
+        'wheel_visible': True,
+        'wheel_mode': 'large',
+        'wheel_sectors': default_wheel_sectors(),
+        'wheel_center_ring': default_wheel_center_ring(),
+    })
+    scene.set_mode('run')
+    item = scene.wheel_items[2] if which == 'sector' else scene.ring_item
+    img = QImage(W, H, QImage.Format.Format_ARGB32_Premultiplied)
+
+    def charge():
+        for i in range(1, 301):                          # 300 帧，比设备像素多
+            item._on_charge_progress(i / 300)
+            painter = QPainter(img)
+            item.paint(painter, None)
+            painter.end()
+
+    base = geometry.path_cache_stats()                # 碰撞 / 视觉路径
+    charge()
+    first = geometry.path_cache_stats()
+    # 充能帧数受设备像素数限制，而不是动画帧数
+    band_px = (item._v_outer - item._v_inner) * geometry.display_resolution()
+    assert first['misses'] - base['misses'] <= band_px + 2
+    charge()
+    again = geometry.path_cache_stats()
+    assert again['misses'] == first['misses']
+    assert again['hits'] - first['hits'] == sum(i / 300 > 0.01 for i in range(1, 301))
+    assert again['entries'] <= geometry.PATH_CACHE_MAX
@@ -0,0 +1,123 @@
+"""
+TEGG Touch - 滚轮事件管线测试（钩子入队 → 按 item 合并 → 多格同批点击）
+
+用法:
+    python -m pytest tests/test_wheel_pipeline.py
+"""
+
+import os
+import sys
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+
+from core import input_engine
+from core.input_backend import RecordingBackend, set_backend
+from core.timer_service import TimerService, set_timer_service
+
+WM_MOUSEWHEEL = input_engine.WM_MOUSEWHEEL
+
+
+def _wheel_data(delta):
+    return (delta & 0xFFFF) << 16
+
+
+@pytest.fixture
+def hook():
+    backend = RecordingBackend()
+    old = set_backend(backend)
+    input_engine.poll_wheel_events()
+    input_engine.install_wheel_hook()
+    yield backend
+    input_engine.uninstall_wheel_hook()
+    input_engine.poll_wheel_events()
+    set_backend(old)
+
+
+def test_hook_keeps_signed_delta_and_timestamp(hook):
+    hook.feed_mouse_hook(WM_MOUSEWHEEL, 1, 2, _wheel_data(30))
+    hook.feed_mouse_hook(WM_MOUSEWHEEL, 1, 2, _wheel_data(-240))
+    evs = input_engine.poll_wheel_events()
+    assert [(e.delta, e.x, e.y) for e in evs] == [(30, 1, 2), (-240, 1, 2)]
+    assert evs[0].ts <= evs[1].ts
+
+
+def test_overflow_is_merged_and_counted(hook, monkeypatch):
+    monkeypatch.setattr(input_engine, 'WHEEL_QUEUE_CAPACITY', 2)
+    before = input_engine.wheel_overflow_count()
+    for _ in range(5):
+        hook.feed_mouse_hook(WM_MOUSEWHEEL, 0, 0, _wheel_data(120))
+    evs = input_engine.poll_wheel_events()
+    assert len(evs) == 2
+    assert sum(e.delta for e in evs) == 600  # 总量不丢
+    assert input_engine.wheel_overflow_count() - before == 3
+
+
+# ─── 控制器合并 ──────────────────────────────────────────────
+
+class _FakeItem:
+    def __init__(self):
+        self.calls = []
+
+    def on_wheel(self, direction, count=1):
+        self.calls.append((direction, count))
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    from PyQt6.QtWidgets import QApplication
+    from engine.run_controller import RunController
+    QApplication.instance() or QApplication([])
+    ctl = RunController(scene=None, window=None)
+    items = {}
+    monkeypatch.setattr(ctl, '_wheel_target', lambda x, y: items.get(x))
+    return ctl, items
+
+
+def _ev(delta, x):
+    return input_engine.WheelEvent(0.0, delta, x, 0)
+
+
+def test_coalesce_per_item_with_sub_notch_accumulation(controller):
+    ctl, items = controller
+    a = items[1] = _FakeItem()
+    b = items[2] = _FakeItem()
+
+    ctl._dispatch_wheel_events([_ev(120, 1), _ev(120, 1), _ev(120, 1), _ev(-120, 2)])
+    assert a.calls == [('up', 3)]
+    assert b.calls == [('down', 1)]
+
+    # 触控板: 40 × 5 = 200 → 第 3 个事件凑满一格，余 80
+    for _ in range(2):
+        ctl._dispatch_wheel_events([_ev(40, 1)])
+    assert a.calls == [('up', 3)]
+    ctl._dispatch_wheel_events([_ev(40, 1), _ev(40, 1), _ev(40, 1)])
+    assert a.calls == [('up', 3), ('up', 1)]
+    assert ctl._wheel_accum == {a: 80}
+
+    # 滚向别处: a 的余量作废
+    ctl._dispatch_wheel_events([_ev(60, 2)])
+    assert a not in ctl._wheel_accum
+    assert ctl._wheel_accum == {b: 60}
+
+
+def test_repeat_click_is_one_batch():
+    backend = RecordingBackend()
+    old = set_backend(backend)
+    old_timers = set_timer_service(TimerService(clock=lambda: 0.0, threaded=False))
+    try:
+        down = [input_engine.key_event(17, False, up=False)]
+        up = [input_engine.key_event(17, False, up=True)]
+        input_engine.trigger_events(down, up, 'c', repeat=3)
+        assert backend.batches == 1
+        ups = [bool(e.flags & input_engine.KEYEVENTF_KEYUP) for e in backend.events]
+        assert ups == [False, True, False, True, False]
+        input_engine.release_all_keys()
+    finally:
+        set_timer_service(old_timers)
+        set_backend(old)
@@ -751,6 +751,9 @@ class ButtonEditorDialog(QDialog):
         if hasattr(self._item, '_hover_sm'):
             self._item._hover_sm.update_delays(
                 self.data.hover_delay, self.data.hover_release_delay)
+        # 重新编译按键绑定
+        if hasattr(self._item, 'rebuild_plans'):
+            self._item.rebuild_plans()
 
         self._item.update()
         self.saved.emit(self.data)
@@ -1084,7 +1087,7 @@ class ButtonEditorDialog(QDialog):
     def _new_macro(self):
         from views.macro_editor_dialog import MacroEditorDialog
         names = [m.get('name', '') for m in self._macros]
-        dlg = MacroEditorDialog(existing_names=names, parent=self)
+        dlg = MacroEditorDialog(existing_names=names, parent=self, macros=self._macros)
         dlg.macro_saved.connect(lambda data: self._on_macro_editor_saved(data, -1))
         dlg.exec()
 
@@ -1092,7 +1095,8 @@ class ButtonEditorDialog(QDialog):
         from views.macro_editor_dialog import MacroEditorDialog
         data = copy.deepcopy(self._macros[idx])
         names = [m.get('name', '') for m in self._macros]
-        dlg = MacroEditorDialog(macro_data=data, existing_names=names, parent=self)
+        dlg = MacroEditorDialog(macro_data=data, existing_names=names, parent=self,
+                                macros=self._macros)
         dlg.macro_saved.connect(lambda d: self._on_macro_editor_saved(d, idx))
         dlg.exec()
 
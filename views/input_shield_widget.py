@@ -0,0 +1,103 @@
+"""
+TEGG Touch 蛋挞 (PyQt6) - input_shield_widget.py
+输入遮罩窗口 — 与覆盖层同尺寸的无形窗口，窗口形状 (setMask → Win32 SetWindowRgn) 即输入区域。
+
+覆盖层本身始终鼠标穿透（只负责绘制，虚拟光标 / 回中进度条 / 网格不受窗口形状裁剪），
+点击落在哪里完全由系统按遮罩形状决定: 形状内的鼠标事件被遮罩接收并原样转发给覆盖层视图，
+形状外直接到达下方游戏。形状只在布局 / 穿透模式变化时更新。
+"""
+
+from PyQt6.QtWidgets import QWidget, QApplication
+from PyQt6.QtCore import Qt, QEvent, QRect, pyqtSignal
+from PyQt6.QtGui import QColor, QMouseEvent, QPainter, QRegion, QWheelEvent
+
+# 分层窗口中 alpha=0 的像素不参与命中测试，用 alpha=1 的填充保证形状内都能接收点击（肉眼不可见）
+SHIELD_ALPHA = 1
+
+_MOUSE_EVENTS = (
+    QEvent.Type.MouseButtonPress,
+    QEvent.Type.MouseButtonRelease,
+    QEvent.Type.MouseButtonDblClick,
+    QEvent.Type.MouseMove,
+)
+
+
+class InputShieldWidget(QWidget):
+    """按输入区域成形的无形窗口，鼠标事件转发给 view 的 viewport"""
+
+    shown = pyqtSignal()  # 由隐藏变为显示（调用方据此把工具栏等窗口提到遮罩之上）
+
+    def __init__(self, view, parent=None):
+        super().__init__(parent)
+        self._view = view
+        self._rects = None
+        self.apply_count = 0
+        self.setWindowFlags(
+            Qt.WindowType.FramelessWindowHint
+            | Qt.WindowType.WindowStaysOnTopHint
+            | Qt.WindowType.Tool
+            | Qt.WindowType.WindowDoesNotAcceptFocus
+        )
+        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating)
+        self.setMouseTracking(True)
+
+    def rects(self):
+        """最近一次应用的矩形（隐藏时为 None）"""
+        return self._rects
+
+    def apply(self, rects):
+        """把窗口形状设为 rects（覆盖层坐标 (x, y, w, h)）；为空时隐藏 — 空遮罩在 Qt 中等于无遮罩"""
+        rects = tuple(rects) if rects else None
+        if rects == self._rects and self.isVisible() == (rects is not None):
+            return
+        self._rects = rects
+        self.apply_count += 1
+        if rects is None:
+            self.hide()
+            return
+        self.setGeometry(self._view.geometry())
+        region = QRegion()
+        region.setRects([QRect(*r) for r in rects])
+        self.setMask(region)
+        if not self.isVisible():
+            self.show()
+            self.shown.emit()
+
+    def release(self):
+        """撤下遮罩（全穿透 / 退出）"""
+        self.apply(None)
+
+    # ── 绘制 ──
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(0, 0, 0, SHIELD_ALPHA))
+
+    # ── 事件转发 ──
+
+    def event(self, event):
+        etype = event.type()
+        viewport = self._view.viewport()
+        if etype in _MOUSE_EVENTS:
+            gpos = event.globalPosition()
+            QApplication.sendEvent(viewport, QMouseEvent(
+                etype, viewport.mapFromGlobal(gpos), gpos,
+                event.button(), event.buttons(), event.modifiers()))
+            self._sync_cursor(viewport)
+            return True
+        if etype == QEvent.Type.Wheel:
+            gpos = event.globalPosition()
+            QApplication.sendEvent(viewport, QWheelEvent(
+                viewport.mapFromGlobal(gpos), gpos, event.pixelDelta(), event.angleDelta(),
+                event.buttons(), event.modifiers(), event.phase(), event.inverted()))
+            return True
+        if etype == QEvent.Type.Leave:
+            # 离开形状 → 覆盖层场景清除悬停（Tooltip / 悬停高亮）
+            QApplication.sendEvent(viewport, QEvent(QEvent.Type.Leave))
+        return super().event(event)
+
+    def _sync_cursor(self, viewport):
+        """系统光标由遮罩窗口决定，跟随覆盖层 Item 设置的光标（缩放手柄等）"""
+        if viewport.cursor().shape() != self.cursor().shape():
+            self.setCursor(viewport.cursor())
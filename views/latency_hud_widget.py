@@ -0,0 +1,80 @@
+"""
+TEGG Touch 蛋挞 (PyQt6) - latency_hud_widget.py
+运行模式输入延迟 HUD — 实时显示各阶段 / 绑定类型的 p50/p95/p99、节拍指标、信号频率与重绘像素/秒（诊断用）。
+"""
+
+from PyQt6.QtWidgets import QLabel
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QFont
+
+from core.latency_stats import get_latency_recorder
+
+REFRESH_MS = 500
+
+
+class LatencyHudWidget(QLabel):
+    """左上角等宽文本表格，可见时每 REFRESH_MS 刷新一次；鼠标事件全部穿透"""
+
+    def __init__(self, parent=None, tick_stats=None, signal_stats=None, repaint_stats=None):
+        super().__init__(None)
+        self._tick_stats = tick_stats  # 可选: 返回自适应节拍指标 dict 的回调
+        self._signal_stats = signal_stats  # 可选: 返回状态信号 报告/发出 频率 dict 的回调
+        self._repaint_stats = repaint_stats  # 可选: 返回重绘像素 / 次数 每秒 dict 的回调
+        self.setWindowFlags(
+            Qt.WindowType.FramelessWindowHint
+            | Qt.WindowType.WindowStaysOnTopHint
+            | Qt.WindowType.Tool
+        )
+        self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        font.setPixelSize(12)
+        self.setFont(font)
+        self.setStyleSheet("""
+            QLabel {
+                background: rgba(0, 0, 0, 180);
+                color: #00D4FF;
+                padding: 6px;
+            }
+        """)
+        self.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+
+        self._recorder = get_latency_recorder()
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+
+    def toggle(self):
+        """显示 / 隐藏 HUD"""
+        if self.isVisible():
+            self._timer.stop()
+            self.hide()
+        else:
+            self.refresh()
+            self.move(12, 12)
+            self.show()
+            self.raise_()
+            self._timer.start()
+
+    def refresh(self):
+        text = self._recorder.format_table()
+        if self._tick_stats is not None:
+            t = self._tick_stats()
+            text = (f"tick {t['mode']:<7}{t['interval_ms']:>4} ms  {t['ticks_per_sec']:>6.1f}/s"
+                    f"  cpu {t['cpu_ms_per_sec']:>6.2f} ms/s\n") + text
+        if self._signal_stats is not None:
+            lines = [f"sig  {name:<22}{s['offered_per_sec']:>7.1f} -> {s['emitted_per_sec']:>6.1f}/s"
+                     for name, s in sorted(self._signal_stats().items())]
+            if lines:
+                text = '\n'.join(lines) + '\n' + text
+        if self._repaint_stats is not None:
+            r = self._repaint_stats()
+            text = (f"paint {r['pixels_per_sec'] / 1e6:>7.2f} Mpx/s  {r['paints_per_sec']:>6.1f}/s\n") + text
+        self.setText(text)
+        self.adjustSize()
+
+    def closeEvent(self, event):
+        self._timer.stop()
+        super().closeEvent(event)
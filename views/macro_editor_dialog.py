@@ -15,6 +15,7 @@ from PyQt6.QtCore import Qt, pyqtSignal, QMimeData, QPoint
 from PyQt6.QtGui import QFont, QColor, QPainter, QPen, QBrush, QDrag
 
 from core.i18n import t, get_font
+from core.macro_compiler import compile_macros
 from views.button_editor_dialog import (
     _get_key_categories, _get_mouse_keys, _FlowWidget, _make_font, _detect_icon_font,
     C_PM_BG, C_GRAY, C_GRAY_H, C_CYBER, C_CYBER_H, C_CLOSE, C_CLOSE_H,
@@ -284,10 +285,13 @@ class MacroEditorDialog(QDialog):
     WIN_W = LEFT_W + RIGHT_W + PADDING * 2 + 20
     WIN_H = 800
 
-    def __init__(self, macro_data: dict = None, existing_names: list[str] = None, parent=None):
+    def __init__(self, macro_data: dict = None, existing_names: list[str] = None, parent=None,
+                 macros: list = None):
         super().__init__(parent)
         # macro_data: {"name": "...", "steps": [...]} or None for new
+        # macros: 当前全部宏（保存前编译校验循环引用）
         self._macro = macro_data or {"name": "", "steps": []}
+        self._all_macros = list(macros or [])
         self._step_rows: list[_StepRow] = []
         self._focus_widget = None
         self._existing_names = set(existing_names or [])
@@ -490,6 +494,14 @@ class MacroEditorDialog(QDialog):
         save_btn.clicked.connect(self._on_save)
         left.addWidget(save_btn)
 
+        # 编译错误提示（循环引用）
+        self._error_lbl = QLabel("")
+        self._error_lbl.setFont(_make_font(fn, 12))
+        self._error_lbl.setStyleSheet("color: #F43F5E; background: transparent;")
+        self._error_lbl.setWordWrap(True)
+        self._error_lbl.hide()
+        left.addWidget(self._error_lbl)
+
         left_widget = QWidget()
         left_widget.setLayout(left)
         left_widget.setFixedWidth(self.LEFT_W)
@@ -642,6 +654,7 @@ class MacroEditorDialog(QDialog):
         """名称输入变化时恢复正常边框样式"""
         self._name_edit.setStyleSheet(self._name_style_normal)
         self._name_edit.setPlaceholderText(t("macro.name_placeholder"))
+        self._error_lbl.hide()
 
     def _on_save(self):
         name = self._name_edit.text().strip()
@@ -663,9 +676,22 @@ class MacroEditorDialog(QDialog):
 
         steps = [row.get_step_data() for row in self._step_rows]
         result = {'name': name, 'steps': steps}
+
+        # 与其他宏一起编译，拒绝形成循环引用的保存
+        cycle = self._find_cycle(result)
+        if cycle:
+            self._error_lbl.setText(t("macro.cycle_error").replace("{path}", " → ".join(cycle)))
+            self._error_lbl.show()
+            return
         self.macro_saved.emit(result)
         self.accept()
 
+    def _find_cycle(self, result: dict):
+        """保存后若 result 参与循环引用，返回环路（宏名元组）；否则 None"""
+        others = [m for m in self._all_macros
+                  if m.get('name') not in (self._original_name, result['name'])]
+        return compile_macros(others + [result]).errors.get(result['name'])
+
     def get_result(self) -> dict:
         name = self._name_edit.text().strip()
         if not name:
@@ -6,7 +6,7 @@ TEGG Touch 蛋挞 (PyQt6) - overlay_window.py
 import logging
 
 from PyQt6.QtWidgets import QGraphicsView, QApplication
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QEvent
 from PyQt6.QtGui import QPainter
 
 from core.i18n import t, load_locale
@@ -16,6 +16,7 @@ from core.config_manager import (
     load_profile, save_profile, set_active_profile,
 )
 from core.input_engine import install_wheel_hook, uninstall_wheel_hook, release_all_keys
+from core.input_region import rect_shape
 from scene.overlay_scene import OverlayScene
 from engine.run_controller import RunController
 from engine.passthrough_manager import PassthroughManager
@@ -31,6 +32,9 @@ from views.virtual_keyboard import VirtualKeyboard
 from views.voice_settings_dialog import VoiceSettingsDialog
 from views.toast_widget import ToastWidget
 from views.voice_hud_widget import VoiceHudWidget
+from views.latency_hud_widget import LatencyHudWidget
+from views.input_shield_widget import InputShieldWidget
+from views.repaint_monitor import RepaintMonitor
 from scene.virtual_cursor_item import VirtualCursorItem
 from core.constants import BTN_TYPE_CENTER_BAND
 
@@ -84,8 +88,12 @@ class OverlayWindow(QGraphicsView):
         self.setGeometry(screen)
         self._scene.setSceneRect(0, 0, screen.width(), screen.height())
 
+        # ── 输入遮罩（窗口形状 = 输入区域，覆盖层自身始终鼠标穿透）──
+        self._input_shield = InputShieldWidget(self)
+        self._input_shield.shown.connect(self._raise_tool_windows)
+
         # ── 引擎初始化 ──
-        self._pt_manager = PassthroughManager(self)
+        self._pt_manager = PassthroughManager(self, self._input_shield)
         self._run_controller = RunController(self._scene, self)
 
         # 连接运行控制器信号
@@ -97,8 +105,6 @@ class OverlayWindow(QGraphicsView):
             lambda mode: self._pt_manager.set_mode(mode))
         self._run_controller.auto_center_progress.connect(
             self._scene.update_auto_center_bar)
-        self._run_controller.cursor_on_ui.connect(
-            self._pt_manager.update_smart_passthrough)
         self._run_controller.request_toggle_voice.connect(self._toggle_voice)
 
         # ── 工具栏 (parent=self ensures Z-order above overlay) ──
@@ -152,15 +158,33 @@ class OverlayWindow(QGraphicsView):
         self._run_controller.voice_command_triggered.connect(
             self._voice_hud.show_command)
 
+        # ── 重绘统计 / 重绘区域闪烁 (诊断快捷键) ──
+        self._repaint_monitor = RepaintMonitor(self)
+        self._run_controller.request_repaint_debug.connect(self._repaint_monitor.toggle_flash)
+
+        # ── 输入延迟 HUD / 导出 (诊断快捷键) ──
+        self._latency_hud = LatencyHudWidget(
+            parent=self, tick_stats=self._run_controller.tick_stats,
+            signal_stats=self._run_controller.signal_stats,
+            repaint_stats=self._repaint_monitor.stats)
+        self._run_controller.request_latency_hud.connect(self._latency_hud.toggle)
+        self._run_controller.request_latency_dump.connect(self._dump_latency_stats)
+
         # ── 虚拟光标 ──
         self._virtual_cursor = VirtualCursorItem()
         self._virtual_cursor.setVisible(False)
         self._scene.addItem(self._virtual_cursor)
-
-        # ── 智能穿透轮询定时器 (编辑模式) ──
-        self._smart_pt_timer = QTimer(self)
-        self._smart_pt_timer.setInterval(16)  # ~60fps，与原版 update_loop 对齐
-        self._smart_pt_timer.timeout.connect(self._poll_smart_passthrough)
+        self._run_controller.frame_ready.connect(self._virtual_cursor.follow_frame)
+
+        # ── 输入区域同步 (布局变化合并到下一轮事件循环，拖拽时每个事件循环最多一次) ──
+        self._input_region_timer = QTimer(self)
+        self._input_region_timer.setSingleShot(True)
+        self._input_region_timer.setInterval(0)
+        self._input_region_timer.timeout.connect(self._refresh_input_region)
+        self._scene.layout_changed.connect(self._input_region_timer.start)
+        # 工具栏 / 软键盘是独立窗口: 位置或显隐变化同样影响输入区域（pt_block 时从遮罩中挖出）
+        for w in (self._edit_toolbar, self._run_toolbar, self._virtual_keyboard):
+            w.installEventFilter(self)
 
         # 连接场景信号
         self._scene.button_double_clicked.connect(self._open_button_editor)
@@ -224,6 +248,7 @@ class OverlayWindow(QGraphicsView):
         item.hoverActivated.connect(self._run_controller.on_hover_activated)
         item.hoverDeactivated.connect(self._run_controller.on_hover_deactivated)
         item.actionTriggered.connect(self._run_controller.on_action_triggered)
+        item.wheelTriggered.connect(self._run_controller.on_wheel_triggered)
 
     # ── 模式切换 ──
 
@@ -233,7 +258,6 @@ class OverlayWindow(QGraphicsView):
         from PyQt6.QtWidgets import QDialog
         for dlg in self.findChildren(QDialog):
             dlg.close()
-        self._smart_pt_timer.stop()
         self._current_mode = 'run'
         self._scene.save_config()
         self._scene.set_mode('run')
@@ -276,8 +300,8 @@ class OverlayWindow(QGraphicsView):
         if self._virtual_keyboard.isVisible():
             self._virtual_keyboard.position_above_toolbar(self._run_toolbar)
 
-        # 启动虚拟光标跟踪
-        self._virtual_cursor.start_tracking()
+        # 启动虚拟光标跟踪（跟随运行控制器的帧快照）
+        self._virtual_cursor.start_tracking(follow_frames=True)
 
         logger.info("Entered run mode")
 
@@ -300,7 +324,7 @@ class OverlayWindow(QGraphicsView):
 
         self._run_toolbar.hide()
         self._edit_toolbar.show()
-        self._smart_pt_timer.start()
+        self._refresh_input_region()
 
         # 停止虚拟光标和软键盘
         self._virtual_cursor.stop_tracking()
@@ -346,6 +370,7 @@ class OverlayWindow(QGraphicsView):
                 self._scene.inner_ring_item.setVisible(False)
         else:
             self._scene._update_ring_visibility()
+        self._input_region_timer.start()
         self._run_toolbar.update_buttons_visibility(self._buttons_hidden)
 
     @staticmethod
@@ -408,6 +433,15 @@ class OverlayWindow(QGraphicsView):
         self._run_controller.auto_center = not self._run_controller.auto_center
         self._run_toolbar.update_auto_center(self._run_controller.auto_center)
 
+    def _dump_latency_stats(self):
+        """导出输入延迟直方图并 toast 提示路径"""
+        try:
+            path = self._run_controller.dump_latency()
+            self._toast.show_toast(t("toast.latency_dumped", path=path))
+        except OSError as e:
+            logger.error(f"延迟统计导出失败: {e}")
+            self._toast.show_toast(t("toast.latency_dump_failed", error=str(e)))
+
     def _toggle_soft_keyboard(self):
         """切换软键盘 — 吸附在当前活动工具栏上方 (匹配原版 toggle_soft_keyboard)"""
         if self._virtual_keyboard.isVisible():
@@ -502,6 +536,7 @@ class OverlayWindow(QGraphicsView):
 
     def _on_button_saved(self, item):
         """按钮编辑保存后"""
+        self._scene.invalidate_hit_index()  # 尺寸可能已变
         item.update()
         self._scene.save_config()
 
@@ -520,7 +555,7 @@ class OverlayWindow(QGraphicsView):
     def _on_macros_changed(self, macros_list):
         """宏列表变更 → 写入 config 并保存"""
         if self._scene.get_config() is not None:
-            self._scene.get_config()['macros'] = macros_list
+            self._scene.set_macros(macros_list)
             self._scene.save_config()
             logger.info("Macros updated: %d macros", len(macros_list))
 
@@ -607,6 +642,7 @@ class OverlayWindow(QGraphicsView):
         dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
         dialog.destroyed.connect(lambda: self._on_dialog_destroyed('_dlg_voice'))
         dialog.settings_saved.connect(self._on_voice_settings_saved)
+        dialog.macros_changed.connect(self._on_macros_changed)
         self._dlg_voice = dialog
         dialog.show()
 
@@ -690,34 +726,47 @@ class OverlayWindow(QGraphicsView):
         super().showEvent(event)
         self._pt_manager.init_hwnd()
         self._edit_toolbar.show()
-        if self._current_mode == 'edit':
-            self._smart_pt_timer.start()
-
-    def _poll_smart_passthrough(self):
-        """每帧检查光标位置，切换 WS_EX_TRANSPARENT — 对齐原版 update_loop"""
-        from PyQt6.QtGui import QCursor
-        global_pos = QCursor.pos()
-        view_pos = self.mapFromGlobal(global_pos)
-        scene_pos = self.mapToScene(view_pos)
-        item = self._scene.itemAt(scene_pos, self.transform())
-        self._pt_manager.update_smart_passthrough(item is not None)
-
-    def mousePressEvent(self, event):
-        """智能穿透: 空白区域的点击转发到底层窗口（轮询间隙兜底）"""
-        scene_pos = self.mapToScene(event.pos())
-        item = self._scene.itemAt(scene_pos, self.transform())
-
-        if item is None:
-            # 空白区域 — 无论编辑/运行模式都转发点击
-            self._pt_manager.forward_click_to_game(
-                event.globalPosition().toPoint(), event.button())
-            event.ignore()
-            return
-        super().mousePressEvent(event)
+        self._refresh_input_region()
+
+    def eventFilter(self, obj, event):
+        """工具栏 / 软键盘窗口移动、缩放、显隐 → 输入区域需要更新"""
+        if event.type() in (QEvent.Type.Move, QEvent.Type.Resize,
+                            QEvent.Type.Show, QEvent.Type.Hide):
+            self._input_region_timer.start()
+        return super().eventFilter(obj, event)
+
+    # ── 输入区域 ──
+
+    def _refresh_input_region(self):
+        """场景 Item + 可见工具窗口 → 输入区域（增量同步）→ 穿透管理器（仅区域变化时重设遮罩形状）"""
+        self._input_region_timer.stop()
+        windows = {}
+        for name, w in (('edit_toolbar', self._edit_toolbar),
+                        ('run_toolbar', self._run_toolbar),
+                        ('virtual_keyboard', self._virtual_keyboard)):
+            if w.isVisible():
+                g = w.frameGeometry()
+                tl = self.mapToScene(self.mapFromGlobal(g.topLeft()))
+                windows[name] = rect_shape(tl.x(), tl.y(), tl.x() + g.width(), tl.y() + g.height())
+        self._pt_manager.set_input_region(self._scene.input_region(extra=windows))
+
+    def _raise_tool_windows(self):
+        """遮罩窗口刚显示时位于最上层 — 把工具栏、软键盘、HUD、弹窗重新提到它之上"""
+        from PyQt6.QtWidgets import QDialog
+        for w in (self._edit_toolbar, self._run_toolbar, self._virtual_keyboard,
+                  self._toast, self._latency_hud, *self.findChildren(QDialog)):
+            if w.isVisible():
+                w.raise_()
+
+    def paintEvent(self, event):
+        """视口重绘: 统计重绘像素，诊断模式下叠加重绘区域闪烁"""
+        self._repaint_monitor.begin(event.region())
+        super().paintEvent(event)
+        self._repaint_monitor.paint_flashes()
 
     def closeEvent(self, event):
         """关闭时保存配置并退出进程"""
-        self._smart_pt_timer.stop()
+        self._pt_manager.release()
         self._run_controller.stop()
         release_all_keys()  # 兜底释放所有残留按键，防止卡键
         uninstall_wheel_hook()
@@ -735,6 +784,8 @@ class OverlayWindow(QGraphicsView):
         self._run_toolbar.close()
         self._virtual_keyboard.close()
         self._toast.close()
+        self._latency_hud.close()
+        self._input_shield.close()
         self._virtual_cursor.stop_tracking()
         event.accept()
         QApplication.quit()
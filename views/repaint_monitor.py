@@ -0,0 +1,106 @@
+"""
+TEGG Touch 蛋挞 (PyQt6) - repaint_monitor.py
+视口重绘诊断 — 统计重绘像素/秒，并可选地闪烁显示每次重绘的区域。
+
+OverlayWindow.paintEvent 在绘制前调用 begin(region)、绘制后调用 paint_flashes()。
+闪烁淡出本身也会触发重绘，这部分区域不计入统计、也不产生新的闪烁。
+"""
+
+import time
+from collections import deque
+
+from PyQt6.QtCore import QObject, QTimer, Qt
+from PyQt6.QtGui import QColor, QPainter, QPainterPath, QRegion
+
+from core.constants import ANIM_FRAME_MS
+from engine.repaint_meter import RepaintMeter
+
+FLASH_MS = 300            # 闪烁淡出时长
+FLASH_COLOR = (255, 0, 255)
+FLASH_ALPHA = 110         # 初始不透明度
+FLASH_MAX = 256           # 同时保留的闪烁矩形上限
+
+
+def region_rects(region: QRegion) -> list:
+    """QRegion 拆成互不重叠的 QRect（PyQt6 的 QRegion 不可迭代，经 QPainterPath 取出）"""
+    path = QPainterPath()
+    path.addRegion(region)
+    return [poly.boundingRect().toRect() for poly in path.toSubpathPolygons()]
+
+
+class RepaintMonitor(QObject):
+    """视口重绘统计 + 闪烁覆盖层（默认关闭）"""
+
+    def __init__(self, view):
+        super().__init__(view)
+        self._view = view
+        self.meter = RepaintMeter()
+        self._flash = False
+        self._flashes = deque(maxlen=FLASH_MAX)  # (QRect, 开始时刻)
+        self._fade = QRegion()                   # 淡出自身请求的重绘区域
+        self._timer = QTimer(self)
+        self._timer.setInterval(ANIM_FRAME_MS)
+        self._timer.timeout.connect(self._on_fade)
+
+    @property
+    def flash_enabled(self) -> bool:
+        return self._flash
+
+    def toggle_flash(self):
+        """开关重绘区域闪烁"""
+        self._flash = not self._flash
+        if not self._flash:
+            self._drop_all()
+
+    def stats(self) -> dict:
+        return self.meter.stats()
+
+    def begin(self, region: QRegion):
+        """视口即将重绘 region: 计数，并记录需要闪烁的区域"""
+        damage = region.subtracted(self._fade) if not self._fade.isEmpty() else region
+        self._fade = QRegion()
+        rects = region_rects(damage)
+        if not rects:
+            return
+        self.meter.add(sum(r.width() * r.height() for r in rects))
+        if self._flash:
+            now = time.perf_counter()
+            self._flashes.extend((r, now) for r in rects)
+            if not self._timer.isActive():
+                self._timer.start()
+
+    def paint_flashes(self):
+        """在视口上叠加闪烁矩形（透明度随时间衰减）"""
+        if not self._flashes:
+            return
+        now = time.perf_counter()
+        painter = QPainter(self._view.viewport())
+        painter.setPen(Qt.PenStyle.NoPen)
+        r, g, b = FLASH_COLOR
+        for rect, t0 in self._flashes:
+            left = 1.0 - (now - t0) * 1000.0 / FLASH_MS
+            if left > 0:
+                painter.fillRect(rect, QColor(r, g, b, int(FLASH_ALPHA * left)))
+        painter.end()
+
+    def _on_fade(self):
+        now = time.perf_counter()
+        viewport = self._view.viewport()
+        while self._flashes and (now - self._flashes[0][1]) * 1000.0 >= FLASH_MS:
+            rect, _ = self._flashes.popleft()
+            self._request(viewport, rect)
+        for rect, _ in self._flashes:
+            self._request(viewport, rect)
+        if not self._flashes:
+            self._timer.stop()
+
+    def _request(self, viewport, rect):
+        self._fade = self._fade.united(rect)
+        viewport.update(rect)
+
+    def _drop_all(self):
+        viewport = self._view.viewport()
+        for rect, _ in self._flashes:
+            self._request(viewport, rect)
+        self._flashes.clear()
+        self._timer.stop()
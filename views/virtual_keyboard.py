@@ -5,8 +5,6 @@ TEGG Touch 蛋挞 (PyQt6) - virtual_keyboard.py
 布局: 主键区 + 导航区(6键+方向键) + 数字小键盘
 """
 
-import ctypes
-
 from PyQt6.QtWidgets import (
     QWidget, QPushButton, QLabel, QHBoxLayout, QVBoxLayout, QFrame,
     QApplication, QLineEdit,
@@ -16,6 +14,7 @@ from PyQt6.QtGui import QColor, QFont, QFontDatabase
 
 from core.i18n import t, get_font
 from core.input_engine import trigger
+from core.input_backend import get_backend
 
 # ── 尺寸常量 ──
 # 缩小三栏间距 (0.935 → 0.415)，扩大按键间距 (2 → 4)，总宽不变 1070
@@ -450,12 +449,11 @@ class VirtualKeyboard(QWidget):
         """设置 WS_EX_NOACTIVATE 防止键盘窗口抢夺焦点"""
         try:
             hwnd = int(self.winId())
-            user32 = ctypes.windll.user32
-            GWL_EXSTYLE = -20
+            backend = get_backend()
             WS_EX_NOACTIVATE = 0x08000000
-            old = user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
+            old = backend.get_window_ex_style(hwnd)
             if not (old & WS_EX_NOACTIVATE):
-                user32.SetWindowLongW(hwnd, GWL_EXSTYLE, old | WS_EX_NOACTIVATE)
+                backend.set_window_ex_style(hwnd, old | WS_EX_NOACTIVATE)
         except Exception:
             pass
 
@@ -1085,7 +1085,7 @@ class VoiceSettingsDialog(QDialog):
     def _new_macro(self):
         from views.macro_editor_dialog import MacroEditorDialog
         names = [m.get('name', '') for m in self._macros]
-        dlg = MacroEditorDialog(existing_names=names, parent=self)
+        dlg = MacroEditorDialog(existing_names=names, parent=self, macros=self._macros)
         dlg.macro_saved.connect(lambda data: self._on_macro_editor_saved(data, -1))
         dlg.exec()
 
@@ -1093,7 +1093,8 @@ class VoiceSettingsDialog(QDialog):
         from views.macro_editor_dialog import MacroEditorDialog
         data = copy.deepcopy(self._macros[idx])
         names = [m.get('name', '') for m in self._macros]
-        dlg = MacroEditorDialog(macro_data=data, existing_names=names, parent=self)
+        dlg = MacroEditorDialog(macro_data=data, existing_names=names, parent=self,
+                                macros=self._macros)
         dlg.macro_saved.connect(lambda d: self._on_macro_editor_saved(d, idx))
         dlg.exec()
 
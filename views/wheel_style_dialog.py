@@ -10,7 +10,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QRectF, pyqtSignal, QSize
 from PyQt6.QtGui import (
-    QColor, QFont, QPainter, QPen, QBrush, QPainterPath,
+    QColor, QFont, QPainter, QPen, QBrush,
 )
 
 from core.i18n import t, get_font
@@ -27,6 +27,7 @@ from core.constants import (
     WHEEL_VISUAL_INSET, WHEEL_GAP_PX,
     WHEEL_SECTOR_COUNT, WHEEL_SECTORS_DEF,
 )
+from scene.wheel_geometry import ring_path, sector_path
 
 # ── 颜色 ──
 C_BG = "#2D2D2D"
@@ -185,48 +186,6 @@ def _wheel_type_name(type_id):
     return t(f"wheel_style.type_{type_id}")
 
 
-# ═══════════════════════════════════════════════════════
-# 路径构建工具函数
-# ═══════════════════════════════════════════════════════
-
-def _build_ring_path(cx, cy, r_inner, r_outer):
-    outer = QPainterPath()
-    outer.addEllipse(cx - r_outer, cy - r_outer, r_outer * 2, r_outer * 2)
-    inner = QPainterPath()
-    inner.addEllipse(cx - r_inner, cy - r_inner, r_inner * 2, r_inner * 2)
-    return outer.subtracted(inner)
-
-
-def _half_gap_angle(radius, gap_px):
-    if radius <= 0 or gap_px <= 0:
-        return 0
-    return math.degrees(math.atan2(gap_px / 2, radius))
-
-
-def _build_sector_path(cx, cy, r_inner, r_outer, start_angle, span_angle, gap_px=0):
-    go = _half_gap_angle(r_outer, gap_px)
-    gi = _half_gap_angle(r_inner, gap_px)
-    os_ = start_angle + go
-    os_span = span_angle - 2 * go
-    is_ = start_angle + gi
-    is_span = span_angle - 2 * gi
-
-    outer_rect = QRectF(cx - r_outer, cy - r_outer, r_outer * 2, r_outer * 2)
-    inner_rect = QRectF(cx - r_inner, cy - r_inner, r_inner * 2, r_inner * 2)
-
-    path = QPainterPath()
-    path.arcMoveTo(outer_rect, os_)
-    path.arcTo(outer_rect, os_, os_span)
-
-    ie = math.radians(is_ + is_span)
-    ix = cx + r_inner * math.cos(ie)
-    iy = cy - r_inner * math.sin(ie)
-    path.lineTo(ix, iy)
-    path.arcTo(inner_rect, is_ + is_span, -is_span)
-    path.closeSubpath()
-    return path
-
-
 # ═══════════════════════════════════════════════════════
 # _WheelPreview — 轮盘预览绘制控件 (缩略图 & 1:1)
 # ═══════════════════════════════════════════════════════
@@ -306,7 +265,7 @@ class _WheelPreview(QWidget):
         span = 360.0 / WHEEL_SECTOR_COUNT
         for i, sd in enumerate(WHEEL_SECTORS_DEF):
             start = sd['angle'] - span / 2
-            path = _build_sector_path(cx, cy, inner_vi, inner_vo, start, span, gap)
+            path = sector_path(inner_vi, inner_vo, start, span, gap).translated(cx, cy)
 
             if self._simplified:
                 p.setPen(Qt.PenStyle.NoPen)
@@ -338,7 +297,7 @@ class _WheelPreview(QWidget):
         if is_dual and outer_vi is not None:
             for i, sd in enumerate(WHEEL_SECTORS_DEF):
                 start = sd['angle'] - span / 2
-                path = _build_sector_path(cx, cy, outer_vi, outer_vo, start, span, gap)
+                path = sector_path(outer_vi, outer_vo, start, span, gap).translated(cx, cy)
 
                 if self._simplified:
                     p.setPen(Qt.PenStyle.NoPen)
@@ -371,12 +330,12 @@ class _WheelPreview(QWidget):
             r_ring_o = wt.get('ring_outer', WHEEL_RING_OUTER)
             rri = r_ring_i * s + WHEEL_VISUAL_INSET * s
             rro = r_ring_o * s - WHEEL_VISUAL_INSET * s
-            ring_path = _build_ring_path(cx, cy, rri, rro)
+            ring_shape = ring_path(rri, rro).translated(cx, cy)
 
             if self._simplified:
                 p.setPen(Qt.PenStyle.NoPen)
                 p.setBrush(QBrush(fill_color))
-                p.drawPath(ring_path)
+                p.drawPath(ring_shape)
             else:
                 # 双环: ring 位置 = 中二环 → _middle_ring_visible
                 # 单环: ring 位置 = 中心环 → _center_ring_visible
@@ -389,13 +348,13 @@ class _WheelPreview(QWidget):
                     else:
                         p.setBrush(QBrush(QColor(C_RING_FILL)))
                         p.setPen(QPen(QColor(C_RING_BORDER), max(1, 2 * s)))
-                    p.drawPath(ring_path)
+                    p.drawPath(ring_shape)
 
         # 绘制内环 (仅双环模式) — 最内位置 = 中心环
         if wt.get('has_inner_ring'):
             ir_i = wt['inner_ring_inner'] * s + WHEEL_VISUAL_INSET * s
             ir_o = wt['inner_ring_outer'] * s - WHEEL_VISUAL_INSET * s
-            inner_path = _build_ring_path(cx, cy, ir_i, ir_o)
+            inner_path = ring_path(ir_i, ir_o).translated(cx, cy)
 
             if self._simplified:
                 p.setPen(Qt.PenStyle.NoPen)